@@ -0,0 +1,78 @@
+"""
+순위 조회 벤치마크입니다.
+
+기존 방식(전체 유저 합계를 정렬한 뒤 순회하며 유저를 찾음)과
+src.core.rank_service.RankIndex(순서 통계 구조)를 10k / 100k 유저에서 비교합니다.
+
+실행: python -m benchmarks.rank_benchmark [유저 수 ...]
+"""
+import random
+import sys
+import time
+
+from src.core.rank_service import RankIndex
+
+DEFAULT_SIZES = (10_000, 100_000)
+QUERIES = 200
+UPDATES = 5_000
+
+
+def sort_scan_rank(totals: dict, user_id: int):
+    """변경 전 get_user_rank / _get_chat_total_with_rank와 같은 방식"""
+    ranked = sorted(totals.items(), key=lambda x: (-x[1], x[0]))
+    for idx, (uid, _) in enumerate(ranked, start=1):
+        if uid == user_id:
+            return idx
+    return None
+
+
+def timed(fn, repeat: int) -> float:
+    """fn을 repeat번 실행한 1회 평균 시간(ms)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def run(size: int, rng: random.Random):
+    totals = {uid: rng.randint(1, 500_000) for uid in range(1, size + 1)}
+    targets = [rng.randint(1, size) for _ in range(QUERIES)]
+
+    started = time.perf_counter()
+    index = RankIndex(totals)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # 두 방식의 결과가 같은지 먼저 확인합니다.
+    for uid in targets[:5]:
+        assert sort_scan_rank(totals, uid) == index.rank(uid)
+
+    scan_queries = max(1, QUERIES // 20)
+    it = iter(targets * 2)
+    scan_ms = timed(lambda: sort_scan_rank(totals, next(it)), scan_queries)
+    it = iter(targets * 2)
+    index_ms = timed(lambda: index.rank(next(it)), QUERIES)
+
+    # 쓰기 경로: 플러시마다 몇몇 유저의 점수가 늘어나는 상황
+    updates = [(rng.randint(1, size), rng.randint(1, 600)) for _ in range(UPDATES)]
+    it = iter(updates)
+    update_us = timed(lambda: index.add(*next(it)), UPDATES) * 1000
+    for uid, delta in updates:
+        totals[uid] += delta
+    for uid in targets[:5]:
+        assert sort_scan_rank(totals, uid) == index.rank(uid)
+
+    print(
+        f"{size:>8,}명 | 정렬+순회 {scan_ms:9.2f}ms/조회 | 인덱스 {index_ms * 1000:7.2f}µs/조회 "
+        f"({scan_ms / index_ms:,.0f}배) | 증분 반영 {update_us:6.2f}µs/건 | 초기 구성 {build_ms:7.1f}ms"
+    )
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    rng = random.Random(42)
+    for size in sizes:
+        run(size, rng)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+"""
+랭크 카드 렌더링 벤치마크입니다.
+
+- 변경 전: 카드마다 배경 파일을 다시 읽고 2배 LANCZOS 확대, 고정 요소 그리기, 전체 다운스케일을 반복하고
+  PNG를 기본 압축 수준(6)으로 인코딩 (템플릿을 매번 다시 만드는 것으로 재현)
+- 템플릿 사용: 프로세스당 한 번 만든 템플릿을 복사해 바뀌는 내용만 그리고 그린 영역만 다운스케일
+- 템플릿 + PNG_COMPRESS_LEVEL: 현재 설정
+
+각 방식의 카드/초를 비교하고, 템플릿을 재사용한 결과가 매번 새로 만든 결과와 픽셀 단위로 같은지도 확인합니다.
+
+실행: python -m benchmarks.rankcard_benchmark [카드 수]
+"""
+import io
+import sys
+import time
+
+from PIL import Image, ImageChops
+
+from src.rankcard import RankCardGenerator as generator_module
+from src.rankcard.RankCardGenerator import RankCardGenerator
+from src.rankcard.RankCardService import RankCardData
+from src.rankcard.XPFormulas import TieredLevelManager
+
+DEFAULT_CARDS = 10
+LEGACY_COMPRESS_LEVEL = 6   # 변경 전 PNG 인코딩 압축 수준 (Pillow 기본값)
+
+
+def sample_data(i: int) -> RankCardData:
+    voice = 3_000 + i * 137
+    chat = 200 + i * 11
+    return RankCardData(
+        user_name=f"고요{i}",
+        avatar_url="",
+        current_role="goyo",
+        role_display="고요",
+        role_emoji="🌙",
+        total_exp=12_345 + i,
+        next_role="seoyu",
+        next_role_display="서유",
+        role_progress_pct=(i * 7) % 100,
+        voice_level_info=TieredLevelManager.calculate_level(voice, 'voice'),
+        voice_total_xp=voice,
+        voice_rank=i + 1,
+        voice_total_users=500,
+        chat_level_info=TieredLevelManager.calculate_level(chat, 'chat'),
+        chat_total_xp=chat,
+        chat_rank=i + 2,
+        chat_total_users=400,
+    )
+
+
+def sample_avatar() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (256, 256), (120, 90, 200)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_without_template(generator: RankCardGenerator, data, avatar) -> bytes:
+    generator_module._load_background.cache_clear()
+    generator._template = None
+    return generator.generate(data, avatar).getvalue()
+
+
+def render_with_template(generator: RankCardGenerator, data, avatar) -> bytes:
+    return generator.generate(data, avatar).getvalue()
+
+
+def cards_per_second(render, generator, cards: int, avatar, compress_level: int) -> float:
+    generator_module.PNG_COMPRESS_LEVEL = compress_level
+    started = time.perf_counter()
+    for i in range(cards):
+        render(generator, sample_data(i), avatar)
+    return cards / (time.perf_counter() - started)
+
+
+def main(argv):
+    cards = int(argv[0]) if argv else DEFAULT_CARDS
+    avatar = sample_avatar()
+    generator = RankCardGenerator()
+
+    before = render_without_template(generator, sample_data(1), avatar)
+    after = render_with_template(generator, sample_data(1), avatar)
+    diff = ImageChops.difference(Image.open(io.BytesIO(before)), Image.open(io.BytesIO(after)))
+    assert diff.getbbox() is None, "템플릿을 재사용한 결과가 새로 만든 결과와 다릅니다."
+
+    current_level = generator_module.PNG_COMPRESS_LEVEL
+    rows = [
+        ("변경 전 (템플릿 없음, 압축 6)", render_without_template, LEGACY_COMPRESS_LEVEL),
+        ("템플릿 사용 (압축 6)", render_with_template, LEGACY_COMPRESS_LEVEL),
+        (f"템플릿 사용 (압축 {current_level})", render_with_template, current_level),
+    ]
+    baseline = None
+    for label, render, level in rows:
+        generator._get_template()
+        rate = cards_per_second(render, generator, cards, avatar, level)
+        baseline = baseline or rate
+        print(f"{label:<28} {rate:6.2f}장/초 ({1000 / rate:7.1f}ms/장) | {rate / baseline:.2f}배")
+    generator_module.PNG_COMPRESS_LEVEL = current_level
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
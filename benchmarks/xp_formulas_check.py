@@ -0,0 +1,143 @@
+"""
+XPFormulas 레벨 계산 검증 및 벤치마크입니다.
+
+닫힌 형식 해(solve_level)와 배치 API(calculate_levels)가 변경 전 while 루프 구현과
+모든 필드에서 같은 결과를 내는지 확인합니다.
+- 0 ~ EXHAUSTIVE_LIMIT 전체, 각 레벨 경계(S(L) - 1, S(L), S(L) + 1), 음수, 무작위 큰 값
+- 배치 API는 NumPy 경로(설치된 경우)와 순수 파이썬 경로를 모두 확인
+- 임의의 (증가량, 기본 비용) 조합에 대해서도 solve_level을 루프와 비교
+마지막으로 루프 / 닫힌 형식 / 배치 계산의 처리량을 비교합니다.
+
+실행: python -m benchmarks.xp_formulas_check [무작위 표본 수]
+"""
+import random
+import sys
+import time
+
+from src.rankcard import XPFormulas
+from src.rankcard.XPFormulas import LevelInfo, TieredLevelManager, cumulative_xp, solve_level
+
+DEFAULT_SAMPLES = 20_000
+EXHAUSTIVE_LIMIT = 200_000
+BOUNDARY_LEVELS = 3_000
+SEED = 20250801
+
+
+def loop_level(total_xp: int, growth: int, base: int) -> int:
+    """변경 전 calculate_level의 레벨 계산 (레벨업 비용을 순차 차감)"""
+    level = 0
+    remaining_xp = total_xp
+    while True:
+        required = growth * level + base
+        if remaining_xp < required:
+            break
+        remaining_xp -= required
+        level += 1
+    return level
+
+
+def loop_calculate_level(total_xp: int, xp_type: str) -> LevelInfo:
+    """변경 전 calculate_level 전체"""
+    growth, base = TieredLevelManager.get_coefficients(xp_type)
+    level = loop_level(total_xp, growth, base)
+    remaining_xp = total_xp - cumulative_xp(level, growth, base)
+    current_required = growth * level + base
+    progress = (remaining_xp / current_required * 100) if current_required > 0 else 0.0
+    return LevelInfo(level, total_xp, remaining_xp, current_required, min(progress, 100.0))
+
+
+def sample_totals(xp_type: str, samples: int, rng: random.Random) -> list:
+    growth, base = TieredLevelManager.get_coefficients(xp_type)
+    totals = list(range(-5, EXHAUSTIVE_LIMIT))
+    for level in range(BOUNDARY_LEVELS):
+        edge = cumulative_xp(level, growth, base)
+        totals.extend((edge - 1, edge, edge + 1))
+    totals.extend(rng.randint(0, 10 ** 9) for _ in range(samples))
+    return totals
+
+
+def check_single(xp_type: str, totals: list):
+    for total_xp in totals:
+        expected = loop_calculate_level(total_xp, xp_type) if total_xp < EXHAUSTIVE_LIMIT * 50 else None
+        actual = TieredLevelManager.calculate_level(total_xp, xp_type)
+        if expected is not None:
+            assert actual == expected, f"{xp_type} {total_xp}: {actual} != {expected}"
+        # 루프가 너무 긴 큰 값은 정의(S(L) <= XP < S(L + 1))로 확인합니다.
+        growth, base = TieredLevelManager.get_coefficients(xp_type)
+        if total_xp >= base:
+            assert cumulative_xp(actual.level, growth, base) <= total_xp < cumulative_xp(actual.level + 1, growth, base)
+        assert 0 <= actual.current_xp < actual.required_xp or total_xp < 0
+
+
+def check_batch(xp_type: str, totals: list):
+    expected = [TieredLevelManager.calculate_level(total_xp, xp_type) for total_xp in totals]
+    paths = [("순수 파이썬", None)]
+    if XPFormulas.np is not None:
+        paths.insert(0, ("NumPy", XPFormulas.np))
+
+    numpy_module = XPFormulas.np
+    try:
+        for label, module in paths:
+            XPFormulas.np = module
+            batch = TieredLevelManager.calculate_levels(totals, xp_type)
+            for i, info in enumerate(expected):
+                got = (int(batch.level[i]), int(batch.current_xp[i]), int(batch.required_xp[i]))
+                assert got == (info.level, info.current_xp, info.required_xp), f"{label} {xp_type} {totals[i]}: {got}"
+                assert abs(float(batch.progress_pct[i]) - info.progress_pct) < 1e-9, f"{label} {xp_type} {totals[i]}"
+            print(f"  배치({label}) {xp_type}: {len(totals)}개 일치")
+    finally:
+        XPFormulas.np = numpy_module
+
+
+def check_coefficients(rng: random.Random):
+    for _ in range(500):
+        growth = rng.randint(0, 300)
+        base = rng.randint(1, 300)
+        for _ in range(50):
+            total_xp = rng.randint(-10, 200_000)
+            assert solve_level(total_xp, growth, base) == loop_level(total_xp, growth, base), (growth, base, total_xp)
+    print("  임의 계수 500쌍 × 50개 일치")
+
+
+def throughput(totals: list):
+    for xp_type in ('voice', 'chat'):
+        started = time.perf_counter()
+        for total_xp in totals:
+            loop_calculate_level(total_xp, xp_type)
+        loop_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for total_xp in totals:
+            TieredLevelManager.calculate_level(total_xp, xp_type)
+        closed_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        TieredLevelManager.calculate_levels(totals, xp_type)
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        print(
+            f"  {xp_type:<5} {len(totals)}명 | 루프 {loop_ms:8.1f}ms | 닫힌 형식 {closed_ms:7.1f}ms "
+            f"({loop_ms / closed_ms:5.1f}배) | 배치 {batch_ms:7.1f}ms ({loop_ms / batch_ms:5.1f}배)"
+        )
+
+
+def main(argv):
+    samples = int(argv[0]) if argv else DEFAULT_SAMPLES
+    rng = random.Random(SEED)
+
+    print("검증")
+    for xp_type in ('voice', 'chat'):
+        totals = sample_totals(xp_type, samples, rng)
+        check_single(xp_type, totals)
+        print(f"  단일 {xp_type}: {len(totals)}개 일치")
+        check_batch(xp_type, totals)
+    check_coefficients(rng)
+
+    print(f"처리량 (NumPy {'사용' if XPFormulas.np is not None else '없음'})")
+    # 헤비 유저 분포: 음성 점수 수십만 ~ 수백만
+    leaderboard = [rng.randint(0, 5_000_000) for _ in range(5_000)]
+    throughput(leaderboard)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
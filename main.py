@@ -5,6 +5,8 @@ import asyncio
 import typing
 from dotenv import load_dotenv
 
+from src.core import connection_registry
+
 load_dotenv()
 import logging
 
@@ -79,7 +81,13 @@ async def load():
 async def main():
     # DB 초기화 선행
     async with bot:
-        await bot.start(bot_token)
+        try:
+            await bot.start(bot_token)
+        finally:
+            # cog_unload(음성/채팅 write-behind flush)가 DB를 쓰므로 봇을 먼저 닫은 뒤 연결을 닫습니다.
+            if not bot.is_closed():
+                await bot.close()
+            await connection_registry.close_all()
 
  # bot ready
 
@@ -135,4 +143,6 @@ async def sync(
 async def sync_error(error):
     print(f"error in sync: {error}")
 
-asyncio.run(main())
+# 랭크 카드 렌더링 프로세스 풀(spawn)이 이 모듈을 다시 import할 때 봇이 또 시작되지 않도록 합니다.
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,23 +1,38 @@
 """
 서버의 모든 멤버에게 DM을 일괄 전송하는 관리자 전용 모듈입니다.
+전송은 src.core.dm_delivery 엔진이 속도 제한에 맞춰 처리하고, 대상별 진행 상태는
+src.core.bulk_dm_db에 저장되어 재시작 후 `*DM일괄전송 재개`로 이어서 보낼 수 있습니다.
 """
 import discord
 from discord.ext import commands
 import asyncio
+from typing import Dict, Optional
 from src.core.admin_utils import is_guild_admin
+from src.core import bulk_dm_db
+from src.core.dm_delivery import DMDeliveryEngine
+
+# 진행 embed 갱신 주기 (초)
+PROGRESS_UPDATE_INTERVAL = 5.0
 
 
 class BulkDM(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_sessions = {}  # {(user_id, channel_id): True}
+        self.engines: Dict[int, DMDeliveryEngine] = {}  # guild_id → 진행 중인 엔진
 
     async def cog_load(self):
         try:
+            await bulk_dm_db.init_db()
             print(f"✅ {self.__class__.__name__} loaded successfully!")
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로드 중 오류 발생: {e}")
 
+    async def cog_unload(self):
+        # 남은 대상은 pending으로 남아 다음 재개 때 이어서 전송됩니다.
+        for engine in self.engines.values():
+            engine.stop()
+
     async def log(self, message):
         """로그 메시지를 Logger cog를 통해 전송합니다."""
         logger = self.bot.get_cog('Logger')
@@ -54,28 +69,39 @@ class BulkDM(commands.Cog):
         )
         return embed
 
-    def build_progress_embed(self, current: int, total: int, success: int, failed: int) -> discord.Embed:
-        """진행 상태 embed를 생성합니다."""
-        percentage = int(current / total * 100) if total > 0 else 0
-        progress_bar = self.create_progress_bar(current, total)
-        
+    def build_progress_embed(self, engine: DMDeliveryEngine, already_done: int, grand_total: int) -> discord.Embed:
+        """진행 상태 embed를 생성합니다. (이전 실행에서 처리한 대상 포함)"""
+        current = already_done + engine.done
+        percentage = int(current / grand_total * 100) if grand_total > 0 else 0
+        progress_bar = self.create_progress_bar(current, grand_total)
+        eta = engine.eta_seconds()
+        eta_text = "계산 중" if eta is None else f"약 {int(eta // 60)}분 {int(eta % 60)}초"
+
         embed = discord.Embed(
             title="📤 DM 전송 중...",
             color=discord.Color.gold()
         )
         embed.add_field(
             name="진행률",
-            value=f"{progress_bar} {percentage}% ({current}/{total})",
+            value=f"{progress_bar} {percentage}% ({current}/{grand_total})",
             inline=False
         )
         embed.add_field(
             name="현재 상태",
-            value=f"✅ 성공: {success}명 | ❌ 실패: {failed}명",
+            value=f"✅ 성공: {engine.stats['sent']}명 | ❌ 실패: {engine.stats['failed']}명 | 🔁 재시도: {engine.stats['retried']}회",
+            inline=False
+        )
+        embed.add_field(
+            name="처리 속도",
+            value=(
+                f"{engine.throughput():.2f}명/초 (전송 한도 {engine.bucket.rate:.2f}명/초, "
+                f"속도 제한 {engine.bucket.penalties}회)\n남은 시간: {eta_text}"
+            ),
             inline=False
         )
         return embed
 
-    def build_complete_embed(self, guild_name: str, success: int, failed: int) -> discord.Embed:
+    def build_complete_embed(self, guild_name: str, success: int, failed: int, throughput: float = 0.0) -> discord.Embed:
         """완료 embed를 생성합니다."""
         embed = discord.Embed(
             title="✅ DM 전송 완료",
@@ -91,6 +117,30 @@ class BulkDM(commands.Cog):
             value=f"✅ 성공: {success}명\n❌ 실패: {failed}명",
             inline=False
         )
+        if throughput > 0:
+            embed.add_field(name="처리 속도", value=f"{throughput:.2f}명/초", inline=False)
+        return embed
+
+    def build_stopped_embed(self, guild_name: str, counts: Dict[str, int]) -> discord.Embed:
+        """중단 embed를 생성합니다."""
+        embed = discord.Embed(
+            title="⏸️ DM 전송 중단됨",
+            description="`*DM일괄전송 재개`로 남은 대상에게 이어서 보낼 수 있습니다.",
+            color=discord.Color.orange()
+        )
+        embed.add_field(
+            name="서버",
+            value=guild_name,
+            inline=False
+        )
+        embed.add_field(
+            name="진행 상황",
+            value=(
+                f"✅ 성공: {counts[bulk_dm_db.SENT]}명\n❌ 실패: {counts[bulk_dm_db.FAILED]}명\n"
+                f"⏳ 남은 대상: {counts[bulk_dm_db.PENDING]}명"
+            ),
+            inline=False
+        )
         return embed
 
     def build_cancel_embed(self) -> discord.Embed:
@@ -104,15 +154,43 @@ class BulkDM(commands.Cog):
 
     @commands.command(name="DM일괄전송")
     @is_guild_admin()
-    async def bulk_dm(self, ctx):
-        """서버의 모든 멤버에게 DM을 일괄 전송합니다."""
+    async def bulk_dm(self, ctx, action: Optional[str] = None):
+        """
+        서버의 모든 멤버에게 DM을 일괄 전송합니다.
+        `재개`: 중단된 작업의 남은 대상에게 이어서 전송합니다.
+        `새로`: 중단된 작업을 취소하고 새 작업을 시작합니다.
+        """
         session_key = (ctx.author.id, ctx.channel.id)
         
         # 이미 세션이 진행 중인지 확인
-        if session_key in self.active_sessions:
+        if session_key in self.active_sessions or ctx.guild.id in self.engines:
             await ctx.send("❌ 이미 DM 전송 세션이 진행 중입니다.")
             return
 
+        unfinished = await bulk_dm_db.get_unfinished_job(ctx.guild.id)
+        if action == "재개":
+            if unfinished is None:
+                await ctx.send("❌ 이어서 보낼 DM 작업이 없습니다.")
+                return
+            self.active_sessions[session_key] = True
+            try:
+                await self._deliver(ctx, unfinished["job_id"], unfinished["content"])
+            finally:
+                self.active_sessions.pop(session_key, None)
+            return
+
+        if unfinished is not None:
+            if action != "새로":
+                counts = await bulk_dm_db.get_job_counts(unfinished["job_id"])
+                await ctx.send(
+                    f"⚠️ 중단된 DM 작업 #{unfinished['job_id']}이 있습니다. "
+                    f"(보냄 {counts[bulk_dm_db.SENT]}명, 실패 {counts[bulk_dm_db.FAILED]}명, "
+                    f"남음 {counts[bulk_dm_db.PENDING]}명, 시작 {unfinished['created_at']})\n"
+                    f"`*DM일괄전송 재개`로 이어서 보내거나 `*DM일괄전송 새로`로 취소하고 새로 시작하세요."
+                )
+                return
+            await bulk_dm_db.finish_job(unfinished["job_id"], bulk_dm_db.JOB_CANCELLED)
+
         # 봇이 아닌 멤버 목록
         members = [m for m in ctx.guild.members if not m.bot]
         target_count = len(members)
@@ -162,41 +240,78 @@ class BulkDM(commands.Cog):
                 )
                 return
 
-            # DM 전송 시작
-            dm_content = msg.content
-            success_count = 0
-            failed_count = 0
+            # 작업과 대상 목록을 저장한 뒤 전송 시작
+            job_id = await bulk_dm_db.create_job(
+                ctx.guild.id, ctx.channel.id, ctx.author.id, msg.content, [m.id for m in members]
+            )
+            await self._deliver(ctx, job_id, msg.content, status_msg)
 
-            # 진행률 업데이트 간격 (10% 또는 최소 1명)
-            update_interval = max(1, target_count // 10)
+        finally:
+            # 세션 정리
+            self.active_sessions.pop(session_key, None)
 
-            for i, member in enumerate(members, 1):
-                try:
-                    await member.send(dm_content)
-                    success_count += 1
-                except (discord.Forbidden, discord.HTTPException):
-                    failed_count += 1
+    async def _deliver(self, ctx, job_id: int, content: str, status_msg: Optional[discord.Message] = None):
+        """작업의 pending 대상에게 전송하고 진행 상황을 embed로 보여줍니다."""
+        guild = ctx.guild
+        targets = await bulk_dm_db.get_pending_targets(job_id)
+        counts = await bulk_dm_db.get_job_counts(job_id)
+        already_done = counts[bulk_dm_db.SENT] + counts[bulk_dm_db.FAILED]
+        grand_total = already_done + len(targets)
+
+        async def resolve(user_id: int):
+            # 서버를 떠난 멤버에게는 보내지 않습니다.
+            return guild.get_member(user_id)
 
-                # 진행률 업데이트
-                if i % update_interval == 0 or i == target_count:
-                    progress_embed = self.build_progress_embed(i, target_count, success_count, failed_count)
-                    await status_msg.edit(embed=progress_embed)
+        engine = DMDeliveryEngine(job_id, content, resolve)
+        engine.total = len(targets)
+        self.engines[guild.id] = engine
 
-                # Rate limit 방지를 위한 딜레이
-                await asyncio.sleep(0.5)
+        progress_embed = self.build_progress_embed(engine, already_done, grand_total)
+        if status_msg is None:
+            status_msg = await ctx.send(embed=progress_embed)
+        else:
+            await status_msg.edit(embed=progress_embed)
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(PROGRESS_UPDATE_INTERVAL)
+                try:
+                    await status_msg.edit(embed=self.build_progress_embed(engine, already_done, grand_total))
+                except discord.HTTPException:
+                    pass
 
-            # 완료 embed
-            complete_embed = self.build_complete_embed(ctx.guild.name, success_count, failed_count)
-            await status_msg.edit(embed=complete_embed)
+        reporter = asyncio.create_task(report_progress())
+        try:
+            await engine.run(targets)
+        finally:
+            reporter.cancel()
+            self.engines.pop(guild.id, None)
 
+        counts = await bulk_dm_db.get_job_counts(job_id)
+        if counts[bulk_dm_db.PENDING]:
+            # cog 언로드 등으로 멈춘 경우: 작업은 running으로 남겨 재개할 수 있게 합니다.
+            try:
+                await status_msg.edit(embed=self.build_stopped_embed(guild.name, counts))
+            except discord.HTTPException:
+                pass
             await self.log(
-                f"DM 일괄전송 완료 - {ctx.author}({ctx.author.id}) "
-                f"[길드: {ctx.guild.name}({ctx.guild.id}), 성공: {success_count}명, 실패: {failed_count}명]"
+                f"DM 일괄전송 중단 - 작업 #{job_id}, 남은 대상 {counts[bulk_dm_db.PENDING]}명 "
+                f"[길드: {guild.name}({guild.id})]"
             )
+            return
 
-        finally:
-            # 세션 정리
-            self.active_sessions.pop(session_key, None)
+        await bulk_dm_db.finish_job(job_id)
+        # 완료 embed
+        complete_embed = self.build_complete_embed(
+            guild.name, counts[bulk_dm_db.SENT], counts[bulk_dm_db.FAILED], engine.throughput()
+        )
+        await status_msg.edit(embed=complete_embed)
+
+        await self.log(
+            f"DM 일괄전송 완료 - {ctx.author}({ctx.author.id}) "
+            f"[길드: {guild.name}({guild.id}), 작업 #{job_id}, 성공: {counts[bulk_dm_db.SENT]}명, "
+            f"실패: {counts[bulk_dm_db.FAILED]}명, {engine.throughput():.2f}명/초]"
+        )
 
     async def cog_command_error(self, ctx, error):
         print(f"{self.__class__.__name__} cog에서 오류 발생: {error}")
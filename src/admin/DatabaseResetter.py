@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 import asyncio
 
 from src.core.admin_utils import is_guild_admin
@@ -8,6 +7,7 @@ from src.core.DataManager import DataManager
 from src.core.LevelDataManager import LevelDataManager
 from src.core.balance_data_manager import balance_manager as BalanceDataManager
 from src.core.ChattingDataManager import ChattingDataManager
+from src.core.connection_registry import connection, write_lock
 
 class DatabaseResetter(commands.Cog):
     def __init__(self, bot):
@@ -81,8 +81,9 @@ class DatabaseResetter(commands.Cog):
             # rank_certifications 테이블을 포함한 추가 테이블 초기화 보완
             await self.level_db.ensure_initialized()
             if self.level_db._db:
-                await self.level_db._db.execute("DELETE FROM rank_certifications")
-                await self.level_db._db.commit()
+                async with write_lock(self.level_db.db_path):
+                    await self.level_db._db.execute("DELETE FROM rank_certifications")
+                    await self.level_db._db.commit()
             results.append("✅ 레벨/경험치 데이터 DB 초기화 완료")
         except Exception as e:
             results.append(f"⚠️ 레벨/경험치 데이터 DB 초기화 실패: {e}")
@@ -93,8 +94,9 @@ class DatabaseResetter(commands.Cog):
             # 송금 내역 테이블도 추가 보조 삭제
             await BalanceDataManager.ensure_initialized()
             if BalanceDataManager._db:
-                await BalanceDataManager._db.execute("DELETE FROM transfers")
-                await BalanceDataManager._db.commit()
+                async with write_lock(BalanceDataManager.db_path):
+                    await BalanceDataManager._db.execute("DELETE FROM transfers")
+                    await BalanceDataManager._db.commit()
             results.append("✅ 자산 데이터 DB 초기화 완료")
         except Exception as e:
             results.append(f"⚠️ 자산 데이터 DB 초기화 실패: {e}")
@@ -102,7 +104,7 @@ class DatabaseResetter(commands.Cog):
         # 4. 출석 DB (Attendance) - SQLite 직접 접근 (attendance.db)
         try:
             db_path = 'data/attendance.db'
-            async with aiosqlite.connect(db_path) as db:
+            async with connection(db_path) as db:
                 await db.execute("DELETE FROM attendance")
                 await db.commit()
             results.append("✅ 출석 DB 초기화 완료")
@@ -7,6 +7,9 @@ import sys
 import os
 import asyncio
 
+from src.core.ChattingDataManager import ChattingDataManager, WRITE_DRAIN_TIMEOUT
+from src.core import connection_registry, rank_service
+
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -25,6 +28,16 @@ class Admin(commands.Cog):
         if logger:
             await logger.log(message, title="⚙️ 관리자 시스템 로그", color=discord.Color.dark_red())
 
+    async def flush_pending_writes(self):
+        """종료 전에 쓰기 큐/누적기에 남아 있는 기록을 모두 DB에 반영합니다."""
+        try:
+            await ChattingDataManager().drain(timeout=WRITE_DRAIN_TIMEOUT)
+        except Exception as e:
+            print(f"채팅 기록 반영 중 오류: {e}")
+        logger = self.bot.get_cog('Logger')
+        if logger:
+            await logger.flush()
+
     @commands.command(name='재시작', aliases=['restart'])
     @commands.is_owner()
     async def restart(self, ctx):
@@ -43,7 +56,9 @@ class Admin(commands.Cog):
             python = sys.executable
             script = os.path.abspath(sys.argv[0])
             
+            await self.flush_pending_writes()
             await self.bot.close()
+            await connection_registry.close_all()
             
             os.execl(python, python, script)
             
@@ -69,7 +84,9 @@ class Admin(commands.Cog):
             await asyncio.sleep(1)
             
             await ctx.send("봇이 종료되었습니다. 안녕히 계세요! 👋")
+            await self.flush_pending_writes()
             await self.bot.close()
+            await connection_registry.close_all()
             
             sys.exit(0)
             
@@ -106,7 +123,104 @@ class Admin(commands.Cog):
                 value=str(guild_count), 
                 inline=True
             )
+
+            db_stats = connection_registry.get_stats()
+            embed.add_field(
+                name="DB 연결",
+                value=f"활성 {db_stats['active']}개 / 최근 1분 신규 {db_stats['opened_last_minute']}개 (누적 {db_stats['opened_total']}개)",
+                inline=False
+            )
+
+            chat_dm = ChattingDataManager()
+            chat_stats = chat_dm.write_stats
+            pending = chat_dm._write_queue.qsize() if chat_dm._write_queue else 0
+            embed.add_field(
+                name="채팅 기록 큐",
+                value=f"대기 {pending}건 / 커밋 {chat_stats['batches']}회 ({chat_stats['rows']}건) / 실패 후 재시도 {chat_stats['failures']}회 / dead-letter {chat_stats['dead_lettered']}건, 큐 포화로 버림 {chat_stats['dropped']}건",
+                inline=False
+            )
             
+            rank_stats = rank_service.get_stats()
+            embed.add_field(
+                name="순위 인덱스",
+                value=f"인덱스 {rank_stats['indexes']}개 / 조회 적중 {rank_stats['hits']}회, 구성 {rank_stats['builds']}회 / 무효화 {rank_stats['invalidations']}회",
+                inline=False
+            )
+
+            rank_card_cog = self.bot.get_cog('RankCardCog')
+            if rank_card_cog:
+                render_stats = rank_card_cog.renderer.get_stats()
+                embed.add_field(
+                    name="랭크 카드 렌더링",
+                    value=(
+                        f"{render_stats['mode']} {render_stats['workers']}개 / 대기 {render_stats['pending']}건 / "
+                        f"완료 {render_stats['renders']}건 (평균 {render_stats['avg_render_ms']:.0f}ms, 최대 {render_stats['max_render_ms']:.0f}ms, "
+                        f"대기 평균 {render_stats['avg_wait_ms']:.0f}ms) / 실패 {render_stats['failures']}건, 거절 {render_stats['rejected']}건"
+                    ),
+                    inline=False
+                )
+                stage_stats = rank_card_cog.service.get_stage_stats()
+                if stage_stats:
+                    embed.add_field(
+                        name="랭크 카드 데이터 수집",
+                        value=" / ".join(
+                            f"{stage} 평균 {stats['avg_ms']:.0f}ms (최대 {stats['max_ms']:.0f}ms)"
+                            for stage, stats in stage_stats.items()
+                        ),
+                        inline=False
+                    )
+                cache_stats = rank_card_cog.result_cache.get_stats()
+                embed.add_field(
+                    name="랭크 카드 캐시",
+                    value=(
+                        f"적중률 {cache_stats['hit_rate']:.0f}% / 최근 결과 적중 {cache_stats['recent_hits']}회, "
+                        f"지문 적중 {cache_stats['hits']}회, 미스 {cache_stats['misses']}회 / "
+                        f"보관 {cache_stats['cards']}장 ({cache_stats['bytes'] / 1024 / 1024:.1f}MB)"
+                    ),
+                    inline=False
+                )
+
+            router = self.bot.get_cog('MessageRouter')
+            if router:
+                router_stats = router.get_stats(limit=3)
+                top = "\n".join(
+                    f"{h['name']}: {h['calls']}회, 평균 {h['avg_ms']:.1f}ms, 최대 {h['max_ms']:.0f}ms"
+                    for h in router_stats['handlers']
+                ) or "기록 없음"
+                embed.add_field(
+                    name="메시지 라우터",
+                    value=f"수신 {router_stats['seen']}건 / 분배 {router_stats['routed']}건\n{top}",
+                    inline=False
+                )
+
+            logger = self.bot.get_cog('Logger')
+            if logger:
+                log_stats = logger.get_stats()
+                embed.add_field(
+                    name="로그 전송",
+                    value=(
+                        f"대기 {log_stats['pending']}건 / 전송 {log_stats['entries_sent']}건 (메시지 {log_stats['messages']}개) / "
+                        f"버림 {log_stats['dropped']}건, 샘플링 제외 {log_stats['sampled_out']}건 / "
+                        f"전송 실패 {log_stats['send_failures']}회, 파일 기록 {log_stats['fallback_entries']}건"
+                    ),
+                    inline=False
+                )
+
+            scheduler = self.bot.get_cog('Scheduler')
+            if scheduler:
+                jobs = scheduler.get_stats()
+                lines = [
+                    f"{job['name']}: 다음 <t:{int(job['next_run'])}:R> / 실행 {job['runs']}회, 실패 {job['failures']}회, "
+                    f"건너뜀 {job['skipped']}회 / 지연 {job['last_lag_ms']:.0f}ms (최대 {job['max_lag_ms']:.0f}ms), "
+                    f"소요 {job['last_duration_ms']:.0f}ms"
+                    for job in jobs[:5] if job['next_run'] is not None
+                ]
+                embed.add_field(
+                    name=f"스케줄러 (작업 {len(jobs)}개)",
+                    value="\n".join(lines) or "예정된 작업 없음",
+                    inline=False
+                )
+
             if hasattr(self.bot, 'start_time'):
                 uptime = ctx.message.created_at - self.bot.start_time
                 hours, remainder = divmod(int(uptime.total_seconds()), 3600)
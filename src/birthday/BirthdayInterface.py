@@ -12,6 +12,7 @@ import json
 from pathlib import Path
 import pytz
 from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
+from src.utils.Scheduler import CATCH_UP_ONCE
 
 CONFIG_PATH = Path("config/birthday_config.json")
 KST = pytz.timezone("Asia/Seoul")
@@ -60,7 +61,8 @@ class BirthdayInterface(commands.Cog):
         # 스케줄러 cog 가져오기
         scheduler = self.bot.get_cog("Scheduler")
         if scheduler:
-            scheduler.schedule_daily(self.midnight_update, 0, 0)
+            # 재시작 중 자정을 넘겼으면 시작하자마자 한 번 갱신
+            scheduler.schedule_daily(self.midnight_update, 0, 0, catch_up=CATCH_UP_ONCE)
         else:
             print("⚠️ Scheduler cog not found! BirthdayInterface task validation failed.")
     
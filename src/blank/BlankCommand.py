@@ -3,6 +3,7 @@ from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta
 from src.core.DataManager import DataManager
+from src.core.voice_utils import get_tracked_channel_resolver
 import pytz
 from typing import List
 
@@ -38,35 +39,8 @@ class BlankCommand(commands.GroupCog, group_name="여백"):
         return f"{days}일 {hours}시간 {minutes}분 {seconds}초 ({self.calculate_points(total_seconds)}점)"
     
     async def get_expanded_tracked_channels(self) -> List[int]:
-        tracked_ids = await self.data_manager.get_tracked_channels("aginari")
-        expanded_ids = set()
-
-        # 1. 카테고리ID와 음성채널ID 분리
-        category_ids = set()
-        voice_channel_ids = set()
-        for cid in tracked_ids:
-            ch = self.bot.get_channel(cid)
-            if isinstance(ch, discord.CategoryChannel):
-                category_ids.add(cid)
-            elif isinstance(ch, discord.VoiceChannel):
-                voice_channel_ids.add(cid)
-
-        # 2. 카테고리ID로 등록된 경우, 해당 카테고리의 모든 하위 음성채널 포함
-        for cat_id in category_ids:
-            cat = self.bot.get_channel(cat_id)
-            if isinstance(cat, discord.CategoryChannel):
-                for vc in cat.voice_channels:
-                    expanded_ids.add(vc.id)
-
-        # 3. 음성채널ID로 등록된 경우, 해당 음성채널만 포함
-        expanded_ids.update(voice_channel_ids)
-
-        # 4. 삭제된 채널 중, category_id가 등록된 카테고리ID에 포함된 것만 추가 (DataManager 메소드 사용)
-        if category_ids:
-            deleted_channel_ids = await self.data_manager.get_deleted_channels_by_categories(list(category_ids))
-            expanded_ids.update(deleted_channel_ids)
-
-        return list(expanded_ids)
+        """여백 집계 채널 (aginari 등록 채널을 규칙 없이 확장, voice_utils의 resolver 캐시 사용)"""
+        return list(await get_tracked_channel_resolver(self.bot).get("aginari", filtered=False))
 
     @app_commands.command(name="확인", description="개인 누적 시간을 확인합니다.")
     @app_commands.describe(
@@ -98,6 +72,8 @@ class BlankCommand(commands.GroupCog, group_name="여백"):
             else:
                 base_datetime = datetime.now(self.tz)
 
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             tracked_channels = await self.get_expanded_tracked_channels()
             times, start_date, end_date = await self.data_manager.get_user_times(user.id, period, base_datetime, tracked_channels)
 
@@ -226,6 +202,8 @@ class BlankCommand(commands.GroupCog, group_name="여백"):
             await interaction.response.defer() # 시간이 오래 걸릴 것을 대비해 defer 처리
             
             # 총 시간 데이터 조회
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             tracked_channels = await self.get_expanded_tracked_channels()
             all_data, start_date, end_date = await self.data_manager.get_all_users_times(period, base_datetime, tracked_channels)
 
@@ -325,6 +303,8 @@ class BlankCommand(commands.GroupCog, group_name="여백"):
                 await interaction.response.defer()  # 시간이 오래 걸릴 것을 대비해 defer 처리
                 
                 # 총 시간 데이터 조회
+                if tracker := self.bot.get_cog("VoiceTracker"):
+                    await tracker.flush_before_read()
                 tracked_channels = await self.get_expanded_tracked_channels()
                 all_data, start_date, end_date = await self.data_manager.get_all_users_times(period, base_datetime, tracked_channels)
 
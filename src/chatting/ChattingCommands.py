@@ -8,22 +8,18 @@ from discord.ext import commands
 from datetime import datetime, timedelta
 import pytz
 import re
-import json
-import os
 from typing import List, Optional, Tuple
 
 from src.core.ChattingDataManager import ChattingDataManager
+from src.core.config_store import get_store
 
 # 설정 파일 경로
 CONFIG_PATH = "config/chatting_config.json"
 
 
-def load_config() -> dict:
-    """설정 파일을 로드합니다."""
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"tracked_channels": [], "ignored_role_ids": []}
+config_store = get_store(
+    CONFIG_PATH, {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+)
 
 
 class ChattingSummaryView(discord.ui.View):
@@ -132,8 +128,7 @@ class ChattingCommands(commands.GroupCog, group_name="채팅"):
 
     def get_tracked_channels(self) -> List[int]:
         """설정된 추적 채널 목록을 반환합니다."""
-        config = load_config()
-        return config.get("tracked_channels", [])
+        return list(config_store.get().id_set("tracked_channels"))
 
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """
@@ -246,8 +241,12 @@ class ChattingCommands(commands.GroupCog, group_name="채팅"):
 
             # 기간 범위 계산
             start, end = self.get_period_range(period, base_datetime)
-            start_str = start.strftime("%Y-%m-%d %H:%M:%S")
-            end_str = end.strftime("%Y-%m-%d %H:%M:%S")
+            if period == '총합':
+                # 누적은 유저별 누적 카운터를 그대로 읽습니다.
+                start_str = end_str = None
+            else:
+                start_str = start.strftime("%Y-%m-%d %H:%M:%S")
+                end_str = end.strftime("%Y-%m-%d %H:%M:%S")
 
             # DB에서 유저의 채팅 통계 조회
             total_messages, total_points = await self.data_manager.get_user_chat_stats(
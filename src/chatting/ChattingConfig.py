@@ -2,17 +2,18 @@
 채팅 설정을 관리하는 모듈입니다.
 추적할 채널을 등록/제거/초기화하고, DB 동기화 및 무시 역할 관리 명령어를 제공합니다.
 """
+import asyncio
 import discord
 from discord.ext import commands
-import json
-import os
 import re
+import time
 from datetime import datetime
-from typing import Union
+from typing import Dict, List, Optional, Tuple, Union
 import pytz
 
 from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
-from src.core.ChattingDataManager import ChattingDataManager
+from src.core.ChattingDataManager import ChattingDataManager, SYNC_LIVE, SYNC_STAGING
+from src.core.config_store import get_store
 
 KST = pytz.timezone("Asia/Seoul")
 
@@ -29,24 +30,112 @@ LONG_MESSAGE_THRESHOLD = 30
 MIN_KOREAN_CHARS = 10
 
 
+# DB 동기화 설정
+SYNC_MODES = ("전체", "증분")
+SYNC_CONCURRENCY = 3            # 동시에 훑는 채널 수 (기본값)
+SYNC_MAX_CONCURRENCY = 10
+SYNC_BATCH_SIZE = 1000          # 이 수만큼 메시지를 훑을 때마다 기록과 진행 지점을 커밋
+SYNC_PROGRESS_INTERVAL = 5.0    # 진행 임베드 갱신 주기 (초)
+
+
+CONFIG_DEFAULTS = {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+config_store = get_store(CONFIG_PATH, CONFIG_DEFAULTS)
+
+
 def load_config() -> dict:
-    """설정 파일을 로드합니다."""
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            if "ignored_role_ids" not in config:
-                config["ignored_role_ids"] = []
-            if "tracked_categories" not in config:
-                config["tracked_categories"] = []
-            return config
-    return {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+    """설정을 수정용 복사본으로 로드합니다."""
+    return config_store.load_mutable()
 
 
 def save_config(config: dict):
-    """설정 파일을 저장합니다."""
-    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    """설정 파일을 저장합니다. (저장 즉시 다른 모듈의 캐시에도 반영)"""
+    config_store.save(config)
+
+
+def message_to_record(message: discord.Message, ignored_role_ids: set) -> Optional[Tuple]:
+    """히스토리 메시지를 chat_messages 레코드로 변환합니다. 점수 대상이 아니면 None. (ChattingTracker와 같은 기준)"""
+    # 봇 메시지 / 시스템 메시지 무시
+    if message.author.bot or message.type != discord.MessageType.default:
+        return None
+
+    content = message.content or ""
+
+    # 무시할 역할 멘션 확인
+    if ignored_role_ids and any(role.id in ignored_role_ids for role in message.role_mentions):
+        return None
+
+    # 한글 10글자 이상 확인
+    if len(KOREAN_PATTERN.findall(content)) < MIN_KOREAN_CHARS:
+        return None
+
+    # 점수 계산
+    points = LONG_MESSAGE_POINTS if len(content) >= LONG_MESSAGE_THRESHOLD else BASE_POINTS
+    created_at = message.created_at.astimezone(KST).strftime("%Y-%m-%d %H:%M:%S")
+    return (message.author.id, message.channel.id, message.id, len(content), points, created_at)
+
+
+class SyncProgress:
+    """
+    동기화 진행률과 처리 속도를 계산합니다.
+    채널별 전체 메시지 수는 미리 알 수 없으므로, 마지막으로 처리한 메시지의 시각이
+    채널 생성 시각 ~ 동기화 시작 시각 사이 어디쯤인지로 진행률을 추정합니다.
+    """
+
+    def __init__(self, channels: List, state: Dict[int, Tuple[int, int, int]], started_at: datetime):
+        self.started = time.perf_counter()
+        self.started_at = started_at
+        self.created = {channel.id: channel.created_at for channel in channels}
+        self.fraction = {
+            channel.id: self._fraction(channel.id, state[channel.id][0]) if channel.id in state else 0.0
+            for channel in channels
+        }
+        self.initial = self._overall()
+        self.scanned = 0
+        self.inserted = 0
+        self.channels_done = 0
+        self.failed: List[int] = []
+
+    def _fraction(self, channel_id: int, last_message_id: int) -> float:
+        created = self.created[channel_id]
+        span = (self.started_at - created).total_seconds()
+        if span <= 0:
+            return 1.0
+        done = (discord.utils.snowflake_time(last_message_id) - created).total_seconds()
+        return max(0.0, min(1.0, done / span))
+
+    def _overall(self) -> float:
+        return sum(self.fraction.values()) / len(self.fraction) if self.fraction else 1.0
+
+    def advance(self, channel_id: int, last_message_id: int, scanned: int, inserted: int):
+        self.scanned += scanned
+        self.inserted += inserted
+        self.fraction[channel_id] = self._fraction(channel_id, last_message_id)
+
+    def finish(self, channel_id: int):
+        self.channels_done += 1
+        self.fraction[channel_id] = 1.0
+
+    def rate(self) -> float:
+        """초당 처리한 메시지 수"""
+        elapsed = time.perf_counter() - self.started
+        return self.scanned / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        """이번 실행의 진행 속도로 추정한 남은 시간 (초). 아직 추정할 수 없으면 None."""
+        overall = self._overall()
+        progressed = overall - self.initial
+        if progressed <= 0:
+            return None
+        return (time.perf_counter() - self.started) * (1.0 - overall) / progressed
+
+    def summary(self) -> str:
+        eta = self.eta_seconds()
+        eta_text = "계산 중" if eta is None else f"약 {int(eta // 60)}분 {int(eta % 60)}초"
+        return (
+            f"채널: {self.channels_done}/{len(self.fraction)}개 완료 (진행률 약 {self._overall() * 100:.1f}%)\n"
+            f"메시지: {self.scanned}개 확인, {self.inserted}개 기록\n"
+            f"속도: {self.rate():.1f}개/초 · 남은 시간: {eta_text}"
+        )
 
 
 class ChattingConfig(commands.Cog):
@@ -55,6 +144,7 @@ class ChattingConfig(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_manager = ChattingDataManager()
+        self._sync_lock = asyncio.Lock()
         bot.loop.create_task(self.data_manager.initialize())
 
     async def cog_load(self):
@@ -107,8 +197,12 @@ class ChattingConfig(commands.Cog):
             inline=False
         )
         embed.add_field(
-            name=f"*{command_name} DB동기화",
-            value="기존 DB를 삭제하고 현재 채널 히스토리 기반으로 DB를 재구축합니다.",
+            name=f"*{command_name} DB동기화 (전체/증분) (동시 채널 수)",
+            value=(
+                "채널 히스토리 기반으로 DB를 동기화합니다.\n"
+                "전체: 새 테이블에 재구축한 뒤 완료되면 교체합니다. 중단되면 다시 실행해 이어서 진행할 수 있습니다.\n"
+                "증분: 마지막으로 동기화한 메시지 이후만 추가합니다."
+            ),
             inline=False
         )
 
@@ -337,41 +431,34 @@ class ChattingConfig(commands.Cog):
     @chatting_config.command(name="DB동기화")
     @only_in_guild()
     @commands.has_permissions(administrator=True)
-    async def sync_db(self, ctx):
-        """DB를 초기화하고 채널 히스토리를 기반으로 재구축합니다."""
-        config = load_config()
-        tracked_channels = config.get("tracked_channels", [])
-        tracked_categories = config.get("tracked_categories", [])
-        ignored_role_ids = config.get("ignored_role_ids", [])
-
-        if not tracked_channels and not tracked_categories:
-            await ctx.reply("설정된 채팅 추적 채널/카테고리가 없습니다.")
+    async def sync_db(self, ctx, mode: str = "전체", concurrency: int = SYNC_CONCURRENCY):
+        """
+        채널 히스토리를 기반으로 DB를 동기화합니다.
+        - 전체: staging 테이블에 새로 채운 뒤 완료되면 한 번에 교체합니다. (중단되면 다음 실행에서 이어서 진행)
+        - 증분: 채널별 마지막으로 동기화한 메시지 이후만 운영 테이블에 이어 씁니다.
+        """
+        if mode not in SYNC_MODES:
+            await ctx.reply(f"동기화 모드는 {'/'.join(SYNC_MODES)} 중 하나여야 합니다.")
             return
+        if self._sync_lock.locked():
+            await ctx.reply("이미 DB 동기화가 진행 중입니다.")
+            return
+
+        async with self._sync_lock:
+            await self._run_sync(ctx, mode, max(1, min(SYNC_MAX_CONCURRENCY, concurrency)))
 
+    async def _resolve_sync_channels(self, config: dict) -> List[Union[discord.TextChannel, discord.VoiceChannel]]:
+        """추적 채널과 추적 카테고리의 채널을 모아 동기화 대상 채널 목록을 만듭니다."""
         # 카테고리에서 채널 ID 수집 (tracked_channels와 합산, 중복 제거)
-        all_channel_ids = set(tracked_channels)
-        for cat_id in tracked_categories:
+        all_channel_ids = set(config.get("tracked_channels", []))
+        for cat_id in config.get("tracked_categories", []):
             cat = self.bot.get_channel(cat_id)
             if cat and isinstance(cat, discord.CategoryChannel):
                 for c in cat.channels:
                     if isinstance(c, (discord.TextChannel, discord.VoiceChannel)):
                         all_channel_ids.add(c.id)
 
-        # 확인 메시지
-        embed = discord.Embed(
-            title="DB 동기화 시작",
-            description="기존 DB를 삭제하고 채널 히스토리를 기반으로 재구축합니다.\n잠시 기다려 주세요...",
-            colour=discord.Colour.from_rgb(253, 237, 134)
-        )
-        embed.add_field(name="대상 채널 수", value=f"{len(all_channel_ids)}개", inline=True)
-        progress_msg = await ctx.reply(embed=embed)
-
-        # DB 초기화
-        await self.data_manager.clear_all()
-
-        total_records = 0
-        processed_channels = 0
-
+        channels = []
         for channel_id in all_channel_ids:
             channel = self.bot.get_channel(channel_id)
             if channel is None:
@@ -379,100 +466,135 @@ class ChattingConfig(commands.Cog):
                     channel = await self.bot.fetch_channel(channel_id)
                 except Exception:
                     continue
+            if isinstance(channel, (discord.TextChannel, discord.VoiceChannel)):
+                channels.append(channel)
+        return channels
+
+    async def _run_sync(self, ctx, mode: str, concurrency: int):
+        config = load_config()
+        if not config.get("tracked_channels") and not config.get("tracked_categories"):
+            await ctx.reply("설정된 채팅 추적 채널/카테고리가 없습니다.")
+            return
+        ignored_role_ids = set(config.get("ignored_role_ids", []))
+        channels = await self._resolve_sync_channels(config)
+
+        now = datetime.now(KST)
+        if mode == "전체":
+            target = SYNC_STAGING
+            resumed = await self.data_manager.begin_staging_sync(
+                discord.utils.time_snowflake(now), now.strftime("%Y-%m-%d %H:%M:%S")
+            )
+            if resumed:
+                description = "중단된 전체 동기화를 이어서 진행합니다."
+            else:
+                description = "채널 히스토리를 새 테이블에 채운 뒤 완료되면 기존 DB와 교체합니다."
+        else:
+            target = SYNC_LIVE
+            description = "채널별 마지막 동기화 지점 이후의 메시지만 추가합니다."
+        state = await self.data_manager.get_sync_state(target)
 
-            if not isinstance(channel, (discord.TextChannel, discord.VoiceChannel)):
-                continue
+        progress = SyncProgress(channels, state, now)
+        embed = discord.Embed(
+            title="DB 동기화 시작",
+            description=f"{description}\n잠시 기다려 주세요...",
+            colour=discord.Colour.from_rgb(253, 237, 134)
+        )
+        embed.add_field(name="모드", value=mode, inline=True)
+        embed.add_field(name="대상 채널 수", value=f"{len(channels)}개", inline=True)
+        embed.add_field(name="동시 진행", value=f"{concurrency}개 채널", inline=True)
+        progress_msg = await ctx.reply(embed=embed)
 
-            # 채널별 메시지 수집
-            batch = []
-            channel_count = 0
+        semaphore = asyncio.Semaphore(concurrency)
 
-            try:
-                async for message in channel.history(limit=None, oldest_first=True):
-                    # 봇 메시지 무시
-                    if message.author.bot:
-                        continue
-
-                    # 시스템 메시지 무시
-                    if message.type != discord.MessageType.default:
-                        continue
-
-                    content = message.content or ""
-
-                    # 무시할 역할 멘션 확인
-                    if ignored_role_ids and message.role_mentions:
-                        has_ignored = any(
-                            role.id in ignored_role_ids for role in message.role_mentions
-                        )
-                        if has_ignored:
-                            continue
-
-                    # 한글 10글자 이상 확인
-                    korean_count = len(KOREAN_PATTERN.findall(content))
-                    if korean_count < MIN_KOREAN_CHARS:
-                        continue
-
-                    # 점수 계산
-                    if len(content) >= LONG_MESSAGE_THRESHOLD:
-                        points = LONG_MESSAGE_POINTS
-                    else:
-                        points = BASE_POINTS
-
-                    created_at = message.created_at.astimezone(KST).strftime("%Y-%m-%d %H:%M:%S")
-
-                    batch.append((
-                        message.author.id,
-                        channel.id,
-                        message.id,
-                        len(content),
-                        points,
-                        created_at
-                    ))
-
-                    # 1000개씩 배치 삽입
-                    if len(batch) >= 1000:
-                        inserted = await self.data_manager.bulk_insert(batch)
-                        channel_count += inserted
-                        batch = []
-
-                # 남은 배치 처리
-                if batch:
-                    inserted = await self.data_manager.bulk_insert(batch)
-                    channel_count += inserted
-
-            except discord.Forbidden:
-                pass
-            except Exception as e:
-                print(f"채널 {channel.name} 동기화 중 오류: {e}")
+        async def sync_one(channel):
+            async with semaphore:
+                await self._sync_channel(channel, target, state.get(channel.id), ignored_role_ids, progress)
 
-            total_records += channel_count
-            processed_channels += 1
+        reporter = asyncio.create_task(self._report_sync_progress(progress_msg, embed, progress))
+        try:
+            await asyncio.gather(*(sync_one(channel) for channel in channels))
+        finally:
+            reporter.cancel()
 
-            # 진행률 업데이트
+        finish_error = None
+        if progress.failed:
+            embed.title = "DB 동기화 중단"
             embed.description = (
-                f"동기화 진행 중... ({processed_channels}/{len(tracked_channels)} 채널)\n"
-                f"현재까지 {total_records}개 기록 처리됨"
+                f"{len(progress.failed)}개 채널에서 오류가 발생했습니다. 다시 실행하면 중단된 지점부터 이어서 진행합니다.\n"
+                + progress.summary()
             )
+            embed.colour = discord.Colour.red()
+        else:
             try:
-                await progress_msg.edit(embed=embed)
-            except discord.HTTPException:
-                pass
-
-        # 완료 메시지
-        embed.title = "DB 동기화 완료"
-        embed.description = f"총 {processed_channels}개 채널에서 {total_records}개 기록을 동기화했습니다."
-        embed.colour = discord.Colour.green()
+                if target == SYNC_STAGING:
+                    await self.data_manager.swap_staging()
+                else:
+                    # sync_insert는 카운터를 갱신하지 않으므로 동기화가 끝난 뒤 한 번에 다시 만듭니다.
+                    await self.data_manager.rebuild_counters()
+            except RuntimeError as e:
+                # 쓰기 큐가 비워지지 않는 경우 등: 수집한 기록과 진행 지점은 남아 있어 다시 실행하면 마무리됩니다.
+                finish_error = str(e)
+                embed.title = "DB 동기화 중단"
+                embed.description = f"{e}\n잠시 후 다시 실행하면 수집한 기록을 그대로 두고 마무리합니다.\n" + progress.summary()
+                embed.colour = discord.Colour.red()
+            else:
+                embed.title = "DB 동기화 완료"
+                embed.description = progress.summary()
+                embed.colour = discord.Colour.green()
         try:
             await progress_msg.edit(embed=embed)
         except discord.HTTPException:
             pass
 
         await self.log(
-            f"{ctx.author}({ctx.author.id})님에 의해 채팅 DB 동기화가 완료되었습니다. "
-            f"({processed_channels}개 채널, {total_records}개 기록) "
+            f"{ctx.author}({ctx.author.id})님에 의해 채팅 DB {mode} 동기화가 "
+            f"{'중단' if progress.failed or finish_error else '완료'}되었습니다. "
+            f"({progress.channels_done}/{len(channels)}개 채널, {progress.scanned}개 메시지 확인, "
+            f"{progress.inserted}개 기록, {progress.rate():.1f}개/초) "
+            f"{f'사유: {finish_error} ' if finish_error else ''}"
             f"[길드: {ctx.guild.name}({ctx.guild.id})]"
         )
 
+    async def _sync_channel(self, channel, target: str, saved_state, ignored_role_ids: set, progress: "SyncProgress"):
+        """채널 하나를 마지막 동기화 지점부터 훑어 SYNC_BATCH_SIZE개마다 기록과 진행 지점을 커밋합니다."""
+        last_id = saved_state[0] if saved_state else None
+        after = discord.Object(id=last_id) if last_id else None
+        batch = []
+        scanned = 0
+        try:
+            async for message in channel.history(limit=None, after=after, oldest_first=True):
+                scanned += 1
+                last_id = message.id
+                record = message_to_record(message, ignored_role_ids)
+                if record is not None:
+                    batch.append(record)
+                if scanned >= SYNC_BATCH_SIZE:
+                    inserted = await self.data_manager.sync_insert(target, channel.id, batch, last_id, scanned)
+                    progress.advance(channel.id, last_id, scanned, inserted)
+                    batch = []
+                    scanned = 0
+
+            if scanned:
+                inserted = await self.data_manager.sync_insert(target, channel.id, batch, last_id, scanned)
+                progress.advance(channel.id, last_id, scanned, inserted)
+            progress.finish(channel.id)
+        except discord.Forbidden:
+            # 읽을 수 없는 채널은 건너뜁니다.
+            progress.finish(channel.id)
+        except Exception as e:
+            print(f"채널 {channel.name} 동기화 중 오류: {e}")
+            progress.failed.append(channel.id)
+
+    async def _report_sync_progress(self, progress_msg, embed: discord.Embed, progress: "SyncProgress"):
+        """SYNC_PROGRESS_INTERVAL마다 진행 임베드를 갱신합니다. (채널 작업과 별도로 돌아 편집 요청 수를 제한)"""
+        while True:
+            await asyncio.sleep(SYNC_PROGRESS_INTERVAL)
+            embed.description = f"동기화 진행 중...\n{progress.summary()}"
+            try:
+                await progress_msg.edit(embed=embed)
+            except discord.HTTPException:
+                pass
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ChattingConfig(bot))
@@ -325,8 +325,12 @@ class ChattingRanking(commands.Cog):
 
             # 기간 범위 계산
             start, end = self.get_period_range(period, base_datetime)
-            start_str = start.strftime("%Y-%m-%d %H:%M:%S")
-            end_str = end.strftime("%Y-%m-%d %H:%M:%S")
+            if period == '총합':
+                # 누적은 유저별 누적 카운터를 그대로 읽습니다.
+                start_str = end_str = None
+            else:
+                start_str = start.strftime("%Y-%m-%d %H:%M:%S")
+                end_str = end.strftime("%Y-%m-%d %H:%M:%S")
 
             # 역할 필터링 대상 유저 ID 집합
             target_user_ids = None
@@ -1,18 +1,18 @@
 """
 실시간 채팅 추적 모듈입니다.
-on_message 이벤트를 통해 채팅을 필터링하고 점수를 DB에 기록합니다.
+MessageRouter가 전달하는 추적 채널 메시지를 필터링하고 점수를 DB에 기록합니다.
 VoiceTracker와 유사한 패턴으로 동작합니다.
 """
 import discord
 from discord.ext import commands
 import re
-import json
-import os
 import time
 from datetime import datetime
 import pytz
 
-from src.core.ChattingDataManager import ChattingDataManager
+from src.core.ChattingDataManager import ChattingDataManager, WRITE_DRAIN_TIMEOUT
+from src.core.config_store import get_store
+from src.core.message_routing import MessageContext, message_route, register_routes, unregister_routes
 
 KST = pytz.timezone("Asia/Seoul")
 
@@ -32,12 +32,9 @@ MIN_KOREAN_CHARS = 10  # 한글 최소 10글자
 COOLDOWN_SECONDS = 60
 
 
-def load_config() -> dict:
-    """설정 파일을 로드합니다."""
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+config_store = get_store(
+    CONFIG_PATH, {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+)
 
 
 class ChattingTracker(commands.Cog):
@@ -52,8 +49,14 @@ class ChattingTracker(commands.Cog):
         self._cooldowns: dict[int, float] = {}
 
     async def cog_load(self):
+        register_routes(self.bot, self)
         print(f"✅ {self.__class__.__name__} loaded successfully!")
 
+    async def cog_unload(self):
+        unregister_routes(self.bot, self)
+        # 쓰기 큐에 남은 채팅 기록을 모두 커밋
+        await self.data_manager.drain(timeout=WRITE_DRAIN_TIMEOUT)
+
     async def log(self, message):
         """로그 메시지를 Logger cog를 통해 전송합니다."""
         try:
@@ -80,7 +83,7 @@ class ChattingTracker(commands.Cog):
             return False
         return (time.time() - last_time) < COOLDOWN_SECONDS
 
-    def _has_ignored_role_mention(self, message: discord.Message, ignored_role_ids: list) -> bool:
+    def _has_ignored_role_mention(self, message: discord.Message, ignored_role_ids: frozenset) -> bool:
         """메시지에 무시할 역할 멘션이 포함되어 있는지 확인합니다."""
         if not ignored_role_ids or not message.role_mentions:
             return False
@@ -89,33 +92,15 @@ class ChattingTracker(commands.Cog):
                 return True
         return False
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        """메시지 이벤트를 감지하여 채팅 점수를 기록합니다."""
-        # 봇 메시지 무시
-        if message.author.bot:
-            return
-
-        # 시스템 메시지 무시
-        if message.type != discord.MessageType.default:
-            return
-
-        # 설정 로드
-        config = load_config()
-        tracked_channels = config.get("tracked_channels", [])
-        tracked_categories = config.get("tracked_categories", [])
-        ignored_role_ids = config.get("ignored_role_ids", [])
-
-        # 추적 채널 확인: 채널 ID 직접 매치 또는 카테고리 ID 매치
-        channel_id = message.channel.id
-        category_id = getattr(message.channel, 'category_id', None)
-
-        is_tracked = (
-            channel_id in tracked_channels
-            or (category_id is not None and category_id in tracked_categories)
-        )
-        if not is_tracked:
-            return
+    @message_route(
+        channels=lambda cfg: cfg.id_set("tracked_channels"),
+        categories=lambda cfg: cfg.id_set("tracked_categories"),
+        store=config_store,
+        default_only=True,
+    )
+    async def on_tracked_message(self, message: discord.Message, ctx: MessageContext):
+        """추적 채널/카테고리의 메시지를 받아 채팅 점수를 기록합니다. (봇/시스템 메시지는 라우터가 거름)"""
+        ignored_role_ids = config_store.get().id_set("ignored_role_ids")
 
         content = message.content or ""
 
@@ -136,13 +121,13 @@ class ChattingTracker(commands.Cog):
         # 점수 계산
         points = self._calculate_points(content)
 
-        # DB에 기록
+        # DB 쓰기 큐에 기록 (큐가 가득 차면 버려지고 False)
         now = datetime.now(KST)
         created_at = now.strftime("%Y-%m-%d %H:%M:%S")
 
         success = await self.data_manager.add_chat_record(
             user_id=user_id,
-            channel_id=message.channel.id,
+            channel_id=ctx.channel_id,
             message_id=message.id,
             char_count=len(content),
             points=points,
@@ -150,7 +135,7 @@ class ChattingTracker(commands.Cog):
         )
 
         if success:
-            # 쿨타임 갱신
+            # 큐에 들어간 뒤에만 쿨타임 갱신
             self._cooldowns[user_id] = time.time()
 
 
@@ -2,16 +2,227 @@
 채팅 데이터를 관리하는 모듈입니다.
 SQLite DB를 통해 채팅 기록을 저장/조회합니다.
 """
-import aiosqlite
 import asyncio
+import json
 import os
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import pytz
 
+from src.core.connection_registry import get_connection, close_connection, write_lock, serialized, add_close_listener
+from src.core.migrations import Migration, run_migrations
+from src.core import rank_service
+
 KST = pytz.timezone("Asia/Seoul")
 db_path = "data/chatting.db"
 
+# 쓰기 큐 설정 (group commit)
+WRITE_QUEUE_MAXSIZE = 1000      # 큐가 가득 차면 add_chat_record는 기록을 버리고 False 반환
+WRITE_BATCH_SIZE = 100          # 이 개수만큼 모이면 즉시 커밋
+WRITE_FLUSH_INTERVAL = 2.0      # 첫 레코드 이후 최대 대기 시간 (초)
+WRITE_RETRY_BASE_DELAY = 1.0    # 커밋 실패 시 첫 재시도 대기 시간 (초, 실패마다 2배)
+WRITE_RETRY_MAX_DELAY = 30.0    # 재시도 대기 시간 상한 (초)
+WRITE_MAX_ATTEMPTS = 5          # 이만큼 실패한 배치는 dead-letter 파일로 옮기고 넘어감
+WRITE_DRAIN_TIMEOUT = 60.0      # 종료/일괄 작업 전 큐가 비워지길 기다리는 최대 시간 (초)
+WRITE_DEAD_LETTER_PATH = "data/chatting_dead_letter.jsonl"
+
+INSERT_CHAT_TEMPLATE = """
+    INSERT OR IGNORE INTO {table} 
+        (user_id, channel_id, message_id, char_count, points, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_CHAT_SQL = INSERT_CHAT_TEMPLATE.format(table="chat_messages")
+
+UPSERT_USER_TOTAL_SQL = """
+    INSERT INTO chat_user_totals (user_id, message_count, points)
+    VALUES (?, ?, ?)
+    ON CONFLICT(user_id)
+    DO UPDATE SET message_count = message_count + excluded.message_count,
+                  points = points + excluded.points
+"""
+
+UPSERT_DAILY_TOTAL_SQL = """
+    INSERT INTO chat_daily_totals (user_id, day, channel_id, message_count, points)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, day, channel_id)
+    DO UPDATE SET message_count = message_count + excluded.message_count,
+                  points = points + excluded.points
+"""
+
+# 동기화 대상: 운영 테이블(chat_messages)에 바로 이어 쓰기 / staging 테이블에 새로 만든 뒤 교체
+SYNC_LIVE = "live"
+SYNC_STAGING = "staging"
+STAGING_TABLE = "chat_messages_staging"
+SYNC_INSERT_SQL = {
+    SYNC_LIVE: INSERT_CHAT_SQL,
+    SYNC_STAGING: INSERT_CHAT_TEMPLATE.format(table=STAGING_TABLE),
+}
+
+UPSERT_SYNC_STATE_SQL = """
+    INSERT INTO chat_sync_state (target, channel_id, last_message_id, scanned, inserted)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(target, channel_id)
+    DO UPDATE SET last_message_id = MAX(last_message_id, excluded.last_message_id),
+                  scanned = scanned + excluded.scanned,
+                  inserted = inserted + excluded.inserted
+"""
+
+# 하루가 시작되는 시각 (created_at은 KST "YYYY-MM-DD HH:MM:SS")
+DAY_START_SUFFIX = " 00:00:00"
+ALL_TIME_RANK_KEY = "all"
+# 한쪽 끝이 없는 기간 조회에 쓰는 경계 (created_at / day 문자열 비교용)
+OPEN_START = "0000-01-01" + DAY_START_SUFFIX
+OPEN_END = "9999-12-31" + DAY_START_SUFFIX
+
+
+def counter_rows(records: List[Tuple]) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, str, int, int, int]]]:
+    """
+    chat_messages에 들어간 레코드를 카운터 증분으로 변환합니다.
+    ([(user_id, 메시지 수, 점수)], [(user_id, 일, channel_id, 메시지 수, 점수)])
+    """
+    users: Dict[int, List[int]] = {}
+    days: Dict[Tuple[int, str, int], List[int]] = {}
+    for user_id, channel_id, _, _, points, created_at in records:
+        total = users.setdefault(user_id, [0, 0])
+        total[0] += 1
+        total[1] += points
+        bucket = days.setdefault((user_id, created_at[:10], channel_id), [0, 0])
+        bucket[0] += 1
+        bucket[1] += points
+    return (
+        [(user_id, count, points) for user_id, (count, points) in users.items()],
+        [(*key, count, points) for key, (count, points) in days.items()],
+    )
+
+
+def fill_open_bounds(start: Optional[str], end: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    한쪽만 없는 기간을 열린 범위로 채웁니다. (둘 다 없으면 누적 조회이므로 그대로 둡니다)
+    채운 값은 자정이므로 카운터 조회(day_range)와 chat_messages 스캔 모두 그대로 쓸 수 있습니다.
+    """
+    if start is None and end is None:
+        return None, None
+    return start or OPEN_START, end or OPEN_END
+
+
+def day_range(start: str, end: str) -> Optional[Tuple[str, str]]:
+    """start/end가 모두 KST 자정이면 일 단위 범위 (시작일, 끝일 — 끝일 미포함)를 반환합니다."""
+    if start.endswith(DAY_START_SUFFIX) and end.endswith(DAY_START_SUFFIX):
+        return start[:10], end[:10]
+    return None
+
+
+async def _fill_counters(db):
+    """chat_messages 전체에서 카운터 테이블을 채웁니다. (비우기/커밋은 호출자 책임)"""
+    await db.execute("""
+        INSERT INTO chat_user_totals (user_id, message_count, points)
+        SELECT user_id, COUNT(*), COALESCE(SUM(points), 0)
+          FROM chat_messages
+         GROUP BY user_id
+    """)
+    await db.execute("""
+        INSERT INTO chat_daily_totals (user_id, day, channel_id, message_count, points)
+        SELECT user_id, substr(created_at, 1, 10), channel_id, COUNT(*), COALESCE(SUM(points), 0)
+          FROM chat_messages
+         GROUP BY user_id, substr(created_at, 1, 10), channel_id
+    """)
+
+
+# ===========================================
+# 스키마 마이그레이션 (PRAGMA user_version)
+# ===========================================
+
+async def _create_chat_messages_table(db, table: str):
+    await db.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL UNIQUE,
+            char_count INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+
+async def _create_chat_messages_indexes(db):
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_user_date 
+        ON chat_messages (user_id, created_at)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_channel_date 
+        ON chat_messages (channel_id, created_at)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_message_id 
+        ON chat_messages (message_id)
+    """)
+
+
+async def _migration_v1_base_tables(db):
+    await _create_chat_messages_table(db, "chat_messages")
+    await _create_chat_messages_indexes(db)
+
+
+async def _migration_v2_chat_counters(db):
+    # 유저별 누적 메시지 수/점수
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS chat_user_totals (
+            user_id INTEGER PRIMARY KEY,
+            message_count INTEGER NOT NULL,
+            points INTEGER NOT NULL
+        )
+    """)
+    # 유저·KST 일·채널별 메시지 수/점수 (일/주/월 등 달력 기간 집계용)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS chat_daily_totals (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            message_count INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day, channel_id)
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_daily_day
+        ON chat_daily_totals (day, user_id)
+    """)
+    await db.execute("DELETE FROM chat_user_totals")
+    await db.execute("DELETE FROM chat_daily_totals")
+    await _fill_counters(db)
+
+
+async def _migration_v3_sync_state(db):
+    # 동기화 대상(SYNC_LIVE / SYNC_STAGING)·채널별 마지막으로 처리한 메시지 ID
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS chat_sync_state (
+            target TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            last_message_id INTEGER NOT NULL,
+            scanned INTEGER NOT NULL DEFAULT 0,
+            inserted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (target, channel_id)
+        )
+    """)
+    # 진행 중인 전체 동기화 (staging 테이블을 채우는 중이면 한 행)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS chat_sync_runs (
+            target TEXT PRIMARY KEY,
+            started_message_id INTEGER NOT NULL,
+            started_at TEXT NOT NULL
+        )
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "chat_messages 테이블 및 인덱스", _migration_v1_base_tables),
+    Migration(2, "유저별 누적/일별 채팅 카운터 테이블", _migration_v2_chat_counters),
+    Migration(3, "채팅 동기화 진행 상태 테이블", _migration_v3_sync_state),
+]
+
 
 class ChattingDataManager:
     """채팅 데이터 매니저 (싱글턴)"""
@@ -24,12 +235,25 @@ class ChattingDataManager:
             cls._instance = super().__new__(cls)
             cls._instance.db_path = db_path
             cls._instance._db = None
+            cls._instance._write_queue = None
+            cls._instance._writer_task = None
+            cls._instance.write_stats = {"batches": 0, "rows": 0, "failures": 0, "dead_lettered": 0, "dropped": 0}
+            cls._instance.counter_stats = {"hits": 0, "fallbacks": 0, "recounts": 0}
         return cls._instance
 
     def __init__(self, db_path: str = db_path):
         if not hasattr(self, 'db_path'):
             self.db_path = db_path
             self._db = None
+            self._write_queue = None
+            self._writer_task = None
+            self.write_stats = {"batches": 0, "rows": 0, "failures": 0, "dead_lettered": 0, "dropped": 0}
+            self.counter_stats = {"hits": 0, "fallbacks": 0, "recounts": 0}
+
+    def _reset_connection_state(self):
+        """connection_registry.close_all() 이후 다음 사용 시 다시 연결하도록 상태를 비웁니다."""
+        self._db = None
+        self._initialized = False
 
     async def ensure_initialized(self):
         """데이터베이스가 초기화되었는지 확인합니다."""
@@ -38,44 +262,274 @@ class ChattingDataManager:
                 if not self._initialized:
                     await self.initialize()
 
+    @serialized
     async def initialize(self):
-        """데이터베이스 연결을 초기화하고 테이블을 생성합니다."""
+        """데이터베이스 연결을 초기화하고 스키마를 최신 버전으로 맞춥니다."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
         if self._db is None:
-            self._db = await aiosqlite.connect(self.db_path)
-            await self._db.execute("""
-                CREATE TABLE IF NOT EXISTS chat_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    message_id INTEGER NOT NULL UNIQUE,
-                    char_count INTEGER NOT NULL,
-                    points INTEGER NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """)
-            await self._db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_chat_user_date 
-                ON chat_messages (user_id, created_at)
-            """)
-            await self._db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_chat_channel_date 
-                ON chat_messages (channel_id, created_at)
-            """)
-            await self._db.execute("""
-                CREATE INDEX IF NOT EXISTS idx_chat_message_id 
-                ON chat_messages (message_id)
-            """)
-            await self._db.commit()
+            self._db = await get_connection(self.db_path)
+            add_close_listener(self._reset_connection_state)
+            await run_migrations(self._db, self.db_path, MIGRATIONS)
             self._initialized = True
 
     async def close(self):
-        """데이터베이스 연결을 닫습니다."""
+        """대기 중인 기록을 모두 반영한 뒤 데이터베이스 연결을 닫습니다."""
+        await self.drain(timeout=WRITE_DRAIN_TIMEOUT)
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
         if self._db:
-            await self._db.close()
+            await close_connection(self.db_path)
             self._db = None
 
+    # ===========================================
+    # 쓰기 큐 (group commit)
+    # ===========================================
+
+    def _ensure_writer(self):
+        """쓰기 큐와 백그라운드 writer 태스크를 준비합니다."""
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue(maxsize=WRITE_QUEUE_MAXSIZE)
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def _writer_loop(self):
+        """큐에서 레코드를 모아 크기/시간 임계값마다 한 트랜잭션으로 커밋합니다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            deadline = loop.time() + WRITE_FLUSH_INTERVAL
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # 같은 배치를 WRITE_MAX_ATTEMPTS번까지 재시도합니다. 그래도 실패하면(디스크 가득 참, DB 손상 등)
+            # dead-letter 파일로 옮기고 넘어가므로 큐와 drain()이 영구히 멈추지 않습니다.
+            delay = WRITE_RETRY_BASE_DELAY
+            for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+                try:
+                    await self._write_batch(batch)
+                    self.write_stats["batches"] += 1
+                    self.write_stats["rows"] += len(batch)
+                    break
+                except Exception as e:
+                    self.write_stats["failures"] += 1
+                    if attempt == WRITE_MAX_ATTEMPTS:
+                        print(f"채팅 기록 일괄 커밋 {attempt}회 실패 ({len(batch)}건), dead-letter 파일로 옮깁니다: {e}")
+                        self._dead_letter(batch, e)
+                        break
+                    print(f"채팅 기록 일괄 커밋 중 오류 ({len(batch)}건), {delay:.0f}초 후 재시도: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, WRITE_RETRY_MAX_DELAY)
+
+            for _ in batch:
+                self._write_queue.task_done()
+
+    def _dead_letter(self, records: List[Tuple], error: Exception):
+        """
+        커밋하지 못한 배치를 WRITE_DEAD_LETTER_PATH에 한 줄에 한 건씩(JSON) 남깁니다.
+        같은 메시지는 DB 동기화(ChattingConfig.sync_db)로도 다시 기록할 수 있습니다.
+        """
+        self.write_stats["dead_lettered"] += len(records)
+        failed_at = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            os.makedirs(os.path.dirname(WRITE_DEAD_LETTER_PATH), exist_ok=True)
+            with open(WRITE_DEAD_LETTER_PATH, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(
+                        {"failed_at": failed_at, "error": str(error), "record": list(record)},
+                        ensure_ascii=False
+                    ) + "\n")
+        except OSError as e:
+            print(f"채팅 기록 dead-letter 파일 기록 실패 ({len(records)}건 유실): {e}")
+
+    async def _drain_or_abort(self, operation: str):
+        """쓰기 큐를 비우지 못하면(WRITE_DRAIN_TIMEOUT 초과) 일괄 작업을 시작하지 않고 RuntimeError를 올립니다."""
+        if not await self.drain(timeout=WRITE_DRAIN_TIMEOUT):
+            raise RuntimeError(
+                f"쓰기 큐가 {WRITE_DRAIN_TIMEOUT:.0f}초 안에 비워지지 않아 {operation} 작업을 중단했습니다."
+            )
+
+    async def _write_batch(self, records: List[Tuple]):
+        """배치를 한 트랜잭션으로 커밋합니다. 실패하면 롤백 후 예외를 그대로 올립니다."""
+        await self.ensure_initialized()
+        await self._commit_batch(records)
+
+    @serialized
+    async def _commit_batch(self, records: List[Tuple]):
+        """기록과 카운터 증분을 한 트랜잭션으로 커밋합니다."""
+        try:
+            cursor = await self._db.executemany(INSERT_CHAT_SQL, records)
+            inserted = cursor.rowcount
+            if inserted == len(records):
+                user_rows, daily_rows = counter_rows(records)
+                await self._db.executemany(UPSERT_USER_TOTAL_SQL, user_rows)
+                await self._db.executemany(UPSERT_DAILY_TOTAL_SQL, daily_rows)
+            else:
+                # INSERT OR IGNORE로 건너뛴 중복이 있으면 어떤 행인지 알 수 없으므로
+                # 배치에 나온 유저/일의 카운터만 chat_messages에서 다시 셉니다.
+                await self._recount_counters(records)
+            await self._db.commit()
+        except Exception:
+            await self._db.rollback()
+            raise
+        self._apply_rank_deltas(records, inserted)
+
+    # ===========================================
+    # 카운터 (chat_user_totals / chat_daily_totals)
+    # ===========================================
+
+    async def _recount_counters(self, records: List[Tuple]):
+        """배치에 나온 유저의 누적 카운터와 (유저, 일) 카운터를 다시 계산합니다. (트랜잭션/커밋은 호출자 책임)"""
+        self.counter_stats["recounts"] += 1
+        user_ids = sorted({record[0] for record in records})
+        user_days = sorted({(record[0], record[5][:10]) for record in records})
+
+        placeholders = ",".join("?" for _ in user_ids)
+        await self._db.execute(f"DELETE FROM chat_user_totals WHERE user_id IN ({placeholders})", user_ids)
+        await self._db.execute(f"""
+            INSERT INTO chat_user_totals (user_id, message_count, points)
+            SELECT user_id, COUNT(*), COALESCE(SUM(points), 0)
+              FROM chat_messages
+             WHERE user_id IN ({placeholders})
+             GROUP BY user_id
+        """, user_ids)
+
+        await self._db.executemany(
+            "DELETE FROM chat_daily_totals WHERE user_id = ? AND day = ?", user_days
+        )
+        await self._db.executemany("""
+            INSERT INTO chat_daily_totals (user_id, day, channel_id, message_count, points)
+            SELECT user_id, ?, channel_id, COUNT(*), COALESCE(SUM(points), 0)
+              FROM chat_messages
+             WHERE user_id = ? AND created_at BETWEEN ? AND ?
+             GROUP BY channel_id
+        """, [
+            (day, user_id, f"{day}{DAY_START_SUFFIX}", f"{day} 23:59:59")
+            for user_id, day in user_days
+        ])
+
+    async def rebuild_counters(self) -> int:
+        """
+        chat_messages 전체에서 카운터 테이블을 다시 만듭니다.
+        bulk_insert/sync_insert는 카운터를 갱신하지 않으므로 증분 동기화(sync_db)가 끝난 뒤 호출합니다.
+        재생성된 일별 카운터 행 수를 반환합니다.
+        """
+        await self.ensure_initialized()
+        await self._drain_or_abort("카운터 재생성")
+        async with write_lock(self.db_path):
+            try:
+                await self._db.execute("DELETE FROM chat_user_totals")
+                await self._db.execute("DELETE FROM chat_daily_totals")
+                await _fill_counters(self._db)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            rank_service.invalidate("chat:")
+
+        async with self._db.execute("SELECT COUNT(*) FROM chat_daily_totals") as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    def _use_counters(self, start: Optional[str], end: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        기간 조회를 카운터로 처리할 수 있으면 일 범위를 반환합니다. (누적이면 빈 범위 ("", ""))
+        자정에 맞지 않는 범위는 None이며 chat_messages 스캔으로 대체합니다.
+        한쪽 끝만 없는 기간은 먼저 fill_open_bounds로 채워서 넘겨야 합니다.
+        """
+        if (start is None) != (end is None):
+            raise ValueError("기간의 한쪽 끝만 None일 수 없습니다. fill_open_bounds로 먼저 채워 주세요.")
+        if start is None and end is None:
+            self.counter_stats["hits"] += 1
+            return "", ""
+        days = day_range(start, end)
+        self.counter_stats["hits" if days else "fallbacks"] += 1
+        return days
+
+    # ===========================================
+    # 순위 인덱스 (src.core.rank_service)
+    # ===========================================
+
+    def _apply_rank_deltas(self, records: List[Tuple], inserted: int):
+        """
+        커밋된 기록을 메시지 수 순위 인덱스에 반영합니다. (쓰기 잠금 안에서 호출)
+        INSERT OR IGNORE로 건너뛴 중복이 있으면 어떤 행인지 알 수 없으므로 인덱스를 버리고
+        다음 조회 때 다시 구성합니다.
+        """
+        names = rank_service.list_indexes("chat:")
+        if not names:
+            return
+        if inserted != len(records):
+            rank_service.invalidate("chat:")
+            return
+        for name in names:
+            since = name[len("chat:"):]
+            deltas: Dict[int, int] = {}
+            for user_id, _, _, _, _, created_at in records:
+                if since == ALL_TIME_RANK_KEY or created_at >= since:
+                    deltas[user_id] = deltas.get(user_id, 0) + 1
+            rank_service.apply_deltas(name, deltas)
+
+    async def get_user_count_rank(self, user_id: int, since: Optional[str] = None) -> Tuple[int, Optional[int], int]:
+        """
+        since 이후(None이면 누적) 메시지 수 기준 유저 순위를 반환합니다. (메시지 수, 순위, 전체 유저 수)
+        순위는 메시지 수 내림차순, 동점자는 user_id 오름차순이며 기록이 없으면 None입니다.
+        첫 조회 때 카운터 테이블에서 인덱스를 구성하고, 이후에는 쓰기 경로의 증분으로 유지합니다.
+        """
+        await self.ensure_initialized()
+        name = f"chat:{since or ALL_TIME_RANK_KEY}"
+        index = rank_service.get_index(name)
+        if index is None:
+            if since is None:
+                query, params = "SELECT user_id, message_count FROM chat_user_totals", ()
+            elif since.endswith(DAY_START_SUFFIX):
+                query = """
+                    SELECT user_id, SUM(message_count)
+                    FROM chat_daily_totals
+                    WHERE day >= ?
+                    GROUP BY user_id
+                """
+                params = (since[:10],)
+            else:
+                query = """
+                    SELECT user_id, COUNT(*)
+                    FROM chat_messages
+                    WHERE created_at >= ?
+                    GROUP BY user_id
+                """
+                params = (since,)
+            # 구성 중에 커밋된 배치가 빠지지 않도록 쓰기 잠금 안에서 읽고 등록합니다.
+            async with write_lock(self.db_path):
+                async with self._db.execute(query, params) as cursor:
+                    scores = {user_id: count async for user_id, count in cursor}
+                index = rank_service.build_index(name, scores)
+        return index.score(user_id), index.rank(user_id), len(index)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        쓰기 큐에 대기 중인 기록이 모두 커밋될 때까지 기다립니다.
+        timeout(초)을 넘기면 False를 반환합니다. 남은 기록은 큐에 그대로 유지됩니다.
+        """
+        if self._write_queue is None:
+            return True
+        if self._writer_task is None or self._writer_task.done():
+            if self._write_queue.empty():
+                return True
+            self._ensure_writer()
+        try:
+            await asyncio.wait_for(self._write_queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            print(f"채팅 기록 반영 대기 시간 초과: {self._write_queue.qsize()}건 이상이 아직 기록되지 않았습니다.")
+            return False
+
     async def add_chat_record(
         self,
         user_id: int,
@@ -85,16 +539,20 @@ class ChattingDataManager:
         points: int,
         created_at: str
     ) -> bool:
-        """채팅 기록을 추가합니다."""
+        """
+        채팅 기록을 쓰기 큐에 넣고 True를 반환합니다.
+        큐가 가득 차 있으면(writer가 밀린 경우) 기다리지 않고 기록을 버린 뒤 False를 반환합니다. (write_stats["dropped"])
+        """
         await self.ensure_initialized()
         try:
-            await self._db.execute("""
-                INSERT OR IGNORE INTO chat_messages 
-                    (user_id, channel_id, message_id, char_count, points, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, channel_id, message_id, char_count, points, created_at))
-            await self._db.commit()
+            self._ensure_writer()
+            self._write_queue.put_nowait(
+                (user_id, channel_id, message_id, char_count, points, created_at)
+            )
             return True
+        except asyncio.QueueFull:
+            self.write_stats["dropped"] += 1
+            return False
         except Exception as e:
             print(f"채팅 기록 추가 중 오류: {e}")
             return False
@@ -102,68 +560,140 @@ class ChattingDataManager:
     async def get_user_chat_stats(
         self,
         user_id: int,
-        start: str,
-        end: str
+        start: Optional[str] = None,
+        end: Optional[str] = None
     ) -> Tuple[int, int]:
-        """기간별 유저 채팅 통계를 반환합니다. (총 메시지 수, 총 점수)"""
+        """기간별 유저 채팅 통계를 반환합니다. (총 메시지 수, 총 점수) start/end가 없으면 누적입니다."""
         await self.ensure_initialized()
-        async with self._db.execute("""
-            SELECT COUNT(*), COALESCE(SUM(points), 0)
-            FROM chat_messages
-            WHERE user_id = ? AND created_at >= ? AND created_at < ?
-        """, (user_id, start, end)) as cursor:
+        start, end = fill_open_bounds(start, end)
+        days = self._use_counters(start, end)
+        if days == ("", ""):
+            query = "SELECT message_count, points FROM chat_user_totals WHERE user_id = ?"
+            params = (user_id,)
+        elif days:
+            query = """
+                SELECT COALESCE(SUM(message_count), 0), COALESCE(SUM(points), 0)
+                FROM chat_daily_totals
+                WHERE user_id = ? AND day >= ? AND day < ?
+            """
+            params = (user_id, *days)
+        else:
+            query = """
+                SELECT COUNT(*), COALESCE(SUM(points), 0)
+                FROM chat_messages
+                WHERE user_id = ? AND created_at >= ? AND created_at < ?
+            """
+            params = (user_id, start, end)
+        async with self._db.execute(query, params) as cursor:
             row = await cursor.fetchone()
             return (row[0], row[1]) if row else (0, 0)
 
     async def get_user_channel_stats(
         self,
         user_id: int,
-        start: str,
-        end: str
+        start: Optional[str] = None,
+        end: Optional[str] = None
     ) -> List[Tuple[int, int, int]]:
-        """채널별 유저 채팅 통계를 반환합니다. [(channel_id, count, points), ...]"""
+        """채널별 유저 채팅 통계를 반환합니다. [(channel_id, count, points), ...] start/end가 없으면 누적입니다."""
         await self.ensure_initialized()
-        async with self._db.execute("""
-            SELECT channel_id, COUNT(*), COALESCE(SUM(points), 0)
-            FROM chat_messages
-            WHERE user_id = ? AND created_at >= ? AND created_at < ?
-            GROUP BY channel_id
-            ORDER BY SUM(points) DESC
-        """, (user_id, start, end)) as cursor:
+        start, end = fill_open_bounds(start, end)
+        days = self._use_counters(start, end)
+        if days is not None:
+            day_sql = " AND day >= ? AND day < ?" if days != ("", "") else ""
+            query = f"""
+                SELECT channel_id, SUM(message_count), SUM(points)
+                FROM chat_daily_totals
+                WHERE user_id = ?{day_sql}
+                GROUP BY channel_id
+                ORDER BY SUM(points) DESC
+            """
+            params = (user_id, *days) if day_sql else (user_id,)
+        else:
+            query = """
+                SELECT channel_id, COUNT(*), COALESCE(SUM(points), 0)
+                FROM chat_messages
+                WHERE user_id = ? AND created_at >= ? AND created_at < ?
+                GROUP BY channel_id
+                ORDER BY SUM(points) DESC
+            """
+            params = (user_id, start, end)
+        async with self._db.execute(query, params) as cursor:
             return await cursor.fetchall()
 
     async def get_all_users_stats(
         self,
-        start: str,
-        end: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
         user_ids: Optional[set] = None
     ) -> List[Tuple[int, int, int]]:
-        """전체 유저의 채팅 통계를 반환합니다. [(user_id, count, points), ...]"""
+        """전체 유저의 채팅 통계를 반환합니다. [(user_id, count, points), ...] start/end가 없으면 누적입니다."""
         await self.ensure_initialized()
-        if user_ids is not None:
-            placeholders = ",".join("?" for _ in user_ids)
-            query = f"""
-                SELECT user_id, COUNT(*), COALESCE(SUM(points), 0)
-                FROM chat_messages
-                WHERE created_at >= ? AND created_at < ?
-                    AND user_id IN ({placeholders})
-                GROUP BY user_id
-                ORDER BY SUM(points) DESC
+        start, end = fill_open_bounds(start, end)
+        days = self._use_counters(start, end)
+        conditions = []
+        params: list = []
+        if days == ("", ""):
+            select = """
+                SELECT user_id, message_count, points
+                FROM chat_user_totals
+            """
+            group_by = ""
+            order_by = "ORDER BY points DESC"
+        elif days:
+            select = """
+                SELECT user_id, SUM(message_count), SUM(points)
+                FROM chat_daily_totals
             """
-            params = [start, end] + list(user_ids)
+            conditions.append("day >= ? AND day < ?")
+            params.extend(days)
+            group_by = "GROUP BY user_id"
+            order_by = "ORDER BY SUM(points) DESC"
         else:
-            query = """
+            select = """
                 SELECT user_id, COUNT(*), COALESCE(SUM(points), 0)
                 FROM chat_messages
-                WHERE created_at >= ? AND created_at < ?
-                GROUP BY user_id
-                ORDER BY SUM(points) DESC
             """
-            params = [start, end]
+            conditions.append("created_at >= ? AND created_at < ?")
+            params.extend((start, end))
+            group_by = "GROUP BY user_id"
+            order_by = "ORDER BY SUM(points) DESC"
 
+        if user_ids is not None:
+            conditions.append(f"user_id IN ({','.join('?' for _ in user_ids)})")
+            params.extend(user_ids)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"{select} {where} {group_by} {order_by}"
         async with self._db.execute(query, params) as cursor:
             return await cursor.fetchall()
 
+    async def get_channel_participants(
+        self,
+        channel_id: int,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> List[int]:
+        """
+        채널에 기록된(점수를 받은) 메시지를 남긴 유저 ID 목록을 반환합니다.
+        start/end로 기간을 좁힐 수 있으며, 쓰기 큐에 남은 기록을 먼저 반영한 뒤 조회합니다.
+        """
+        await self.ensure_initialized()
+        await self.drain(timeout=WRITE_DRAIN_TIMEOUT)
+        conditions = ["channel_id = ?"]
+        params: list = [channel_id]
+        if start is not None:
+            conditions.append("created_at >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("created_at < ?")
+            params.append(end)
+        async with self._db.execute(f"""
+            SELECT DISTINCT user_id
+            FROM chat_messages
+            WHERE {' AND '.join(conditions)}
+        """, params) as cursor:
+            return [row[0] async for row in cursor]
+
     async def get_last_scored_time(self, user_id: int) -> Optional[str]:
         """유저의 마지막 점수 획득 시간을 반환합니다."""
         await self.ensure_initialized()
@@ -179,19 +709,151 @@ class ChattingDataManager:
     async def clear_all(self):
         """DB의 모든 채팅 기록을 삭제합니다."""
         await self.ensure_initialized()
-        await self._db.execute("DELETE FROM chat_messages")
-        await self._db.commit()
+        await self._drain_or_abort("채팅 기록 초기화")
+        async with write_lock(self.db_path):
+            await self._db.execute("DELETE FROM chat_messages")
+            await self._db.execute("DELETE FROM chat_user_totals")
+            await self._db.execute("DELETE FROM chat_daily_totals")
+            await self._db.execute("DELETE FROM chat_sync_state")
+            await self._db.execute("DELETE FROM chat_sync_runs")
+            await self._db.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+            await self._db.commit()
+            rank_service.invalidate("chat:")
+
+    # ===========================================
+    # 히스토리 동기화 (ChattingConfig.sync_db)
+    # ===========================================
+
+    async def begin_staging_sync(self, started_message_id: int, started_at: str) -> bool:
+        """
+        전체 동기화용 staging 테이블을 준비합니다.
+        중단된 전체 동기화가 남아 있으면 staging 테이블과 진행 상태를 그대로 두고 이어서 진행합니다.
+        이어서 진행하면 True를 반환합니다.
+        """
+        await self.ensure_initialized()
+        async with write_lock(self.db_path):
+            async with self._db.execute(
+                "SELECT started_message_id FROM chat_sync_runs WHERE target = ?", (SYNC_STAGING,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is not None:
+                return True
+
+            try:
+                await self._db.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                await _create_chat_messages_table(self._db, STAGING_TABLE)
+                await self._db.execute("DELETE FROM chat_sync_state WHERE target = ?", (SYNC_STAGING,))
+                await self._db.execute(
+                    "INSERT INTO chat_sync_runs (target, started_message_id, started_at) VALUES (?, ?, ?)",
+                    (SYNC_STAGING, started_message_id, started_at)
+                )
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            return False
+
+    async def get_sync_state(self, target: str) -> Dict[int, Tuple[int, int, int]]:
+        """동기화 대상의 채널별 진행 상태를 반환합니다. {channel_id: (마지막 메시지 ID, 훑은 수, 기록 수)}"""
+        await self.ensure_initialized()
+        async with self._db.execute(
+            "SELECT channel_id, last_message_id, scanned, inserted FROM chat_sync_state WHERE target = ?",
+            (target,)
+        ) as cursor:
+            return {channel_id: (last_id, scanned, inserted) async for channel_id, last_id, scanned, inserted in cursor}
+
+    @serialized
+    async def sync_insert(
+        self,
+        target: str,
+        channel_id: int,
+        records: List[Tuple],
+        last_message_id: int,
+        scanned: int
+    ) -> int:
+        """
+        동기화 배치와 채널의 마지막 메시지 ID를 한 트랜잭션으로 기록합니다.
+        중단되더라도 다음 동기화는 커밋된 마지막 메시지 다음부터 이어갑니다.
+        카운터 테이블은 갱신하지 않으므로 동기화를 마친 뒤 rebuild_counters() 또는 swap_staging()을 호출합니다.
+        새로 기록된 행 수를 반환합니다.
+        """
+        inserted = 0
+        try:
+            if records:
+                cursor = await self._db.executemany(SYNC_INSERT_SQL[target], records)
+                inserted = cursor.rowcount
+            await self._db.execute(
+                UPSERT_SYNC_STATE_SQL, (target, channel_id, last_message_id, scanned, inserted)
+            )
+            await self._db.commit()
+        except Exception:
+            await self._db.rollback()
+            raise
+        if target == SYNC_LIVE and inserted:
+            rank_service.invalidate("chat:")
+        return inserted
+
+    async def swap_staging(self) -> int:
+        """
+        다 채운 staging 테이블을 chat_messages로 교체합니다.
+        동기화 시작 이후 실시간으로 기록된 메시지를 staging에 합친 뒤, 테이블 교체·인덱스 생성·
+        카운터 재생성·진행 상태 이관을 한 트랜잭션으로 처리하므로 조회 쪽에는 교체 전후 상태만 보입니다.
+        교체 후 chat_messages의 행 수를 반환합니다.
+        """
+        await self.ensure_initialized()
+        await self._drain_or_abort("staging 테이블 교체")
+        async with write_lock(self.db_path):
+            async with self._db.execute(
+                "SELECT started_message_id FROM chat_sync_runs WHERE target = ?", (SYNC_STAGING,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                raise RuntimeError("진행 중인 전체 동기화가 없습니다.")
+
+            if self._db.in_transaction:
+                await self._db.commit()
+            await self._db.execute("BEGIN")
+            try:
+                await self._db.execute(f"""
+                    INSERT OR IGNORE INTO {STAGING_TABLE}
+                        (user_id, channel_id, message_id, char_count, points, created_at)
+                    SELECT user_id, channel_id, message_id, char_count, points, created_at
+                      FROM chat_messages
+                     WHERE message_id >= ?
+                """, (row[0],))
+                await self._db.execute("DROP TABLE chat_messages")
+                await self._db.execute(f"ALTER TABLE {STAGING_TABLE} RENAME TO chat_messages")
+                await _create_chat_messages_indexes(self._db)
+                await self._db.execute("DELETE FROM chat_user_totals")
+                await self._db.execute("DELETE FROM chat_daily_totals")
+                await _fill_counters(self._db)
+                await self._db.execute("DELETE FROM chat_sync_state WHERE target = ?", (SYNC_LIVE,))
+                await self._db.execute(
+                    "UPDATE chat_sync_state SET target = ? WHERE target = ?", (SYNC_LIVE, SYNC_STAGING)
+                )
+                await self._db.execute("DELETE FROM chat_sync_runs WHERE target = ?", (SYNC_STAGING,))
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            rank_service.invalidate("chat:")
+
+        async with self._db.execute("SELECT COUNT(*) FROM chat_messages") as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else 0
 
+    @serialized
     async def bulk_insert(self, records: List[Tuple]) -> int:
-        """대량의 채팅 기록을 한 번에 삽입합니다. (동기화용)"""
+        """
+        대량의 채팅 기록을 한 번에 삽입합니다. (동기화용)
+        카운터 테이블은 갱신하지 않으므로 삽입을 마친 뒤 rebuild_counters()를 호출해야 합니다.
+        """
         await self.ensure_initialized()
         try:
-            await self._db.executemany("""
-                INSERT OR IGNORE INTO chat_messages 
-                    (user_id, channel_id, message_id, char_count, points, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, records)
+            await self._db.executemany(INSERT_CHAT_SQL, records)
             await self._db.commit()
+            # 동기화는 과거 기록을 대량으로 채우므로 증분 대신 다시 구성합니다.
+            rank_service.invalidate("chat:")
             return len(records)
         except Exception as e:
             print(f"대량 삽입 중 오류: {e}")
@@ -1,4 +1,3 @@
-import aiosqlite
 import asyncio
 import json
 import os
@@ -6,9 +5,109 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import pytz
 
+from src.core.connection_registry import get_connection, close_connection, write_lock, serialized, add_close_listener
+from src.core.migrations import Migration, run_migrations
+from src.core import rank_service
+
 KST = pytz.timezone("Asia/Seoul")
 db_path = "data/voice_logs.db"
 
+# 기간 이름 → 롤업 period_type
+ROLLUP_PERIOD_TYPES = {
+    '일간': 'day',
+    '주간': 'week',
+    '월간': 'month',
+    '누적': 'total',
+}
+
+UPSERT_VOICE_SQL = """
+    INSERT INTO voice_times (date, user_id, channel_id, seconds)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(date, user_id, channel_id)
+    DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+UPSERT_ROLLUP_SQL = """
+    INSERT INTO voice_rollups (scope, period_type, period_key, user_id, seconds)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(scope, period_type, period_key, user_id)
+    DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+
+def rollup_keys(date_str: str) -> List[Tuple[str, str]]:
+    """voice_times의 날짜(YYYY-MM-DD)가 속하는 롤업 (period_type, period_key) 목록"""
+    day = datetime.strptime(date_str, "%Y-%m-%d")
+    week_start = (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+    return [
+        ('day', date_str),
+        ('week', week_start),
+        ('month', date_str[:7]),
+        ('total', 'all'),
+    ]
+
+
+# ===========================================
+# 스키마 마이그레이션 (PRAGMA user_version)
+# ===========================================
+
+async def _migration_v1_base_tables(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS voice_times (
+            date TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (date, user_id, channel_id)
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS deleted_channels (
+            channel_id INTEGER PRIMARY KEY,
+            category_id INTEGER NOT NULL
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS tracked_channels (
+            channel_id INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            PRIMARY KEY (channel_id, source)
+        )
+    """)
+
+
+async def _migration_v2_voice_rollups(db):
+    # 롤업 범위(scope)별로 집계에 포함되는 채널 목록
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS voice_rollup_scopes (
+            scope TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            PRIMARY KEY (scope, channel_id)
+        )
+    """)
+    # 유저별 일/주/월/누적 합계 (scope 채널만 포함)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS voice_rollups (
+            scope TEXT NOT NULL,
+            period_type TEXT NOT NULL,
+            period_key TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (scope, period_type, period_key, user_id)
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_voice_rollups_rank
+        ON voice_rollups (scope, period_type, period_key, seconds DESC)
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "voice_times / deleted_channels / tracked_channels 테이블", _migration_v1_base_tables),
+    Migration(2, "음성 롤업 테이블 및 순위 인덱스", _migration_v2_voice_rollups),
+]
+
+
 class DataManager:
     _instance = None
     _initialized = False
@@ -19,6 +118,10 @@ class DataManager:
             cls._instance = super().__new__(cls)
             cls._instance.db_path = db_path
             cls._instance._db = None
+            cls._instance._rollup_scopes = {}
+            cls._instance._rollup_misses = set()
+            cls._instance.rollup_stats = {"hits": 0, "fallbacks": 0}
+            cls._instance.tracked_channels_version = 0
         return cls._instance
         
     def __init__(self, db_path: str = db_path):
@@ -26,6 +129,21 @@ class DataManager:
         if not hasattr(self, 'db_path'):
             self.db_path = db_path
             self._db = None
+            self._rollup_scopes = {}
+            self._rollup_misses = set()
+            self.rollup_stats = {"hits": 0, "fallbacks": 0}
+            # tracked_channels / deleted_channels가 바뀔 때마다 증가합니다. (voice_utils의 확장 캐시 무효화용)
+            self.tracked_channels_version = 0
+
+    @property
+    def _write_lock(self):
+        """voice_logs.db 공유 연결의 쓰기 잠금 (connection_registry가 관리)"""
+        return write_lock(self.db_path)
+
+    def _reset_connection_state(self):
+        """connection_registry.close_all() 이후 다음 사용 시 다시 연결하도록 상태를 비웁니다."""
+        self._db = None
+        DataManager._initialized = False
 
     async def ensure_initialized(self):
         """작업을 실행하기 전에 데이터베이스가 초기화되었는지 확인합니다."""
@@ -36,42 +154,24 @@ class DataManager:
                     await self.initialize()
                     DataManager._initialized = True
 
+    @serialized
     async def initialize(self):
-        """데이터베이스 연결을 초기화하고 테이블이 없으면 생성합니다."""
+        """데이터베이스 연결을 초기화하고 스키마를 최신 버전으로 맞춥니다."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         if self._db is None:
-            self._db = await aiosqlite.connect(self.db_path)
-            await self._db.execute("""
-                CREATE TABLE IF NOT EXISTS voice_times (
-                    date TEXT NOT NULL,
-                    user_id INTEGER NOT NULL,
-                    channel_id INTEGER NOT NULL,
-                    seconds INTEGER NOT NULL,
-                    PRIMARY KEY (date, user_id, channel_id)
-                )
-            """)
-            await self._db.execute("""
-                CREATE TABLE IF NOT EXISTS deleted_channels (
-                    channel_id INTEGER PRIMARY KEY,
-                    category_id INTEGER NOT NULL
-                )
-            """)
-            await self._db.execute("""
-                CREATE TABLE IF NOT EXISTS tracked_channels (
-                    channel_id INTEGER NOT NULL,
-                    source TEXT NOT NULL,
-                    PRIMARY KEY (channel_id, source)
-                )
-            """)
-            await self._db.commit()
+            self._db = await get_connection(self.db_path)
+            add_close_listener(self._reset_connection_state)
+            await run_migrations(self._db, self.db_path, MIGRATIONS)
+            await self._load_rollup_scopes()
 
     async def close(self):
         if self._db:
-            await self._db.close()
+            await close_connection(self.db_path)
             self._db = None
             DataManager._initialized = False
             
+    @serialized
     async def register_tracked_channel(self, channel_id: int, source: str):
         await self.ensure_initialized()
         await self._db.execute("""
@@ -79,13 +179,16 @@ class DataManager:
             VALUES (?, ?)
         """, (channel_id, source))
         await self._db.commit()
+        self.tracked_channels_version += 1
 
+    @serialized
     async def unregister_tracked_channel(self, channel_id: int, source: str):
         await self.ensure_initialized()
         await self._db.execute("""
             DELETE FROM tracked_channels WHERE channel_id = ? AND source = ?
         """, (channel_id, source))
         await self._db.commit()
+        self.tracked_channels_version += 1
 
     async def get_tracked_channels(self, source: str) -> List[int]:
         await self.ensure_initialized()
@@ -98,16 +201,187 @@ class DataManager:
             return [row[0] async for row in cursor]
 
     async def add_voice_time(self, user_id: int, channel_id: int, seconds: int):
-        await self.ensure_initialized()
         now = datetime.now(KST).strftime("%Y-%m-%d")
-        await self._db.execute("""
-            INSERT INTO voice_times (date, user_id, channel_id, seconds)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(date, user_id, channel_id)
-            DO UPDATE SET seconds = seconds + excluded.seconds
-        """, (now, user_id, channel_id, seconds))
-        await self._db.commit()
+        await self.add_voice_times_bulk([(now, user_id, channel_id, seconds)])
+
+    async def add_voice_times_bulk(self, rows: List[Tuple[str, int, int, int]]) -> int:
+        """
+        (date, user_id, channel_id, seconds) 목록을 하나의 트랜잭션으로 누적 반영합니다.
+        같은 트랜잭션에서 롤업 테이블도 함께 갱신합니다.
+        VoiceTracker의 write-behind 누적기가 주기적으로 호출합니다.
+        """
+        if not rows:
+            return 0
+        await self.ensure_initialized()
+        async with self._write_lock:
+            try:
+                await self._db.executemany(UPSERT_VOICE_SQL, rows)
+                rollup_rows = self._build_rollup_rows(rows)
+                if rollup_rows:
+                    await self._db.executemany(UPSERT_ROLLUP_SQL, rollup_rows)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            self._apply_rank_deltas(rollup_rows)
+        return len(rows)
+
+    # ===========================================
+    # 롤업 (유저별 기간 합계)
+    # ===========================================
+
+    async def _load_rollup_scopes(self):
+        scopes: Dict[str, set] = {}
+        async with self._db.execute("SELECT scope, channel_id FROM voice_rollup_scopes") as cursor:
+            async for scope, channel_id in cursor:
+                scopes.setdefault(scope, set()).add(channel_id)
+        self._rollup_scopes = {scope: frozenset(ids) for scope, ids in scopes.items()}
+
+    def _build_rollup_rows(self, rows: List[Tuple[str, int, int, int]]) -> List[Tuple[str, str, str, int, int]]:
+        """voice_times 증분을 scope별 롤업 증분으로 변환합니다."""
+        if not self._rollup_scopes:
+            return []
+        deltas: Dict[Tuple[str, str, str, int], int] = {}
+        for date_str, user_id, channel_id, seconds in rows:
+            scopes = [scope for scope, ids in self._rollup_scopes.items() if channel_id in ids]
+            if not scopes:
+                continue
+            keys = rollup_keys(date_str)
+            for scope in scopes:
+                for period_type, period_key in keys:
+                    k = (scope, period_type, period_key, user_id)
+                    deltas[k] = deltas.get(k, 0) + seconds
+        return [(*k, secs) for k, secs in deltas.items()]
+
+    def _match_rollup_scope(self, channel_filter: Optional[List[int]]) -> Optional[str]:
+        """
+        채널 필터와 채널 구성이 정확히 같은 롤업 scope를 찾습니다.
+        일치하는 scope가 없으면 voice_times 스캔으로 대체되므로 횟수를 세고,
+        처음 보는 채널 구성이면 한 번 출력합니다.
+        """
+        if not channel_filter:
+            return None
+        wanted = frozenset(channel_filter)
+        for scope, ids in self._rollup_scopes.items():
+            if ids == wanted:
+                self.rollup_stats["hits"] += 1
+                return scope
+
+        self.rollup_stats["fallbacks"] += 1
+        if wanted not in self._rollup_misses:
+            self._rollup_misses.add(wanted)
+            print(f"⚠️ 음성 롤업과 일치하지 않는 채널 구성({len(wanted)}개)입니다. voice_times 스캔으로 대체합니다.")
+        return None
+
+    # ===========================================
+    # 순위 인덱스 (src.core.rank_service)
+    # ===========================================
+
+    @staticmethod
+    def _rank_index_name(scope: str, period_type: str, period_key: str) -> str:
+        return f"voice:{scope}:{period_type}:{period_key}"
+
+    def _apply_rank_deltas(self, rollup_rows: List[Tuple[str, str, str, int, int]]):
+        """커밋된 롤업 증분을 메모리 순위 인덱스에 반영합니다. (쓰기 잠금 안에서 호출)"""
+        deltas: Dict[str, Dict[int, int]] = {}
+        for scope, period_type, period_key, user_id, seconds in rollup_rows:
+            per_user = deltas.setdefault(self._rank_index_name(scope, period_type, period_key), {})
+            per_user[user_id] = per_user.get(user_id, 0) + seconds
+        for name, per_user in deltas.items():
+            rank_service.apply_deltas(name, per_user)
+
+    async def _get_rank_index(self, scope: str, period_type: str, period_key: str) -> rank_service.RankIndex:
+        """롤업 기간의 순위 인덱스를 반환합니다. 없으면 voice_rollups에서 한 번 구성합니다."""
+        name = self._rank_index_name(scope, period_type, period_key)
+        index = rank_service.get_index(name)
+        if index is not None:
+            return index
+        # 구성 중에 커밋된 증분이 빠지지 않도록 쓰기 잠금 안에서 읽고 등록합니다.
+        async with self._write_lock:
+            async with self._db.execute("""
+                SELECT user_id, seconds FROM voice_rollups
+                 WHERE scope = ? AND period_type = ? AND period_key = ?
+            """, (scope, period_type, period_key)) as cursor:
+                scores = {user_id: seconds async for user_id, seconds in cursor}
+            return rank_service.build_index(name, scores)
+
+    def get_rollup_scope_channels(self, scope: str) -> frozenset:
+        """scope에 등록된 채널 ID 집합을 반환합니다. (없으면 빈 집합)"""
+        return self._rollup_scopes.get(scope, frozenset())
+
+    @staticmethod
+    def _rollup_period_key(period: str, start_date: datetime) -> Optional[Tuple[str, str]]:
+        period_type = ROLLUP_PERIOD_TYPES.get(period)
+        if period_type == 'day' or period_type == 'week':
+            return period_type, start_date.strftime("%Y-%m-%d")
+        if period_type == 'month':
+            return period_type, start_date.strftime("%Y-%m")
+        if period_type == 'total':
+            return period_type, 'all'
+        return None
+
+    async def _rebuild_rollup_rows(self, scope: str, user_ids: Optional[List[int]] = None):
+        """voice_times에서 scope의 롤업 행을 다시 계산합니다. (트랜잭션/커밋은 호출자 책임)"""
+        user_sql = ""
+        params: list = []
+        if user_ids is not None:
+            user_sql = f" AND v.user_id IN ({','.join('?' for _ in user_ids)})"
+            params = list(user_ids)
+
+        delete_sql = "DELETE FROM voice_rollups WHERE scope = ?"
+        if user_ids is not None:
+            delete_sql += f" AND user_id IN ({','.join('?' for _ in user_ids)})"
+        await self._db.execute(delete_sql, [scope, *params])
+
+        week_expr = "date(v.date, '-' || ((CAST(strftime('%w', v.date) AS INTEGER) + 6) % 7) || ' days')"
+        for period_type, key_expr in (
+            ('day', "v.date"),
+            ('week', week_expr),
+            ('month', "substr(v.date, 1, 7)"),
+            ('total', "'all'"),
+        ):
+            await self._db.execute(f"""
+                INSERT INTO voice_rollups (scope, period_type, period_key, user_id, seconds)
+                SELECT ?, ?, {key_expr}, v.user_id, SUM(v.seconds)
+                  FROM voice_times v
+                  JOIN voice_rollup_scopes s
+                    ON s.channel_id = v.channel_id AND s.scope = ?
+                 WHERE 1 = 1{user_sql}
+                 GROUP BY {key_expr}, v.user_id
+            """, [scope, period_type, scope, *params])
+
+    async def rebuild_rollups(self, scope: str, channel_ids: List[int]) -> int:
+        """
+        scope의 채널 구성을 channel_ids로 교체하고, voice_times 전체에서 롤업을 재생성합니다.
+        추적 채널 설정이 바뀐 뒤 호출합니다. 생성된 롤업 행 수를 반환합니다.
+        """
+        await self.ensure_initialized()
+        async with self._write_lock:
+            try:
+                await self._db.execute("DELETE FROM voice_rollup_scopes WHERE scope = ?", (scope,))
+                await self._db.executemany(
+                    "INSERT OR IGNORE INTO voice_rollup_scopes (scope, channel_id) VALUES (?, ?)",
+                    [(scope, int(cid)) for cid in set(channel_ids)]
+                )
+                await self._rebuild_rollup_rows(scope)
+                await self._db.commit()
+            except Exception:
+                await self._db.rollback()
+                raise
+            await self._load_rollup_scopes()
+            self._rollup_misses.clear()
+            rank_service.invalidate(f"voice:{scope}:")
+
+        async with self._db.execute("SELECT COUNT(*) FROM voice_rollups WHERE scope = ?", (scope,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else 0
+
+    async def get_rollup_scopes(self) -> Dict[str, int]:
+        """등록된 롤업 scope와 포함 채널 수를 반환합니다."""
+        await self.ensure_initialized()
+        return {scope: len(ids) for scope, ids in self._rollup_scopes.items()}
 
+    @serialized
     async def register_deleted_channel(self, channel_id: int, category_id: int):
         await self.ensure_initialized()
         await self._db.execute("""
@@ -115,6 +389,7 @@ class DataManager:
             VALUES (?, ?)
         """, (channel_id, category_id))
         await self._db.commit()
+        self.tracked_channels_version += 1
 
     async def get_deleted_channel_category(self, channel_id: int) -> Optional[int]:
         await self.ensure_initialized()
@@ -209,6 +484,62 @@ class DataManager:
 
         return result, start_date, end_date
 
+    async def get_all_users_totals(
+        self,
+        period: str,
+        base_date: datetime,
+        channel_filter: Optional[List[int]] = None
+    ) -> Tuple[Dict[int, int], Optional[datetime], Optional[datetime]]:
+        """
+        기간 내 유저별 총 시간(초)을 반환합니다. {user_id: seconds}
+        channel_filter가 롤업 scope와 일치하면 롤업 테이블에서 바로 읽습니다.
+        """
+        await self.ensure_initialized()
+        scope = self._match_rollup_scope(channel_filter)
+        if scope is not None:
+            start_date, end_date = await self.get_period_range(period, base_date)
+            if not start_date or not end_date:
+                return {}, start_date, end_date
+            period_type, period_key = self._rollup_period_key(period, start_date)
+            async with self._db.execute("""
+                SELECT user_id, seconds
+                  FROM voice_rollups
+                 WHERE scope = ? AND period_type = ? AND period_key = ? AND seconds > 0
+                 ORDER BY user_id
+            """, (scope, period_type, period_key)) as cursor:
+                return {uid: secs async for uid, secs in cursor}, start_date, end_date
+
+        all_data, start_date, end_date = await self.get_all_users_times(period, base_date, channel_filter)
+        return {uid: sum(times.values()) for uid, times in all_data.items()}, start_date, end_date
+
+    async def get_user_total(
+        self,
+        user_id: int,
+        period: str,
+        base_date: Optional[datetime] = None,
+        channel_filter: Optional[List[int]] = None
+    ) -> int:
+        """기간 내 유저의 총 시간(초)을 반환합니다. 롤업 scope와 일치하면 롤업에서 읽습니다."""
+        await self.ensure_initialized()
+        if base_date is None:
+            base_date = datetime.now(KST)
+
+        scope = self._match_rollup_scope(channel_filter)
+        if scope is not None:
+            start_date, end_date = await self.get_period_range(period, base_date)
+            if not start_date or not end_date:
+                return 0
+            period_type, period_key = self._rollup_period_key(period, start_date)
+            async with self._db.execute("""
+                SELECT seconds FROM voice_rollups
+                 WHERE scope = ? AND period_type = ? AND period_key = ? AND user_id = ?
+            """, (scope, period_type, period_key, user_id)) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else 0
+
+        times, _, _ = await self.get_user_times(user_id, period, base_date, channel_filter)
+        return sum(times.values()) if times else 0
+
     async def get_user_rank(
         self,
         user_id: int,
@@ -219,13 +550,26 @@ class DataManager:
         """
         다음 값을 반환합니다: (순위, 전체 유저 수, 유저 총 시간, 시작일, 종료일)
         순위는 1부터 시작하며, 해당 기간에 데이터가 없으면 None을 반환합니다.
+        채널 필터가 롤업 scope와 일치하면 메모리 순위 인덱스로, 아니면 voice_times 스캔으로 계산합니다.
         """
+        await self.ensure_initialized()
+        scope = self._match_rollup_scope(channel_filter)
+        if scope is not None:
+            start_date, end_date = await self.get_period_range(period, base_date)
+            if not start_date or not end_date:
+                return None, 0, 0, start_date, end_date
+            period_type, period_key = self._rollup_period_key(period, start_date)
+            index = await self._get_rank_index(scope, period_type, period_key)
+            # 동점자는 user_id 오름차순 (스캔 경로의 정렬 기준과 동일)
+            return index.rank(user_id), len(index), index.score(user_id), start_date, end_date
+
         all_data, start_date, end_date = await self.get_all_users_times(period, base_date, channel_filter)
         if not all_data:
             return None, 0, 0, start_date, end_date
 
         user_totals = [(uid, sum(times.values())) for uid, times in all_data.items()]
-        ranked = sorted(user_totals, key=lambda x: x[1], reverse=True)
+        # 시간 내림차순, 동점자는 user_id 오름차순
+        ranked = sorted(user_totals, key=lambda x: (-x[1], x[0]))
 
         total_users = len(ranked)
         user_total = 0
@@ -258,11 +602,13 @@ class DataManager:
             else:
                 end = start.replace(month=start.month + 1)
         elif period == '누적':
-            async with self._db.execute("SELECT date FROM voice_times ORDER BY date ASC") as cursor:
-                dates = [datetime.strptime(row[0], "%Y-%m-%d").replace(tzinfo=KST) async for row in cursor]
-                if not dates:
+            async with self._db.execute("SELECT MIN(date), MAX(date) FROM voice_times") as cursor:
+                row = await cursor.fetchone()
+                if not row or row[0] is None:
                     return None, None
-                return dates[0], dates[-1] + timedelta(days=1)
+                first = datetime.strptime(row[0], "%Y-%m-%d").replace(tzinfo=KST)
+                last = datetime.strptime(row[1], "%Y-%m-%d").replace(tzinfo=KST)
+                return first, last + timedelta(days=1)
         else:
             return None, None
 
@@ -270,10 +616,15 @@ class DataManager:
 
     async def reset_data(self):
         await self.ensure_initialized()
-        await self._db.execute("DELETE FROM voice_times")
-        await self._db.execute("DELETE FROM deleted_channels")
-        await self._db.commit()
+        async with self._write_lock:
+            await self._db.execute("DELETE FROM voice_times")
+            await self._db.execute("DELETE FROM voice_rollups")
+            await self._db.execute("DELETE FROM deleted_channels")
+            await self._db.commit()
+            rank_service.invalidate("voice:")
+            self.tracked_channels_version += 1
         
+    @serialized
     async def reset_tracked_channels(self, source: str):
         """
         트래킹된 채널 목록(tracked_channels)만 모두 삭제합니다.
@@ -285,7 +636,9 @@ class DataManager:
             (source,)
         )
         await self._db.commit()
+        self.tracked_channels_version += 1
 
+    @serialized
     async def migrate_multiple_user_times(self, user_times_paths: List[str], deleted_channels_path: str):
         await self.ensure_initialized()
         # ① 매번 깨끗한 상태에서 시작하기 위해 이전 삭제채널 기록을 모두 지웁니다.
@@ -325,10 +678,15 @@ class DataManager:
                     (int(channel_id), int(category_id))
                 )
 
-        # ④ 최종 커밋
+        # ④ 롤업 재계산 후 최종 커밋
+        for scope in self._rollup_scopes:
+            await self._rebuild_rollup_rows(scope)
         await self._db.commit()
+        rank_service.invalidate("voice:")
+        self.tracked_channels_version += 1
         
 
+    @serialized
     async def migrate_deleted_channels(self, deleted_channels_paths: List[str]):
         """
         deleted_channels 테이블을 비우고, 여러 JSON 파일에서
@@ -368,6 +726,7 @@ class DataManager:
 
         # 3) 커밋
         await self._db.commit()
+        self.tracked_channels_version += 1
 
     async def get_deleted_channels_by_categories(self, category_ids: List[int]) -> List[int]:
         """주어진 카테고리ID 목록에 속한 삭제된 채널ID들을 반환합니다."""
@@ -422,25 +781,32 @@ class DataManager:
         날짜/채널이 겹치면 시간을 합산합니다.
         """
         await self.ensure_initialized()
-        try:
-            # 1. old_user의 데이터를 가져옴
-            async with self._db.execute("SELECT date, channel_id, seconds FROM voice_times WHERE user_id = ?", (old_user_id,)) as cursor:
-                rows = await cursor.fetchall()
+        async with self._write_lock:
+            try:
+                # 1. old_user의 데이터를 가져옴
+                async with self._db.execute("SELECT date, channel_id, seconds FROM voice_times WHERE user_id = ?", (old_user_id,)) as cursor:
+                    rows = await cursor.fetchall()
             
-            # 2. 각 기록을 new_user에게 병합
-            for date, channel_id, seconds in rows:
-                await self._db.execute("""
-                    INSERT INTO voice_times (date, user_id, channel_id, seconds)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(date, user_id, channel_id)
-                    DO UPDATE SET seconds = seconds + excluded.seconds
-                """, (date, new_user_id, channel_id, seconds))
-
-            # 3. old_user 데이터 삭제
-            await self._db.execute("DELETE FROM voice_times WHERE user_id = ?", (old_user_id,))
+                # 2. 각 기록을 new_user에게 병합
+                for date, channel_id, seconds in rows:
+                    await self._db.execute("""
+                        INSERT INTO voice_times (date, user_id, channel_id, seconds)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(date, user_id, channel_id)
+                        DO UPDATE SET seconds = seconds + excluded.seconds
+                    """, (date, new_user_id, channel_id, seconds))
+
+                # 3. old_user 데이터 삭제
+                await self._db.execute("DELETE FROM voice_times WHERE user_id = ?", (old_user_id,))
+
+                # 4. 두 유저의 롤업 재계산
+                for scope in self._rollup_scopes:
+                    await self._rebuild_rollup_rows(scope, [old_user_id, new_user_id])
             
-            await self._db.commit()
-            return True
-        except Exception as e:
-            print(f"Error swapping voice data: {e}")
-            return False
+                await self._db.commit()
+                rank_service.invalidate("voice:")
+                return True
+            except Exception as e:
+                await self._db.rollback()
+                print(f"Error swapping voice data: {e}")
+                return False
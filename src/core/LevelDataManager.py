@@ -1,14 +1,139 @@
-import aiosqlite
 import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
 import pytz
 import os
 
+from src.core.connection_registry import get_connection, connection, write_lock, serialized, add_close_listener
+from src.core.migrations import Migration, run_migrations, table_columns
+
 KST = pytz.timezone("Asia/Seoul")
 db_path = "data/level_system.db"
 
+# ===========================================
+# 스키마 마이그레이션 (PRAGMA user_version)
+# ===========================================
+
+async def _migration_v1_base_tables(db):
+    # 유저 경험치 테이블
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_exp (
+            user_id INTEGER PRIMARY KEY,
+            total_exp INTEGER DEFAULT 0,
+            current_role TEXT DEFAULT 'yeobaek',
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # 퀘스트 로그 테이블
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS quest_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            quest_type TEXT,
+            quest_subtype TEXT,
+            completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            exp_gained INTEGER DEFAULT 0,
+            week_start DATE,
+            FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
+        )
+    """)
+
+    # 일회성 퀘스트 완료 기록
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS one_time_quests (
+            user_id INTEGER,
+            quest_type TEXT,
+            completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, quest_type),
+            FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
+        )
+    """)
+
+    # 랭크 인증 테이블
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS rank_certifications (
+            user_id INTEGER,
+            rank_type TEXT,
+            certified_level INTEGER,
+            certified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, rank_type),
+            FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
+        )
+    """)
+
+
+async def _migration_v2_quest_log_kst_keys(db):
+    """
+    quest_logs에 KST 기준 일/월 키(kst_day, kst_month)를 추가하고 기존 행을 채웁니다.
+    completed_at(UTC)에서 계산하는 트리거를 두어 이후 INSERT에도 자동으로 채워집니다.
+    """
+    columns = await table_columns(db, "quest_logs")
+    if "kst_day" not in columns:
+        await db.execute("ALTER TABLE quest_logs ADD COLUMN kst_day TEXT")
+    if "kst_month" not in columns:
+        await db.execute("ALTER TABLE quest_logs ADD COLUMN kst_month TEXT")
+
+    # 기존 행 백필
+    await db.execute("""
+        UPDATE quest_logs
+           SET kst_day = DATE(completed_at, '+9 hours'),
+               kst_month = strftime('%Y-%m', completed_at, '+9 hours')
+         WHERE kst_day IS NULL AND completed_at IS NOT NULL
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_quest_logs_kst_keys
+        AFTER INSERT ON quest_logs
+        WHEN NEW.kst_day IS NULL
+        BEGIN
+            UPDATE quest_logs
+               SET kst_day = DATE(NEW.completed_at, '+9 hours'),
+                   kst_month = strftime('%Y-%m', NEW.completed_at, '+9 hours')
+             WHERE id = NEW.id;
+        END
+    """)
+
+    # 일간 퀘스트 여부 / 주간 집계 / 기간 순위용 인덱스
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_logs_user_day
+        ON quest_logs (user_id, quest_type, quest_subtype, kst_day)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_logs_user_week
+        ON quest_logs (user_id, quest_type, quest_subtype, week_start)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_logs_week
+        ON quest_logs (week_start, user_id)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_logs_day
+        ON quest_logs (kst_day, user_id)
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quest_logs_month
+        ON quest_logs (kst_month, user_id)
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "user_exp / quest_logs / one_time_quests / rank_certifications 테이블", _migration_v1_base_tables),
+    Migration(2, "quest_logs KST 일/월 키 및 인덱스", _migration_v2_quest_log_kst_keys),
+]
+
+
+@dataclass
+class QuestLedgerEntry:
+    """한 유저의 이번 KST 일/주 퀘스트 완료 횟수 ((quest_type, quest_subtype) → 횟수)"""
+    day_key: str
+    week_key: str
+    day: Counter = field(default_factory=Counter)
+    week: Counter = field(default_factory=Counter)
+
+
 class LevelDataManager:
     _instance = None
     _initialized = False
@@ -19,13 +144,21 @@ class LevelDataManager:
             cls._instance = super().__new__(cls)
             cls._instance.db_path = db_path
             cls._instance._db = None
+            cls._instance._quest_ledger = {}
         return cls._instance
     
     def __init__(self, db_path: str = db_path):
         if not hasattr(self, 'db_path'):
             self.db_path = db_path
             self._db = None
+            self._quest_ledger = {}
         self.logger = logging.getLogger(__name__)
+
+    def _reset_connection_state(self):
+        """connection_registry.close_all() 이후 다음 사용 시 다시 연결하도록 상태를 비웁니다."""
+        self._db = None
+        self._quest_ledger.clear()
+        LevelDataManager._initialized = False
     
     async def ensure_initialized(self):
         if not LevelDataManager._initialized:
@@ -34,64 +167,18 @@ class LevelDataManager:
                     await self.initialize_database()
                     LevelDataManager._initialized = True
     
+    @serialized
     async def initialize_database(self):
-        """데이터베이스 초기화 및 테이블 생성"""
+        """데이터베이스 연결을 초기화하고 스키마를 최신 버전으로 맞춥니다."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        self._db = await aiosqlite.connect(self.db_path)
-        
-        # 유저 경험치 테이블
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS user_exp (
-                user_id INTEGER PRIMARY KEY,
-                total_exp INTEGER DEFAULT 0,
-                current_role TEXT DEFAULT 'yeobaek',
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # 퀘스트 로그 테이블
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS quest_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                quest_type TEXT,
-                quest_subtype TEXT,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                exp_gained INTEGER DEFAULT 0,
-                week_start DATE,
-                FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
-            )
-        """)
-        
-        # 일회성 퀘스트 완료 기록
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS one_time_quests (
-                user_id INTEGER,
-                quest_type TEXT,
-                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, quest_type),
-                FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
-            )
-        """)
-        
-        # 랭크 인증 테이블
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS rank_certifications (
-                user_id INTEGER,
-                rank_type TEXT,
-                certified_level INTEGER,
-                certified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, rank_type),
-                FOREIGN KEY (user_id) REFERENCES user_exp (user_id)
-            )
-        """)
-        
-        await self._db.commit()
+        self._db = await get_connection(self.db_path)
+        add_close_listener(self._reset_connection_state)
+        await run_migrations(self._db, self.db_path, MIGRATIONS)
     
     def db_connect(self):
-        """데이터베이스 연결 컨텍스트 매니저"""
-        return aiosqlite.connect(self.db_path)
+        """공유 데이터베이스 연결 컨텍스트 매니저 (블록 종료 시 연결을 닫지 않음)"""
+        return connection(self.db_path)
     
     def _get_week_start(self, date: datetime = None) -> str:
         """주의 시작일 계산 (월요일 기준, KST)"""
@@ -103,6 +190,77 @@ class LevelDataManager:
         week_start = date - timedelta(days=days_since_monday)
         return week_start.strftime('%Y-%m-%d')
     
+    # ===========================================
+    # 퀘스트 원장 (이번 KST 일/주 완료 횟수 메모리 캐시)
+    # ===========================================
+
+    def _current_period_keys(self) -> Tuple[str, str]:
+        now = datetime.now(KST)
+        return now.strftime('%Y-%m-%d'), self._get_week_start(now)
+
+    async def _get_ledger_entry(self, user_id: int) -> QuestLedgerEntry:
+        """
+        유저의 원장을 반환합니다. 처음 조회하거나 KST 일/주가 바뀌었으면 quest_logs에서 다시 읽습니다.
+        읽는 도중 커밋된 기록이 빠지지 않도록 쓰기 잠금 안에서 읽고 등록합니다.
+        """
+        day_key, week_key = self._current_period_keys()
+        entry = self._quest_ledger.get(user_id)
+        if entry is not None and entry.day_key == day_key and entry.week_key == week_key:
+            return entry
+
+        async with write_lock(self.db_path):
+            entry = QuestLedgerEntry(day_key, week_key)
+            async with self._db.execute("""
+                SELECT quest_type, quest_subtype, kst_day, COUNT(*)
+                FROM quest_logs
+                WHERE user_id = ? AND week_start = ?
+                GROUP BY quest_type, quest_subtype, kst_day
+            """, (user_id, week_key)) as cursor:
+                async for quest_type, quest_subtype, kst_day, count in cursor:
+                    entry.week[(quest_type, quest_subtype)] += count
+                    if kst_day == day_key:
+                        entry.day[(quest_type, quest_subtype)] += count
+            self._quest_ledger[user_id] = entry
+        return entry
+
+    def _record_in_ledger(self, user_id: int, quest_type: str, quest_subtype: Optional[str], count: int = 1):
+        """커밋된 quest_logs 기록을 원장에 반영합니다. (쓰기 잠금 안에서 호출)"""
+        entry = self._quest_ledger.get(user_id)
+        if entry is None:
+            return
+        day_key, week_key = self._current_period_keys()
+        if entry.day_key != day_key or entry.week_key != week_key:
+            # 기간이 바뀌었으면 다음 조회 때 새로 읽습니다.
+            del self._quest_ledger[user_id]
+            return
+        entry.day[(quest_type, quest_subtype)] += count
+        entry.week[(quest_type, quest_subtype)] += count
+
+    def invalidate_quest_ledger(self, user_id: Optional[int] = None):
+        """quest_logs를 직접 수정한 뒤 호출합니다. user_id가 없으면 전체를 비웁니다."""
+        if user_id is None:
+            self._quest_ledger.clear()
+        else:
+            self._quest_ledger.pop(user_id, None)
+
+    @serialized
+    async def log_quest(self, user_id: int, quest_type: str, quest_subtype: str, count: int = 1) -> bool:
+        """경험치 없이 퀘스트 진행 기록만 count개 남깁니다. (게시판 참여, 추천 인증 등)"""
+        await self.ensure_initialized()
+        try:
+            week_start = self._get_week_start()
+            await self._db.executemany("""
+                INSERT INTO quest_logs (user_id, quest_type, quest_subtype, exp_gained, week_start)
+                VALUES (?, ?, ?, 0, ?)
+            """, [(user_id, quest_type, quest_subtype, week_start)] * count)
+            await self._db.commit()
+            self._record_in_ledger(user_id, quest_type, quest_subtype, count)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error logging quest: {e}")
+            return False
+
+    @serialized
     async def add_exp(self, user_id: int, exp_amount: int, quest_type: str = None, quest_subtype: str = None) -> bool:
         await self.ensure_initialized()
         """다공 지급"""
@@ -126,6 +284,8 @@ class LevelDataManager:
                 """, (user_id, quest_type, quest_subtype, exp_amount, week_start))
             
             await self._db.commit()
+            if quest_type:
+                self._record_in_ledger(user_id, quest_type, quest_subtype)
             self.logger.info(f"Added {exp_amount} 다공 to user {user_id}")
             return True
         except Exception as e:
@@ -161,6 +321,7 @@ class LevelDataManager:
             self.logger.error(f"Error getting user exp: {e}")
             return None
     
+    @serialized
     async def remove_exp(self, user_id: int, exp_amount: int) -> bool:
         await self.ensure_initialized()
         """다공 회수"""
@@ -178,6 +339,7 @@ class LevelDataManager:
             self.logger.error(f"Error removing 다공: {e}")
             return False
     
+    @serialized
     async def reset_all_users(self) -> bool:
         await self.ensure_initialized()
         """전체 유저 초기화"""
@@ -186,12 +348,14 @@ class LevelDataManager:
             await self._db.execute("DELETE FROM quest_logs")
             await self._db.execute("DELETE FROM one_time_quests")
             await self._db.commit()
+            self.invalidate_quest_ledger()
             self.logger.info("Reset all users")
             return True
         except Exception as e:
             self.logger.error(f"Error resetting all users: {e}")
             return False
     
+    @serialized
     async def reset_user(self, user_id: int) -> bool:
         await self.ensure_initialized()
         """특정 유저 초기화"""
@@ -200,6 +364,7 @@ class LevelDataManager:
             await self._db.execute("DELETE FROM quest_logs WHERE user_id = ?", (user_id,))
             await self._db.execute("DELETE FROM one_time_quests WHERE user_id = ?", (user_id,))
             await self._db.commit()
+            self.invalidate_quest_ledger(user_id)
             self.logger.info(f"Reset user {user_id}")
             return True
         except Exception as e:
@@ -208,43 +373,17 @@ class LevelDataManager:
     
     async def get_quest_count(self, user_id: int, quest_type: str, quest_subtype: str = None, timeframe: str = 'week') -> int:
         await self.ensure_initialized()
-        """퀘스트 완료 횟수 조회"""
+        """퀘스트 완료 횟수 조회 (일간/주간은 메모리 원장, 누적은 DB)"""
         try:
-            if timeframe == 'day':
-                # 오늘 수행 여부만 0/1로 반환
-                today_kst = datetime.now(KST).strftime('%Y-%m-%d')
+            if timeframe in ('day', 'week'):
+                entry = await self._get_ledger_entry(user_id)
+                counts = entry.day if timeframe == 'day' else entry.week
                 if quest_subtype:
-                    cursor = await self._db.execute("""
-                        SELECT EXISTS (
-                            SELECT 1 FROM quest_logs 
-                            WHERE user_id = ? AND quest_type = ? AND quest_subtype = ? 
-                            AND DATE(completed_at, '+9 hours') = ?
-                        ) as did_today
-                    """, (user_id, quest_type, quest_subtype, today_kst))
-                else:
-                    cursor = await self._db.execute("""
-                        SELECT EXISTS (
-                            SELECT 1 FROM quest_logs 
-                            WHERE user_id = ? AND quest_type = ? 
-                            AND DATE(completed_at, '+9 hours') = ?
-                        ) as did_today
-                    """, (user_id, quest_type, today_kst))
-                result = await cursor.fetchone()
-                return result[0] if result else 0
-            elif timeframe == 'week':  # 기존 주간 카운트 로직
-                week_start = self._get_week_start()
-                if quest_subtype:
-                    cursor = await self._db.execute("""
-                        SELECT COUNT(*) FROM quest_logs 
-                        WHERE user_id = ? AND quest_type = ? AND quest_subtype = ? AND week_start = ?
-                    """, (user_id, quest_type, quest_subtype, week_start))
+                    count = counts[(quest_type, quest_subtype)]
                 else:
-                    cursor = await self._db.execute("""
-                        SELECT COUNT(*) FROM quest_logs 
-                        WHERE user_id = ? AND quest_type = ? AND week_start = ?
-                    """, (user_id, quest_type, week_start))
-                result = await cursor.fetchone()
-                return result[0] if result else 0
+                    count = sum(c for (q_type, _), c in counts.items() if q_type == quest_type)
+                # 일간은 오늘 수행 여부만 0/1로 반환
+                return min(count, 1) if timeframe == 'day' else count
             else:  # all time
                 if quest_subtype:
                     cursor = await self._db.execute("""
@@ -276,6 +415,7 @@ class LevelDataManager:
             self.logger.error(f"Error checking one-time quest: {e}")
             return False
     
+    @serialized
     async def mark_one_time_quest_completed(self, user_id: int, quest_type: str) -> bool:
         await self.ensure_initialized()
         """일회성 퀘스트 완료 표시"""
@@ -290,6 +430,7 @@ class LevelDataManager:
             self.logger.error(f"Error marking one-time quest: {e}")
             return False
     
+    @serialized
     async def update_user_role(self, user_id: int, new_role: str) -> bool:
         await self.ensure_initialized()
         """유저 역할 업데이트"""
@@ -327,7 +468,7 @@ class LevelDataManager:
                             COALESCE(ue.current_role, 'hub') as current_role
                     FROM quest_logs ql
                     LEFT JOIN user_exp ue ON ql.user_id = ue.user_id
-                    WHERE DATE(ql.completed_at, 'localtime') = ?
+                    WHERE ql.kst_day = ?
                     GROUP BY ql.user_id
                     HAVING period_exp > 0
                     ORDER BY period_exp DESC
@@ -355,7 +496,7 @@ class LevelDataManager:
                             COALESCE(ue.current_role, 'hub') as current_role
                     FROM quest_logs ql
                     LEFT JOIN user_exp ue ON ql.user_id = ue.user_id
-                    WHERE strftime('%Y-%m', ql.completed_at, 'localtime') = ?
+                    WHERE ql.kst_month = ?
                     GROUP BY ql.user_id
                     HAVING period_exp > 0
                     ORDER BY period_exp DESC
@@ -385,7 +526,7 @@ class LevelDataManager:
                 cursor = await self._db.execute("""
                     SELECT COALESCE(SUM(exp_gained), 0) as daily_exp
                     FROM quest_logs 
-                    WHERE user_id = ? AND DATE(completed_at, 'localtime') = ?
+                    WHERE user_id = ? AND kst_day = ?
                 """, (user_id, today_kst))
             elif period_type == 'weekly':
                 # 이번 주 획득한 경험치
@@ -401,7 +542,7 @@ class LevelDataManager:
                 cursor = await self._db.execute("""
                     SELECT COALESCE(SUM(exp_gained), 0) as monthly_exp
                     FROM quest_logs 
-                    WHERE user_id = ? AND strftime('%Y-%m', completed_at, 'localtime') = ?
+                    WHERE user_id = ? AND kst_month = ?
                 """, (user_id, month_kst))
             else:
                 return 0
@@ -433,13 +574,13 @@ class LevelDataManager:
                     FROM (
                         SELECT user_id, SUM(exp_gained) as daily_exp
                         FROM quest_logs 
-                        WHERE DATE(completed_at, 'localtime') = ?
+                        WHERE kst_day = ?
                         GROUP BY user_id
                     ) daily_ranks
                     WHERE daily_exp > (
                         SELECT COALESCE(SUM(exp_gained), 0)
                         FROM quest_logs 
-                        WHERE user_id = ? AND DATE(completed_at, 'localtime') = ?
+                        WHERE user_id = ? AND kst_day = ?
                     )
                 """, (today_kst, user_id, today_kst))
             elif period_type == 'weekly':
@@ -467,13 +608,13 @@ class LevelDataManager:
                     FROM (
                         SELECT user_id, SUM(exp_gained) as monthly_exp
                         FROM quest_logs 
-                        WHERE strftime('%Y-%m', completed_at, 'localtime') = ?
+                        WHERE kst_month = ?
                         GROUP BY user_id
                     ) monthly_ranks
                     WHERE monthly_exp > (
                         SELECT COALESCE(SUM(exp_gained), 0)
                         FROM quest_logs 
-                        WHERE user_id = ? AND strftime('%Y-%m', completed_at, 'localtime') = ?
+                        WHERE user_id = ? AND kst_month = ?
                     )
                 """, (month_kst, user_id, month_kst))
             else:
@@ -510,6 +651,7 @@ class LevelDataManager:
             self.logger.error(f"Error getting certified rank level: {e}")
             return 0
 
+    @serialized
     async def update_certified_rank_level(self, user_id: int, rank_type: str, new_level: int) -> bool:
         """유저의 인증된 랭크 레벨 업데이트"""
         try:
@@ -541,6 +683,7 @@ class LevelDataManager:
             self.logger.error(f"Error getting all certified ranks: {e}")
             return {}
 
+    @serialized
     async def swap_user_level_data(self, old_user_id: int, new_user_id: int) -> bool:
         """
         특정 유저(old_user_id)의 레벨 데이터를 다른 유저(new_user_id)로 통합합니다.
@@ -596,6 +739,8 @@ class LevelDataManager:
             await self._db.execute("DELETE FROM rank_certifications WHERE user_id = ?", (old_user_id,))
 
             await self._db.commit()
+            self.invalidate_quest_ledger(old_user_id)
+            self.invalidate_quest_ledger(new_user_id)
             self.logger.info(f"Merged level data from {old_user_id} to {new_user_id}")
             return True
         except Exception as e:
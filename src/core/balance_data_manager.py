@@ -1,11 +1,78 @@
-import aiosqlite
 import asyncio
 import os
 from datetime import datetime
 import pytz
+
+from src.core.connection_registry import get_connection, close_connection, serialized, add_close_listener
+from src.core.migrations import Migration, run_migrations
+
 KST = pytz.timezone("Asia/Seoul")
 DB_FILE = "data/balance.db"
 
+
+# ===========================================
+# 스키마 마이그레이션 (PRAGMA user_version)
+# ===========================================
+
+async def _migration_v1_base_tables(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS balances (
+            user_id TEXT PRIMARY KEY,
+            balance INTEGER DEFAULT 0
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS auth (
+            item TEXT PRIMARY KEY,
+            reward_amount INTEGER DEFAULT 100
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS auth_roles (
+            role_id INTEGER PRIMARY KEY
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS currency_unit (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            emoji TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS allowed_channels (
+            channel_id INTEGER
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS transfers (          -- 송금 테이블
+            id INTEGER PRIMARY KEY AUTOINCREMENT,       -- 당일 송금 내역 확인을 위한 Key값 (자동증가, 중복방지)
+            sender_id TEXT NOT NULL,                    -- 보내는 유저 ID
+            receiver_id TEXT NOT NULL,                  -- 받는 유저 ID
+            amount INTEGER NOT NULL,                    -- 송금 금액
+            fee INTEGER NOT NULL,                       -- 수수료
+            timestamp TEXT NOT NULL                     -- 송금 시각
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS fee_tiers (          -- 수수료 단계 테이블
+            fee_threshold INTEGER PRIMARY KEY,          -- 기준 금액 (이 금액 이상일 때 해당 수수료 적용)
+            fee INTEGER NOT NULL                        -- 수수료
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS transfer_limits (    -- 송금 제한 테이블
+            id INTEGER PRIMARY KEY CHECK (id = 1),      -- 하나만 존재하도록 강제
+            daily_send_limit INTEGER,         -- 일일 송금 제한
+            daily_receive_limit INTEGER       -- 일일 수취 제한
+        )
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "balances / auth / transfers 등 기본 테이블", _migration_v1_base_tables),
+]
+
+
 class BalanceDataManager:
     _instance = None
     _initialized = False
@@ -23,6 +90,11 @@ class BalanceDataManager:
             self.db_path = db_path
             self._db = None
 
+    def _reset_connection_state(self):
+        """connection_registry.close_all() 이후 다음 사용 시 다시 연결하도록 상태를 비웁니다."""
+        self._db = None
+        BalanceDataManager._initialized = False
+
     async def ensure_initialized(self):
         if not BalanceDataManager._initialized:
             async with self._init_lock:
@@ -30,67 +102,18 @@ class BalanceDataManager:
                     await self.init_db()
                     BalanceDataManager._initialized = True
 
+    @serialized
     async def init_db(self):
+        """데이터베이스 연결을 초기화하고 스키마를 최신 버전으로 맞춥니다."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        self._db = await aiosqlite.connect(self.db_path)
-
-        await self._db.execute("""
-                CREATE TABLE IF NOT EXISTS balances (
-                    user_id TEXT PRIMARY KEY,
-                    balance INTEGER DEFAULT 0
-                )
-            """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS auth (
-                item TEXT PRIMARY KEY,
-                reward_amount INTEGER DEFAULT 100
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS auth_roles (
-                role_id INTEGER PRIMARY KEY
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS currency_unit (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                emoji TEXT
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS allowed_channels (
-                channel_id INTEGER
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS transfers (          -- 송금 테이블
-                id INTEGER PRIMARY KEY AUTOINCREMENT,       -- 당일 송금 내역 확인을 위한 Key값 (자동증가, 중복방지)
-                sender_id TEXT NOT NULL,                    -- 보내는 유저 ID
-                receiver_id TEXT NOT NULL,                  -- 받는 유저 ID
-                amount INTEGER NOT NULL,                    -- 송금 금액
-                fee INTEGER NOT NULL,                       -- 수수료
-                timestamp TEXT NOT NULL                     -- 송금 시각
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS fee_tiers (          -- 수수료 단계 테이블
-                fee_threshold INTEGER PRIMARY KEY,          -- 기준 금액 (이 금액 이상일 때 해당 수수료 적용)
-                fee INTEGER NOT NULL                        -- 수수료
-            )
-        """)
-        await self._db.execute("""
-            CREATE TABLE IF NOT EXISTS transfer_limits (    -- 송금 제한 테이블
-                id INTEGER PRIMARY KEY CHECK (id = 1),      -- 하나만 존재하도록 강제
-                daily_send_limit INTEGER,         -- 일일 송금 제한
-                daily_receive_limit INTEGER       -- 일일 수취 제한
-            )
-        """)
-        await self._db.commit()
+        self._db = await get_connection(self.db_path)
+        add_close_listener(self._reset_connection_state)
+        await run_migrations(self._db, self.db_path, MIGRATIONS)
     
     async def close(self):
         if self._db:
-            await self._db.close()
+            await close_connection(self.db_path)
             self._db = None
             BalanceDataManager._initialized = False
 
@@ -100,6 +123,7 @@ class BalanceDataManager:
             row = await cursor.fetchone()
             return row[0] if row else 0
 
+    @serialized
     async def give(self, user_id, amount):
         await self.ensure_initialized()
         await self._db.execute("""
@@ -109,6 +133,22 @@ class BalanceDataManager:
         """, (user_id, amount))
         await self._db.commit()
 
+    @serialized
+    async def give_many(self, user_ids, amount):
+        """여러 유저에게 같은 금액을 한 트랜잭션으로 지급합니다. (중복 ID는 한 번만) 지급한 유저 수를 반환합니다."""
+        await self.ensure_initialized()
+        rows = [(user_id, amount) for user_id in dict.fromkeys(user_ids)]
+        if not rows:
+            return 0
+        await self._db.executemany("""
+            INSERT INTO balances (user_id, balance)
+            VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance
+        """, rows)
+        await self._db.commit()
+        return len(rows)
+
+    @serialized
     async def take(self, user_id, amount):
         await self.ensure_initialized()
         await self._db.execute("""
@@ -117,11 +157,13 @@ class BalanceDataManager:
         """, (amount, user_id))
         await self._db.commit()
 
+    @serialized
     async def add_auth_item(self, item, reward_amount):
         await self.ensure_initialized()
         await self._db.execute("INSERT OR REPLACE INTO auth (item, reward_amount) VALUES (?, ?)", (item, reward_amount))
         await self._db.commit()
 
+    @serialized
     async def remove_auth_item(self, item):
         await self.ensure_initialized()
         await self._db.execute("DELETE FROM auth WHERE item = ?", (item,))
@@ -145,11 +187,13 @@ class BalanceDataManager:
             return [{"item": row[0], "reward_amount": row[1]} for row in rows]
 
     # 인증 역할 관련
+    @serialized
     async def add_auth_role(self, role_id):
         await self.ensure_initialized()
         await self._db.execute("INSERT OR IGNORE INTO auth_roles (role_id) VALUES (?)", (role_id,))
         await self._db.commit()
 
+    @serialized
     async def remove_auth_role(self, role_id):
         await self.ensure_initialized()
         await self._db.execute("DELETE FROM auth_roles WHERE role_id = ?", (role_id,))
@@ -162,6 +206,7 @@ class BalanceDataManager:
             return [row[0] for row in rows]
 
     # 화폐 단위 관련
+    @serialized
     async def set_currency_unit(self, emoji):
         await self.ensure_initialized()
         await self._db.execute("INSERT OR REPLACE INTO currency_unit (id, emoji) VALUES (1, ?)", (emoji,))
@@ -176,11 +221,13 @@ class BalanceDataManager:
             return None
 
     # Economy 명령어 허용 채널 관리
+    @serialized
     async def add_allowed_channel(self, channel_id):
         await self.ensure_initialized()
         await self._db.execute("INSERT INTO allowed_channels (channel_id) VALUES (?)", (channel_id,))
         await self._db.commit()
 
+    @serialized
     async def remove_allowed_channel(self, channel_id):
         await self.ensure_initialized()
         await self._db.execute("DELETE FROM allowed_channels WHERE channel_id = ?", (channel_id,))
@@ -193,12 +240,14 @@ class BalanceDataManager:
             return [row[0] for row in rows]
 
     # 모든 유저 화폐 초기화 (설정 제외)
+    @serialized
     async def reset_all_balances(self):
         await self.ensure_initialized()
         await self._db.execute("DELETE FROM balances")
         await self._db.commit()
 
     # 화폐 송금 기능
+    @serialized
     async def transfer(self, sender_id: str, receiver_id: str, amount: int, fee: int) -> bool:
         """화폐 송금 기능 구현"""
         await self.ensure_initialized()
@@ -264,6 +313,7 @@ class BalanceDataManager:
             return count[0] if count else 0
 
     # 화폐 수수료 설정
+    @serialized
     async def set_fee_tiers(self, tiers: list):
         await self.ensure_initialized()
         normalized_input = []
@@ -332,6 +382,7 @@ class BalanceDataManager:
         return selected_fee if selected_fee is not None else (1000 if amount >= 50000 else 500)
 
     # 일일 송금/수취 한도 설정
+    @serialized
     async def set_daily_limits(self, send_limit: int, receive_limit: int):
         await self.ensure_initialized()
         async with self._db.execute("SELECT 1 FROM transfer_limits WHERE id = 1") as cursor:
@@ -354,6 +405,7 @@ class BalanceDataManager:
                     pass
         return 3, 5
 
+    @serialized
     async def swap_user_balance_data(self, old_user_id: str, new_user_id: str) -> bool:
         """
         특정 유저(old_user_id)의 자산 데이터를 다른 유저(new_user_id)로 통합합니다.
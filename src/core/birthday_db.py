@@ -7,83 +7,85 @@ import aiosqlite
 from pathlib import Path
 from typing import Optional, Dict
 
+from src.core.connection_registry import connection, get_connection
+from src.core.migrations import Migration, run_migrations, table_columns
+
 DB_PATH = Path("data/birthday.db")
 
 
+async def _migration_v1_base_tables(db):
+    # 생일 정보 테이블 (edit_count 제거)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS birthdays (
+            user_id TEXT PRIMARY KEY,
+            year INTEGER,
+            month INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # 수정 횟수 관리 테이블 (별도 테이블로 분리)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS user_edit_count (
+            user_id TEXT PRIMARY KEY,
+            edit_count INTEGER DEFAULT 0,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def _migration_v2_split_edit_count(db):
+    """예전 birthdays 테이블의 edit_count 컬럼을 user_edit_count 테이블로 옮깁니다."""
+    if "edit_count" not in await table_columns(db, "birthdays"):
+        return
+
+    await db.execute("""
+        INSERT OR REPLACE INTO user_edit_count (user_id, edit_count, last_updated)
+        SELECT user_id, edit_count, updated_at FROM birthdays WHERE edit_count > 0
+    """)
+
+    # SQLite는 컬럼 삭제를 직접 지원하지 않으므로 테이블 재생성
+    await db.execute("""
+        CREATE TABLE birthdays_new (
+            user_id TEXT PRIMARY KEY,
+            year INTEGER,
+            month INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await db.execute("""
+        INSERT INTO birthdays_new (user_id, year, month, day, registered_at, updated_at)
+        SELECT user_id, year, month, day, registered_at, updated_at FROM birthdays
+    """)
+    await db.execute("DROP TABLE birthdays")
+    await db.execute("ALTER TABLE birthdays_new RENAME TO birthdays")
+
+
+MIGRATIONS = [
+    Migration(1, "birthdays / user_edit_count 테이블", _migration_v1_base_tables),
+    Migration(2, "birthdays.edit_count → user_edit_count 분리", _migration_v2_split_edit_count),
+]
+
+
 async def init_db():
-    """데이터베이스 초기화 및 테이블 생성"""
+    """데이터베이스 연결을 열고 스키마를 최신 버전으로 맞춥니다."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     
-    async with aiosqlite.connect(DB_PATH) as db:
-        # 생일 정보 테이블 (edit_count 제거)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS birthdays (
-                user_id TEXT PRIMARY KEY,
-                year INTEGER,
-                month INTEGER NOT NULL,
-                day INTEGER NOT NULL,
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # 수정 횟수 관리 테이블 (별도 테이블로 분리)
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS user_edit_count (
-                user_id TEXT PRIMARY KEY,
-                edit_count INTEGER DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # 기존 birthdays 테이블에서 edit_count 데이터를 user_edit_count로 마이그레이션
-        try:
-            # edit_count 컬럼이 있는지 확인
-            async with db.execute("PRAGMA table_info(birthdays)") as cursor:
-                columns = await cursor.fetchall()
-                has_edit_count = any(col[1] == 'edit_count' for col in columns)
-            
-            if has_edit_count:
-                # 기존 데이터 마이그레이션
-                await db.execute("""
-                    INSERT OR REPLACE INTO user_edit_count (user_id, edit_count, last_updated)
-                    SELECT user_id, edit_count, updated_at FROM birthdays WHERE edit_count > 0
-                """)
-                
-                # birthdays 테이블에서 edit_count 컬럼 제거
-                # SQLite는 컬럼 삭제를 직접 지원하지 않으므로 테이블 재생성
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS birthdays_new (
-                        user_id TEXT PRIMARY KEY,
-                        year INTEGER,
-                        month INTEGER NOT NULL,
-                        day INTEGER NOT NULL,
-                        registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await db.execute("""
-                    INSERT INTO birthdays_new (user_id, year, month, day, registered_at, updated_at)
-                    SELECT user_id, year, month, day, registered_at, updated_at FROM birthdays
-                """)
-                
-                await db.execute("DROP TABLE birthdays")
-                await db.execute("ALTER TABLE birthdays_new RENAME TO birthdays")
-                
-                print("✅ Migration completed: edit_count moved to user_edit_count table")
-        except Exception as e:
-            print(f"⚠️ Migration warning (can be ignored if fresh install): {e}")
-        
-        await db.commit()
+    async with connection(DB_PATH) as db:
+        await run_migrations(db, DB_PATH, MIGRATIONS)
     print(f"✅ Birthday DB initialized at {DB_PATH}")
 
 
 async def get_db():
-    """데이터베이스 연결 반환 (Row factory 설정)"""
-    db = await aiosqlite.connect(DB_PATH)
-    db.row_factory = aiosqlite.Row
-    return db
+    """
+    공유 데이터베이스 연결 반환
+    연결은 다른 모듈과 공유되므로 row_factory는 연결이 아닌 커서에 설정하세요.
+    """
+    return await get_connection(DB_PATH)
 
 
 async def get_user_edit_count(user_id: str) -> int:
@@ -96,7 +98,7 @@ async def get_user_edit_count(user_id: str) -> int:
     Returns:
         int: 수정 횟수 (0-2)
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection(DB_PATH) as db:
         async with db.execute(
             "SELECT edit_count FROM user_edit_count WHERE user_id = ?", (user_id,)
         ) as cursor:
@@ -114,7 +116,7 @@ async def increment_edit_count(user_id: str) -> int:
     Returns:
         int: 증가된 수정 횟수
     """
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection(DB_PATH) as db:
         # 현재 수정 횟수 조회
         current_count = await get_user_edit_count(user_id)
         new_count = current_count + 1
@@ -145,7 +147,7 @@ async def register_birthday(user_id: str, year: Optional[int], month: int, day:
         bool: 성공 여부
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             # 기존 수정 횟수 확인
             current_edit_count = await get_user_edit_count(user_id)
             
@@ -188,7 +190,7 @@ async def admin_update_birthday(user_id: str, year: Optional[int], month: int, d
         bool: 성공 여부
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             # 생일 정보만 업데이트 (edit_count는 건드리지 않음)
             await db.execute("""
                 INSERT INTO birthdays (user_id, year, month, day, updated_at)
@@ -216,11 +218,11 @@ async def get_birthday(user_id: str) -> Optional[Dict]:
     Returns:
         Dict 또는 None: {'user_id', 'year', 'month', 'day', 'edit_count', 'registered_at', 'updated_at'}
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection(DB_PATH) as db:
         async with db.execute(
             "SELECT * FROM birthdays WHERE user_id = ?", (user_id,)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             row = await cursor.fetchone()
             if row:
                 # 수정 횟수는 별도 테이블에서 조회
@@ -249,7 +251,7 @@ async def delete_birthday(user_id: str) -> bool:
         bool: 성공 여부
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             # birthdays 테이블에서만 삭제, user_edit_count는 유지
             await db.execute("DELETE FROM birthdays WHERE user_id = ?", (user_id,))
             await db.commit()
@@ -270,7 +272,7 @@ async def reset_edit_count(user_id: str) -> bool:
         bool: 성공 여부
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute(
                 "DELETE FROM user_edit_count WHERE user_id = ?", (user_id,)
             )
@@ -288,9 +290,9 @@ async def get_all_birthdays() -> list:
     Returns:
         list: 생일 정보 딕셔너리 리스트
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection(DB_PATH) as db:
         async with db.execute("SELECT * FROM birthdays") as cursor:
+            cursor.row_factory = aiosqlite.Row
             rows = await cursor.fetchall()
             return [
                 {
@@ -316,11 +318,11 @@ async def get_birthdays_by_date(month: int, day: int) -> list:
     Returns:
         list: 해당 날짜가 생일인 유저 정보 리스트
     """
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with connection(DB_PATH) as db:
         async with db.execute(
             "SELECT * FROM birthdays WHERE month = ? AND day = ?", (month, day)
         ) as cursor:
+            cursor.row_factory = aiosqlite.Row
             rows = await cursor.fetchall()
             return [
                 {
@@ -342,7 +344,7 @@ async def swap_user_birthday_data(old_user_id: str, new_user_id: str) -> bool:
     없다면 부계정 정보를 본계정으로 이동합니다.
     """
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             # 1. 본계정 존재 여부 확인
             async with db.execute("SELECT 1 FROM birthdays WHERE user_id = ?", (new_user_id,)) as cursor:
                 main_exists = await cursor.fetchone()
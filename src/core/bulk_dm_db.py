@@ -0,0 +1,158 @@
+"""
+DM 일괄전송 작업 데이터베이스 모듈
+작업(보낼 메시지)과 대상 멤버별 전송 상태(pending/sent/failed)를 SQLite에 저장해
+봇이 재시작되어도 남은 대상에게 이어서 보낼 수 있게 합니다.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+from src.core.connection_registry import connection, get_connection
+from src.core.migrations import Migration, run_migrations
+
+KST = pytz.timezone("Asia/Seoul")
+DB_PATH = Path("data/bulk_dm.db")
+
+# 대상 상태
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+# 작업 상태
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+
+
+async def _migration_v1_base_tables(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_dm_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            finished_at TEXT
+        )
+    """)
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_dm_targets (
+            job_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (job_id, user_id)
+        )
+    """)
+    await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bulk_dm_targets_status
+        ON bulk_dm_targets (job_id, status)
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "bulk_dm_jobs / bulk_dm_targets 테이블", _migration_v1_base_tables),
+]
+
+
+def _now() -> str:
+    return datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
+
+
+async def init_db():
+    """데이터베이스 연결을 열고 스키마를 최신 버전으로 맞춥니다."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    async with connection(DB_PATH) as db:
+        await run_migrations(db, DB_PATH, MIGRATIONS)
+
+
+async def create_job(guild_id: int, channel_id: int, author_id: int, content: str, user_ids: Iterable[int]) -> int:
+    """작업과 대상 목록(모두 pending)을 한 트랜잭션으로 만들고 job_id를 반환합니다."""
+    async with connection(DB_PATH) as db:
+        cursor = await db.execute("""
+            INSERT INTO bulk_dm_jobs (guild_id, channel_id, author_id, content, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (guild_id, channel_id, author_id, content, JOB_RUNNING, _now()))
+        job_id = cursor.lastrowid
+        await db.executemany(
+            "INSERT OR IGNORE INTO bulk_dm_targets (job_id, user_id, status) VALUES (?, ?, ?)",
+            [(job_id, user_id, PENDING) for user_id in user_ids]
+        )
+        await db.commit()
+        return job_id
+
+
+async def get_unfinished_job(guild_id: int) -> Optional[Dict]:
+    """길드에서 끝나지 않은(running) 가장 최근 작업을 반환합니다."""
+    db = await get_connection(DB_PATH)
+    async with db.execute("""
+        SELECT job_id, channel_id, author_id, content, created_at
+        FROM bulk_dm_jobs
+        WHERE guild_id = ? AND status = ?
+        ORDER BY job_id DESC
+        LIMIT 1
+    """, (guild_id, JOB_RUNNING)) as cursor:
+        row = await cursor.fetchone()
+    if row is None:
+        return None
+    return {
+        "job_id": row[0],
+        "channel_id": row[1],
+        "author_id": row[2],
+        "content": row[3],
+        "created_at": row[4],
+    }
+
+
+async def get_pending_targets(job_id: int) -> List[Tuple[int, int]]:
+    """아직 보내지 않은 대상의 (user_id, 시도 횟수) 목록을 반환합니다."""
+    db = await get_connection(DB_PATH)
+    async with db.execute(
+        "SELECT user_id, attempts FROM bulk_dm_targets WHERE job_id = ? AND status = ?",
+        (job_id, PENDING)
+    ) as cursor:
+        return [(row[0], row[1]) async for row in cursor]
+
+
+async def get_job_counts(job_id: int) -> Dict[str, int]:
+    """작업의 상태별 대상 수를 반환합니다. {pending, sent, failed}"""
+    db = await get_connection(DB_PATH)
+    counts = {PENDING: 0, SENT: 0, FAILED: 0}
+    async with db.execute(
+        "SELECT status, COUNT(*) FROM bulk_dm_targets WHERE job_id = ? GROUP BY status", (job_id,)
+    ) as cursor:
+        async for status, count in cursor:
+            counts[status] = count
+    return counts
+
+
+async def record_results(job_id: int, results: List[Tuple[int, str, int, Optional[str]]]):
+    """전송 결과 [(user_id, 상태, 시도 횟수, 오류)]를 한 트랜잭션으로 기록합니다."""
+    if not results:
+        return
+    now = _now()
+    async with connection(DB_PATH) as db:
+        await db.executemany("""
+            UPDATE bulk_dm_targets
+            SET status = ?, attempts = ?, error = ?, updated_at = ?
+            WHERE job_id = ? AND user_id = ?
+        """, [(status, attempts, error, now, job_id, user_id) for user_id, status, attempts, error in results])
+        await db.commit()
+
+
+async def finish_job(job_id: int, status: str = JOB_DONE):
+    """작업을 끝난 상태(done/cancelled)로 표시합니다."""
+    async with connection(DB_PATH) as db:
+        await db.execute(
+            "UPDATE bulk_dm_jobs SET status = ?, finished_at = ? WHERE job_id = ?",
+            (status, _now(), job_id)
+        )
+        await db.commit()
@@ -0,0 +1,132 @@
+"""
+JSON 설정 파일 캐시 모듈입니다.
+
+on_message 같은 핫패스에서 매번 설정 파일을 다시 읽지 않도록, 파일별로 한 번만 파싱한
+읽기 전용 스냅샷을 제공합니다.
+- 스냅샷의 dict/list는 MappingProxyType/tuple로 고정되어 호출자가 실수로 수정할 수 없습니다.
+- id_set(key)는 ID 목록을 frozenset으로 한 번만 만들어 두고 재사용합니다.
+- save()로 저장하면 즉시 새 스냅샷으로 바뀌고, 파일을 직접 고친 경우는 mtime 확인으로 반영합니다.
+  (mtime 확인은 MTIME_CHECK_INTERVAL초에 한 번만 하므로 핫패스에는 파일 I/O가 없습니다.)
+"""
+import copy
+import json
+import os
+import time
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+# 파일 변경(mtime) 확인 주기 (초)
+MTIME_CHECK_INTERVAL = 5.0
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ConfigSnapshot:
+    """설정 파일 한 시점의 읽기 전용 내용"""
+
+    __slots__ = ("data", "_id_sets")
+
+    def __init__(self, raw: dict):
+        self.data: Mapping[str, Any] = _freeze(raw)
+        self._id_sets: Dict[str, FrozenSet[int]] = {}
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def items(self):
+        return self.data.items()
+
+    def id_set(self, key: str) -> FrozenSet[int]:
+        """data[key]의 ID 목록을 frozenset으로 반환합니다. (스냅샷마다 한 번만 계산)"""
+        ids = self._id_sets.get(key)
+        if ids is None:
+            ids = frozenset(int(v) for v in self.data.get(key, ()))
+            self._id_sets[key] = ids
+        return ids
+
+
+class ConfigStore:
+    """JSON 설정 파일 하나를 관리합니다. get_store()로 얻어 사용합니다."""
+
+    def __init__(self, path: str, defaults: Optional[dict] = None):
+        self.path = path
+        self.defaults = defaults or {}
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load(self, mtime: Optional[float]):
+        raw = copy.deepcopy(self.defaults)
+        if mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw.update(json.load(f))
+            except (OSError, ValueError) as e:
+                if self._snapshot is not None:
+                    # 편집 중 깨진 파일이면 이전 스냅샷을 유지하고 다음 확인 때 다시 시도합니다.
+                    print(f"⚠️ 설정 파일을 읽지 못해 이전 설정을 유지합니다 ({self.path}): {e}")
+                    return
+                print(f"⚠️ 설정 파일을 읽지 못해 기본값을 사용합니다 ({self.path}): {e}")
+        self._snapshot = ConfigSnapshot(raw)
+        self._mtime = mtime
+
+    def get(self) -> ConfigSnapshot:
+        """현재 스냅샷을 반환합니다. 파일 변경 확인은 MTIME_CHECK_INTERVAL초에 한 번만 합니다."""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= MTIME_CHECK_INTERVAL:
+            self._checked_at = now
+            mtime = self._read_mtime()
+            if self._snapshot is None or mtime != self._mtime:
+                self._load(mtime)
+        return self._snapshot
+
+    def load_mutable(self) -> dict:
+        """수정 후 save()에 넘길 수 있는 복사본을 반환합니다."""
+        return json.loads(json.dumps(self.get().data, default=lambda v: dict(v) if isinstance(v, Mapping) else list(v)))
+
+    def save(self, data: dict, indent: int = 2):
+        """파일에 원자적으로 저장하고 스냅샷을 바로 교체합니다."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, self.path)
+
+        raw = copy.deepcopy(self.defaults)
+        raw.update(copy.deepcopy(data))
+        self._snapshot = ConfigSnapshot(raw)
+        self._mtime = self._read_mtime()
+        self._checked_at = time.monotonic()
+
+
+_stores: Dict[str, ConfigStore] = {}
+
+
+def get_store(path: str, defaults: Optional[dict] = None) -> ConfigStore:
+    """경로별로 하나뿐인 ConfigStore를 반환합니다. (defaults는 처음 만들 때만 사용)"""
+    key = os.path.normpath(path)
+    store = _stores.get(key)
+    if store is None:
+        store = ConfigStore(path, defaults)
+        _stores[key] = store
+    return store
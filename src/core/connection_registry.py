@@ -0,0 +1,214 @@
+"""
+SQLite 연결 레지스트리 모듈입니다.
+DB 경로마다 하나의 aiosqlite 연결을 열어 두고 모든 모듈이 공유합니다.
+연결을 열 때 DB별 PRAGMA 프로필(WAL, synchronous 등)을 적용하고,
+종료 시 close_all()로 한 번에 닫습니다.
+
+연결 하나를 여러 코루틴이 함께 쓰므로, 쓰기 트랜잭션은 DB별 쓰기 잠금(write_lock)
+안에서만 실행해야 합니다. 그래야 한 쪽의 commit/rollback이 다른 쪽의
+진행 중인 트랜잭션을 건드리지 않습니다.
+"""
+import aiosqlite
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional
+
+# 모든 DB에 공통으로 적용되는 PRAGMA
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -8000,              # 음수는 KiB 단위 (약 8MB)
+    "mmap_size": 64 * 1024 * 1024,    # 64MB
+    "busy_timeout": 5000,             # ms
+    "temp_store": "MEMORY",
+}
+
+# DB별로 덮어쓸 PRAGMA (경로는 프로젝트 루트 기준 상대 경로)
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    "data/voice_logs.db": {"cache_size": -32000, "mmap_size": 256 * 1024 * 1024},
+    "data/chatting.db": {"cache_size": -32000, "mmap_size": 256 * 1024 * 1024},
+    "data/level_system.db": {"cache_size": -16000, "mmap_size": 128 * 1024 * 1024},
+}
+
+_connections: Dict[str, aiosqlite.Connection] = {}
+_locks: Dict[str, asyncio.Lock] = {}
+_write_locks: Dict[str, "WriteLock"] = {}
+_close_listeners: List[Callable[[], None]] = []
+_open_events: deque = deque()   # 연결을 연 시각 (time.monotonic)
+_opened_total = 0
+
+
+def _key(db_path) -> str:
+    return os.path.abspath(str(db_path))
+
+
+class WriteLock:
+    """
+    같은 태스크 안에서는 다시 획득할 수 있는 asyncio 잠금입니다.
+    잠금을 잡은 채 같은 DB를 쓰는 다른 함수를 호출해도 교착되지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._owner: Optional[asyncio.Task] = None
+        self._depth = 0
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    async def acquire(self):
+        task = asyncio.current_task()
+        if self._owner is task and task is not None:
+            self._depth += 1
+            return True
+        await self._lock.acquire()
+        self._owner = task
+        self._depth = 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def write_lock(db_path) -> WriteLock:
+    """DB 경로별 쓰기 잠금을 반환합니다."""
+    return _write_locks.setdefault(_key(db_path), WriteLock())
+
+
+def serialized(method):
+    """
+    self.db_path의 쓰기 잠금을 잡은 채로 메서드를 실행하는 데코레이터.
+    공유 연결에서 execute ~ commit을 수행하는 매니저 메서드에 붙입니다.
+    메서드가 커밋하지 않고 끝나면(예외 포함) 남은 변경을 롤백합니다.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        lock = write_lock(self.db_path)
+        async with lock:
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                # 가장 바깥 호출이 끝났는데 트랜잭션이 열려 있으면 커밋되지 못한 이 메서드의 변경입니다.
+                db = getattr(self, "_db", None)
+                if lock._depth == 1 and db is not None and db.in_transaction:
+                    await db.rollback()
+    return wrapper
+
+
+def add_close_listener(callback: Callable[[], None]):
+    """close_all() 후 호출될 콜백을 등록합니다. (싱글톤의 연결 상태 초기화용)"""
+    if callback not in _close_listeners:
+        _close_listeners.append(callback)
+
+
+def get_pragma_profile(db_path) -> Dict[str, object]:
+    """DB 경로에 적용될 PRAGMA 목록을 반환합니다."""
+    profile = dict(DEFAULT_PRAGMAS)
+    profile.update(PRAGMA_PROFILES.get(os.path.normpath(str(db_path)).replace(os.sep, "/"), {}))
+    return profile
+
+
+async def _open(db_path) -> aiosqlite.Connection:
+    global _opened_total
+
+    directory = os.path.dirname(str(db_path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    db = await aiosqlite.connect(str(db_path))
+    for name, value in get_pragma_profile(db_path).items():
+        await db.execute(f"PRAGMA {name} = {value}")
+
+    _opened_total += 1
+    _open_events.append(time.monotonic())
+    return db
+
+
+async def get_connection(db_path) -> aiosqlite.Connection:
+    """DB 경로에 대한 공유 연결을 반환합니다. 없으면 새로 엽니다."""
+    key = _key(db_path)
+    db = _connections.get(key)
+    if db is not None:
+        return db
+
+    lock = _locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        db = _connections.get(key)
+        if db is None:
+            db = await _open(db_path)
+            _connections[key] = db
+        return db
+
+
+@asynccontextmanager
+async def connection(db_path):
+    """
+    `async with aiosqlite.connect(...)`를 대체하는 컨텍스트 매니저.
+    공유 연결을 빌려주며, 블록을 벗어나도 연결을 닫지 않습니다.
+    블록 전체를 DB별 쓰기 잠금 안에서 실행하므로, 열린 트랜잭션은 항상 이 블록의 것입니다.
+    예외(취소 포함)로 빠져나가면 이 블록에서 커밋하지 않은 변경만 롤백됩니다.
+    """
+    db = await get_connection(db_path)
+    async with write_lock(db_path):
+        try:
+            yield db
+        except BaseException:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+
+
+async def close_connection(db_path):
+    """특정 DB의 공유 연결을 닫습니다."""
+    db = _connections.pop(_key(db_path), None)
+    if db is not None:
+        await db.close()
+
+
+async def close_all():
+    """열려 있는 모든 공유 연결을 닫습니다. (종료/재시작 시 호출)"""
+    for key in list(_connections.keys()):
+        db = _connections.pop(key, None)
+        if db is None:
+            continue
+        try:
+            await db.close()
+        except Exception as e:
+            print(f"DB 연결 종료 중 오류 ({key}): {e}")
+
+    for callback in _close_listeners:
+        try:
+            callback()
+        except Exception as e:
+            print(f"DB 연결 종료 후처리 중 오류: {e}")
+
+
+def get_stats(window: float = 60.0) -> Dict[str, int]:
+    """
+    연결 통계를 반환합니다.
+    - active: 현재 열려 있는 연결 수
+    - opened_total: 프로세스 시작 이후 연 연결 수
+    - opened_last_minute: 최근 window초 동안 연 연결 수
+    """
+    cutoff = time.monotonic() - window
+    while _open_events and _open_events[0] < cutoff:
+        _open_events.popleft()
+    return {
+        "active": len(_connections),
+        "opened_total": _opened_total,
+        "opened_last_minute": len(_open_events),
+    }
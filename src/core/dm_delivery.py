@@ -0,0 +1,245 @@
+"""
+DM 일괄전송 엔진 모듈입니다.
+
+고정 간격으로 한 명씩 보내는 대신,
+- 토큰 버킷(TokenBucket)이 초당 전송 수를 제한하고
+- 여러 워커가 버킷에서 토큰을 받아 동시에 전송합니다.
+- discord.py가 429 응답을 받으면 남기는 로그(discord.http)를 RateLimitListener가 가로채
+  retry_after 동안 버킷을 멈추고 전송 속도를 절반으로 줄입니다. (성공할 때마다 조금씩 다시 올림, AIMD)
+- 전송 결과는 모아서 bulk_dm_db에 기록하므로, 재시작 후에도 pending 대상부터 이어서 보낼 수 있습니다.
+  (기록 전에 종료되면 마지막 몇 초 분량의 대상은 다시 받을 수 있습니다.)
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from src.core import bulk_dm_db
+
+# 동시에 전송하는 워커 수
+DM_WORKERS = 4
+# 초당 전송 수 (시작값 / 하한 / 상한)
+DM_INITIAL_RATE = 2.0
+DM_MIN_RATE = 0.2
+DM_MAX_RATE = 5.0
+# 성공할 때마다 더하는 초당 전송 수, 429를 받을 때마다 곱하는 비율
+DM_RATE_INCREASE = 0.05
+DM_BACKOFF_FACTOR = 0.5
+# 재시도 가능한 오류의 최대 시도 횟수
+DM_MAX_ATTEMPTS = 3
+# retry_after를 알 수 없을 때 쉬는 시간 (초)
+DM_DEFAULT_RETRY_AFTER = 5.0
+# 결과를 DB에 기록하는 단위 (개수 / 초)
+DM_FLUSH_SIZE = 20
+DM_FLUSH_INTERVAL = 2.0
+
+# 너무 빠르게 DM을 여는 경우 등 속도 제한 성격의 Discord 오류 코드
+RATE_LIMIT_ERROR_CODES = {40003}
+
+
+class TokenBucket:
+    """초당 rate개의 토큰을 채우는 버킷. 속도는 rate-limit 응답에 따라 조정됩니다."""
+
+    def __init__(self, rate: float = DM_INITIAL_RATE, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.penalties = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """토큰 하나를 받을 때까지 기다립니다. (순서대로 한 워커씩)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def penalize(self, retry_after: float):
+        """rate-limit 응답: retry_after 동안 멈추고 속도를 줄입니다."""
+        self.penalties += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._tokens = 0.0
+        self.rate = max(DM_MIN_RATE, self.rate * DM_BACKOFF_FACTOR)
+
+    def reward(self):
+        """전송 성공: 속도를 조금 올립니다."""
+        self.rate = min(DM_MAX_RATE, self.rate + DM_RATE_INCREASE)
+
+
+class RateLimitListener(logging.Handler):
+    """
+    discord.http 로거의 429 경고를 받아 버킷에 전달합니다.
+    discord.py는 429를 받으면 retry_after만큼 자고 스스로 재시도하므로 예외로는 알 수 없습니다.
+    """
+
+    def __init__(self, bucket: TokenBucket):
+        super().__init__(level=logging.WARNING)
+        self.bucket = bucket
+        self._logger = logging.getLogger("discord.http")
+
+    def emit(self, record: logging.LogRecord):
+        message = record.msg if isinstance(record.msg, str) else ""
+        if "rate limited" not in message and "rate limit has been hit" not in message:
+            return
+        if "erroring instead" in message:
+            return  # discord.RateLimited 예외로 전달되어 _send에서 처리합니다.
+        # 'Retrying in %.2f seconds' 형식의 마지막 인자가 retry_after입니다.
+        retry_after = DM_DEFAULT_RETRY_AFTER
+        if record.args and isinstance(record.args[-1], (int, float)):
+            retry_after = float(record.args[-1])
+        self.bucket.penalize(retry_after)
+
+    def __enter__(self):
+        self._logger.addHandler(self)
+        return self
+
+    def __exit__(self, *exc):
+        self._logger.removeHandler(self)
+
+
+class DMDeliveryEngine:
+    """작업 하나의 pending 대상에게 DM을 보냅니다."""
+
+    def __init__(
+        self,
+        job_id: int,
+        content: str,
+        resolve: Callable[[int], Awaitable[Optional[discord.abc.Messageable]]],
+        workers: int = DM_WORKERS,
+    ):
+        self.job_id = job_id
+        self.content = content
+        self.resolve = resolve
+        self.workers = workers
+        self.bucket = TokenBucket()
+        self._queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        self._results: List[Tuple[int, str, int, Optional[str]]] = []
+        self._stopping = False
+        self._closed = asyncio.Event()   # run()이 끝나 주기적 기록을 멈출 때
+        self.total = 0
+        self.stats = {"sent": 0, "failed": 0, "retried": 0, "rate_limited": 0}
+        self.started = time.perf_counter()
+
+    @property
+    def done(self) -> int:
+        return self.stats["sent"] + self.stats["failed"]
+
+    def throughput(self) -> float:
+        """이번 실행에서 처리한 대상 수 / 초"""
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.throughput()
+        if rate <= 0:
+            return None
+        return (self.total - self.done) / rate
+
+    def stop(self):
+        """남은 대상은 pending으로 두고 전송을 멈춥니다. (다음 재개 때 이어서 전송)"""
+        self._stopping = True
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopping
+
+    async def run(self, targets: List[Tuple[int, int]]) -> Dict[str, int]:
+        """(user_id, 이전 시도 횟수) 목록을 모두 처리하고 이번 실행의 통계를 반환합니다."""
+        self.total = len(targets)
+        self.started = time.perf_counter()
+        for target in targets:
+            self._queue.put_nowait(target)
+
+        flusher = asyncio.create_task(self._flush_loop())
+        try:
+            with RateLimitListener(self.bucket):
+                await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            # 기록 중인 flush를 취소하면 결과가 사라지므로, 루프를 멈추고 끝날 때까지 기다린 뒤 마지막으로 기록합니다.
+            self._closed.set()
+            await flusher
+            await self._flush()
+        return dict(self.stats)
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                user_id, attempts = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self.bucket.acquire()
+            if self._stopping:
+                return
+            attempts += 1
+            status, error = await self._send(user_id)
+            if status == bulk_dm_db.PENDING and attempts < DM_MAX_ATTEMPTS:
+                self.stats["retried"] += 1
+                self._queue.put_nowait((user_id, attempts))
+                continue
+            if status == bulk_dm_db.PENDING:
+                status = bulk_dm_db.FAILED
+            self.stats["sent" if status == bulk_dm_db.SENT else "failed"] += 1
+            self._results.append((user_id, status, attempts, error))
+            if len(self._results) >= DM_FLUSH_SIZE:
+                await self._flush()
+
+    async def _send(self, user_id: int) -> Tuple[str, Optional[str]]:
+        """한 명에게 보냅니다. 다시 시도할 오류면 PENDING을 반환합니다."""
+        target = await self.resolve(user_id)
+        if target is None:
+            return bulk_dm_db.FAILED, "대상을 찾을 수 없음"
+        try:
+            await target.send(self.content)
+        except discord.Forbidden as e:
+            # DM 차단 / 서버 멤버 DM 비허용 등은 다시 시도해도 실패합니다.
+            return bulk_dm_db.FAILED, f"Forbidden({e.code})"
+        except discord.NotFound as e:
+            return bulk_dm_db.FAILED, f"NotFound({e.code})"
+        except discord.RateLimited as e:
+            self.stats["rate_limited"] += 1
+            self.bucket.penalize(e.retry_after)
+            return bulk_dm_db.PENDING, "RateLimited"
+        except discord.HTTPException as e:
+            if e.status == 429 or e.code in RATE_LIMIT_ERROR_CODES:
+                self.stats["rate_limited"] += 1
+                self.bucket.penalize(DM_DEFAULT_RETRY_AFTER)
+            return bulk_dm_db.PENDING, f"HTTP {e.status}({e.code})"
+        self.bucket.reward()
+        return bulk_dm_db.SENT, None
+
+    async def _flush(self):
+        results, self._results = self._results, []
+        if not results:
+            return
+        try:
+            await bulk_dm_db.record_results(self.job_id, results)
+        except BaseException:
+            # 기록하지 못한 결과는 되돌려 두고 다음 flush에서 다시 기록합니다.
+            self._results = results + self._results
+            raise
+
+    async def _flush_loop(self):
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), DM_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._flush()
+            except Exception as e:
+                print(f"DM 전송 결과 기록 중 오류 (다음에 다시 기록): {e}")
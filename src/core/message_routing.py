@@ -0,0 +1,106 @@
+"""
+메시지 라우팅 공용 모듈입니다.
+
+각 Cog가 on_message 리스너를 따로 두면 discord.py가 메시지마다 리스너 수만큼 태스크를 만들고,
+리스너마다 봇/메시지 종류/채널 검사를 반복합니다. 대신 Cog는 처리 함수에 @message_route를 붙여
+"어느 채널/카테고리/포럼의 메시지를 받을지"만 선언하고, MessageRouter Cog(src/utils/MessageRouter.py)가
+메시지를 한 번만 분류한 뒤 dict 조회로 해당 처리 함수에만 전달합니다.
+
+라우트 대상은 정수 ID(또는 ID 목록)로 고정하거나, store(ConfigStore)의 스냅샷을 받아 ID 집합을
+돌려주는 함수로 지정할 수 있습니다. 함수로 지정한 경우 스냅샷이 바뀔 때만 라우팅 표를 다시 만듭니다.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, FrozenSet, Iterable, Optional, Union
+
+import discord
+
+ROUTE_ATTR = "__message_route__"
+
+RouteTarget = Union[None, int, Iterable[int], Callable[[Any], Iterable[int]]]
+
+
+@dataclass(frozen=True)
+class RouteSpec:
+    """@message_route로 선언한 라우트 조건"""
+    channels: RouteTarget = None
+    categories: RouteTarget = None
+    forums: RouteTarget = None          # 포럼/텍스트 채널 ID → 그 하위 스레드의 메시지
+    store: Any = None                   # 함수형 대상이 참조하는 ConfigStore
+    threads: bool = True                # False면 스레드 안의 메시지는 channels/categories로 매치하지 않음
+    include_bots: bool = False
+    default_only: bool = False          # True면 일반 메시지(MessageType.default)만 전달
+
+
+def message_route(
+    *,
+    channels: RouteTarget = None,
+    categories: RouteTarget = None,
+    forums: RouteTarget = None,
+    store=None,
+    threads: bool = True,
+    include_bots: bool = False,
+    default_only: bool = False,
+):
+    """
+    Cog 메서드를 메시지 처리 함수로 표시합니다. 처리 함수는 (self, message, ctx: MessageContext)를 받습니다.
+    Cog는 cog_load/cog_unload에서 register_routes/unregister_routes를 호출합니다.
+    """
+    spec = RouteSpec(channels, categories, forums, store, threads, include_bots, default_only)
+
+    def decorator(func):
+        setattr(func, ROUTE_ATTR, spec)
+        return func
+
+    return decorator
+
+
+def resolve_target(target: RouteTarget, snapshot) -> FrozenSet[int]:
+    """라우트 대상을 ID 집합으로 바꿉니다."""
+    if target is None:
+        return frozenset()
+    if callable(target):
+        target = target(snapshot)
+    if isinstance(target, int):
+        return frozenset((target,))
+    return frozenset(int(cid) for cid in target if cid)
+
+
+@dataclass(frozen=True)
+class MessageContext:
+    """메시지 한 건의 분류 결과 (라우터가 한 번만 계산해 모든 처리 함수에 넘깁니다)"""
+    message: discord.Message
+    author_id: int
+    is_bot: bool
+    is_default: bool
+    channel_id: int
+    category_id: Optional[int]
+    is_thread: bool
+    parent_id: Optional[int]
+
+    @classmethod
+    def classify(cls, message: discord.Message) -> "MessageContext":
+        channel = message.channel
+        is_thread = isinstance(channel, discord.Thread)
+        return cls(
+            message=message,
+            author_id=message.author.id,
+            is_bot=message.author.bot,
+            is_default=message.type == discord.MessageType.default,
+            channel_id=channel.id,
+            category_id=getattr(channel, "category_id", None),
+            is_thread=is_thread,
+            parent_id=channel.parent_id if is_thread else None,
+        )
+
+
+def register_routes(bot, cog):
+    """cog의 @message_route 처리 함수를 라우터에 등록합니다. 라우터가 아직 없으면 라우터가 로드될 때 등록합니다."""
+    router = bot.get_cog("MessageRouter")
+    if router is not None:
+        router.register_cog(cog)
+
+
+def unregister_routes(bot, cog):
+    router = bot.get_cog("MessageRouter")
+    if router is not None:
+        router.unregister_cog(cog)
@@ -0,0 +1,106 @@
+"""
+SQLite 스키마 마이그레이션 모듈입니다.
+
+각 DB는 PRAGMA user_version에 적용된 스키마 버전을 기록합니다.
+데이터 매니저는 버전 순으로 정렬된 Migration 목록을 정의하고 초기화 시
+run_migrations()를 호출합니다. 현재 버전보다 높은 단계만 하나씩,
+각각 하나의 트랜잭션 안에서 적용하며 단계별 소요 시간을 기록합니다.
+스키마가 최신이면 DDL을 전혀 실행하지 않습니다.
+
+기존 설치본(user_version = 0)은 테이블이 이미 있을 수 있으므로
+첫 단계는 항상 IF NOT EXISTS / 컬럼 존재 확인 등으로 멱등하게 작성합니다.
+"""
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+import aiosqlite
+
+
+@dataclass(frozen=True)
+class Migration:
+    """마이그레이션 한 단계 (version은 1부터 증가)"""
+    version: int
+    description: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+@dataclass
+class MigrationResult:
+    """적용된 단계의 기록"""
+    db_name: str
+    version: int
+    description: str
+    elapsed_ms: float
+
+
+# DB 이름 → 최근 실행에서 적용된 단계 목록 (상태 확인용)
+_reports: Dict[str, List[MigrationResult]] = {}
+
+
+async def get_user_version(db: aiosqlite.Connection) -> int:
+    async with db.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+
+async def table_columns(db: aiosqlite.Connection, table: str) -> set:
+    """테이블의 컬럼 이름 집합을 반환합니다. (컬럼 추가 단계를 멱등하게 만들 때 사용)"""
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        return {row[1] async for row in cursor}
+
+
+async def run_migrations(
+    db: aiosqlite.Connection,
+    db_path,
+    migrations: Sequence[Migration],
+) -> List[MigrationResult]:
+    """
+    db에 아직 적용되지 않은 마이그레이션을 순서대로 적용합니다.
+    각 단계는 BEGIN ~ COMMIT 안에서 실행되고, 같은 트랜잭션에서 user_version을 올립니다.
+    단계가 실패하면 해당 단계만 롤백되고 예외가 그대로 전달됩니다.
+    호출자는 DB별 쓰기 잠금을 잡은 상태여야 합니다.
+    """
+    db_name = os.path.basename(str(db_path))
+    ordered = sorted(migrations, key=lambda m: m.version)
+    versions = [m.version for m in ordered]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"{db_name}: 마이그레이션 버전이 중복되었습니다: {versions}")
+
+    current = await get_user_version(db)
+    pending = [m for m in ordered if m.version > current]
+    results: List[MigrationResult] = []
+    if not pending:
+        _reports.setdefault(db_name, [])
+        return results
+
+    # 앞서 열린 암묵적 트랜잭션이 있으면 먼저 정리합니다.
+    if db.in_transaction:
+        await db.commit()
+
+    for migration in pending:
+        started = time.perf_counter()
+        await db.execute("BEGIN")
+        try:
+            await migration.apply(db)
+            # PRAGMA는 바인딩 파라미터를 받지 않으므로 정수로 검증 후 삽입합니다.
+            await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            print(f"❌ [{db_name}] 마이그레이션 v{migration.version} ({migration.description}) 실패")
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        result = MigrationResult(db_name, migration.version, migration.description, elapsed_ms)
+        results.append(result)
+        print(f"🛠️ [{db_name}] 마이그레이션 v{migration.version} 적용: {migration.description} ({elapsed_ms:.1f}ms)")
+
+    _reports[db_name] = results
+    return results
+
+
+def get_reports() -> Dict[str, List[MigrationResult]]:
+    """프로세스 시작 이후 DB별로 적용된 마이그레이션 기록을 반환합니다."""
+    return {name: list(results) for name, results in _reports.items()}
@@ -0,0 +1,211 @@
+"""
+순위 조회 서비스 모듈입니다.
+
+"기간 P에서 유저 X의 순위"를 매번 전체 유저 합계를 정렬해 구하는 대신,
+점수 순으로 정렬된 순서 통계(order-statistics) 구조를 메모리에 유지해
+O(log n)에 가깝게 답합니다.
+
+- RankIndex: 유저별 점수와 정렬 구조를 함께 관리합니다.
+  정렬 기준은 (점수 내림차순, user_id 오름차순)입니다.
+- 인덱스는 이름(예: "voice:voice_ranking:total:all", "chat:all")으로
+  등록되며, 데이터 매니저가 첫 조회 때 DB에서 구성하고 커밋 직후 apply_deltas()로 갱신합니다.
+- 스키마/집계 범위가 바뀌면 invalidate()로 버리고, 다음 조회에서 다시 구성합니다.
+"""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 버킷 하나에 담는 최대 원소 수. 넘으면 반으로 나눕니다.
+BUCKET_SIZE = 512
+
+
+class OrderStatisticList:
+    """
+    정렬 상태를 유지하는 버킷 리스트.
+    원소 위치(순위) 조회는 버킷 경계 이분 탐색 + 버킷 내 이분 탐색 + 앞 버킷 크기 합으로,
+    삽입/삭제는 버킷 하나만 수정하므로 n이 커져도 리스트 전체를 옮기지 않습니다.
+    """
+
+    def __init__(self, items: Iterable = ()):
+        self._buckets: List[list] = []
+        self._maxes: List = []
+        self._prefix: List[int] = []   # _prefix[i] = 앞선 버킷들의 원소 수 합
+        self._len = 0
+        self._build(sorted(items))
+
+    def _build(self, ordered: list):
+        self._buckets = [ordered[i:i + BUCKET_SIZE] for i in range(0, len(ordered), BUCKET_SIZE)]
+        self._maxes = [b[-1] for b in self._buckets]
+        self._len = len(ordered)
+        self._rebuild_prefix()
+
+    def _rebuild_prefix(self):
+        total = 0
+        self._prefix = []
+        for bucket in self._buckets:
+            self._prefix.append(total)
+            total += len(bucket)
+
+    def _bucket_index(self, value) -> int:
+        i = bisect_left(self._maxes, value)
+        return min(i, len(self._buckets) - 1)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, value):
+        if not self._buckets:
+            self._buckets = [[value]]
+            self._maxes = [value]
+            self._prefix = [0]
+            self._len = 1
+            return
+
+        i = self._bucket_index(value)
+        bucket = self._buckets[i]
+        insort(bucket, value)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > BUCKET_SIZE * 2:
+            half = len(bucket) // 2
+            self._buckets[i:i + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[i:i + 1] = [bucket[half - 1], bucket[-1]]
+            self._rebuild_prefix()
+        else:
+            for j in range(i + 1, len(self._prefix)):
+                self._prefix[j] += 1
+
+    def remove(self, value):
+        i = self._bucket_index(value)
+        bucket = self._buckets[i]
+        pos = bisect_left(bucket, value)
+        if pos >= len(bucket) or bucket[pos] != value:
+            raise ValueError(f"{value!r} not in list")
+        del bucket[pos]
+        self._len -= 1
+
+        if not bucket:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._rebuild_prefix()
+        else:
+            self._maxes[i] = bucket[-1]
+            for j in range(i + 1, len(self._prefix)):
+                self._prefix[j] -= 1
+
+    def index(self, value) -> int:
+        """value의 0부터 시작하는 위치를 반환합니다. 없으면 ValueError."""
+        if not self._buckets:
+            raise ValueError(f"{value!r} not in list")
+        i = self._bucket_index(value)
+        bucket = self._buckets[i]
+        pos = bisect_left(bucket, value)
+        if pos >= len(bucket) or bucket[pos] != value:
+            raise ValueError(f"{value!r} not in list")
+        return self._prefix[i] + pos
+
+    def __getitem__(self, idx: int):
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("index out of range")
+        i = bisect_left(self._prefix, idx + 1) - 1
+        return self._buckets[i][idx - self._prefix[i]]
+
+
+class RankIndex:
+    """유저별 점수와 순위를 관리합니다. 점수가 0 이하인 유저는 순위에서 제외합니다."""
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        self._scores: Dict[int, int] = {uid: s for uid, s in (scores or {}).items() if s > 0}
+        self._order = OrderStatisticList((-s, uid) for uid, s in self._scores.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def score(self, user_id: int) -> int:
+        return self._scores.get(user_id, 0)
+
+    def set(self, user_id: int, score: int):
+        old = self._scores.get(user_id)
+        if old is not None:
+            self._order.remove((-old, user_id))
+        if score > 0:
+            self._scores[user_id] = score
+            self._order.add((-score, user_id))
+        else:
+            self._scores.pop(user_id, None)
+
+    def add(self, user_id: int, delta: int):
+        if delta:
+            self.set(user_id, self.score(user_id) + delta)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1부터 시작하는 순위. 점수가 없으면 None."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return self._order.index((-score, user_id)) + 1
+
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        """상위 n명의 (user_id, 점수) 목록"""
+        return [(uid, -neg) for neg, uid in (self._order[i] for i in range(min(n, len(self._order))))]
+
+
+# 메모리에 유지하는 인덱스 최대 개수. 지난 일간/주간 인덱스처럼 오래 안 쓰인 것부터 버립니다.
+MAX_INDEXES = 32
+
+# 이름 → 인덱스 (최근 사용 순서 유지)
+_indexes: "OrderedDict[str, RankIndex]" = OrderedDict()
+_stats = {"hits": 0, "fallbacks": 0, "builds": 0, "invalidations": 0}
+
+
+def get_index(name: str) -> Optional[RankIndex]:
+    """등록된 인덱스를 반환합니다. 없으면 None (호출자는 DB에서 구성하거나 DB로 대체)."""
+    index = _indexes.get(name)
+    if index is None:
+        _stats["fallbacks"] += 1
+        return None
+    _indexes.move_to_end(name)
+    _stats["hits"] += 1
+    return index
+
+
+def build_index(name: str, scores: Dict[int, int]) -> RankIndex:
+    """
+    DB에서 읽은 {user_id: 점수}로 인덱스를 (재)구성해 등록합니다.
+    읽기와 등록 사이에 커밋된 증분이 빠지지 않도록 호출자는 DB 쓰기 잠금 안에서 호출합니다.
+    """
+    index = RankIndex(scores)
+    _indexes[name] = index
+    _indexes.move_to_end(name)
+    while len(_indexes) > MAX_INDEXES:
+        _indexes.popitem(last=False)
+    _stats["builds"] += 1
+    return index
+
+
+def list_indexes(prefix: str = "") -> List[str]:
+    """prefix로 시작하는 등록된 인덱스 이름 목록"""
+    return [name for name in _indexes if name.startswith(prefix)]
+
+
+def apply_deltas(name: str, deltas: Dict[int, int]):
+    """쓰기 경로에서 커밋된 증분을 인덱스에 반영합니다. 인덱스가 없으면 무시합니다."""
+    index = _indexes.get(name)
+    if index is None:
+        return
+    for user_id, delta in deltas.items():
+        index.add(user_id, delta)
+
+
+def invalidate(prefix: str = ""):
+    """prefix로 시작하는 인덱스를 버립니다. 다음 조회 때 DB에서 다시 구성됩니다."""
+    for name in list_indexes(prefix):
+        del _indexes[name]
+        _stats["invalidations"] += 1
+
+
+def get_stats() -> Dict[str, int]:
+    return {**_stats, "indexes": len(_indexes)}
@@ -0,0 +1,82 @@
+"""
+스케줄러 작업 데이터베이스 모듈
+작업별 다음 실행 시각과 마지막 실행 시각을 SQLite에 저장해
+봇이 재시작되는 동안 놓친 실행을 작업별 정책에 따라 따라잡고,
+한 번만 실행하는 작업(schedule_once)도 재시작 후에 이어서 실행할 수 있게 합니다.
+시각은 모두 UNIX 시간(초)입니다.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.core.connection_registry import connection, get_connection
+from src.core.migrations import Migration, run_migrations
+
+DB_PATH = Path("data/scheduler.db")
+
+
+async def _migration_v1_base_tables(db):
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            name TEXT PRIMARY KEY,
+            handler TEXT NOT NULL,
+            spec TEXT NOT NULL,
+            catch_up TEXT NOT NULL,
+            next_run REAL,
+            last_run REAL
+        )
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "scheduled_jobs 테이블", _migration_v1_base_tables),
+]
+
+
+async def init_db():
+    """데이터베이스 연결을 열고 스키마를 최신 버전으로 맞춥니다."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    async with connection(DB_PATH) as db:
+        await run_migrations(db, DB_PATH, MIGRATIONS)
+
+
+async def load_jobs() -> Dict[str, Dict]:
+    """저장된 모든 작업을 {이름: {handler, spec, catch_up, next_run, last_run}}으로 반환합니다."""
+    db = await get_connection(DB_PATH)
+    async with db.execute(
+        "SELECT name, handler, spec, catch_up, next_run, last_run FROM scheduled_jobs"
+    ) as cursor:
+        return {
+            row[0]: {
+                "handler": row[1],
+                "spec": row[2],
+                "catch_up": row[3],
+                "next_run": row[4],
+                "last_run": row[5],
+            }
+            async for row in cursor
+        }
+
+
+async def save_job(name: str, handler: str, spec: str, catch_up: str, next_run: Optional[float], last_run: Optional[float]):
+    """작업의 현재 상태를 저장합니다. (없으면 추가)"""
+    async with connection(DB_PATH) as db:
+        await db.execute("""
+            INSERT INTO scheduled_jobs (name, handler, spec, catch_up, next_run, last_run)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                handler = excluded.handler,
+                spec = excluded.spec,
+                catch_up = excluded.catch_up,
+                next_run = excluded.next_run,
+                last_run = excluded.last_run
+        """, (name, handler, spec, catch_up, next_run, last_run))
+        await db.commit()
+
+
+async def delete_job(name: str):
+    """끝난(한 번 실행) 작업이나 취소된 작업을 지웁니다."""
+    async with connection(DB_PATH) as db:
+        await db.execute("DELETE FROM scheduled_jobs WHERE name = ?", (name,))
+        await db.commit()
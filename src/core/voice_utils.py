@@ -1,208 +1,168 @@
 
+"""
+음성 추적 채널 목록을 확장하는 모듈입니다.
+
+tracked_channels 테이블에 등록된 값(카테고리/채널 혼재)을 실제 집계에 쓰일
+'음성/스테이지 채널 ID' 집합으로 확장합니다. 확장 결과는 source별로 메모리에 보관하고,
+다음 경우에만 다시 계산합니다.
+- 채널 생성/삭제/수정 이벤트가 해당 source의 등록 채널이나 카테고리에 닿았을 때
+- DataManager의 추적/삭제 채널 기록이 바뀌었을 때 (tracked_channels_version)
+
+계산은 봇 캐시(get_channel)만 사용하며 REST(fetch_channel)를 호출하지 않습니다.
+"""
+import asyncio
 import discord
-from typing import List, Set
+from typing import Dict, FrozenSet, Optional, Set, Tuple
 from .DataManager import DataManager
 
-async def get_expanded_tracked_channels(
-    bot: discord.Client,
-    data_manager: DataManager,
-    source: str = "voice"
-) -> List[int]:
-    """
-    tracked_channels 테이블에 등록된 값(카테고리/채널 혼재)을
-    실제 집계에 쓰일 '음성/스테이지 채널 ID' 목록으로 확장해 반환.
-    - 카테고리 → 하위 voice + stage 채널 포함
-    - 삭제된 채널 → deleted_channels 테이블에서 카테고리 매핑으로 보강
-    - 삭제된 카테고리 → 해당 카테고리에 속한 삭제된 채널도 포함
-    """
-    tracked_ids = await data_manager.get_tracked_channels(source)
-    expanded_ids: Set[int] = set()
-
-    category_ids: Set[int] = set()
-    deleted_category_ids: Set[int] = set()  # 삭제된 카테고리 ID 저장
-    
-    # 1) 등록 목록을 분류
-    for cid in tracked_ids:
-        ch = bot.get_channel(cid)
-        if ch is None:
-            # fetch_channel은 레이트 제한도 있고 실패 가능성 있으니, 먼저 get_channel로 시도
-            try:
-                ch = await bot.fetch_channel(cid)
-            except Exception:
-                ch = None
-
-        if isinstance(ch, discord.CategoryChannel):
-            category_ids.add(cid)
-        elif isinstance(ch, (discord.VoiceChannel, discord.StageChannel)):
-            expanded_ids.add(cid)
-        else:
-            # 삭제되었거나 접근 불가 → 삭제된 카테고리로 간주하여 deleted_channels에서 조회
-            deleted_category_ids.add(cid)
-
-    # 2) 카테고리 하위의 활성 채널(보이스 + 스테이지) 추가
-    for cat_id in category_ids:
-        cat = bot.get_channel(cat_id) or await bot.fetch_channel(cat_id)
-        if isinstance(cat, discord.CategoryChannel):
-            for vc in getattr(cat, "voice_channels", []):
-                expanded_ids.add(vc.id)
-            # ✅ Stage 채널도 포함
-            for sc in getattr(cat, "stage_channels", []):
-                expanded_ids.add(sc.id)
-
-    # 3) 삭제된 채널(카테고리 매핑 보유분) 추가 - 활성 카테고리 + 삭제된 카테고리 모두 포함
-    all_category_ids = category_ids | deleted_category_ids
-    if all_category_ids:
-        deleted_ids = await data_manager.get_deleted_channels_by_categories(list(all_category_ids))
-        expanded_ids.update(int(i) for i in deleted_ids)
-
-    return list(expanded_ids)
-
-async def get_blank_expanded_tracked_channels(
-    bot: discord.Client,
-    data_manager: DataManager,
-    source: str = "blank"
-) -> List[int]:
-    """
-    tracked_channels 테이블에 등록된 값(카테고리/채널 혼재)을
-    실제 집계에 쓰일 '음성/스테이지 채널 ID' 목록으로 확장해 반환.
-    - 카테고리 → 하위 voice + stage 채널 포함
-    - 삭제된 채널 → deleted_channels 테이블에서 카테고리 매핑으로 보강
-    - 삭제된 카테고리 → 해당 카테고리에 속한 삭제된 채널도 포함
-    """
-    tracked_ids = await data_manager.get_tracked_channels(source)
-    expanded_ids: Set[int] = set()
-
-    category_ids: Set[int] = set()
-    deleted_category_ids: Set[int] = set()  # 삭제된 카테고리 ID 저장
-    
-    # 1) 등록 목록을 분류
-    for cid in tracked_ids:
-        ch = bot.get_channel(cid)
-        if ch is None:
-            # fetch_channel은 레이트 제한도 있고 실패 가능성 있으니, 먼저 get_channel로 시도
-            try:
-                ch = await bot.fetch_channel(cid)
-            except Exception:
-                ch = None
-
-        if isinstance(ch, discord.CategoryChannel):
-            category_ids.add(cid)
-        elif isinstance(ch, (discord.VoiceChannel, discord.StageChannel)):
-            expanded_ids.add(cid)
-        else:
-            # 삭제되었거나 접근 불가 → 삭제된 카테고리로 간주하여 deleted_channels에서 조회
-            deleted_category_ids.add(cid)
-
-    # 2) 카테고리 하위의 활성 채널(보이스 + 스테이지) 추가
-    for cat_id in category_ids:
-        cat = bot.get_channel(cat_id) or await bot.fetch_channel(cat_id)
-        if isinstance(cat, discord.CategoryChannel):
-            for vc in getattr(cat, "voice_channels", []):
-                expanded_ids.add(vc.id)
-            # ✅ Stage 채널도 포함
-            for sc in getattr(cat, "stage_channels", []):
-                expanded_ids.add(sc.id)
-
-    # 3) 삭제된 채널(카테고리 매핑 보유분) 추가 - 활성 카테고리 + 삭제된 카테고리 모두 포함
-    all_category_ids = category_ids | deleted_category_ids
-    if all_category_ids:
-        deleted_ids = await data_manager.get_deleted_channels_by_categories(list(all_category_ids))
-        expanded_ids.update(int(i) for i in deleted_ids)
-
-    return list(expanded_ids)
-
 # --- Special Category Rules ---
 # Key: Category ID (int), Value: List of allowed Channel IDs (int)
 SPECIAL_CATEGORY_RULES = {
     1452268260010496162: [1396829224744259691]
 }
 
-async def get_filtered_tracked_channels(
-    bot: discord.Client,
-    data_manager: DataManager,
-    source: str = "voice"
-) -> List[int]:
+# 이 카테고리에 속한 채널은 필터링된 목록에서 완전히 제외합니다. (예: 책방선율)
+EXCLUDED_CATEGORIES = {1474014243052585126}
+
+_VOICE_TYPES = (discord.VoiceChannel, discord.StageChannel)
+
+
+class TrackedChannelResolver:
     """
-    기본적으로 get_expanded_tracked_channels와 동일하게 작동하되,
-    SPECIAL_CATEGORY_RULES에 정의된 카테고리에 대해서는
-    지정된 채널 ID만 필터링하여 반환합니다.
+    source별 확장 채널 집합을 보관합니다.
+    filtered=True는 SPECIAL_CATEGORY_RULES와 EXCLUDED_CATEGORIES를 적용한 목록(퀘스트/내정보/롤업 voice),
+    filtered=False는 규칙 없이 확장한 목록(/순위, 랭크카드, 여백)입니다.
     """
-    tracked_ids = await data_manager.get_tracked_channels(source)
-    expanded_ids: Set[int] = set()
-
-    category_ids: Set[int] = set()
-    deleted_category_ids: Set[int] = set()
-    
-    # 1) 등록 목록 분류
-    for cid in tracked_ids:
-        ch = bot.get_channel(cid)
-        if ch is None:
-            try:
-                ch = await bot.fetch_channel(cid)
-            except Exception:
-                ch = None
-
-        if isinstance(ch, discord.CategoryChannel):
-            category_ids.add(cid)
-        elif isinstance(ch, (discord.VoiceChannel, discord.StageChannel)):
-            # 개별 채널 등록의 경우:
-            # 만약 이 채널이 특수 카테고리에 속해있다면 규칙을 확인해야 할 수도 있지만,
-            # 현재 요구사항은 "카테고리 ID가 X인 경우 Y채널만 포함"이므로
-            # 카테고리 단위로 트래킹 등록된 경우를 주로 제어합니다.
-            # 개별 등록된 채널은 사용자가 의도한 것이므로 그냥 추가합니다.
-            # (필요 시 수정 가능)
-            expanded_ids.add(cid)
+
+    def __init__(self, bot: discord.Client, data_manager: Optional[DataManager] = None):
+        self.bot = bot
+        self.data_manager = data_manager or DataManager()
+        self._cache: Dict[Tuple[str, bool], FrozenSet[int]] = {}
+        self._registered: Dict[str, FrozenSet[int]] = {}   # source → 등록된 원본 ID (이벤트 관련성 판단용)
+        self._version = -1
+        self._lock = asyncio.Lock()
+
+        bot.add_listener(self._on_channel_create, "on_guild_channel_create")
+        bot.add_listener(self._on_channel_delete, "on_guild_channel_delete")
+        bot.add_listener(self._on_channel_update, "on_guild_channel_update")
+
+    # ===========================================
+    # 조회
+    # ===========================================
+
+    async def get(self, source: str = "voice", filtered: bool = True) -> FrozenSet[int]:
+        """source의 확장 채널 ID 집합을 반환합니다."""
+        key = (source, filtered)
+        if self._version == self.data_manager.tracked_channels_version and key in self._cache:
+            return self._cache[key]
+
+        async with self._lock:
+            version = self.data_manager.tracked_channels_version
+            if version != self._version:
+                self._cache.clear()
+                self._registered.clear()
+                self._version = version
+            if key not in self._cache:
+                result = await self._resolve(source, filtered)
+                # 봇 캐시가 준비되기 전 결과는 불완전할 수 있으므로 보관하지 않습니다.
+                if not self.bot.is_ready():
+                    return result
+                self._cache[key] = result
+            return self._cache[key]
+
+    def invalidate(self, source: Optional[str] = None):
+        """source(없으면 전체)의 확장 결과를 버립니다."""
+        keys = [k for k in self._cache if source is None or k[0] == source]
+        for key in keys:
+            del self._cache[key]
+        if source is None:
+            self._registered.clear()
         else:
-            deleted_category_ids.add(cid)
-
-    # 2) 활성 카테고리 처리
-    for cat_id in category_ids:
-        # 특수 규칙 적용 대상인지 확인
-        allowed_channels = SPECIAL_CATEGORY_RULES.get(cat_id)
-        
-        cat = bot.get_channel(cat_id) or await bot.fetch_channel(cat_id)
-        
-        if isinstance(cat, discord.CategoryChannel):
-            children = getattr(cat, "voice_channels", []) + getattr(cat, "stage_channels", [])
-            for ch in children:
-                # 규칙이 있는 카테고리라면, 허용 목록에 있는 경우만 추가
-                if allowed_channels is not None:
-                    if ch.id in allowed_channels:
-                        expanded_ids.add(ch.id)
-                else:
-                    # 규칙 없으면 모두 추가
+            self._registered.pop(source, None)
+
+    async def _resolve(self, source: str, filtered: bool) -> FrozenSet[int]:
+        tracked_ids = await self.data_manager.get_tracked_channels(source)
+        self._registered[source] = frozenset(tracked_ids)
+
+        expanded_ids: Set[int] = set()
+        category_ids: Set[int] = set()
+        deleted_category_ids: Set[int] = set()
+
+        # 1) 등록 목록 분류 (캐시에 없으면 삭제되었거나 접근 불가 → 삭제된 카테고리로 간주)
+        for cid in tracked_ids:
+            ch = self.bot.get_channel(cid)
+            if isinstance(ch, discord.CategoryChannel):
+                category_ids.add(cid)
+            elif isinstance(ch, _VOICE_TYPES):
+                # 개별 등록된 채널은 사용자가 의도한 것이므로 규칙과 관계없이 포함합니다.
+                expanded_ids.add(cid)
+            else:
+                deleted_category_ids.add(cid)
+
+        # 2) 활성 카테고리 하위의 음성/스테이지 채널
+        for cat_id in category_ids:
+            cat = self.bot.get_channel(cat_id)
+            allowed = SPECIAL_CATEGORY_RULES.get(cat_id) if filtered else None
+            for ch in list(cat.voice_channels) + list(getattr(cat, "stage_channels", [])):
+                if allowed is None or ch.id in allowed:
                     expanded_ids.add(ch.id)
 
-    # 3) 삭제된 채널 처리
-    tracked_special_cats = set(SPECIAL_CATEGORY_RULES.keys())
-    target_special_cats = deleted_category_ids & tracked_special_cats
-    target_normal_cats = deleted_category_ids - tracked_special_cats
-    
-    # 3-1) 일반 삭제 카테고리
-    if target_normal_cats:
-        deleted_ids = await data_manager.get_deleted_channels_by_categories(list(target_normal_cats))
-        expanded_ids.update(deleted_ids)
-        
-    # 3-2) 특수 삭제 카테고리
-    if target_special_cats:
-         candidates = await data_manager.get_deleted_channels_by_categories(list(target_special_cats))
-         
-         allowed_all_special = set()
-         for cat_id in target_special_cats:
-             allowed = SPECIAL_CATEGORY_RULES.get(cat_id, [])
-             allowed_all_special.update(allowed)
-             
-         for ch_id in candidates:
-             if ch_id in allowed_all_special:
-                 expanded_ids.add(ch_id)
-
-    # 4) 특정 카테고리에 속한 채널은 집계에서 완전 제외 (예: 책방선율)
-    EXCLUDED_CATEGORIES = {1474014243052585126}
-    final_expanded = set()
-    for ch_id in expanded_ids:
-        ch = bot.get_channel(ch_id)
-        if ch and getattr(ch, "category_id", None) in EXCLUDED_CATEGORIES:
-            continue
-        final_expanded.add(ch_id)
-
-    return list(final_expanded)
+        # 3) 삭제된 채널 (deleted_channels의 카테고리 매핑)
+        if filtered:
+            # 필터링 목록은 삭제된 카테고리에 속했던 채널만, 특수 카테고리는 허용 채널만 포함합니다.
+            special = deleted_category_ids & SPECIAL_CATEGORY_RULES.keys()
+            normal = deleted_category_ids - special
+            if normal:
+                expanded_ids.update(await self.data_manager.get_deleted_channels_by_categories(list(normal)))
+            if special:
+                allowed_all = {cid for cat_id in special for cid in SPECIAL_CATEGORY_RULES[cat_id]}
+                candidates = await self.data_manager.get_deleted_channels_by_categories(list(special))
+                expanded_ids.update(cid for cid in candidates if cid in allowed_all)
+        else:
+            all_category_ids = category_ids | deleted_category_ids
+            if all_category_ids:
+                expanded_ids.update(await self.data_manager.get_deleted_channels_by_categories(list(all_category_ids)))
+
+        # 4) 제외 카테고리에 속한 채널 제거
+        if filtered:
+            expanded_ids = {
+                cid for cid in expanded_ids
+                if getattr(self.bot.get_channel(cid), "category_id", None) not in EXCLUDED_CATEGORIES
+            }
+
+        return frozenset(int(cid) for cid in expanded_ids)
+
+    # ===========================================
+    # 채널 이벤트 → 관련 source만 무효화
+    # ===========================================
+
+    def _invalidate_related(self, *channels):
+        touched = set()
+        for ch in channels:
+            touched.add(ch.id)
+            category_id = getattr(ch, "category_id", None)
+            if category_id is not None:
+                touched.add(category_id)
+        for source, registered in list(self._registered.items()):
+            if touched & registered:
+                self.invalidate(source)
+
+    async def _on_channel_create(self, channel):
+        self._invalidate_related(channel)
+
+    async def _on_channel_delete(self, channel):
+        self._invalidate_related(channel)
+
+    async def _on_channel_update(self, before, after):
+        # 이름 변경 등은 무시하고 카테고리 이동/종류 변경만 반영합니다.
+        if getattr(before, "category_id", None) != getattr(after, "category_id", None) or type(before) is not type(after):
+            self._invalidate_related(before, after)
+
+
+def get_tracked_channel_resolver(bot: discord.Client) -> TrackedChannelResolver:
+    """봇에 하나뿐인 resolver를 반환합니다. (처음 호출 시 생성하고 채널 이벤트를 등록)"""
+    resolver = getattr(bot, "_tracked_channel_resolver", None)
+    if resolver is None:
+        resolver = TrackedChannelResolver(bot)
+        bot._tracked_channel_resolver = resolver
+    return resolver
@@ -2,8 +2,21 @@ import discord
 from discord.ext import commands
 from src.core.balance_data_manager import balance_manager
 import aiosqlite
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+import pytz
 
 from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
+from src.core.ChattingDataManager import ChattingDataManager
+from src.core.config_store import get_store
+
+KST = pytz.timezone("Asia/Seoul")
+
+# 채팅 추적 설정 (ChattingConfig와 같은 파일) — 추적 채널이면 채널 일괄 지급 대상을 채팅 DB에서 찾습니다.
+chatting_config_store = get_store(
+    "config/chatting_config.json", {"tracked_channels": [], "tracked_categories": [], "ignored_role_ids": []}
+)
 
 
 def has_auth_role():
@@ -76,7 +89,8 @@ class Economy(commands.Cog):
                 "`*온 지급 @유저 금액 [횟수]` : 특정 유저에게 온을 지급합니다. (권한 필요)\n"
                 "`*온 회수 @유저 금액` : 특정 유저의 온을 회수합니다. (권한 필요)\n"
                 "`*온 인증 @유저 조건 [횟수]` : 인증 조건을 만족한 유저에게 온을 지급합니다. (권한 필요)\n"
-                "`*온 채널일괄지급 금액 [#채널]` : 해당 채널에 채팅을 한 모든 유저에게 온을 지급합니다. (권한 필요)\n"
+                "`*온 채널일괄지급 금액 [#채널] [시작일]` : 해당 채널에 채팅을 한 모든 유저에게 온을 지급합니다. "
+                "시작일(YYYY-MM-DD)을 지정하면 그 이후 채팅한 유저만 대상입니다. (권한 필요)\n"
                 "예시: `*온 지급 @유저 1000 10` → 10000 지급, `*온 인증 @유저 업 10` → 업 인증 10회분 지급"
             ),
             inline=False
@@ -509,12 +523,21 @@ class Economy(commands.Cog):
     @on.command(name="채널일괄지급")
     @only_in_guild()
     @has_auth_role()
-    async def bulk_give_channel(self, ctx, amount: int, channel: discord.TextChannel = None):
-        """지정된 채널에서 채팅한 모든 유저에게 온을 지급합니다."""
+    async def bulk_give_channel(self, ctx, amount: int, channel: Optional[discord.TextChannel] = None, since: str = None):
+        """지정된 채널에서 채팅한 모든 유저에게 온을 지급합니다. (since: 이 날짜 이후 채팅한 유저만)"""
         if amount <= 0:
             await ctx.reply("금액은 0보다 커야 합니다.")
             return
 
+        after = None
+        if since:
+            try:
+                after = KST.localize(datetime.strptime(since.replace("-", ""), "%Y%m%d"))
+            except ValueError:
+                await ctx.reply("시작일 형식이 올바르지 않습니다. YYYY-MM-DD 형식으로 입력해주세요.")
+                return
+
+        started = time.perf_counter()
         target_channel = channel or ctx.channel
         unit = await self.get_currency_unit()
 
@@ -527,11 +550,8 @@ class Economy(commands.Cog):
         processing_msg = await ctx.reply(embed=processing_embed)
 
         # 채널에서 메시지를 보낸 유저들 수집 (중복 제거)
-        unique_users = set()
         try:
-            async for message in target_channel.history(limit=None):
-                if not message.author.bot:  # 봇 제외
-                    unique_users.add(message.author)
+            user_ids, source = await self._collect_channel_participants(target_channel, after)
         except discord.Forbidden:
             await processing_msg.edit(embed=discord.Embed(
                 title="❌ 오류",
@@ -547,7 +567,7 @@ class Economy(commands.Cog):
             ))
             return
 
-        if not unique_users:
+        if not user_ids:
             await processing_msg.edit(embed=discord.Embed(
                 title="ℹ️ 알림",
                 description=f"{target_channel.mention}에서 채팅한 유저가 없습니다.",
@@ -555,16 +575,15 @@ class Economy(commands.Cog):
             ))
             return
 
-        # 각 유저에게 지급
+        # 모든 유저에게 한 트랜잭션으로 지급 (실패하면 아무에게도 지급되지 않음)
         successful_users = []
         failed_users = []
-        
-        for user in unique_users:
-            try:
-                await balance_manager.give(str(user.id), amount)
-                successful_users.append(user)
-            except Exception as e:
-                failed_users.append(f"{user.display_name}: {str(e)}")
+        try:
+            await balance_manager.give_many([str(user_id) for user_id in user_ids], amount)
+            successful_users = [f"<@{user_id}>" for user_id in user_ids]
+        except Exception as e:
+            failed_users.append(f"전체 {len(user_ids)}명: {str(e)}")
+        elapsed = time.perf_counter() - started
 
         # 결과 임베드 생성
         total_given = len(successful_users) * amount
@@ -584,7 +603,7 @@ class Economy(commands.Cog):
         )
         
         # 지급받은 유저 목록 (최대 25개 필드 제한)
-        user_mentions = [user.mention for user in successful_users]
+        user_mentions = successful_users
         
         # 유저 목록을 여러 필드로 나누어 표시 (필드당 최대 1024자)
         field_count = 0
@@ -626,13 +645,44 @@ class Economy(commands.Cog):
             )
 
         embed.set_footer(
-            text=f"요청자: {ctx.author}",
+            text=f"요청자: {ctx.author} | 대상 수집: {source} | 처리 시간: {elapsed:.2f}초",
             icon_url=ctx.author.display_avatar.url
         )
         embed.timestamp = ctx.message.created_at
 
         await processing_msg.edit(embed=embed)
-        await self.log(f"{ctx.author}({ctx.author.id})이 {target_channel.name}({target_channel.id}) 채널에서 {len(successful_users)}명에게 각각 {amount} {unit} 일괄 지급.")
+        await self.log(
+            f"{ctx.author}({ctx.author.id})이 {target_channel.name}({target_channel.id}) 채널에서 "
+            f"{len(successful_users)}명에게 각각 {amount} {unit} 일괄 지급. "
+            f"(대상 수집: {source}{f', {since} 이후' if since else ''}, {elapsed:.2f}초)"
+        )
+
+    @staticmethod
+    def _is_chat_tracked(channel: discord.TextChannel) -> bool:
+        """채널이 채팅 추적 대상(채널 또는 카테고리 등록)인지 확인합니다."""
+        config = chatting_config_store.get()
+        return (
+            channel.id in config.id_set("tracked_channels")
+            or (channel.category_id is not None and channel.category_id in config.id_set("tracked_categories"))
+        )
+
+    async def _collect_channel_participants(
+        self, channel: discord.TextChannel, after: Optional[datetime]
+    ) -> Tuple[List[int], str]:
+        """
+        채널에서 채팅한 유저 ID 목록과 수집 방식을 반환합니다.
+        채팅 추적 채널이면 chat_messages에서 한 번의 쿼리로 찾고(점수가 기록된 메시지 기준),
+        아니면 메시지 기록을 REST로 훑습니다. after가 있으면 그 이후 메시지만 봅니다.
+        """
+        if self._is_chat_tracked(channel):
+            start = after.strftime("%Y-%m-%d %H:%M:%S") if after else None
+            return await ChattingDataManager().get_channel_participants(channel.id, start), "채팅 기록 DB"
+
+        unique_users = set()
+        async for message in channel.history(limit=None, after=after):
+            if not message.author.bot:  # 봇 제외
+                unique_users.add(message.author.id)
+        return list(unique_users), "메시지 기록"
 
 
 async def setup(bot):
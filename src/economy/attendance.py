@@ -1,10 +1,10 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 from datetime import datetime, timedelta
 import pytz
 import asyncio
 from src.core.balance_data_manager import balance_manager  # 추가
+from src.core.connection_registry import connection
 
 DB_PATH = 'data/attendance.db'
 KST = pytz.timezone("Asia/Seoul")
@@ -12,7 +12,7 @@ from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
 
 
 async def is_attendance_allowed_channel(channel_id):
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with connection(DB_PATH) as db:
         async with db.execute("SELECT 1 FROM attendance_allowed_channels WHERE channel_id = ?", (channel_id,)) as cur:
             row = await cur.fetchone()
             return row is not None
@@ -22,7 +22,7 @@ class AttendanceCog(commands.Cog):
         self.bot = bot
 
     async def cog_load(self):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS attendance (
                     user_id INTEGER PRIMARY KEY,
@@ -63,7 +63,7 @@ class AttendanceCog(commands.Cog):
             attendance_success = False
             count = 0
 
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with connection(DB_PATH) as db:
                 cur = await db.execute("SELECT last_date, count FROM attendance WHERE user_id=?", (user_id,))
                 row = await cur.fetchone()
 
@@ -157,7 +157,7 @@ class AttendanceCog(commands.Cog):
     @attendance.command(name="순위")
     async def ranking(self, ctx, page: int = 1):
         """출석 순위 (페이지네이션, 임베드)"""
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             cur = await db.execute(
                 "SELECT user_id, count FROM attendance ORDER BY count DESC, user_id ASC"
             )
@@ -235,7 +235,7 @@ class AttendanceCog(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def add_attendance_channel(self, ctx, channel: discord.TextChannel = None):
         channel = channel or ctx.channel
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute("INSERT OR IGNORE INTO attendance_allowed_channels (channel_id) VALUES (?)", (channel.id,))
             await db.commit()
         await ctx.send(f"{channel.mention} 채널이 출석 명령어 허용 채널로 추가되었습니다.")
@@ -246,7 +246,7 @@ class AttendanceCog(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def remove_attendance_channel(self, ctx, channel: discord.TextChannel = None):
         channel = channel or ctx.channel
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute("DELETE FROM attendance_allowed_channels WHERE channel_id = ?", (channel.id,))
             await db.commit()
         await ctx.send(f"{channel.mention} 채널이 출석 명령어 허용 채널에서 제거되었습니다.")
@@ -256,7 +256,7 @@ class AttendanceCog(commands.Cog):
     @only_in_guild()
     @commands.has_permissions(administrator=True)
     async def list_attendance_channels(self, ctx):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             async with db.execute("SELECT channel_id FROM attendance_allowed_channels") as cur:
                 rows = await cur.fetchall()
         if not rows:
@@ -273,7 +273,7 @@ class AttendanceCog(commands.Cog):
         """특정 유저의 오늘 출석을 초기화합니다. (관리자 전용)"""
         today = datetime.now(KST).strftime("%Y-%m-%d")
         
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             # 먼저 현재 상태 확인
             cur = await db.execute(
                 "SELECT last_date, count FROM attendance WHERE user_id=?", 
@@ -328,7 +328,7 @@ class AttendanceCog(commands.Cog):
             await ctx.send("⏳ 시간 초과로 완전초기화가 취소되었습니다.")
             return
 
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute("DELETE FROM attendance")
             await db.commit()
             
@@ -5,13 +5,15 @@ from discord.ext import commands
 import asyncio
 from datetime import datetime
 import pytz
-import aiosqlite
 from openai import AsyncOpenAI
 import random
 import re
 
 from src.level.LevelConstants import FIRST_SENTENCE_ROLE_ID, EVERYONE_ROLE_ID, FIRST_SENTENCE_FORUM_ID, QUEST_EXP, REACTION_EMOJI_POOL, MAIN_CHAT_CHANNEL_ID
 from src.core.admin_utils import is_guild_admin
+from src.core.connection_registry import connection
+from src.core.message_routing import MessageContext, message_route, register_routes, unregister_routes
+from src.utils.Scheduler import CATCH_UP_ONCE, CATCH_UP_SKIP
 
 Promotion_Time = ["12:00", "18:00"]
 
@@ -56,9 +58,13 @@ class DailyFirstSentence(commands.Cog):
         
     async def cog_load(self):
         await self.init_db()
+        register_routes(self.bot, self)
         print(f"✅ {self.__class__.__name__} loaded successfully!")
         self.bot.loop.create_task(self.setup_schedules())
 
+    async def cog_unload(self):
+        unregister_routes(self.bot, self)
+
     async def log(self, message: str):
         try:
             logger = self.bot.get_cog("Logger")
@@ -68,7 +74,7 @@ class DailyFirstSentence(commands.Cog):
             print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
 
     async def init_db(self):
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with connection(DB_PATH) as db:
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS daily_sentence_answers (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -92,7 +98,7 @@ class DailyFirstSentence(commands.Cog):
         """최근 작성된 첫 문장 질문 목록을 가져옵니다."""
         questions = []
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with connection(DB_PATH) as db:
                 cursor = await db.execute(
                     "SELECT question FROM daily_sentence_questions ORDER BY id DESC LIMIT ?", 
                     (limit,)
@@ -115,14 +121,14 @@ class DailyFirstSentence(commands.Cog):
         await self.bot.wait_until_ready()
         scheduler = self.bot.get_cog("Scheduler")
         if scheduler:
-            # 매일 자정(00:00)에 포럼 스레드 생성
-            scheduler.schedule_daily(self.generate_daily_thread, 0, 0)
+            # 매일 자정(00:00)에 포럼 스레드 생성 (재시작 중 자정을 넘겼으면 시작하자마자 한 번 생성)
+            scheduler.schedule_daily(self.generate_daily_thread, 0, 0, catch_up=CATCH_UP_ONCE)
             
-            # 일일 홍보 스케줄
+            # 일일 홍보 스케줄 (놓친 홍보는 늦게 보내지 않음)
             for time_str in Promotion_Time:
                 try:
                     h, m = map(int, time_str.split(":"))
-                    scheduler.schedule_daily(self.promote_daily_thread, h, m)
+                    scheduler.schedule_daily(self.promote_daily_thread, h, m, catch_up=CATCH_UP_SKIP)
                 except ValueError:
                     pass
 
@@ -174,7 +180,7 @@ class DailyFirstSentence(commands.Cog):
             
             # DB에 새로 생성한 질문 저장
             try:
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with connection(DB_PATH) as db:
                     await db.execute("INSERT INTO daily_sentence_questions (question) VALUES (?)", (question,))
                     await db.commit()
             except Exception as e:
@@ -204,7 +210,7 @@ class DailyFirstSentence(commands.Cog):
             old_thread = None
             old_thread_id = None
             try:
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with connection(DB_PATH) as db:
                     cursor = await db.execute(
                         "SELECT DISTINCT thread_id FROM daily_sentence_answers ORDER BY id DESC LIMIT 1"
                     )
@@ -266,7 +272,7 @@ class DailyFirstSentence(commands.Cog):
         lookup_thread_id = old_thread.id if old_thread else old_thread_id
         if lookup_thread_id:
             try:
-                async with aiosqlite.connect(DB_PATH) as db:
+                async with connection(DB_PATH) as db:
                     cursor = await db.execute("SELECT user_id, answer, question FROM daily_sentence_answers WHERE thread_id = ?", (lookup_thread_id,))
                     rows = await cursor.fetchall()
                     for row in rows:
@@ -414,19 +420,10 @@ class DailyFirstSentence(commands.Cog):
         except Exception as e:
             await self.log(f"❌ 홍보 메시지 생성 중 오류: {e}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
-        if not isinstance(message.channel, discord.Thread):
-            return
-
-        # 해당하는 포럼 채널의 스레드인지 확인
-        if message.channel.parent_id != FIRST_SENTENCE_FORUM_ID:
-            return
-
-        user_id = message.author.id
+    @message_route(forums=FIRST_SENTENCE_FORUM_ID)
+    async def on_forum_message(self, message: discord.Message, ctx: MessageContext):
+        """첫 문장 포럼 스레드의 답변을 기록하고 보상합니다. (봇 메시지는 라우터가 거름)"""
+        user_id = ctx.author_id
         level_checker = self.bot.get_cog("LevelChecker")
         if not level_checker:
             return
@@ -462,7 +459,7 @@ class DailyFirstSentence(commands.Cog):
 
         # DB 기록
         try:
-            async with aiosqlite.connect(DB_PATH) as db:
+            async with connection(DB_PATH) as db:
                 await db.execute("""
                     INSERT INTO daily_sentence_answers (user_id, thread_id, question, answer)
                     VALUES (?, ?, ?, ?)
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from src.core.LevelDataManager import LevelDataManager
+from src.core.message_routing import MessageContext, message_route, register_routes, unregister_routes
 from src.level.LevelConstants import (
     QUEST_EXP, REACTION_EMOJI_POOL,
     DIARY_CHANNEL_ID, BOARD_CATEGORY_ID,
@@ -28,7 +29,11 @@ class LevelChecker(commands.Cog):
     async def cog_load(self):
         """Cog 로드 시 데이터베이스 초기화"""
         await self.data_manager.ensure_initialized()
+        register_routes(self.bot, self)
         print(f"✅ {self.__class__.__name__} loaded successfully!")
+
+    async def cog_unload(self):
+        unregister_routes(self.bot, self)
         
     async def log(self, message):
         try:
@@ -148,58 +153,43 @@ class LevelChecker(commands.Cog):
     # 다방일지 퀘스트 처리
     # ===========================================
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """메시지 이벤트 리스너 - 다방일지/게시판 퀘스트 감지"""
-        # 봇 메시지 무시
-        if message.author.bot:
-            return
-
-        # 스레드 채널 무시
-        if isinstance(message.channel, discord.Thread):
-            return
-
-        # 시스템 메시지 무시 (스레드 생성, 핀 추가 등)
-        if message.type != discord.MessageType.default:
+    @message_route(channels=DIARY_CHANNEL_ID, threads=False, default_only=True)
+    async def on_diary_message(self, message: discord.Message, ctx: MessageContext):
+        """다방일지 퀘스트 감지 (봇/스레드/시스템 메시지는 라우터가 거름)"""
+        # 최소 길이 체크
+        if len(message.content.strip()) < DIARY_MIN_LENGTH:
             return
 
-        # --- 다방일지 퀘스트 감지 ---
-        if message.channel.id == DIARY_CHANNEL_ID:
-            # 최소 길이 체크
-            if len(message.content.strip()) >= DIARY_MIN_LENGTH:
-                user_id = message.author.id
-
-                try:
-                    # get_quest_count로 오늘 작성했는지 확인 (0 또는 1 반환)
-                    today_count = await self.data_manager.get_quest_count(
-                        user_id, 
-                        quest_type='daily', 
-                        quest_subtype='diary',
-                        timeframe='day'
-                    )
-
-                    if today_count > 0:
-                        return  # 오늘 이미 작성함
-                    
-                    # 다방일지 퀘스트 처리
-                    result = await self.process_diary(user_id)
-                    
-                    # 성공 시 반응 추가
-                    if result['success']:
-                        await message.add_reaction(random.choice(REACTION_EMOJI_POOL))
-                except Exception as e:
-                    await self.log(f"다방일지 처리 중 오류 발생: {e}")
+        user_id = ctx.author_id
+        try:
+            # get_quest_count로 오늘 작성했는지 확인 (0 또는 1 반환)
+            today_count = await self.data_manager.get_quest_count(
+                user_id, 
+                quest_type='daily', 
+                quest_subtype='diary',
+                timeframe='day'
+            )
 
-        # --- 게시판 퀘스트 감지 ---
-        # BOARD_CATEGORY_ID는 LevelConstants에서 import됨
-        
-        if hasattr(message.channel, 'category_id') and message.channel.category_id == BOARD_CATEGORY_ID:
-            try:
-                user_id = message.author.id
-                result = await self.process_board(user_id)
+            if today_count > 0:
+                return  # 오늘 이미 작성함
+            
+            # 다방일지 퀘스트 처리
+            result = await self.process_diary(user_id)
+            
+            # 성공 시 반응 추가
+            if result['success']:
                 await message.add_reaction(random.choice(REACTION_EMOJI_POOL))
-            except Exception as e:
-                await self.log(f"게시판 퀘스트 처리 중 오류 발생: {e}")
+        except Exception as e:
+            await self.log(f"다방일지 처리 중 오류 발생: {e}")
+
+    @message_route(categories=BOARD_CATEGORY_ID, threads=False, default_only=True)
+    async def on_board_message(self, message: discord.Message, ctx: MessageContext):
+        """게시판 퀘스트 감지 (BOARD_CATEGORY_ID는 LevelConstants에서 import됨)"""
+        try:
+            result = await self.process_board(ctx.author_id)
+            await message.add_reaction(random.choice(REACTION_EMOJI_POOL))
+        except Exception as e:
+            await self.log(f"게시판 퀘스트 처리 중 오류 발생: {e}")
 
     async def process_diary(self, user_id: int) -> Dict[str, Any]:
         """다방일지 퀘스트 처리 (일간 + 주간 마일스톤)"""
@@ -263,7 +253,7 @@ class LevelChecker(commands.Cog):
     async def process_board(self, user_id: int) -> Dict[str, Any]:
         """
         게시판 참여 시 호출: 주간 게시판 3회 달성 시 경험치 지급
-        on_message에서 특정 카테고리에 글 작성 시 호출됨.
+        on_board_message에서 특정 카테고리에 글 작성 시 호출됨.
         """
         await self.data_manager.ensure_initialized()
         result = {
@@ -274,13 +264,7 @@ class LevelChecker(commands.Cog):
         }
         try:
             # 게시판 참여 기록 (quest_logs에 'weekly', 'board_participate'로 기록)
-            async with self.data_manager.db_connect() as db:
-                week_start = self.data_manager._get_week_start()
-                await db.execute("""
-                    INSERT INTO quest_logs (user_id, quest_type, quest_subtype, exp_gained, week_start)
-                    VALUES (?, 'weekly', 'board_participate', 0, ?)
-                """, (user_id, week_start))
-                await db.commit()
+            await self.data_manager.log_quest(user_id, 'weekly', 'board_participate')
 
             # 이번 주 게시판 참여 횟수 확인
             board_count = await self.data_manager.get_quest_count(user_id, 'weekly', 'board_participate', 'week')
@@ -358,14 +342,7 @@ class LevelChecker(commands.Cog):
         }
         try:
             # 추천 인증 기록 (quest_logs에 'weekly', 'recommend'로 count만큼 기록)
-            async with self.data_manager.db_connect() as db:
-                week_start = self.data_manager._get_week_start()
-                for _ in range(count):
-                    await db.execute("""
-                        INSERT INTO quest_logs (user_id, quest_type, quest_subtype, exp_gained, week_start)
-                        VALUES (?, 'weekly', 'recommend', 0, ?)
-                    """, (user_id, week_start))
-                await db.commit()
+            await self.data_manager.log_quest(user_id, 'weekly', 'recommend', count)
 
             # 이번 주 추천 인증 횟수 확인
             recommend_count = await self.data_manager.get_quest_count(user_id, 'weekly', 'recommend', 'week')
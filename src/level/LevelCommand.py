@@ -6,10 +6,9 @@ from src.core.DataManager import DataManager
 from typing import Optional, Dict, Any, List
 import logging
 from datetime import datetime, timedelta
-import json, os
 import pytz
-from src.core.voice_utils import get_filtered_tracked_channels 
-import time
+from src.core.voice_utils import get_tracked_channel_resolver
+from src.core.config_store import get_store
 
 CONFIG_PATH = "config/level_config.json"
 KST = pytz.timezone("Asia/Seoul")
@@ -24,11 +23,7 @@ def extract_name(text: str) -> str:
     name = re.sub(r"^[&!]\s*", "", name)
     return name.strip() or text
     
-def _load_levelcfg():
-    if not os.path.exists(CONFIG_PATH):
-        return {"guilds": {}}
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+level_config_store = get_store(CONFIG_PATH, {"guilds": {}})
 
 def in_myinfo_allowed_channel():
     def check():
@@ -44,8 +39,8 @@ def in_myinfo_allowed_channel():
             if ctx.author.guild_permissions.administrator:
                 return True
 
-            cfg = _load_levelcfg()
-            allowed = cfg.get("guilds", {}).get(str(ctx.guild.id), {}).get("my_info_channels", [])
+            cfg = level_config_store.get()
+            allowed = cfg.get("guilds", {}).get(str(ctx.guild.id), {}).get("my_info_channels", ())
 
             # 설정이 비어 있으면 전체 허용
             if not allowed:
@@ -61,8 +56,6 @@ class LevelCommands(commands.Cog):
         self.data_manager = LevelDataManager()
         self.voice_data_manager = DataManager()
         self.logger = logging.getLogger(__name__)
-        self._tracked_voice_cache = None
-        self._tracked_voice_cache_at = 0  # epoch seconds
 
         self.role_info = get_role_info()
         self.role_order = ROLE_ORDER
@@ -80,14 +73,8 @@ class LevelCommands(commands.Cog):
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
             
-    async def _get_tracked_voice_ids_cached(self, ttl: int = 600) -> set[int]:
-        now_ts = time.time()
-        if self._tracked_voice_cache and (now_ts - self._tracked_voice_cache_at) < ttl:
-            return self._tracked_voice_cache
-        ids = set(await get_filtered_tracked_channels(self.bot, self.voice_data_manager, "voice"))
-        self._tracked_voice_cache = ids
-        self._tracked_voice_cache_at = now_ts
-        return ids
+    async def _get_tracked_voice_ids(self) -> set[int]:
+        return set(await get_tracked_channel_resolver(self.bot).get("voice"))
     
     def _get_progress_info(self, total_exp: int, current_role_key: str) -> tuple:
         """현재 역할에 따른 진행률, 다음 마일스톤 등 계산"""
@@ -142,14 +129,12 @@ class LevelCommands(commands.Cog):
         voice_sec_day = 0
         voice_sec_week = 0
         now = datetime.now(KST)
-        if hasattr(self.voice_data_manager, "get_user_times") and tracked_channel_ids:
-            day_result, _, _ = await self.voice_data_manager.get_user_times(
-                user_id = user_id, period='일간', base_date=now, channel_filter=list(tracked_channel_ids))
-            voice_sec_day = sum(day_result.values()) if day_result else 0
-            
-            week_result, _, _ = await self.voice_data_manager.get_user_times(
-                user_id = user_id, period='주간', base_date=now, channel_filter=list(tracked_channel_ids))
-            voice_sec_week = sum(week_result.values()) if week_result else 0
+        if hasattr(self.voice_data_manager, "get_user_total") and tracked_channel_ids:
+            channel_filter = list(tracked_channel_ids)
+            voice_sec_day = await self.voice_data_manager.get_user_total(
+                user_id = user_id, period='일간', base_date=now, channel_filter=channel_filter)
+            voice_sec_week = await self.voice_data_manager.get_user_total(
+                user_id = user_id, period='주간', base_date=now, channel_filter=channel_filter)
             
         stats['voice_sec_day'] = voice_sec_day
         stats['voice_sec_week'] = voice_sec_week
@@ -274,12 +259,10 @@ class LevelCommands(commands.Cog):
                     pass
             ranks = (voice_lv, chat_lv)
 
-            try:
-                tracked_channel_ids = set(await self._get_tracked_voice_ids_cached())
-            except AttributeError:
-                from src.core.voice_utils import get_filtered_tracked_channels
-                tracked_channel_ids = set(await get_filtered_tracked_channels(self.bot, self.data_manager, "voice"))
+            tracked_channel_ids = await self._get_tracked_voice_ids()
 
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             stats = await self._get_quest_stats(user_id, tracked_channel_ids)
             embed = await self._build_myinfo_embed(ctx, member, user_data, ranks, stats, progress)
             
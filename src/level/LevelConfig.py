@@ -5,29 +5,22 @@ from src.core.LevelDataManager import LevelDataManager
 from src.level.LevelConstants import get_role_info, QUEST_DESCRIPTIONS, QUEST_CATEGORY_NAMES
 from datetime import time, timezone, timedelta
 from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
+from src.core.config_store import get_store
 from typing import Optional, Dict, Any, List
-import json, os
 import logging
 import pytz
 
 KST = pytz.timezone("Asia/Seoul")    
 CONFIG_PATH = "config/level_config.json"
 
-def _ensure_config():
-    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-    if not os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump({"guilds": {}}, f, ensure_ascii=False, indent=2)
+level_config_store = get_store(CONFIG_PATH, {"guilds": {}})
 
 def _load_levelcfg():
-    _ensure_config()
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """설정을 수정용 복사본으로 로드합니다."""
+    return level_config_store.load_mutable()
 
 def _save_levelcfg(data):
-    os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    level_config_store.save(data)
 
 class LevelConfig(commands.Cog):
     def __init__(self, bot):
@@ -512,6 +505,7 @@ class LevelConfig(commands.Cog):
                     await db.execute("DELETE FROM quest_logs WHERE user_id = ?", (member.id,))
                     await db.execute("DELETE FROM one_time_quests WHERE user_id = ?", (member.id,))
                     await db.commit()
+                self.data_manager.invalidate_quest_ledger(member.id)
                 
                 embed = discord.Embed(
                     title="✅ 퀘스트 초기화 완료",
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiosqlite
 import asyncio
 from datetime import datetime
 import pytz
@@ -8,6 +7,7 @@ import os
 
 from src.core.admin_utils import is_guild_admin
 from src.core.LevelDataManager import LevelDataManager
+from src.core.connection_registry import connection
 
 KST = pytz.timezone("Asia/Seoul")
 ARCHIVE_DB_PATH = "data/level_archive.db"
@@ -36,7 +36,7 @@ class ExpTransferView(discord.ui.View):
 
         # 2. 전용 테이블을 생성해 중복 수령 방지 확인
         try:
-            async with aiosqlite.connect(SYSTEM_DB_PATH) as db:
+            async with connection(SYSTEM_DB_PATH) as db:
                 await db.execute("""
                     CREATE TABLE IF NOT EXISTS exp_transfers (
                         user_id INTEGER PRIMARY KEY,
@@ -69,7 +69,7 @@ class ExpTransferView(discord.ui.View):
             
         old_exp = 0
         try:
-            async with aiosqlite.connect(ARCHIVE_DB_PATH) as db:
+            async with connection(ARCHIVE_DB_PATH) as db:
                 cursor = await db.execute("SELECT total_exp FROM user_exp WHERE user_id = ?", (user_id,))
                 row = await cursor.fetchone()
                 if row:
@@ -98,7 +98,7 @@ class ExpTransferView(discord.ui.View):
         if success:
             # 중복 수령을 막기 위한 전용 기록 추가
             try:
-                async with aiosqlite.connect(SYSTEM_DB_PATH) as db:
+                async with connection(SYSTEM_DB_PATH) as db:
                     await db.execute("INSERT OR IGNORE INTO exp_transfers (user_id) VALUES (?)", (user_id,))
                     await db.commit()
             except Exception as e:
@@ -4,9 +4,8 @@
 유저가 채널에 텍스트를 입력하면 검색·재생합니다.
 """
 import asyncio
-import json
-import os
 import re
+from collections.abc import Mapping
 
 import discord
 import lavalink
@@ -15,6 +14,9 @@ from lavalink.errors import ClientError
 from lavalink.events import QueueEndEvent, TrackExceptionEvent, TrackStartEvent
 from lavalink.server import LoadType
 
+from src.core.config_store import get_store
+from src.core.message_routing import MessageContext, message_route, register_routes, unregister_routes
+
 url_rx = re.compile(r'https?://(?:www\.)?.+')
 CONFIG_PATH = 'config/music_config.json'
 COMMAND_PREFIX = '?!'
@@ -44,20 +46,22 @@ def _bar(position: int, duration: int, length: int = 17) -> str:
     return '▬' * filled + '🔘' + '─' * (length - filled - 1)
 
 
-def load_config() -> dict:
-    try:
-        if os.path.exists(CONFIG_PATH):
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception:
-        pass
-    return {}
+config_store = get_store(CONFIG_PATH)
+
+
+def load_config():
+    """현재 설정 스냅샷 (읽기 전용, 파일은 변경되었을 때만 다시 읽음)"""
+    return config_store.get()
 
 
 def save_config(data: dict):
-    os.makedirs('config', exist_ok=True)
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    config_store.save(data)
+
+
+def music_channel_ids(cfg) -> set:
+    """설정된 모든 길드의 음악 채널 ID (메시지 라우트 대상)"""
+    return {guild_cfg.get('channel_id') for guild_cfg in cfg.data.values()
+            if isinstance(guild_cfg, Mapping) and guild_cfg.get('channel_id')}
 
 
 # ──────────────────────────────────────────
@@ -392,10 +396,12 @@ class Music(commands.Cog):
         self.lavalink.add_event_hooks(self)
 
     async def cog_load(self):
+        register_routes(self.bot, self)
         print(f'✅ {self.__class__.__name__} loaded successfully!')
         asyncio.create_task(self._restore_embeds())
 
     def cog_unload(self):
+        unregister_routes(self.bot, self)
         self.lavalink._event_hooks.clear()
 
     # ── 로깅 헬퍼 ──────────────────────────
@@ -426,7 +432,7 @@ class Music(commands.Cog):
         view = MusicPlayerView(self, guild.id)
         msg = await channel.send(embed=view.build_embed(), view=view)
 
-        cfg = load_config()
+        cfg = config_store.load_mutable()
         guild_key = str(guild.id)
         cfg.setdefault(guild_key, {})['channel_id'] = channel.id
         cfg[guild_key]['message_id'] = msg.id
@@ -474,16 +480,11 @@ class Music(commands.Cog):
                     code='MUSIC-007',
                 )
 
-    # ── on_message: 텍스트 입력 → 음악 재생 ──
-
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
+    # ── 음악 채널 메시지 (MessageRouter): 텍스트 입력 → 음악 재생 ──
 
-        guild_cfg = load_config().get(str(message.guild.id), {})
-        channel_id = guild_cfg.get('channel_id')
-        if not channel_id or message.channel.id != channel_id:
+    @message_route(channels=music_channel_ids, store=config_store, threads=False)
+    async def on_music_channel_message(self, message: discord.Message, ctx: MessageContext):
+        if not message.guild:
             return
 
         # 모든 유저 메시지 즉시 삭제 (채널 무결성 유지)
@@ -0,0 +1,88 @@
+"""
+랭크 카드 아바타 디스크 캐시 모듈입니다.
+
+display_avatar URL에는 아바타 내용 해시(Asset.key)가 들어 있으므로, 같은 해시·크기의 아바타는
+한 번 받은 뒤 다시 받을 필요가 없습니다.
+- 디스크: data/cache/avatars/{해시}_{크기}.png, 전체 크기가 AVATAR_DISK_MAX_BYTES를 넘으면
+  가장 오래 쓰이지 않은 파일부터 지웁니다. (FileCache.DiskLRU)
+- 메모리: 디코드·원형 마스크까지 끝낸 이미지는 렌더링 워커 쪽(RankCardGenerator)의 LRU가 보관합니다.
+  이 모듈은 워커에 파일 경로(AvatarRef)만 넘깁니다.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import aiohttp
+
+from src.rankcard.FileCache import DiskLRU
+
+AVATAR_CACHE_DIR = "data/cache/avatars"
+# 디스크 캐시 최대 크기 (바이트)
+AVATAR_DISK_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class AvatarRef:
+    """렌더링 워커에 넘기는 아바타 정보. 디스크에 저장하지 못했으면 data에 원본 바이트를 담습니다."""
+    key: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+class AvatarCache:
+    """해시·크기로 주소를 정하는 아바타 디스크 캐시"""
+
+    def __init__(self, directory: str = AVATAR_CACHE_DIR, max_bytes: int = AVATAR_DISK_MAX_BYTES):
+        self.disk = DiskLRU(directory, max_bytes)
+        self._downloads: Dict[str, asyncio.Future] = {}   # 같은 아바타 동시 다운로드 합치기
+        self.stats = {"hits": 0, "downloads": 0, "failures": 0}
+
+    async def get(self, url: str, key: str) -> Optional[AvatarRef]:
+        """아바타를 캐시에서 찾고, 없으면 받아서 저장합니다. 받지 못하면 None."""
+        path = self.disk.lookup(key)
+        if path is not None:
+            self.stats["hits"] += 1
+            return AvatarRef(key, path=path)
+
+        pending = self._downloads.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._downloads[key] = future
+        try:
+            data = await self._download(url)
+            if data is None:
+                ref = None
+            else:
+                path = self.disk.store(key, data)
+                ref = AvatarRef(key, path=path) if path else AvatarRef(key, data=data)
+            future.set_result(ref)
+            return ref
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 예외를 읽지 않은 Future 경고가 나므로 한 번 읽어 둡니다.
+            future.exception()
+            raise
+        finally:
+            del self._downloads[key]
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        self.stats["downloads"] += 1
+                        return await resp.read()
+        except aiohttp.ClientError as e:
+            print(f"⚠️ 아바타 다운로드 실패 ({url}): {e}")
+        self.stats["failures"] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, **self.disk.get_stats()}
+
+
+async def setup(bot):
+    pass  # 유틸리티 모듈 — Cog 없음
@@ -0,0 +1,112 @@
+"""
+크기 제한이 있는 디스크 LRU 캐시 모듈입니다.
+랭크 카드 아바타 캐시와 렌더링 결과 캐시가 함께 사용합니다.
+
+- 파일 이름은 {key}{suffix}이며, 적중할 때 mtime을 갱신해 LRU 순서로 씁니다.
+- 전체 크기가 max_bytes를 넘으면 가장 오래 쓰이지 않은 파일부터 지웁니다.
+- 디렉터리는 처음 사용할 때 한 번만 훑어 크기 목록을 만듭니다.
+"""
+
+import os
+from typing import Dict, Optional
+
+
+class DiskLRU:
+    """디렉터리 하나를 크기 제한 LRU로 관리합니다."""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".png"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._sizes: Dict[str, int] = {}     # key → 파일 크기
+        self._total = 0
+        self._scanned = False
+        self.evictions = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _scan(self):
+        self._scanned = True
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(self.suffix):
+                        size = entry.stat().st_size
+                        self._sizes[entry.name[:-len(self.suffix)]] = size
+                        self._total += size
+        except FileNotFoundError:
+            pass
+
+    def lookup(self, key: str) -> Optional[str]:
+        """key의 파일 경로를 반환하고 사용 시각을 갱신합니다. 없으면 None."""
+        if not self._scanned:
+            self._scan()
+        if key not in self._sizes:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            self._total -= self._sizes.pop(key)
+            return None
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key: str, data: bytes) -> Optional[str]:
+        """파일을 원자적으로 저장하고 경로를 반환합니다. 저장하지 못하면 None."""
+        if not self._scanned:
+            self._scan()
+        path = self.path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 캐시 파일 저장 실패 ({path}): {e}")
+            return None
+        self._total += len(data) - self._sizes.get(key, 0)
+        self._sizes[key] = len(data)
+        self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: str):
+        """전체 크기가 한도 안으로 들어올 때까지 오래된 파일부터 지웁니다. (keep은 제외)"""
+        if self._total <= self.max_bytes:
+            return
+        by_age = []
+        for key in self._sizes:
+            if key == keep:
+                continue
+            try:
+                by_age.append((os.stat(self.path(key)).st_mtime, key))
+            except FileNotFoundError:
+                by_age.append((0.0, key))
+        by_age.sort()
+        for _, key in by_age:
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            self._total -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"files": len(self._sizes), "bytes": self._total, "evictions": self.evictions}
+
+
+async def setup(bot):
+    pass  # 유틸리티 모듈 — Cog 없음
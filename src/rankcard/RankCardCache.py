@@ -0,0 +1,111 @@
+"""
+렌더링된 랭크 카드 결과 캐시 모듈입니다.
+
+같은 유저의 랭크 카드를 몇 분 안에 반복해서 요청해도 데이터는 거의 바뀌지 않으므로,
+RankCardData(아바타 해시 포함)의 지문(fingerprint)으로 렌더링된 PNG를 재사용합니다.
+- 최근 결과: 유저별 마지막 카드가 RECENT_SECONDS 안에 만들어졌고 아바타가 같으면
+  데이터 수집과 렌더링을 모두 건너뜁니다. (그 사이 바뀐 수치는 최대 RECENT_SECONDS 늦게 반영)
+- 지문 적중: 데이터를 다시 모았는데 지문이 같으면 렌더링만 건너뜁니다.
+- PNG는 메모리 LRU(전체 바이트 제한)에 두고, 선택적으로 디스크(data/cache/rankcards)에도 둡니다.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import astuple
+from typing import Dict, Optional, Tuple
+
+from src.rankcard.FileCache import DiskLRU
+from src.rankcard.RankCardService import RankCardData
+
+# 데이터 수집 없이 바로 재사용하는 최근 결과의 유효 시간 (초)
+RECENT_SECONDS = 60
+# 메모리에 보관하는 PNG 전체 크기 (바이트, 카드 한 장 약 2.5MB)
+CARD_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+RANKCARD_CACHE_DIR = "data/cache/rankcards"
+CARD_DISK_MAX_BYTES = 256 * 1024 * 1024
+# 카드 디자인(템플릿/좌표)이 바뀌면 올려서 디스크에 남은 이전 결과를 쓰지 않게 합니다.
+CARD_LAYOUT_VERSION = 1
+
+
+def fingerprint(data: RankCardData) -> str:
+    """카드에 그려지는 모든 값(아바타 해시 포함)의 지문"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((CARD_LAYOUT_VERSION, astuple(data))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RankCardResultCache:
+    """렌더링된 랭크 카드 PNG 캐시"""
+
+    def __init__(self, use_disk: bool = False, max_bytes: int = CARD_MEMORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._cards: "OrderedDict[str, bytes]" = OrderedDict()   # 지문 → PNG
+        self._bytes = 0
+        self._recent: Dict[int, Tuple[str, str, float]] = {}     # user_id → (avatar_key, 지문, 만든 시각)
+        self.disk = DiskLRU(RANKCARD_CACHE_DIR, CARD_DISK_MAX_BYTES) if use_disk else None
+        self.stats = {"recent_hits": 0, "hits": 0, "misses": 0}
+
+    def _get_card(self, fp: str) -> Optional[bytes]:
+        png = self._cards.get(fp)
+        if png is not None:
+            self._cards.move_to_end(fp)
+            return png
+        if self.disk is not None:
+            png = self.disk.read(fp)
+            if png is not None:
+                self._put_memory(fp, png)
+        return png
+
+    def _put_memory(self, fp: str, png: bytes):
+        if fp in self._cards:
+            self._bytes -= len(self._cards.pop(fp))
+        self._cards[fp] = png
+        self._bytes += len(png)
+        while self._bytes > self.max_bytes and len(self._cards) > 1:
+            _, old = self._cards.popitem(last=False)
+            self._bytes -= len(old)
+
+    def get_recent(self, user_id: int, avatar_key: str) -> Optional[bytes]:
+        """RECENT_SECONDS 안에 같은 아바타로 만든 카드가 있으면 반환합니다. (데이터 수집 생략)"""
+        entry = self._recent.get(user_id)
+        if entry is None:
+            return None
+        key, fp, created_at = entry
+        if key != avatar_key or time.monotonic() - created_at > RECENT_SECONDS:
+            return None
+        png = self._get_card(fp)
+        if png is not None:
+            self.stats["recent_hits"] += 1
+        return png
+
+    def get(self, user_id: int, data: RankCardData) -> Tuple[str, Optional[bytes]]:
+        """(지문, 캐시된 PNG 또는 None)을 반환합니다."""
+        fp = fingerprint(data)
+        png = self._get_card(fp)
+        if png is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+            self._recent[user_id] = (data.avatar_key, fp, time.monotonic())
+        return fp, png
+
+    def put(self, user_id: int, data: RankCardData, fp: str, png: bytes):
+        self._put_memory(fp, png)
+        if self.disk is not None:
+            self.disk.store(fp, png)
+        self._recent[user_id] = (data.avatar_key, fp, time.monotonic())
+
+    def get_stats(self) -> Dict[str, int]:
+        lookups = self.stats["recent_hits"] + self.stats["hits"] + self.stats["misses"]
+        hits = self.stats["recent_hits"] + self.stats["hits"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups * 100 if lookups else 0.0,
+            "cards": len(self._cards),
+            "bytes": self._bytes,
+        }
+
+
+async def setup(bot):
+    pass  # 유틸리티 모듈 — Cog 없음
@@ -6,14 +6,15 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 import traceback
 import io
 import os
 import json
 
-from src.rankcard.RankCardService import RankCardService
-from src.rankcard.RankCardGenerator import RankCardGenerator
+from src.rankcard.RankCardService import RankCardService, avatar_cache_key
+from src.rankcard.RankCardCache import RankCardResultCache
+from src.rankcard.AvatarCache import AvatarCache, AvatarRef
+from src.rankcard.RankCardRenderer import RankCardRenderer, RenderBusyError, RENDER_MODE, RENDER_WORKERS
 
 
 class RankCardCog(commands.Cog):
@@ -22,30 +23,41 @@ class RankCardCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.service = RankCardService(bot)
-        self.generator = RankCardGenerator()
+        self.avatar_cache = AvatarCache()
         self.config_path = "config/rank_config.json"
-        self.allowed_channels = self._load_config()
+        self._config = self._load_config()
+        self.allowed_channels = self._config.get("allowed_channels", [])
+        # 렌더링 방식/워커 수는 rank_config.json의 render_mode, render_workers로 바꿀 수 있습니다.
+        self.renderer = RankCardRenderer(
+            mode=self._config.get("render_mode", RENDER_MODE),
+            workers=self._config.get("render_workers", RENDER_WORKERS),
+        )
+        # 렌더링 결과 캐시 (result_cache_disk가 true면 디스크에도 보관)
+        self.result_cache = RankCardResultCache(use_disk=bool(self._config.get("result_cache_disk", False)))
 
-    def _load_config(self) -> list:
+    def _load_config(self) -> dict:
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return data.get("allowed_channels", [])
+                    return json.load(f)
             except Exception as e:
                 print(f"[RankCardCog] 설정 파일 로드 실패: {e}")
-        return []
+        return {}
 
     def _save_config(self):
         try:
+            self._config["allowed_channels"] = self.allowed_channels
             with open(self.config_path, "w", encoding="utf-8") as f:
-                json.dump({"allowed_channels": self.allowed_channels}, f, indent=4)
+                json.dump(self._config, f, indent=4)
         except Exception as e:
             print(f"[RankCardCog] 설정 파일 저장 실패: {e}")
 
     async def cog_load(self):
         await self.log("RankCardCog 로드됨")
 
+    async def cog_unload(self):
+        self.renderer.close()
+
     # ── 로깅 ──
     async def log(self, message: str):
         """로그 메시지를 Logger cog를 통해 전송합니다."""
@@ -67,9 +79,9 @@ class RankCardCog(commands.Cog):
         랭크 카드를 생성하고 전송합니다.
 
         접두사 명령어와 슬래시 명령어 모두에서 사용되는 공통 로직입니다.
-        1. 로딩 메시지 전송
-        2. 데이터 수집 + 아바타 다운로드
-        3. 이미지 생성
+        1. 최근 결과 캐시 확인 (적중 시 바로 4번)
+        2. 로딩 메시지 전송 + 데이터 수집, 지문이 같은 카드가 있으면 바로 4번
+        3. 아바타 (디스크 캐시에 없을 때만 다운로드) + 이미지 생성 (렌더링 풀에서 실행)
         4. 결과 전송
         """
         loading_msg = None
@@ -84,41 +96,52 @@ class RankCardCog(commands.Cog):
             return
 
         try:
-            # 로딩 메시지
-            if is_slash:
-                await ctx_or_interaction.response.defer()
-            else:
-                loading_embed = discord.Embed(
-                    description="랭크 카드를 생성하고 있어요...",
-                    color=discord.Color.from_str("#0f0f13")
-                )
-                loading_msg = await ctx_or_interaction.send(embed=loading_embed)
-
-            # 데이터 수집
-            data = await self.service.get_rank_card_data(user)
-
-            # 아바타 이미지 다운로드
-            avatar_bytes = await self._download_avatar(data.avatar_url)
-            if not avatar_bytes:
-                error_msg = "❌ 아바타 이미지를 불러올 수 없습니다."
+            # 최근에 만든 같은 카드가 있으면 데이터 수집·렌더링 없이 바로 전송
+            png_bytes = self.result_cache.get_recent(user.id, avatar_cache_key(user))
+
+            if png_bytes is None:
+                # 로딩 메시지
                 if is_slash:
-                    await ctx_or_interaction.followup.send(error_msg, ephemeral=True)
+                    await ctx_or_interaction.response.defer()
                 else:
-                    await loading_msg.edit(
-                        embed=discord.Embed(description=error_msg, color=discord.Color.red())
+                    loading_embed = discord.Embed(
+                        description="랭크 카드를 생성하고 있어요...",
+                        color=discord.Color.from_str("#0f0f13")
                     )
-                return
+                    loading_msg = await ctx_or_interaction.send(embed=loading_embed)
+
+                # 데이터 수집
+                data = await self.service.get_rank_card_data(user)
+
+                # 지문이 같은 카드가 있으면 렌더링 생략
+                fingerprint, png_bytes = self.result_cache.get(user.id, data)
 
-            # 이미지 생성
-            image_buffer = self.generator.generate(data, avatar_bytes)
+            if png_bytes is None:
+                # 아바타 이미지 (캐시에 없을 때만 다운로드)
+                avatar = await self._get_avatar(data)
+                if not avatar:
+                    await self._send_error(ctx_or_interaction, loading_msg, "❌ 아바타 이미지를 불러올 수 없습니다.", discord.Color.red(), is_slash)
+                    return
+
+                # 이미지 생성 (이벤트 루프를 막지 않도록 렌더링 풀에서 실행)
+                try:
+                    png_bytes = await self.renderer.render(data, avatar)
+                except RenderBusyError as e:
+                    await self._send_error(ctx_or_interaction, loading_msg, f"⏳ {e}", discord.Color.orange(), is_slash)
+                    return
+                self.result_cache.put(user.id, data, fingerprint, png_bytes)
 
             # 파일 생성 및 전송
-            file = discord.File(image_buffer, filename="rank_card.png")
+            file = discord.File(io.BytesIO(png_bytes), filename="rank_card.png")
 
             if is_slash:
-                await ctx_or_interaction.followup.send(file=file)
+                if ctx_or_interaction.response.is_done():
+                    await ctx_or_interaction.followup.send(file=file)
+                else:
+                    await ctx_or_interaction.response.send_message(file=file)
             else:
-                await loading_msg.delete()
+                if loading_msg:
+                    await loading_msg.delete()
                 await ctx_or_interaction.send(file=file)
 
             # 로그
@@ -154,14 +177,17 @@ class RankCardCog(commands.Cog):
                 else:
                     await ctx_or_interaction.send(embed=error_embed)
 
-    async def _download_avatar(self, url: str) -> bytes | None:
-        """아바타 이미지를 비동기로 다운로드합니다."""
+    async def _send_error(self, ctx_or_interaction, loading_msg, error_msg: str, color: discord.Color, is_slash: bool):
+        """로딩 메시지가 있으면 그 자리에, 슬래시 명령어면 followup으로 오류를 알립니다."""
+        if is_slash:
+            await ctx_or_interaction.followup.send(error_msg, ephemeral=True)
+        else:
+            await loading_msg.edit(embed=discord.Embed(description=error_msg, color=color))
+
+    async def _get_avatar(self, data) -> AvatarRef | None:
+        """아바타를 해시·크기 기준 캐시에서 가져옵니다. 없으면 비동기로 다운로드해 저장합니다."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        return await resp.read()
-            return None
+            return await self.avatar_cache.get(data.avatar_url, data.avatar_key)
         except Exception as e:
             await self.log(f"아바타 다운로드 실패: {e}")
             return None
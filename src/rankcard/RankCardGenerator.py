@@ -11,11 +11,17 @@ Pillow를 사용하여 유저의 레벨/경지 정보를 시각화한 카드 이
 import io
 import os
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
 
 from PIL import Image, ImageDraw, ImageFont
 
 from src.rankcard.RankCardService import RankCardData
+from src.rankcard.AvatarCache import AvatarRef
 
 logger = logging.getLogger(__name__)
 
@@ -49,12 +55,81 @@ def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
         logger.warning(f"폰트 로드 실패 ({path}, {size}px): {e}")
         return ImageFont.load_default()
 
+@lru_cache(maxsize=1)
+def _load_background() -> Image.Image:
+    """배경 이미지를 프로세스(워커)마다 한 번만 읽어 둡니다. 호출자는 수정하지 않고 resize 결과만 사용합니다."""
+    try:
+        return Image.open(BG_IMAGE_PATH).convert('RGBA')
+    except (IOError, OSError) as e:
+        logger.error(f"배경 이미지 로드 실패: {e}")
+        return Image.new('RGBA', (1000, 660), (30, 30, 35)) # Fallback
+
 def _make_circle_mask(diameter: int) -> Image.Image:
     mask = Image.new('L', (diameter, diameter), 0)
     draw = ImageDraw.Draw(mask)
     draw.ellipse([(0, 0), (diameter - 1, diameter - 1)], fill=255)
     return mask
 
+# ── 좌표 비율 정의 ──
+POS = {
+    'avatar_cx': 0.156,  'avatar_cy': 0.358,  'avatar_radius': 0.098,
+    'badge_y': 0.500,
+    'info_x': 0.305,     
+    'name_y': 0.220,     'exp_y': 0.340,      'next_role_y': 0.430,
+    'main_bar_y': 0.470, 'main_bar_w': 0.600, 'main_bar_h': 0.025,
+    'box1_x': 0.295,     'box2_x': 0.615,     'box_y': 0.685,
+    'box_w': 0.300,      'box_h': 0.175
+}
+
+# 다운스케일 시 그린 영역 주변으로 넓히는 폭 (2배 캔버스 기준, LANCZOS 필터 반경 3 × S 이상)
+DOWNSCALE_MARGIN = 4 * S
+
+Box = Tuple[int, int, int, int]
+
+# PNG 압축 수준 (기본값 6은 인코딩이 렌더링보다 오래 걸리고, 3은 파일이 약 8% 커지는 대신 4배 이상 빠름)
+PNG_COMPRESS_LEVEL = 3
+
+# 하단 스탯 박스 라벨 (템플릿에 미리 그려 둠)
+BOX_LABELS = {'chat': "채팅 레벨", 'voice': "음성 레벨"}
+
+
+@dataclass
+class StatBoxLayout:
+    """하단 스탯 박스 하나의 2배 캔버스 좌표"""
+    x: int
+    y: int
+    width: int
+    pad_x: int
+    inner_y: int
+    bar_y: int
+    bar_w: int
+    bar_h: int
+    bottom_y: int
+
+
+@dataclass
+class CardTemplate:
+    """
+    프로세스(워커)마다 한 번만 만드는 카드 템플릿.
+    2배로 확대한 배경에 고정 요소(진행 바 배경, 박스 라벨)를 미리 합성해 두고,
+    카드마다 base.copy() 위에 바뀌는 내용만 그립니다.
+    """
+    base: Image.Image
+    output_base: Image.Image              # base를 원래 크기로 줄여 둔 것
+    output_size: Tuple[int, int]
+    avatar_pos: Tuple[int, int]
+    avatar_size: int
+    avatar_mask: Image.Image
+    badge_cx: int
+    badge_y: int
+    info_x: int
+    name_y: int
+    exp_y: int
+    next_y: int
+    main_bar: Tuple[int, int, int, int]   # x, y, w, h
+    boxes: Dict[str, StatBoxLayout]
+
+
 class RankCardGenerator:
     def __init__(self):
         # 폰트 사이즈 대폭 확대 적용
@@ -71,128 +146,213 @@ class RankCardGenerator:
         self.font_box_level = _load_font(FONT_BOLD_PATH, int(36 * self.base_font_scale))   # 28 -> 36
         self.font_box_val = _load_font(FONT_MEDIUM_PATH, int(24 * self.base_font_scale))   # 16 -> 18
 
-    def generate(self, data: RankCardData, avatar_bytes: bytes) -> io.BytesIO:
-        # 1. 원본 배경 이미지 로드 및 논리적/물리적 크기 설정
-        try:
-            bg_image = Image.open(BG_IMAGE_PATH).convert('RGBA')
-            OUTPUT_WIDTH, OUTPUT_HEIGHT = bg_image.size
-        except (IOError, OSError) as e:
-            logger.error(f"배경 이미지 로드 실패: {e}")
-            OUTPUT_WIDTH, OUTPUT_HEIGHT = 1000, 660 # Fallback
-            bg_image = Image.new('RGBA', (OUTPUT_WIDTH, OUTPUT_HEIGHT), (30, 30, 35))
+        self._template: Optional[CardTemplate] = None
+
+    # ────────────────────────────────────────────────
+    # 템플릿 (배경 + 고정 요소)
+    # ────────────────────────────────────────────────
+    def _get_template(self) -> CardTemplate:
+        if self._template is None:
+            self._template = self._build_template()
+        return self._template
+
+    def _build_template(self) -> CardTemplate:
+        # 원본 배경 이미지 로드 및 논리적/물리적 크기 설정
+        bg_image = _load_background()
+        OUTPUT_WIDTH, OUTPUT_HEIGHT = bg_image.size
 
         CANVAS_WIDTH = OUTPUT_WIDTH * S
         CANVAS_HEIGHT = OUTPUT_HEIGHT * S
-        canvas = bg_image.resize((CANVAS_WIDTH, CANVAS_HEIGHT), Image.LANCZOS)
-        draw = ImageDraw.Draw(canvas)
-
-        # ── 좌표 비율 정의 ──
-        POS = {
-            'avatar_cx': 0.156,  'avatar_cy': 0.358,  'avatar_radius': 0.098,
-            'badge_y': 0.500,
-            'info_x': 0.305,     
-            'name_y': 0.220,     'exp_y': 0.340,      'next_role_y': 0.430,
-            'main_bar_y': 0.470, 'main_bar_w': 0.600, 'main_bar_h': 0.025,
-            'box1_x': 0.295,     'box2_x': 0.615,     'box_y': 0.685,
-            'box_w': 0.300,      'box_h': 0.175
-        }
+        base = bg_image.resize((CANVAS_WIDTH, CANVAS_HEIGHT), Image.LANCZOS)
+        draw = ImageDraw.Draw(base)
 
-        # ── 1. 아바타 ──
+        # 아바타 위치와 원형 마스크
         avatar_r = int(CANVAS_WIDTH * POS['avatar_radius'])
         avatar_size = avatar_r * 2
         avatar_x = int(CANVAS_WIDTH * POS['avatar_cx']) - avatar_r
         avatar_y = int(CANVAS_HEIGHT * POS['avatar_cy']) - avatar_r
-        self._draw_avatar(canvas, avatar_bytes, avatar_x, avatar_y, avatar_size)
+
+        # 메인 진행 바 배경
+        info_x = int(CANVAS_WIDTH * POS['info_x'])
+        main_bar = (
+            info_x,
+            int(CANVAS_HEIGHT * POS['main_bar_y']),
+            int(CANVAS_WIDTH * POS['main_bar_w']),
+            int(CANVAS_HEIGHT * POS['main_bar_h']),
+        )
+        self._draw_bar_background(draw, *main_bar)
+
+        # 하단 스탯 박스: 라벨과 진행 바 배경
+        box_y = int(CANVAS_HEIGHT * POS['box_y'])
+        box_w = int(CANVAS_WIDTH * POS['box_w'])
+        box_h = int(CANVAS_HEIGHT * POS['box_h'])
+        boxes = {}
+        for key, box_x in (('chat', int(CANVAS_WIDTH * POS['box1_x'])), ('voice', int(CANVAS_WIDTH * POS['box2_x']))):
+            layout = self._layout_stat_box(box_x, box_y, box_w, box_h)
+            draw.text((box_x + layout.pad_x, layout.inner_y), BOX_LABELS[key], fill=TEXT_LIGHT, font=self.font_box_label)
+            self._draw_bar_background(draw, box_x + layout.pad_x, layout.bar_y, layout.bar_w, layout.bar_h)
+            boxes[key] = layout
+
+        return CardTemplate(
+            base=base,
+            output_base=base.resize((OUTPUT_WIDTH, OUTPUT_HEIGHT), Image.LANCZOS),
+            output_size=(OUTPUT_WIDTH, OUTPUT_HEIGHT),
+            avatar_pos=(avatar_x, avatar_y),
+            avatar_size=avatar_size,
+            avatar_mask=_make_circle_mask(avatar_size),
+            badge_cx=int(CANVAS_WIDTH * POS['avatar_cx']),
+            badge_y=int(CANVAS_HEIGHT * POS['badge_y']),
+            info_x=info_x,
+            name_y=int(CANVAS_HEIGHT * POS['name_y']),
+            exp_y=int(CANVAS_HEIGHT * POS['exp_y']),
+            next_y=int(CANVAS_HEIGHT * POS['next_role_y']),
+            main_bar=main_bar,
+            boxes=boxes,
+        )
+
+    @staticmethod
+    def _layout_stat_box(x: int, y: int, width: int, height: int) -> StatBoxLayout:
+        pad_x = 24 * S
+        inner_y = y + int(height * 0.15)
+        bar_y = inner_y + int(height * 0.45)
+        bar_h = int(height * 0.15)
+        return StatBoxLayout(
+            x=x, y=y, width=width, pad_x=pad_x, inner_y=inner_y,
+            bar_y=bar_y, bar_w=width - (pad_x * 2), bar_h=bar_h,
+            bottom_y=bar_y + bar_h + 12 * S,
+        )
+
+    # ────────────────────────────────────────────────
+    # 카드 생성 (템플릿 복사 + 바뀌는 내용만 그림)
+    # ────────────────────────────────────────────────
+    def generate(self, data: RankCardData, avatar: Union[bytes, Image.Image, None]) -> io.BytesIO:
+        """avatar는 원본 바이트 또는 prepare_avatar()로 만든 이미지입니다."""
+        template = self._get_template()
+        canvas = template.base.copy()
+        draw = ImageDraw.Draw(canvas)
+        dirty: List[Box] = []   # 이번 카드에서 그린 영역 (이 영역만 다운스케일)
+
+        # ── 1. 아바타 ──
+        self._draw_avatar(canvas, avatar, template, dirty)
 
         # ── 2. 배지 (별 아이콘 제거) ──
-        badge_cx = int(CANVAS_WIDTH * POS['avatar_cx'])
-        badge_y = int(CANVAS_HEIGHT * POS['badge_y'])
-        self._draw_badge(canvas, badge_cx, badge_y, data.role_display) # 별(★) 제거됨
+        self._draw_badge(canvas, template.badge_cx, template.badge_y, data.role_display, dirty)
 
         # ── 3. 상단 텍스트 정보 ──
-        info_x = int(CANVAS_WIDTH * POS['info_x'])
+        info_x = template.info_x
         
         # 이름
-        name_y = int(CANVAS_HEIGHT * POS['name_y'])
-        draw.text((info_x - 20, name_y), data.user_name, fill=TEXT_WHITE, font=self.font_name)
+        self._text(draw, dirty, (info_x - 20, template.name_y), data.user_name, TEXT_WHITE, self.font_name)
 
         # 총 페이지(쪽)
-        exp_y = int(CANVAS_HEIGHT * POS['exp_y'])
+        exp_y = template.exp_y
         exp_val = f"{data.total_exp:,}"
-        draw.text((info_x, exp_y), exp_val, fill=TEXT_LIGHT, font=self.font_exp_val)
-        val_w = draw.textbbox((0, 0), exp_val, font=self.font_exp_val)[2]
-        draw.text((info_x + val_w + 8 * S, exp_y + 18 * S), "쪽", fill=TEXT_GRAY, font=self.font_exp_lbl)
+        val_w = self._text(draw, dirty, (info_x, exp_y), exp_val, TEXT_LIGHT, self.font_exp_val)[2] - info_x
+        self._text(draw, dirty, (info_x + val_w + 8 * S, exp_y + 18 * S), "쪽", TEXT_GRAY, self.font_exp_lbl)
 
         # 다음 단계
-        next_y = int(CANVAS_HEIGHT * POS['next_role_y'])
         next_text = f"다음 단계 : {data.next_role_display}" if data.next_role_display else "최고 단계 달성"
-        draw.text((info_x, next_y), next_text, fill=TEXT_GRAY, font=self.font_next_role)
+        self._text(draw, dirty, (info_x, template.next_y), next_text, TEXT_GRAY, self.font_next_role)
 
         # ── 4. 메인 진행 바 ──
-        main_bar_y = int(CANVAS_HEIGHT * POS['main_bar_y'])
-        main_bar_w = int(CANVAS_WIDTH * POS['main_bar_w'])
-        main_bar_h = int(CANVAS_HEIGHT * POS['main_bar_h'])
+        main_bar_x, main_bar_y, main_bar_w, main_bar_h = template.main_bar
 
         # 메인 진행 % 텍스트
         pct_text = f"{data.role_progress_pct:.1f}%"
         pct_w = draw.textbbox((0, 0), pct_text, font=self.font_box_val)[2]
-        draw.text(
-            (info_x + main_bar_w - pct_w, main_bar_y - int(30 * S)), 
-            pct_text, fill=THEME_COLOR_MAIN, font=self.font_box_val
+        self._text(
+            draw, dirty, (info_x + main_bar_w - pct_w, main_bar_y - int(30 * S)),
+            pct_text, THEME_COLOR_MAIN, self.font_box_val
         )
 
-        self._draw_rounded_progress_bar(
-            draw, info_x, main_bar_y, main_bar_w, main_bar_h, data.role_progress_pct
-        )
+        self._draw_bar_fill(draw, dirty, main_bar_x, main_bar_y, main_bar_w, main_bar_h, data.role_progress_pct)
 
         # ── 5. 하단 스탯 박스 (채팅/음성) ──
-        box1_x = int(CANVAS_WIDTH * POS['box1_x'])
-        box2_x = int(CANVAS_WIDTH * POS['box2_x'])
-        box_y = int(CANVAS_HEIGHT * POS['box_y'])
-        box_w = int(CANVAS_WIDTH * POS['box_w'])
-        box_h = int(CANVAS_HEIGHT * POS['box_h'])
-
         # 채팅 레벨 (왼쪽 박스)
         self._draw_stat_box_content(
-            draw, box1_x, box_y, box_w, box_h,
-            "채팅 레벨", data.chat_level_info.level, data.chat_level_info.progress_pct,
+            draw, dirty, template.boxes['chat'],
+            data.chat_level_info.level, data.chat_level_info.progress_pct,
             data.chat_level_info.current_xp, data.chat_level_info.required_xp,
             data.chat_rank, data.chat_total_users
         )
 
         # 음성 레벨 (오른쪽 박스)
         self._draw_stat_box_content(
-            draw, box2_x, box_y, box_w, box_h,
-            "음성 레벨", data.voice_level_info.level, data.voice_level_info.progress_pct,
+            draw, dirty, template.boxes['voice'],
+            data.voice_level_info.level, data.voice_level_info.progress_pct,
             data.voice_level_info.current_xp, data.voice_level_info.required_xp,
             data.voice_rank, data.voice_total_users
         )
 
         # ── 2배 → 원래 크기로 다운스케일 (LANCZOS) ──
-        output = canvas.resize((OUTPUT_WIDTH, OUTPUT_HEIGHT), Image.LANCZOS)
+        # 나머지는 템플릿의 output_base와 같으므로 그린 영역만 줄여서 덮어씁니다.
+        output = template.output_base.copy()
+        for box in dirty:
+            self._downscale_region(canvas, output, box)
 
         buffer = io.BytesIO()
-        output.save(buffer, format="PNG", quality=95)
+        output.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
         buffer.seek(0)
         return buffer
 
+    @staticmethod
+    def _text(draw: ImageDraw.ImageDraw, dirty: List[Box], xy: Tuple[int, int], text: str, fill, font) -> Box:
+        """텍스트를 그리고 그린 영역을 dirty에 추가합니다. (영역 반환)"""
+        draw.text(xy, text, fill=fill, font=font)
+        box = draw.textbbox(xy, text, font=font)
+        dirty.append(box)
+        return box
+
+    @staticmethod
+    def _downscale_region(canvas: Image.Image, output: Image.Image, box: Box):
+        """
+        2배 캔버스의 box 영역만 LANCZOS로 줄여 output에 붙입니다.
+        resize(box=...)는 필터 범위만큼 box 바깥 픽셀도 읽으므로 전체를 줄인 결과와 픽셀 단위로 같고,
+        바뀐 픽셀이 영향을 주는 주변(필터 반경)까지 포함하도록 DOWNSCALE_MARGIN만큼 넓힙니다.
+        """
+        width, height = canvas.size
+        x0 = max(0, (int(box[0]) - DOWNSCALE_MARGIN) // S * S)
+        y0 = max(0, (int(box[1]) - DOWNSCALE_MARGIN) // S * S)
+        x1 = min(width, -(-(int(box[2]) + DOWNSCALE_MARGIN) // S) * S)
+        y1 = min(height, -(-(int(box[3]) + DOWNSCALE_MARGIN) // S) * S)
+        if x1 <= x0 or y1 <= y0:
+            return
+        # RGBA resize는 원본 전체를 premultiplied로 변환하므로, 필터 반경을 포함한 영역만 잘라서 줄입니다.
+        cx0, cy0 = max(0, x0 - DOWNSCALE_MARGIN), max(0, y0 - DOWNSCALE_MARGIN)
+        source = canvas.crop((cx0, cy0, min(width, x1 + DOWNSCALE_MARGIN), min(height, y1 + DOWNSCALE_MARGIN)))
+        region = source.resize(
+            ((x1 - x0) // S, (y1 - y0) // S), Image.LANCZOS,
+            box=(x0 - cx0, y0 - cy0, x1 - cx0, y1 - cy0)
+        )
+        output.paste(region, (x0 // S, y0 // S))
+
     # ────────────────────────────────────────────────
     # 아바타 & 배지
     # ────────────────────────────────────────────────
-    def _draw_avatar(self, canvas: Image.Image, avatar_bytes: bytes, x: int, y: int, size: int):
+    def prepare_avatar(self, avatar_bytes: bytes) -> Image.Image:
+        """아바타를 디코드해 카드 크기로 줄이고 원 바깥을 비운 이미지를 만듭니다. (워커 LRU에 보관되는 단위)"""
+        template = self._get_template()
+        size = template.avatar_size
+        avatar_img = Image.open(io.BytesIO(avatar_bytes)).convert('RGBA')
+        avatar_img = avatar_img.resize((size, size), Image.LANCZOS)
+        masked = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+        masked.paste(avatar_img, (0, 0), template.avatar_mask)
+        return masked
+
+    def _draw_avatar(self, canvas: Image.Image, avatar: Union[bytes, Image.Image, None], template: CardTemplate, dirty: List[Box]):
         try:
-            avatar_img = Image.open(io.BytesIO(avatar_bytes)).convert('RGBA')
-            avatar_img = avatar_img.resize((size, size), Image.LANCZOS)
-            mask = _make_circle_mask(size)
-            canvas.paste(avatar_img, (x, y), mask)
+            if avatar is None:
+                return
+            if isinstance(avatar, (bytes, bytearray)):
+                avatar = self.prepare_avatar(avatar)
+            x, y = template.avatar_pos
+            canvas.paste(avatar, (x, y), template.avatar_mask)
+            dirty.append((x, y, x + template.avatar_size, y + template.avatar_size))
         except Exception as e:
             logger.error(f"아바타 로드 실패: {e}")
 
-    def _draw_badge(self, canvas: Image.Image, cx: int, cy: int, text: str):
-        badge_layer = Image.new('RGBA', canvas.size, (0, 0, 0, 0))
-        bd = ImageDraw.Draw(badge_layer)
-
-        text_bbox = bd.textbbox((0, 0), text, font=self.font_badge)
+    def _draw_badge(self, canvas: Image.Image, cx: int, cy: int, text: str, dirty: List[Box]):
+        text_bbox = self.font_badge.getbbox(text)
         tw = text_bbox[2] - text_bbox[0]
         th = text_bbox[3] - text_bbox[1]
 
@@ -202,75 +362,132 @@ class RankCardGenerator:
         bh = th + pad_y * 2
         bx, by = cx - bw // 2, cy
 
+        # 캔버스 전체 대신 배지 영역만 한 레이어에 그려 합성합니다. (글자가 테두리를 넘는 경우를 위한 여백 포함)
+        margin = pad_y
+        left, top = max(bx - margin, 0), max(by - margin, 0)
+        badge_layer = Image.new('RGBA', (bw + margin * 2 + 1, bh + margin * 2 + 1), (0, 0, 0, 0))
+        bd = ImageDraw.Draw(badge_layer)
+
         bd.rounded_rectangle(
-            [(bx, by), (bx + bw, by + bh)],
+            [(bx - left, by - top), (bx - left + bw, by - top + bh)],
             radius=bh // 2,
             fill=(20, 15, 10, 220),
             outline=THEME_COLOR_MAIN,
             width=max(1, 1 * S)
         )
 
-        text_x = bx + pad_x
-        text_y = by + pad_y - (2 * S)
+        text_x = bx - left + pad_x
+        text_y = by - top + pad_y - (2 * S)
         bd.text((text_x, text_y), text, fill=TEXT_WHITE, font=self.font_badge)
 
-        canvas.paste(Image.alpha_composite(canvas, badge_layer))
+        canvas.alpha_composite(badge_layer, dest=(left, top))
+        dirty.append((left, top, left + badge_layer.width, top + badge_layer.height))
 
     # ────────────────────────────────────────────────
     # 둥근 형태 프로그레스 바 (화살표 대체)
     # ────────────────────────────────────────────────
     @staticmethod
-    def _draw_rounded_progress_bar(
-        draw: ImageDraw.ImageDraw,
+    def _draw_bar_background(draw: ImageDraw.ImageDraw, x: int, y: int, width: int, height: int):
+        """양끝이 둥근 프로그레스 바의 배경 (템플릿에 미리 그림)"""
+        draw.rounded_rectangle([(x, y), (x + width, y + height)], height // 2, fill=THEME_COLOR_BAR_BG)
+
+    @staticmethod
+    def _draw_bar_fill(
+        draw: ImageDraw.ImageDraw, dirty: List[Box],
         x: int, y: int, width: int, height: int,
         progress: float
     ):
-        """양끝이 둥근 일반적인 프로그레스 바를 그립니다."""
-        # 1. 배경 바
-        draw.rounded_rectangle([(x, y), (x + width, y + height)], height // 2, fill=THEME_COLOR_BAR_BG)
-        
-        # 2. 진행 바
+        """양끝이 둥근 프로그레스 바의 진행 부분"""
         if progress > 0:
             fill_w = max(int(width * (progress / 100.0)), height)
             draw.rounded_rectangle([(x, y), (x + fill_w, y + height)], height // 2, fill=THEME_COLOR_MAIN)
+            dirty.append((x, y, x + fill_w + 1, y + height + 1))
 
     # ────────────────────────────────────────────────
-    # 하단 스탯 박스 콘텐츠
+    # 하단 스탯 박스 콘텐츠 (라벨과 바 배경은 템플릿에 있음)
     # ────────────────────────────────────────────────
     def _draw_stat_box_content(
-        self, draw: ImageDraw.ImageDraw,
-        x: int, y: int, width: int, height: int,
-        label: str, level: int, progress: float,
+        self, draw: ImageDraw.ImageDraw, dirty: List[Box], box: StatBoxLayout,
+        level: int, progress: float,
         current_xp: int, required_xp: int,
         rank: Optional[int], total_users: int
     ):
-        pad_x = 24 * S
-        inner_y = y + int(height * 0.15)
-        
-        # [상단 좌측] 라벨 & 순위
-        draw.text((x + pad_x, inner_y), label, fill=TEXT_LIGHT, font=self.font_box_label)
-        
+        x, pad_x, inner_y = box.x, box.pad_x, box.inner_y
+
+        # [상단 좌측] 순위
         if rank is not None:
             rank_text = f"{rank}등 / {total_users}명"
-            label_w = draw.textbbox((0, 0), label, font=self.font_box_label)[2]
-            draw.text((x + pad_x, inner_y + 40 * S), rank_text, fill=TEXT_DARK_GOLD, font=self.font_box_rank)
+            self._text(draw, dirty, (x + pad_x, inner_y + 40 * S), rank_text, TEXT_DARK_GOLD, self.font_box_rank)
 
         # [상단 우측] 레벨
         level_text = f"Lv. {level}"
         level_w = draw.textbbox((0, 0), level_text, font=self.font_box_level)[2]
-        draw.text((x + width - pad_x - level_w, inner_y - 8 * S), level_text, fill=TEXT_WHITE, font=self.font_box_level)
+        self._text(draw, dirty, (x + box.width - pad_x - level_w, inner_y - 8 * S), level_text, TEXT_WHITE, self.font_box_level)
 
         # [중앙] 프로그레스 바
-        bar_y = inner_y + int(height * 0.45)
-        bar_w = width - (pad_x * 2)
-        bar_h = int(height * 0.15)
-        self._draw_rounded_progress_bar(draw, x + pad_x, bar_y, bar_w, bar_h, progress)
+        self._draw_bar_fill(draw, dirty, x + pad_x, box.bar_y, box.bar_w, box.bar_h, progress)
 
         # [하단 좌/우측] XP / 퍼센트
-        bottom_y = bar_y + bar_h + 12 * S
         xp_text = f"{current_xp:,} / {required_xp:,}"
-        draw.text((x + pad_x, bottom_y), xp_text, fill=TEXT_GRAY, font=self.font_box_val)
+        self._text(draw, dirty, (x + pad_x, box.bottom_y), xp_text, TEXT_GRAY, self.font_box_val)
 
         pct_text = f"{progress:.1f}%"
         pct_w = draw.textbbox((0, 0), pct_text, font=self.font_box_val)[2]
-        draw.text((x + width - pad_x - pct_w, bottom_y), pct_text, fill=TEXT_GRAY, font=self.font_box_val)
\ No newline at end of file
+        self._text(draw, dirty, (x + box.width - pad_x - pct_w, box.bottom_y), pct_text, TEXT_GRAY, self.font_box_val)
+
+
+# ────────────────────────────────────────────────
+# 렌더링 워커 진입점 (RankCardRenderer의 프로세스/스레드 풀에서 실행)
+# ────────────────────────────────────────────────
+_worker_local = threading.local()
+
+def _get_worker_generator() -> RankCardGenerator:
+    """워커(프로세스 또는 스레드)마다 폰트를 한 번만 로드한 생성기를 재사용합니다."""
+    generator = getattr(_worker_local, "generator", None)
+    if generator is None:
+        generator = RankCardGenerator()
+        _worker_local.generator = generator
+    return generator
+
+def warm_up_worker():
+    """워커 시작 시 폰트와 배경을 미리 읽어 첫 카드가 느려지지 않게 합니다."""
+    _get_worker_generator()
+    _load_background()
+
+# 워커 메모리에 보관하는 아바타 수 (디코드·원형 마스크가 끝난 이미지, 장당 약 1.4MB)
+AVATAR_MEMORY_ITEMS = 24
+
+_avatar_lru: "OrderedDict[str, Image.Image]" = OrderedDict()
+_avatar_lock = threading.Lock()
+
+def _get_avatar(generator: RankCardGenerator, ref: AvatarRef) -> Optional[Image.Image]:
+    """워커 LRU에서 아바타 이미지를 찾고, 없으면 디스크 캐시(또는 함께 넘어온 바이트)에서 만듭니다."""
+    with _avatar_lock:
+        image = _avatar_lru.get(ref.key)
+        if image is not None:
+            _avatar_lru.move_to_end(ref.key)
+            return image
+    try:
+        if ref.data is not None:
+            avatar_bytes = ref.data
+        else:
+            with open(ref.path, "rb") as f:
+                avatar_bytes = f.read()
+        image = generator.prepare_avatar(avatar_bytes)
+    except Exception as e:
+        logger.error(f"아바타 로드 실패 ({ref.key}): {e}")
+        return None
+    with _avatar_lock:
+        _avatar_lru[ref.key] = image
+        while len(_avatar_lru) > AVATAR_MEMORY_ITEMS:
+            _avatar_lru.popitem(last=False)
+    return image
+
+def render_card(data: RankCardData, avatar: Union[AvatarRef, bytes]) -> Tuple[bytes, float]:
+    """카드를 렌더링해 (PNG 바이트, 렌더링 시간 ms)를 반환합니다. (프로세스 경계를 넘도록 bytes로 반환)"""
+    started = time.perf_counter()
+    generator = _get_worker_generator()
+    if isinstance(avatar, AvatarRef):
+        avatar = _get_avatar(generator, avatar)
+    buffer = generator.generate(data, avatar)
+    return buffer.getvalue(), (time.perf_counter() - started) * 1000
@@ -0,0 +1,132 @@
+"""
+랭크 카드 렌더링 실행기 모듈입니다.
+
+RankCardGenerator.generate는 2배 캔버스 합성, LANCZOS 리사이즈, PNG 인코딩까지 CPU를 오래 쓰므로
+이벤트 루프에서 직접 호출하면 그동안 게이트웨이 하트비트와 다른 Cog가 모두 멈춥니다.
+이 모듈은 렌더링을 프로세스 풀(기본)이나 스레드 풀로 넘기고,
+- 동시에 처리 중인 카드 수를 제한하고 (대기열이 가득 차면 RenderBusyError)
+- 워커에서 잰 렌더링 시간과 대기 시간을 기록합니다.
+프로세스 풀을 만들 수 없거나 워커가 죽으면 스레드 풀로 전환합니다.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Union
+
+from src.rankcard.RankCardGenerator import render_card, warm_up_worker
+from src.rankcard.RankCardService import RankCardData
+from src.rankcard.AvatarCache import AvatarRef
+
+# 렌더링 방식: "process" (CPU 코어에 분산) 또는 "thread"
+RENDER_MODE = "process"
+# 렌더링 워커 수
+RENDER_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# 워커당 동시에 맡기는 카드 수 (나머지는 이벤트 루프 쪽에서 대기)
+IN_FLIGHT_PER_WORKER = 2
+# 대기 중인 카드가 이만큼을 넘으면 새 요청을 거절합니다.
+MAX_PENDING = 16
+
+
+class RenderBusyError(Exception):
+    """렌더링 대기열이 가득 찼을 때 발생합니다."""
+
+
+class RankCardRenderer:
+    """랭크 카드 렌더링을 풀에 넘기고 시간을 기록합니다."""
+
+    def __init__(self, mode: str = RENDER_MODE, workers: int = RENDER_WORKERS, max_pending: int = MAX_PENDING):
+        self.mode = mode if mode in ("process", "thread") else RENDER_MODE
+        self.workers = max(1, int(workers))
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.workers * IN_FLIGHT_PER_WORKER)
+        self._pending = 0
+        self.stats = {
+            "renders": 0, "failures": 0, "rejected": 0, "fallbacks": 0,
+            "render_ms_total": 0.0, "render_ms_max": 0.0, "wait_ms_total": 0.0,
+        }
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "process":
+            try:
+                # fork는 봇의 스레드(aiosqlite 등) 잠금 상태까지 복제하므로 spawn을 사용합니다.
+                return ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_up_worker,
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                print(f"⚠️ 랭크 카드 프로세스 풀 생성 실패, 스레드 풀로 전환합니다: {e}")
+                self._switch_to_threads()
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rankcard", initializer=warm_up_worker)
+
+    def _switch_to_threads(self):
+        self.mode = "thread"
+        self.stats["fallbacks"] += 1
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def render(self, data: RankCardData, avatar: Union[AvatarRef, bytes]) -> bytes:
+        """카드를 렌더링해 PNG 바이트를 반환합니다. 대기열이 가득 차면 RenderBusyError."""
+        if self._pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise RenderBusyError("랭크 카드 요청이 많아 잠시 후 다시 시도해주세요.")
+
+        self._pending += 1
+        queued_at = time.perf_counter()
+        try:
+            async with self._slots:
+                self.stats["wait_ms_total"] += (time.perf_counter() - queued_at) * 1000
+                loop = asyncio.get_running_loop()
+                try:
+                    png, render_ms = await loop.run_in_executor(self._get_executor(), render_card, data, avatar)
+                except BrokenProcessPool:
+                    # 워커 프로세스가 죽은 경우: 스레드 풀로 전환해 한 번 더 시도합니다.
+                    self._shutdown_executor()
+                    self._switch_to_threads()
+                    png, render_ms = await loop.run_in_executor(self._get_executor(), render_card, data, avatar)
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        self.stats["renders"] += 1
+        self.stats["render_ms_total"] += render_ms
+        self.stats["render_ms_max"] = max(self.stats["render_ms_max"], render_ms)
+        return png
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def close(self):
+        """Cog 언로드 시 워커를 정리합니다."""
+        self._shutdown_executor()
+
+    def get_stats(self) -> Dict[str, object]:
+        renders = self.stats["renders"]
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "pending": self._pending,
+            "renders": renders,
+            "failures": self.stats["failures"],
+            "rejected": self.stats["rejected"],
+            "fallbacks": self.stats["fallbacks"],
+            "avg_render_ms": self.stats["render_ms_total"] / renders if renders else 0.0,
+            "max_render_ms": self.stats["render_ms_max"],
+            "avg_wait_ms": self.stats["wait_ms_total"] / renders if renders else 0.0,
+        }
+
+
+async def setup(bot):
+    pass  # 유틸리티 모듈 — Cog 없음
@@ -3,10 +3,12 @@
 음성/채팅/레벨 데이터를 각 모듈에서 읽어와 XPFormulas로 레벨을 계산합니다.
 """
 
+import asyncio
 import re
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
 
 import discord
 from discord.ext import commands
@@ -16,15 +18,21 @@ from src.core.DataManager import DataManager
 from src.core.LevelDataManager import LevelDataManager
 from src.level.LevelConstants import ROLE_THRESHOLDS, ROLE_ORDER, ROLE_DISPLAY, ROLE_EMOJI
 from src.core.ChattingDataManager import ChattingDataManager
+from src.core.voice_utils import get_tracked_channel_resolver
 from src.rankcard.XPFormulas import TieredLevelManager, LevelInfo
 
 KST = pytz.timezone("Asia/Seoul")
 
-# 누적 기간 시작일 (서버 오픈일)
-ALL_TIME_START = "2025-08-01 00:00:00"
+# 랭크 카드에 쓰는 아바타 크기
+AVATAR_SIZE = 256
 
 # 역할 승급 기준 등급표는 LevelConstants에서 import하여 사용합니다.
 
+
+def avatar_cache_key(user: discord.abc.User) -> str:
+    """아바타 캐시 키 (display_avatar의 내용 해시 + 크기). 데이터 수집 없이 계산할 수 있습니다."""
+    return f"{user.display_avatar.key}_{AVATAR_SIZE}"
+
 @dataclass
 class RankCardData:
     """랭크 카드에 표시할 모든 데이터"""
@@ -55,6 +63,9 @@ class RankCardData:
     chat_rank: Optional[int]          # 채팅 순위 (1부터)
     chat_total_users: int             # 채팅 전체 유저 수
 
+    # 아바타 캐시 키 (아바타 해시_크기)
+    avatar_key: str = ""
+
 
 
 
@@ -66,6 +77,35 @@ class RankCardService:
         self.voice_dm = DataManager()
         self.level_dm = LevelDataManager()
         self.chat_dm = ChattingDataManager()
+        # 단계별 소요 시간 {단계: {"count", "total_ms", "max_ms", "last_ms"}}
+        self.stage_stats: Dict[str, Dict[str, float]] = {}
+
+    def _record_stage(self, stage: str, started: float):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.stage_stats.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["last_ms"] = elapsed_ms
+
+    async def _timed(self, stage: str, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self._record_stage(stage, started)
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """단계별 평균/최대/마지막 소요 시간(ms)"""
+        return {
+            stage: {
+                "avg_ms": s["total_ms"] / s["count"] if s["count"] else 0.0,
+                "max_ms": s["max_ms"],
+                "last_ms": s["last_ms"],
+                "count": s["count"],
+            }
+            for stage, s in self.stage_stats.items()
+        }
 
     async def get_rank_card_data(
         self,
@@ -74,13 +114,21 @@ class RankCardService:
         """
         유저의 랭크 카드 데이터를 수집합니다.
 
+        아래 세 단계를 동시에 실행하므로 전체 지연은 가장 느린 단계 하나로 정해집니다.
         1. 레벨 시스템에서 다공/역할 정보 조회
-        2. 음성 데이터에서 누적 시간(초) 조회
-        3. 채팅 데이터에서 누적 메시지 수 조회
-        4. XPFormulas로 각각의 레벨/진행률 계산
+        2. 음성: 누적기 반영 후 추적 채널을 한 번 확인하고, 누적 시간과 순위를 한 번의 집계로 조회
+        3. 채팅: 누적 메시지 수와 순위 조회
+        이후 XPFormulas로 각각의 레벨/진행률을 계산합니다. 단계별 소요 시간은 stage_stats에 기록됩니다.
         """
+        started = time.perf_counter()
+        level_data, (voice_total, voice_rank, voice_total_users), (chat_total, chat_rank, chat_total_users) = await asyncio.gather(
+            self._timed("level", self.level_dm.get_user_exp(user.id)),
+            self._timed("voice", self._get_voice_stats(user.id)),
+            self._timed("chat", self._get_chat_total_with_rank(user)),
+        )
+        self._record_stage("total", started)
+
         # ── 1. 메인 레벨 데이터 (다공 & 경지) ──
-        level_data = await self.level_dm.get_user_exp(user.id)
         if level_data:
             total_exp = level_data['total_exp']
             current_role = level_data['current_role']
@@ -104,19 +152,13 @@ class RankCardService:
             current_role, total_exp
         )
 
-        # ── 2. 음성 데이터 (누적 초 + 순위) ──
-        voice_total = await self._get_voice_total(user.id)
-        voice_rank, voice_total_users = await self._get_voice_rank(user.id)
-
-        # ── 3. 채팅 데이터 (누적 메시지 수 + 순위) ──
-        chat_total, chat_rank, chat_total_users = await self._get_chat_total_with_rank(user)
-
         # ── 4. 티어 레벨 계산 ──
         voice_level_info = TieredLevelManager.calculate_level(voice_total, 'voice')
         chat_level_info = TieredLevelManager.calculate_level(chat_total, 'chat')
 
-        # 아바타 URL (없으면 기본 아바타)
-        avatar_url = str(user.display_avatar.replace(size=256, format="png"))
+        # 아바타 URL (없으면 기본 아바타)과 캐시 키 (URL의 내용 해시 + 크기)
+        avatar_url = str(user.display_avatar.replace(size=AVATAR_SIZE, format="png"))
+        avatar_key = avatar_cache_key(user)
 
         # 표시 이름 추출 (닉네임에서 칭호 제거)
         display_name = self._extract_name(user.display_name)
@@ -139,6 +181,7 @@ class RankCardService:
             chat_total_xp=chat_total,
             chat_rank=chat_rank,
             chat_total_users=chat_total_users,
+            avatar_key=avatar_key,
         )
 
     def _calc_role_progress(self, current_role: str, total_exp: int):
@@ -168,82 +211,43 @@ class RankCardService:
         return next_role_key, next_role_display, min(max(pct, 0.0), 100.0)
 
     async def _get_tracked_voice_channels(self) -> List[int]:
-        """음성 추적 채널 목록을 가져옵니다. (VoiceCommands와 동일한 로직)"""
+        """음성 추적 채널 목록을 가져옵니다. (/순위와 같은 확장 목록)"""
         try:
-            voice_cog = self.bot.get_cog('VoiceCommands')
-            if voice_cog and hasattr(voice_cog, 'get_expanded_tracked_channels'):
-                return await voice_cog.get_expanded_tracked_channels()
+            return list(await get_tracked_channel_resolver(self.bot).get("voice", filtered=False))
         except Exception:
-            pass
-        return None
+            return None
 
-    async def _get_voice_total(self, user_id: int) -> int:
-        """유저의 누적 음성 점수를 반환합니다. (1분당 2점, VoiceCommands.calculate_points와 동일)"""
-        try:
-            await self.voice_dm.ensure_initialized()
-            base_date = datetime.now(KST)
-            tracked = await self._get_tracked_voice_channels()
-            times, _, _ = await self.voice_dm.get_user_times(
-                user_id, '누적', base_date, tracked
-            )
-            total_seconds = sum(times.values()) if times else 0
-            return (total_seconds // 60) * 2
-        except Exception:
-            return 0
-
-    async def _get_voice_rank(self, user_id: int) -> Tuple[Optional[int], int]:
-        """유저의 누적 음성 순위를 반환합니다. (순위, 전체 유저 수)"""
+    async def _get_voice_stats(self, user_id: int) -> Tuple[int, Optional[int], int]:
+        """
+        유저의 누적 음성 점수와 순위를 한 번의 집계로 반환합니다. (점수, 순위, 전체 유저 수)
+        점수는 1분당 2점으로 VoiceCommands.calculate_points와 같습니다.
+        """
         try:
+            # 음성 누적기에 남은 시간을 먼저 반영
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             await self.voice_dm.ensure_initialized()
             base_date = datetime.now(KST)
             tracked = await self._get_tracked_voice_channels()
-            rank, total_users, _, _, _ = await self.voice_dm.get_user_rank(
+            rank, total_users, total_seconds, _, _ = await self.voice_dm.get_user_rank(
                 user_id, '누적', base_date, tracked
             )
-            return rank, total_users
+            return (total_seconds // 60) * 2, rank, total_users
         except Exception:
-            return None, 0
+            return 0, None, 0
 
     async def _get_chat_total_with_rank(
         self, user: discord.Member
     ) -> Tuple[int, Optional[int], int]:
         """
         유저의 누적 채팅 메시지 수와 순위를 반환합니다.
-        ChattingDataManager DB를 통해 조회합니다.
+        ChattingDataManager의 메시지 수 순위 인덱스를 통해 조회합니다.
 
         Returns:
             (유저 메시지 수, 순위, 전체 유저 수)
         """
         try:
-            await self.chat_dm.ensure_initialized()
-
-            end = datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S")
-
-            # 유저 채팅 수
-            user_count, _ = await self.chat_dm.get_user_chat_stats(
-                user.id, ALL_TIME_START, end
-            )
-
-            # 전체 유저 순위 (메시지 수 기준)
-            all_stats: List[Tuple[int, int, int]] = await self.chat_dm.get_all_users_stats(
-                ALL_TIME_START, end
-            )
-
-            if not all_stats:
-                return user_count, None, 0
-
-            # get_all_users_stats는 points DESC로 정렬되어 있으므로
-            # count 기준으로 다시 정렬
-            all_stats_sorted = sorted(all_stats, key=lambda x: x[1], reverse=True)
-            total_users = len(all_stats_sorted)
-
-            chat_rank = None
-            for idx, (uid, count, _) in enumerate(all_stats_sorted, start=1):
-                if uid == user.id:
-                    chat_rank = idx
-                    break
-
-            return user_count, chat_rank, total_users
+            return await self.chat_dm.get_user_count_rank(user.id)
         except Exception:
             return 0, None, 0
 
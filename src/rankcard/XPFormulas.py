@@ -5,9 +5,20 @@
 경험치 공식 (선형 증가):
   - 음성: (레벨 * 139) + 70
   - 채팅: (레벨 * 13.9) + 7  (음성의 1/10 스케일)
+
+레벨 L까지의 누적 비용은 등차수열의 합 S(L) = G·L(L-1)/2 + B·L 이므로,
+S(L) <= XP 를 만족하는 최대 L을 이차방정식의 근으로 바로 구합니다. (정수 제곱근 + 경계 보정)
+여러 유저를 한 번에 계산하는 calculate_levels는 NumPy가 있으면 배열 연산으로 처리합니다.
 """
 
+import math
 from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:   # NumPy는 선택 의존성입니다. 없으면 순수 파이썬으로 계산합니다.
+    np = None
 
 
 @dataclass
@@ -20,6 +31,39 @@ class LevelInfo:
     progress_pct: float   # 진행률 (0.0 ~ 100.0)
 
 
+@dataclass
+class LevelBatch:
+    """calculate_levels 결과. 각 필드는 입력 순서와 같은 길이의 배열(NumPy) 또는 리스트입니다."""
+    level: Sequence[int]
+    current_xp: Sequence[int]
+    required_xp: Sequence[int]
+    progress_pct: Sequence[float]
+
+
+def cumulative_xp(level: int, growth: int, base: int) -> int:
+    """레벨 0에서 level까지 올라가는 데 필요한 누적 XP: S(L) = G·L(L-1)/2 + B·L"""
+    return growth * level * (level - 1) // 2 + base * level
+
+
+def solve_level(total_xp: int, growth: int, base: int) -> int:
+    """
+    S(L) <= total_xp 인 최대 레벨 L을 반환합니다. (growth, base는 0 이상 정수, 둘 다 0이면 안 됨)
+    G·L² + (2B - G)·L - 2·XP <= 0 의 양의 근을 정수 제곱근으로 구하고,
+    내림 오차는 경계에서 한 단계씩 보정합니다.
+    """
+    if total_xp < base:
+        return 0
+    if growth == 0:
+        return total_xp // base
+    b = 2 * base - growth
+    level = (math.isqrt(b * b + 8 * growth * total_xp) - b) // (2 * growth)
+    while cumulative_xp(level + 1, growth, base) <= total_xp:
+        level += 1
+    while level > 0 and cumulative_xp(level, growth, base) > total_xp:
+        level -= 1
+    return level
+
+
 class TieredLevelManager:
     """경험치 레벨 계산기"""
 
@@ -41,6 +85,15 @@ class TieredLevelManager:
         """해당 레벨에서 다음 채팅 레벨로 올라가기 위한 XP를 반환합니다."""
         return int((level * cls.CHAT_GROWTH) + cls.CHAT_BASE)
 
+    @classmethod
+    def get_coefficients(cls, xp_type: str) -> Tuple[int, int]:
+        """XP 타입의 (레벨당 증가량, 기본 비용)을 반환합니다."""
+        if xp_type == 'voice':
+            return cls.VOICE_GROWTH, cls.VOICE_BASE
+        if xp_type == 'chat':
+            return cls.CHAT_GROWTH, cls.CHAT_BASE
+        raise ValueError(f"알 수 없는 XP 타입: {xp_type}")
+
     @classmethod
     def calculate_level(cls, total_xp: int, xp_type: str) -> LevelInfo:
         """
@@ -53,26 +106,12 @@ class TieredLevelManager:
         Returns:
             LevelInfo: 레벨, 현재 XP, 필요 XP, 진행률
         """
-        if xp_type == 'voice':
-            get_next_xp = cls.get_next_voice_xp
-        elif xp_type == 'chat':
-            get_next_xp = cls.get_next_chat_xp
-        else:
-            raise ValueError(f"알 수 없는 XP 타입: {xp_type}")
-
-        level = 0
-        remaining_xp = total_xp
-
-        # 누적 XP에서 레벨업 비용을 순차 차감
-        while True:
-            required = get_next_xp(level)
-            if remaining_xp < required:
-                break
-            remaining_xp -= required
-            level += 1
+        growth, base = cls.get_coefficients(xp_type)
+        level = solve_level(total_xp, growth, base)
 
         # 현재 레벨의 필요 XP와 진행률 계산
-        current_required = get_next_xp(level)
+        remaining_xp = total_xp - cumulative_xp(level, growth, base)
+        current_required = growth * level + base
         progress = (remaining_xp / current_required * 100) if current_required > 0 else 0.0
 
         return LevelInfo(
@@ -83,6 +122,57 @@ class TieredLevelManager:
             progress_pct=min(progress, 100.0)
         )
 
+    @classmethod
+    def calculate_levels(cls, totals: Sequence[int], xp_type: str) -> LevelBatch:
+        """
+        여러 누적 XP를 한 번에 레벨/잔여 XP/필요 XP/진행률 배열로 변환합니다. (리더보드 등)
+        NumPy가 있으면 int64 배열 연산으로 계산하고, 없으면 solve_level을 반복합니다.
+        결과는 calculate_level을 하나씩 호출한 것과 같습니다.
+        """
+        growth, base = cls.get_coefficients(xp_type)
+        if np is not None:
+            return cls._calculate_levels_numpy(np.asarray(totals, dtype=np.int64), growth, base)
+
+        levels: List[int] = []
+        current: List[int] = []
+        required: List[int] = []
+        progress: List[float] = []
+        for total_xp in totals:
+            level = solve_level(total_xp, growth, base)
+            remaining_xp = total_xp - cumulative_xp(level, growth, base)
+            current_required = growth * level + base
+            levels.append(level)
+            current.append(remaining_xp)
+            required.append(current_required)
+            progress.append(min(remaining_xp / current_required * 100, 100.0) if current_required > 0 else 0.0)
+        return LevelBatch(levels, current, required, progress)
+
+    @staticmethod
+    def _calculate_levels_numpy(totals, growth: int, base: int) -> LevelBatch:
+        """solve_level의 배열 버전. float 제곱근으로 근사한 뒤 정수 연산으로 경계를 보정합니다."""
+        def cumulative(levels):
+            return growth * levels * (levels - 1) // 2 + base * levels
+
+        if growth == 0:
+            levels = np.maximum(totals, 0) // base
+        else:
+            b = 2 * base - growth
+            disc = np.maximum(b * b + 8 * growth * totals.astype(np.float64), 0.0)
+            levels = np.floor((np.sqrt(disc) - b) / (2 * growth)).astype(np.int64)
+            levels = np.maximum(levels, 0)
+            # float 오차는 많아야 한두 단계이므로 양쪽으로 두 번씩 보정합니다.
+            for _ in range(2):
+                levels += cumulative(levels + 1) <= totals
+            for _ in range(2):
+                levels -= (levels > 0) & (cumulative(levels) > totals)
+        levels = np.where(totals < base, 0, levels)
+
+        current = totals - cumulative(levels)
+        required = growth * levels + base
+        with np.errstate(divide='ignore', invalid='ignore'):
+            progress = np.where(required > 0, current / np.where(required > 0, required, 1) * 100, 0.0)
+        return LevelBatch(levels, current, required, np.minimum(progress, 100.0))
+
 
 async def setup(bot):
     pass  # 유틸리티 모듈 — Cog 없음
@@ -1,6 +1,10 @@
+import asyncio
 import json
 import os
-from typing import Dict, Optional, Tuple, List
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, Optional, Set, Tuple, List
 
 import discord
 from discord import app_commands
@@ -20,6 +24,45 @@ TARGET_GUILD_IDS = GUILD_IDS
 
 STORAGE_FILE = "data/count_channels.json"
 
+# 디스코드 채널 이름 변경 제한: RENAME_WINDOW초에 RENAME_LIMIT번
+RENAME_LIMIT = 2
+RENAME_WINDOW = 600
+# 역할 일괄 지급처럼 이벤트가 몰릴 때 이름 변경을 한 번으로 모으는 대기 시간 (초)
+RENAME_DEBOUNCE = 5.0
+
+
+@dataclass
+class ChannelCount:
+    """
+    카운트 채널 하나의 집계 대상 멤버 집합입니다.
+    처음 한 번만 길드 멤버를 훑어 만들고, 이후에는 멤버 이벤트마다 해당 멤버 한 명만 반영합니다.
+    """
+    role_ids: Optional[FrozenSet[int]]   # None이면 서버 전체
+    include_bots: bool
+    members: Set[int] = field(default_factory=set)
+
+    def matches(self, member: discord.Member) -> bool:
+        if member.bot and not self.include_bots:
+            return False
+        if self.role_ids is None:
+            return True
+        return any(role.id in self.role_ids for role in member.roles)
+
+    def apply(self, member: discord.Member) -> bool:
+        """멤버 한 명의 포함 여부를 갱신합니다. 인원수가 바뀌면 True."""
+        if self.matches(member):
+            if member.id in self.members:
+                return False
+            self.members.add(member.id)
+            return True
+        return self.discard(member.id)
+
+    def discard(self, member_id: int) -> bool:
+        if member_id in self.members:
+            self.members.discard(member_id)
+            return True
+        return False
+
 class SingleFileStore:
     def __init__(self, path: str):
         self.path = path
@@ -72,10 +115,17 @@ class CountChannelCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.store = SingleFileStore(STORAGE_FILE)
+        self._counts: Dict[int, ChannelCount] = {}                # 채널 ID → 집계 대상 멤버
+        self._rename_tasks: Dict[int, asyncio.Task] = {}          # 채널 ID → 대기 중인 이름 변경
+        self._rename_history: Dict[int, Deque[float]] = {}        # 채널 ID → 최근 이름 변경 시각
+        self._dirty: Set[int] = set()                             # 이름 변경 중에 인원수가 바뀐 채널
+        self.stats = {"events": 0, "renames": 0, "coalesced": 0, "drift_checks": 0, "drift_fixes": 0}
         self._reconcile.start()
 
     def cog_unload(self):
         self._reconcile.cancel()
+        for task in self._rename_tasks.values():
+            task.cancel()
         
     async def cog_load(self):
         print(f"✅ {self.__class__.__name__} loaded successfully!")
@@ -125,7 +175,100 @@ class CountChannelCog(commands.Cog):
     def _is_target_guild(self, guild: discord.Guild) -> bool:
         return guild.id in TARGET_GUILD_IDS
 
+    # ===========================================
+    # 증분 집계
+    # ===========================================
+
+    @staticmethod
+    def _count_scope(guild: discord.Guild, meta: Dict) -> Tuple[Optional[FrozenSet[int]], bool]:
+        """설정에서 (집계 역할 ID 집합 또는 None, 봇 포함 여부)를 구합니다. (count_members와 같은 기준)"""
+        role_id = meta.get("role_id")
+        include_bots = meta.get("include_bots", False)
+        if not role_id or guild.get_role(role_id) is None:
+            return None, include_bots
+        return frozenset([role_id, *meta.get("additional_role_ids", [])]), include_bots
+
+    def _build_count(self, guild: discord.Guild, meta: Dict) -> ChannelCount:
+        """길드 멤버를 훑어 집계를 처음부터 만듭니다."""
+        role_ids, include_bots = self._count_scope(guild, meta)
+        counter = ChannelCount(role_ids, include_bots)
+        if role_ids is None:
+            candidates = guild.members
+        else:
+            candidates = set()
+            for rid in role_ids:
+                role = guild.get_role(rid)
+                if role:
+                    candidates.update(role.members)
+        counter.members = {m.id for m in candidates if include_bots or not m.bot}
+        return counter
+
+    def _get_count(self, guild: discord.Guild, channel_id: int, meta: Dict) -> ChannelCount:
+        """채널의 집계를 반환합니다. 없거나 설정(역할/봇 포함)이 바뀌었으면 다시 만듭니다."""
+        counter = self._counts.get(channel_id)
+        if counter is None or (counter.role_ids, counter.include_bots) != self._count_scope(guild, meta):
+            counter = self._build_count(guild, meta)
+            self._counts[channel_id] = counter
+        return counter
+
+    def _drop_count(self, channel_id: int):
+        self._counts.pop(channel_id, None)
+        self._dirty.discard(channel_id)
+        task = self._rename_tasks.pop(channel_id, None)
+        if task:
+            task.cancel()
+
+    def _apply_member_event(self, member: discord.Member, removed: bool = False):
+        """멤버 한 명의 변화를 모든 카운트 채널에 반영하고, 인원수가 바뀐 채널의 이름 변경을 예약합니다."""
+        self.stats["events"] += 1
+        guild = member.guild
+        for cid, meta in self.store.all_items():
+            if not isinstance(guild.get_channel(cid), discord.VoiceChannel):
+                continue
+            counter = self._get_count(guild, cid, meta)
+            changed = counter.discard(member.id) if removed else counter.apply(member)
+            if changed:
+                self._schedule_rename(guild, cid)
+
+    # ===========================================
+    # 이름 변경 (디바운스 + 10분 2회 제한)
+    # ===========================================
+
+    def _schedule_rename(self, guild: discord.Guild, channel_id: int):
+        task = self._rename_tasks.get(channel_id)
+        if task is not None and not task.done():
+            # 대기 중인 변경이 실행될 때 최신 인원수를 읽으므로 합쳐집니다.
+            self.stats["coalesced"] += 1
+            self._dirty.add(channel_id)
+            return
+        self._rename_tasks[channel_id] = asyncio.create_task(self._rename_later(guild, channel_id))
+
+    async def _wait_rename_slot(self, channel_id: int):
+        """최근 RENAME_WINDOW초 안의 이름 변경이 RENAME_LIMIT번이면 가장 오래된 변경이 창을 벗어날 때까지 기다립니다."""
+        history = self._rename_history.get(channel_id)
+        if history and len(history) >= RENAME_LIMIT:
+            wait = history[0] + RENAME_WINDOW - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def _rename_later(self, guild: discord.Guild, channel_id: int):
+        try:
+            while True:
+                await asyncio.sleep(RENAME_DEBOUNCE)
+                await self._wait_rename_slot(channel_id)
+                self._dirty.discard(channel_id)
+                await self.update_one_channel(guild, channel_id)
+                # 이름을 바꾸는 동안 인원수가 또 바뀌었으면 한 번 더 (다음 슬롯에서)
+                if channel_id not in self._dirty:
+                    return
+        except Exception as e:
+            print(f"❌ 카운트 채널 {channel_id} 이름 변경 중 오류: {e}")
+        finally:
+            if self._rename_tasks.get(channel_id) is asyncio.current_task():
+                self._rename_tasks.pop(channel_id, None)
+
     async def update_one_channel(self, guild: discord.Guild, channel_id: int):
+        """채널 이름을 현재 집계 인원수로 맞춥니다. (직접 호출하지 말고 _schedule_rename을 거칩니다)"""
         if not self._is_target_guild(guild):
             return
         meta = self.store.get(channel_id)
@@ -136,11 +279,7 @@ class CountChannelCog(commands.Cog):
             return
 
         role_id = meta.get("role_id")
-        include_bots = meta.get("include_bots", False)
-        additional_role_ids = meta.get("additional_role_ids", [])
-        
         role = guild.get_role(role_id) if role_id else None
-        additional_roles = [guild.get_role(rid) for rid in additional_role_ids if guild.get_role(rid)]
 
         current_prefix = self.extract_prefix(channel.name)
         if current_prefix and current_prefix != meta.get("prefix"):
@@ -148,24 +287,40 @@ class CountChannelCog(commands.Cog):
             self.store.save()
 
         prefix = meta.get("prefix") or (role.name if role else "전체 인원: ")
-        count = self.count_members(guild, role, include_bots, additional_roles)
+        count = len(self._get_count(guild, channel_id, meta).members)
         desired = self.build_name(prefix, count)
 
         if channel.name != desired:
             try:
                 await channel.edit(name=desired, reason="역할 카운트 자동 업데이트")
+                self._rename_history.setdefault(channel_id, deque(maxlen=RENAME_LIMIT)).append(time.monotonic())
+                self.stats["renames"] += 1
             except discord.Forbidden:
                 await self.log(f"❌ 카운트 채널 {channel.name} 수정 권한 부족 [길드: {guild.name}({guild.id}), 채널: {channel.name}({channel.id})] [시스템]")
             except discord.HTTPException as e:
                 await self.log(f"❌ 카운트 채널 {channel.name} 수정 실패: {e} [길드: {guild.name}({guild.id}), 채널: {channel.name}({channel.id})] [시스템]")
 
-    async def update_all_channels(self, guild: Optional[discord.Guild] = None):
-        g = guild or None
-        if not g or not self._is_target_guild(g):
-            return
-        
-        for cid, _ in self.store.all_items():
-            await self.update_one_channel(g, cid)
+    async def check_drift(self, guild: discord.Guild):
+        """
+        증분 집계가 실제 멤버 목록과 어긋났는지 확인합니다. (이벤트 누락, 재연결 등)
+        어긋났으면 새로 만든 집계로 바꾸고, 채널 이름이 인원수와 다르면 이름 변경을 예약합니다.
+        """
+        for cid, meta in self.store.all_items():
+            channel = guild.get_channel(cid)
+            if not isinstance(channel, discord.VoiceChannel):
+                continue
+            self.stats["drift_checks"] += 1
+            fresh = self._build_count(guild, meta)
+            current = self._counts.get(cid)
+            if current is not None and current.members != fresh.members:
+                self.stats["drift_fixes"] += 1
+                await self.log(
+                    f"⚠️ 카운트 채널 {channel.name} 집계 보정: {len(current.members)} → {len(fresh.members)}명 "
+                    f"[길드: {guild.name}({guild.id}), 채널: {channel.name}({channel.id})] [시스템]"
+                )
+            self._counts[cid] = fresh
+            if channel.name != self.build_name(self.extract_prefix(channel.name), len(fresh.members)):
+                self._schedule_rename(guild, cid)
 
     async def set_voice_permissions(self, channel: discord.VoiceChannel):
         overwrites = {
@@ -180,11 +335,12 @@ class CountChannelCog(commands.Cog):
 
     @tasks.loop(minutes=10)
     async def _reconcile(self):
+        """증분 집계의 드리프트 확인 (첫 실행에서 집계를 만듭니다)"""
         for guild in self.bot.guilds:
             if not self._is_target_guild(guild):
                 continue
             try:
-                await self.update_all_channels(guild)
+                await self.check_drift(guild)
             except Exception as e:
                 await self.log(f"❌ 길드 {guild.name} 카운트 채널 정기 업데이트 중 오류: {e} [길드: {guild.name}({guild.id})] [시스템]")
 
@@ -197,19 +353,19 @@ class CountChannelCog(commands.Cog):
         if not self._is_target_guild(before.guild):
             return
         if set(before.roles) != set(after.roles):
-            await self.update_all_channels(after.guild)
+            self._apply_member_event(after)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         if not self._is_target_guild(member.guild):
             return
-        await self.update_all_channels(member.guild)
+        self._apply_member_event(member)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         if not self._is_target_guild(member.guild):
             return
-        await self.update_all_channels(member.guild)
+        self._apply_member_event(member, removed=True)
 
     count_group = app_commands.Group(name="카운트", description="역할 카운트 채널 관리")
 
@@ -278,6 +434,7 @@ class CountChannelCog(commands.Cog):
 
         await self.set_voice_permissions(channel)
         self.store.set(channel.id, role.id if role else None, prefix, bool(봇포함), additional_role_ids)
+        self._get_count(guild, channel.id, self.store.get(channel.id))
 
         additional_info = ""
         if additional_roles:
@@ -302,6 +459,7 @@ class CountChannelCog(commands.Cog):
             return await interaction.response.send_message("해당 채널은 카운트 채널로 관리되고 있지 않아요.", ephemeral=True)
 
         self.store.delete(채널.id)
+        self._drop_count(채널.id)
         try:
             await 채널.delete(reason="카운트 채널 삭제")
             await self.log(f"🗑️ 카운트 채널 삭제: {채널.name} [길드: {interaction.guild.name}({interaction.guild.id}), 채널: {interaction.channel.name if interaction.channel else 'DM'}({interaction.channel_id})] [유저: {interaction.user.id}]")
@@ -345,6 +503,7 @@ class CountChannelCog(commands.Cog):
                 lines.append(f"• {ch.mention} — 역할: {role_txt} / 접두어: `{prefix}` / 봇: {inc_bots}")
             else:
                 self.store.delete(cid)
+                self._drop_count(cid)
                 cleaned_count += 1
         
         if cleaned_count > 0:
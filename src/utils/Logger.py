@@ -1,24 +1,93 @@
 import discord
 from discord.ext import commands
+import asyncio
 import datetime
 import json
+import logging
 import os
-import inspect
+import sys
+from dataclasses import dataclass
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+import aiohttp
 import pytz
 
+KST = pytz.timezone("Asia/Seoul")
+
+# 대기열 최대 길이. 가득 차면 새 로그를 버립니다.
+LOG_QUEUE_MAX = 1000
+# 대기열이 이만큼 쌓이면 LOG_SAMPLE_RATE건 중 1건만 받습니다.
+LOG_SAMPLE_THRESHOLD = 300
+LOG_SAMPLE_RATE = 10
+# 첫 로그가 들어온 뒤 이만큼(초) 모았다가 한 번에 보냅니다.
+LOG_FLUSH_INTERVAL = 1.0
+# 디스코드 제한: 메시지당 임베드 10개, 임베드 전체 6000자, 설명 4096자
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_EMBED_CHARS = 6000
+EMBED_DESCRIPTION_MAX = 4096
+# 디스코드로 보내지 못한 로그를 남기는 파일
+LOG_FALLBACK_FILE = "data/logs/logger_fallback.log"
+LOG_FALLBACK_MAX_BYTES = 5 * 1024 * 1024
+LOG_FALLBACK_BACKUPS = 3
+
+# 디스코드에 닿지 못한 것으로 보는 전송 오류
+SEND_ERRORS = (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError, OSError)
+
+
+@dataclass
+class LogEntry:
+    """대기열의 로그 한 건"""
+    title: str
+    message: str
+    color: discord.Color
+    footer: str
+    created_at: datetime.datetime
+    embed: Optional[discord.Embed] = None   # 호출한 쪽이 직접 만든 임베드 (합치지 않음)
+
+    def key(self):
+        return self.title, self.color.value, self.footer
+
+
 class Logger(commands.Cog):
+    """
+    로그 채널 전송 Cog입니다.
+
+    log()는 대기열에 넣고 바로 돌아옵니다. 백그라운드 작성기가 LOG_FLUSH_INTERVAL 동안 모은 로그를
+    - 제목/색/모듈이 같은 연속 로그는 한 임베드로 합치고
+    - 임베드 10개 / 6000자 단위로 메시지 하나에 담아 보냅니다.
+    대기열이 넘치면 샘플링하거나 버리고(건수는 다음 전송에 표시), 디스코드로 보내지 못하면 LOG_FALLBACK_FILE에 남깁니다.
+    """
+
     def __init__(self, bot):
         self.bot = bot
         self.log_channel_id = self._load_log_channel()
+        self._queue: "asyncio.Queue[LogEntry]" = asyncio.Queue()
+        self._flush_now = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._sample_counter = 0
+        self._unreported = {"dropped": 0, "sampled_out": 0}
+        self._fallback: Optional[logging.Logger] = None
+        self.stats = {
+            "queued": 0, "dropped": 0, "sampled_out": 0,
+            "messages": 0, "entries_sent": 0, "send_failures": 0, "fallback_entries": 0,
+        }
 
     async def cog_load(self):
         # Logger cog를 가져와서 로그를 전송
         try:
+            self._writer = asyncio.create_task(self._write_loop())
             print(f"✅ {self.__class__.__name__} loaded successfully!")
 
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로드 중 오류 발생: {e}")
-        
+
+    async def cog_unload(self):
+        if self._writer:
+            self._writer.cancel()
+        # 보내지 못한 로그는 파일에 남깁니다.
+        self._write_fallback(self._take_pending())
+
     def _load_log_channel(self):
         """설정 파일에서 로그 채널 ID를 로드합니다."""
         try:
@@ -29,67 +98,230 @@ class Logger(commands.Cog):
         except Exception as e:
             print(f"로그 채널 설정 로드 중 오류 발생: {e}")
         return None
-    
+
     def _save_log_channel(self, channel_id):
         """로그 채널 ID를 설정 파일에 저장합니다."""
         os.makedirs('config', exist_ok=True)
         with open('config/logger_config.json', 'w') as f:
             json.dump({'log_channel_id': channel_id}, f)
-    
+
     @commands.command(name='로그채널설정')
     @commands.is_owner()
     async def set_log_channel(self, ctx, channel: discord.TextChannel = None):
         """로그를 전송할 채널을 설정합니다."""
         if channel is None:
             channel = ctx.channel
-            
+
         self.log_channel_id = channel.id
         self._save_log_channel(channel.id)
         await ctx.send(f"로그 채널이 {channel.mention}로 설정되었습니다.")
         await self.log(f"로그 채널이 {channel.name} ({channel.id})로 설정되었습니다. [길드: {ctx.guild.name if ctx.guild else 'DM'}({ctx.guild.id if ctx.guild else 'N/A'}), 채널: {ctx.channel.name if hasattr(ctx.channel, 'name') else 'DM'}({ctx.channel.id})]")
-    
+
     async def log(self, message=None, file_name=None, title="📝 시스템 로그", color=discord.Color.blue(), embed=None):
-        """로그 메시지를 지정된 채널에 전송합니다."""
+        """로그 메시지를 대기열에 넣습니다. 전송은 백그라운드 작성기가 합니다."""
         if not self.log_channel_id:
             return
-            
-        channel = self.bot.get_channel(self.log_channel_id)
-        if not channel:
+
+        size = self._queue.qsize()
+        if size >= LOG_QUEUE_MAX:
+            self.stats["dropped"] += 1
+            self._unreported["dropped"] += 1
             return
-            
+        if size >= LOG_SAMPLE_THRESHOLD:
+            self._sample_counter += 1
+            if self._sample_counter % LOG_SAMPLE_RATE:
+                self.stats["sampled_out"] += 1
+                self._unreported["sampled_out"] += 1
+                return
+
         # 파일명이 지정되지 않은 경우 호출한 파일의 이름을 가져옵니다
         if file_name is None:
             try:
-                frame = inspect.currentframe().f_back
-                file_name = os.path.basename(frame.f_code.co_filename)
+                file_name = os.path.basename(sys._getframe(1).f_code.co_filename)
             except Exception:
                 file_name = "Unknown"
-        
-        # 한국 시간대로 변환
-        kr_tz = pytz.timezone("Asia/Seoul")
-        kr_time = datetime.datetime.now(kr_tz)
-        
-        if embed is None:
-            log_embed = discord.Embed(
-                title=title,
-                description=str(message) if message else "",
-                color=color,
-                timestamp=kr_time
-            )
-            log_embed.set_footer(text=f"모듈: {file_name}")
-        else:
-            log_embed = embed
-            if message and not log_embed.description:
-                log_embed.description = str(message)
+
+        self.stats["queued"] += 1
+        self._queue.put_nowait(LogEntry(
+            title=title,
+            message=str(message) if message else "",
+            color=color,
+            footer=f"모듈: {file_name}",
+            created_at=datetime.datetime.now(KST),
+            embed=embed,
+        ))
+
+    async def flush(self, timeout: float = 10.0):
+        """대기열의 로그를 지금 보내고, 모두 처리될 때까지(최대 timeout초) 기다립니다. (종료 전 호출)"""
+        self._flush_now.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ 로그 대기열을 {timeout}초 안에 비우지 못했습니다. (남은 {self._queue.qsize()}건)")
+
+    def get_stats(self):
+        return {**self.stats, "pending": self._queue.qsize()}
+
+    # ===========================================
+    # 백그라운드 작성기
+    # ===========================================
+
+    async def _write_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            first = await self._queue.get()
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            batch = [first] + self._take_pending()
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                print(f"로그 전송 중 오류 발생: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _take_pending(self) -> List[LogEntry]:
+        entries = []
+        while True:
+            try:
+                entries.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return entries
+
+    def _overload_entry(self) -> Optional[LogEntry]:
+        dropped, sampled = self._unreported["dropped"], self._unreported["sampled_out"]
+        if not dropped and not sampled:
+            return None
+        self._unreported = {"dropped": 0, "sampled_out": 0}
+        return LogEntry(
+            title="⚠️ 로그 과부하",
+            message=f"대기열이 넘쳐 로그 {dropped}건을 버리고, {sampled}건을 샘플링으로 건너뛰었습니다.",
+            color=discord.Color.orange(),
+            footer="모듈: Logger.py",
+            created_at=datetime.datetime.now(KST),
+        )
+
+    async def _deliver(self, batch: List[LogEntry]):
+        notice = self._overload_entry()
+        if notice:
+            batch = [notice] + batch
+        messages = self._pack(self._coalesce(batch))
+
+        channel = self.bot.get_channel(self.log_channel_id)
+        if channel is None:
+            self._write_fallback(batch)
+            return
+
+        for i, (embeds, entries) in enumerate(messages):
+            try:
+                await channel.send(embeds=embeds)
+            except SEND_ERRORS as e:
+                print(f"로그 전송 중 오류 발생: {e}")
+                self.stats["send_failures"] += 1
+                # 이번 묶음의 남은 로그는 파일로 (다음 묶음은 다시 디스코드로 시도)
+                self._write_fallback([entry for _, rest in messages[i:] for entry in rest])
+                return
+            self.stats["messages"] += 1
+            self.stats["entries_sent"] += len(entries)
+
+    @staticmethod
+    def _line(entry: LogEntry) -> str:
+        return f"<t:{int(entry.created_at.timestamp())}:T> {entry.message}"
+
+    def _coalesce(self, batch: List[LogEntry]) -> List[tuple]:
+        """연속된 같은 종류의 로그를 한 임베드로 합칩니다. [(임베드, 포함된 로그 목록)]"""
+        groups: List[List[LogEntry]] = []
+        length = 0
+        for entry in batch:
+            current = groups[-1] if groups else None
+            line_length = len(self._line(entry)) + 1
+            if (
+                current and entry.embed is None and current[0].embed is None
+                and current[0].key() == entry.key() and length + line_length <= EMBED_DESCRIPTION_MAX
+            ):
+                current.append(entry)
+                length += line_length
+            else:
+                groups.append([entry])
+                length = line_length
+        return [(self._build_embed(group), group) for group in groups]
+
+    @staticmethod
+    def _build_embed(group: List[LogEntry]) -> discord.Embed:
+        first, last = group[0], group[-1]
+        if first.embed is not None:
+            log_embed = first.embed
+            if first.message and not log_embed.description:
+                log_embed.description = first.message
             if not log_embed.timestamp:
-                log_embed.timestamp = kr_time
+                log_embed.timestamp = first.created_at
             if not log_embed.footer.text:
-                log_embed.set_footer(text=f"모듈: {file_name}")
+                log_embed.set_footer(text=first.footer)
+            return log_embed
 
+        if len(group) == 1:
+            description = first.message
+        else:
+            description = "\n".join(Logger._line(entry) for entry in group)
+        log_embed = discord.Embed(
+            title=first.title,
+            description=description[:EMBED_DESCRIPTION_MAX],
+            color=first.color,
+            timestamp=last.created_at
+        )
+        footer = first.footer if len(group) == 1 else f"{first.footer} · {len(group)}건"
+        log_embed.set_footer(text=footer)
+        return log_embed
+
+    @staticmethod
+    def _pack(embeds: List[tuple]) -> List[tuple]:
+        """임베드를 메시지 단위(10개 / 6000자)로 나눕니다. [(임베드 목록, 포함된 로그 목록)]"""
+        messages = []
+        current, entries, chars = [], [], 0
+        for log_embed, group in embeds:
+            size = len(log_embed)
+            if current and (len(current) >= EMBEDS_PER_MESSAGE or chars + size > MESSAGE_EMBED_CHARS):
+                messages.append((current, entries))
+                current, entries, chars = [], [], 0
+            current.append(log_embed)
+            entries.extend(group)
+            chars += size
+        if current:
+            messages.append((current, entries))
+        return messages
+
+    # ===========================================
+    # 파일 대체 기록
+    # ===========================================
+
+    def _write_fallback(self, entries: List[LogEntry]):
+        if not entries:
+            return
         try:
-            await channel.send(embed=log_embed) 
+            if self._fallback is None:
+                os.makedirs(os.path.dirname(LOG_FALLBACK_FILE), exist_ok=True)
+                handler = RotatingFileHandler(
+                    LOG_FALLBACK_FILE, maxBytes=LOG_FALLBACK_MAX_BYTES,
+                    backupCount=LOG_FALLBACK_BACKUPS, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self._fallback = logging.getLogger("bot.logger.fallback")
+                self._fallback.propagate = False
+                self._fallback.setLevel(logging.INFO)
+                self._fallback.addHandler(handler)
+            for entry in entries:
+                message = entry.message or (entry.embed.description if entry.embed else "") or ""
+                title = entry.title if entry.embed is None else (entry.embed.title or entry.title)
+                self._fallback.info(
+                    f"{entry.created_at.strftime('%Y-%m-%d %H:%M:%S')} [{title}] {message} ({entry.footer})"
+                )
+            self.stats["fallback_entries"] += len(entries)
         except Exception as e:
-            print(f"로그 전송 중 오류 발생: {e}")
+            print(f"로그 파일 기록 중 오류 발생: {e}")
 
     # Cog error handler
     async def cog_command_error(self, ctx, error):
@@ -97,4 +329,4 @@ class Logger(commands.Cog):
         await self.log(f"An error occurred in the {self.__class__.__name__} cog: {error} [길드: {ctx.guild.name if ctx.guild else 'DM'}, 채널: {ctx.channel.name if hasattr(ctx.channel, 'name') else 'DM'}({ctx.channel.id})]")
 
 async def setup(bot):
-    await bot.add_cog(Logger(bot))
\ No newline at end of file
+    await bot.add_cog(Logger(bot))
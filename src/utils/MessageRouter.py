@@ -0,0 +1,233 @@
+import asyncio
+import time
+import traceback
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import discord
+from discord.ext import commands
+
+from src.core.message_routing import ROUTE_ATTR, MessageContext, RouteSpec, resolve_target
+
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str           # "Cog.method"
+    cog_name: str
+    handler: object     # 바인딩된 메서드
+    spec: RouteSpec
+
+
+class MessageRouter(commands.Cog):
+    """
+    모든 on_message 처리를 한곳에서 분배하는 Cog.
+    메시지를 한 번만 분류(MessageContext)하고 채널/카테고리/포럼 ID로 미리 만들어 둔 dict에서
+    처리 함수를 찾아 호출합니다. 처리 함수별 호출 수/누적/최대 시간을 기록합니다.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._routes: Dict[str, Route] = {}
+        self._by_channel: Dict[int, Tuple[Route, ...]] = {}
+        self._by_category: Dict[int, Tuple[Route, ...]] = {}
+        self._by_forum: Dict[int, Tuple[Route, ...]] = {}
+        self._accepts_bots = False
+        self._store_snapshots: List[Tuple[object, object]] = []   # (store, 표를 만들 때 본 스냅샷)
+        self._dirty = True
+        self.handler_stats: Dict[str, HandlerStats] = defaultdict(HandlerStats)
+        self.message_stats = {"seen": 0, "routed": 0}
+
+    async def cog_load(self):
+        # 라우터보다 먼저 로드된 Cog의 처리 함수도 등록합니다.
+        for cog in list(self.bot.cogs.values()):
+            if cog is not self:
+                self.register_cog(cog)
+        print(f"✅ {self.__class__.__name__} loaded successfully!")
+
+    async def log(self, message):
+        try:
+            logger = self.bot.get_cog('Logger')
+            if logger:
+                await logger.log(message, title="🛠️ 유틸리티 로그", color=discord.Color.dark_grey())
+        except Exception as e:
+            print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
+
+    # ===========================================
+    # 등록
+    # ===========================================
+
+    def register_cog(self, cog: commands.Cog):
+        """cog의 @message_route 처리 함수를 등록합니다. (같은 Cog를 다시 등록하면 교체)"""
+        self.unregister_cog(cog)
+        for attr in dir(type(cog)):
+            func = getattr(type(cog), attr, None)
+            spec = getattr(func, ROUTE_ATTR, None)
+            if spec is None:
+                continue
+            name = f"{cog.qualified_name}.{attr}"
+            self._routes[name] = Route(name, cog.qualified_name, getattr(cog, attr), spec)
+        self._dirty = True
+
+    def unregister_cog(self, cog: commands.Cog):
+        names = [name for name, route in self._routes.items() if route.cog_name == cog.qualified_name]
+        for name in names:
+            del self._routes[name]
+        if names:
+            self._dirty = True
+
+    def _needs_rebuild(self) -> bool:
+        if self._dirty:
+            return True
+        for store, seen in self._store_snapshots:
+            if store.get() is not seen:
+                return True
+        return False
+
+    def _rebuild(self):
+        by_channel = defaultdict(list)
+        by_category = defaultdict(list)
+        by_forum = defaultdict(list)
+        snapshots = {}
+
+        for route in self._routes.values():
+            spec = route.spec
+            snapshot = None
+            if spec.store is not None:
+                snapshot = snapshots.setdefault(id(spec.store), (spec.store, spec.store.get()))[1]
+            for cid in resolve_target(spec.channels, snapshot):
+                by_channel[cid].append(route)
+            for cid in resolve_target(spec.categories, snapshot):
+                by_category[cid].append(route)
+            for cid in resolve_target(spec.forums, snapshot):
+                by_forum[cid].append(route)
+
+        self._by_channel = {k: tuple(v) for k, v in by_channel.items()}
+        self._by_category = {k: tuple(v) for k, v in by_category.items()}
+        self._by_forum = {k: tuple(v) for k, v in by_forum.items()}
+        self._accepts_bots = any(r.spec.include_bots for r in self._routes.values())
+        self._store_snapshots = list(snapshots.values())
+        self._dirty = False
+
+    # ===========================================
+    # 분배
+    # ===========================================
+
+    def match(self, ctx: MessageContext) -> List[Route]:
+        """ctx에 해당하는 처리 함수 목록 (등록 순서, 중복 제거)"""
+        if self._needs_rebuild():
+            self._rebuild()
+
+        candidates = []
+        channel_routes = self._by_channel.get(ctx.channel_id)
+        if channel_routes:
+            candidates.extend(channel_routes)
+        if ctx.category_id is not None:
+            category_routes = self._by_category.get(ctx.category_id)
+            if category_routes:
+                candidates.extend(category_routes)
+        if ctx.is_thread:
+            # 스레드 제외 라우트는 채널/카테고리 매치에서 빼고, 포럼 라우트는 스레드 메시지만 받습니다.
+            candidates = [r for r in candidates if r.spec.threads]
+            forum_routes = self._by_forum.get(ctx.parent_id)
+            if forum_routes:
+                candidates.extend(forum_routes)
+
+        matched = []
+        for route in candidates:
+            spec = route.spec
+            if ctx.is_bot and not spec.include_bots:
+                continue
+            if spec.default_only and not ctx.is_default:
+                continue
+            if route not in matched:
+                matched.append(route)
+        return matched
+
+    async def _run(self, route: Route, ctx: MessageContext):
+        stats = self.handler_stats[route.name]
+        started = time.perf_counter()
+        try:
+            await route.handler(ctx.message, ctx)
+        except Exception as e:
+            stats.errors += 1
+            traceback.print_exc()
+            await self.log(f"메시지 처리 함수 {route.name} 실행 중 오류 발생: {e} (메시지 ID: {ctx.message.id})")
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        self.message_stats["seen"] += 1
+        # 봇 메시지를 받는 라우트가 없으면 분류 전에 버립니다.
+        if message.author.bot and not self._accepts_bots and not self._dirty:
+            return
+
+        ctx = MessageContext.classify(message)
+        routes = self.match(ctx)
+        if not routes:
+            return
+
+        self.message_stats["routed"] += 1
+        if len(routes) == 1:
+            await self._run(routes[0], ctx)
+        else:
+            # 한 처리 함수의 대기(REST 호출, 지연 응답)가 다른 처리 함수를 늦추지 않도록 동시에 실행합니다.
+            await asyncio.gather(*(self._run(route, ctx) for route in routes))
+
+    # ===========================================
+    # 통계
+    # ===========================================
+
+    def get_stats(self, limit: int = 5) -> Dict[str, object]:
+        """누적 시간이 큰 순서로 처리 함수 통계를 반환합니다."""
+        ranked = sorted(self.handler_stats.items(), key=lambda kv: kv[1].total_ms, reverse=True)
+        return {
+            **self.message_stats,
+            "routes": len(self._routes),
+            "handlers": [
+                {
+                    "name": name,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "avg_ms": s.total_ms / s.calls if s.calls else 0.0,
+                    "max_ms": s.max_ms,
+                    "total_ms": s.total_ms,
+                }
+                for name, s in ranked[:limit]
+            ],
+        }
+
+    @commands.command(name='라우터통계')
+    @commands.is_owner()
+    async def router_stats(self, ctx):
+        """메시지 처리 함수별 호출 수와 소요 시간을 보여줍니다."""
+        stats = self.get_stats(limit=len(self.handler_stats))
+        embed = discord.Embed(
+            title="메시지 라우터 통계",
+            description=f"수신 {stats['seen']}건 / 분배 {stats['routed']}건 / 등록된 처리 함수 {stats['routes']}개",
+            color=discord.Color.dark_grey(),
+        )
+        for h in stats["handlers"][:25]:
+            embed.add_field(
+                name=h["name"],
+                value=f"{h['calls']}회 · 평균 {h['avg_ms']:.1f}ms · 최대 {h['max_ms']:.0f}ms · 누적 {h['total_ms'] / 1000:.1f}s · 오류 {h['errors']}회",
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(MessageRouter(bot))
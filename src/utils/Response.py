@@ -5,6 +5,8 @@ import random
 import discord
 from discord.ext import commands
 
+from src.core.message_routing import MessageContext, message_route, register_routes, unregister_routes
+
 MAIN_CHANNEL_ID = 1474014240896585880
 
 class Response(commands.Cog):
@@ -29,10 +31,14 @@ class Response(commands.Cog):
 
     async def cog_load(self):
         try:
+            register_routes(self.bot, self)
             print(f"✅ {self.__class__.__name__} loaded successfully!")
 
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로드 중 오류 발생: {e}")
+
+    async def cog_unload(self):
+        unregister_routes(self.bot, self)
             
     async def _check_owner(self, ctx):
         """명령어를 실행하는 사용자가 봇의 주인인지 확인"""
@@ -65,14 +71,8 @@ class Response(commands.Cog):
         except Exception as e:
             await self.log(f"Reply 명령어 실행 중 오류 발생: {str(e)} (사용자: {ctx.author.name})")
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-        
-        if message.channel.id != MAIN_CHANNEL_ID:
-            return
-        
+    @message_route(channels=MAIN_CHANNEL_ID)
+    async def on_main_channel_message(self, message: discord.Message, ctx: MessageContext):
         user_pattern = r"<@(\d+)>"
         user_matches = re.findall(user_pattern, message.content)
 
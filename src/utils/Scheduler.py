@@ -1,25 +1,172 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import pytz
-import logging
-from typing import List, Callable, Dict, Any
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core import scheduler_db
 
 KST = pytz.timezone("Asia/Seoul")
 
+# 놓친 실행(재시작, 루프 지연 등) 처리 정책
+CATCH_UP_SKIP = "skip"   # 놓친 실행은 건너뛰고 다음 예정 시각부터
+CATCH_UP_ONCE = "once"   # 여러 번 놓쳤어도 한 번만 바로 실행
+CATCH_UP_ALL = "all"     # 놓친 실행을 모두 차례로 실행 (최대 MAX_CATCH_UP_RUNS번)
+CATCH_UP_POLICIES = (CATCH_UP_SKIP, CATCH_UP_ONCE, CATCH_UP_ALL)
+
+# 예정 시각에서 이만큼(초) 늦은 실행까지는 놓친 것으로 보지 않습니다.
+MISFIRE_GRACE = 60
+# CATCH_UP_ALL 작업이 연속으로 따라잡는 최대 횟수
+MAX_CATCH_UP_RUNS = 24
+# 예정된 작업이 없거나 멀어도 이 간격(초)마다 깨어나 시계 변경을 반영합니다.
+MAX_SLEEP = 60
+
+
+class DailyRule:
+    """매일 KST hour:minute:second"""
+
+    def __init__(self, hour: int, minute: int, second: int = 0):
+        self.hour, self.minute, self.second = hour, minute, second
+        self.spec = f"daily {hour:02d}:{minute:02d}:{second:02d}"
+
+    def _at(self, day: datetime) -> datetime:
+        return KST.localize(datetime(day.year, day.month, day.day, self.hour, self.minute, self.second))
+
+    def next_after(self, ts: float) -> Optional[float]:
+        now = datetime.fromtimestamp(ts, KST)
+        candidate = self._at(now)
+        if candidate.timestamp() <= ts:
+            candidate = self._at(now + timedelta(days=1))
+        return candidate.timestamp()
+
+    def first_run(self, now: float) -> Optional[float]:
+        return self.next_after(now)
+
+    def describe(self) -> str:
+        return f"매일 {self.hour:02d}:{self.minute:02d}:{self.second:02d} KST"
+
+
+class WeeklyRule(DailyRule):
+    """매주 weekday(월=0 ... 일=6) KST hour:minute:second"""
+
+    WEEKDAYS = "월화수목금토일"
+
+    def __init__(self, weekday: int, hour: int, minute: int, second: int = 0):
+        super().__init__(hour, minute, second)
+        self.weekday = weekday
+        self.spec = f"weekly {weekday} {hour:02d}:{minute:02d}:{second:02d}"
+
+    def next_after(self, ts: float) -> Optional[float]:
+        now = datetime.fromtimestamp(ts, KST)
+        candidate = self._at(now + timedelta(days=(self.weekday - now.weekday()) % 7))
+        if candidate.timestamp() <= ts:
+            candidate = self._at(candidate + timedelta(days=7))
+        return candidate.timestamp()
+
+    def describe(self) -> str:
+        return f"매주 {self.WEEKDAYS[self.weekday]}요일 {self.hour:02d}:{self.minute:02d}:{self.second:02d} KST"
+
+
+class IntervalRule:
+    """seconds초마다 (이전 예정 시각 기준이라 실행 시간만큼 밀리지 않습니다)"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("간격은 0초보다 커야 합니다.")
+        self.seconds = seconds
+        self.spec = f"interval {seconds:g}"
+
+    def next_after(self, ts: float) -> Optional[float]:
+        return ts + self.seconds
+
+    def first_run(self, now: float) -> Optional[float]:
+        return now + self.seconds
+
+    def describe(self) -> str:
+        return f"{self.seconds:g}초마다"
+
+
+class OnceRule:
+    """run_time에 한 번"""
+
+    def __init__(self, run_time: float):
+        self.run_time = run_time
+        self.spec = f"once {run_time:.3f}"
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "OnceRule":
+        return cls(float(spec.split()[1]))
+
+    def next_after(self, ts: float) -> Optional[float]:
+        return None
+
+    def first_run(self, now: float) -> Optional[float]:
+        return self.run_time   # 이미 지났으면 놓친 실행으로 처리
+
+    def describe(self) -> str:
+        return f"{datetime.fromtimestamp(self.run_time, KST).strftime('%Y-%m-%d %H:%M:%S')} KST 한 번"
+
+
+@dataclass
+class ScheduledJob:
+    """등록된 작업 하나의 상태와 실행 통계"""
+    name: str
+    handler: str
+    rule: object
+    catch_up: str
+    next_run: Optional[float] = None
+    last_run: Optional[float] = None     # 마지막으로 실행한 예정 시각
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_duration: float = 0.0
+    last_lag: float = 0.0                # 예정 시각 대비 실제 시작 지연 (초)
+    max_lag: float = 0.0
+    last_error: Optional[str] = None
+    missed_streak: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+
+def handler_name(callback: Callable) -> str:
+    """콜백의 이름 (예: 'DailyFirstSentence.generate_daily_thread')"""
+    return getattr(callback, "__qualname__", callback.__name__)
+
+
 class Scheduler(commands.Cog):
-    """중앙 작업 스케줄러: 등록된 작업을 지정된 시간에 실행합니다."""
+    """
+    중앙 작업 스케줄러: 등록된 작업을 지정된 시간에 실행합니다.
+
+    다음 실행 시각 순서의 힙(heap)을 두고, 가장 가까운 작업의 시각까지 잠들었다가 깨어납니다. (초 단위)
+    작업 상태는 scheduler_db에 저장되어, 재시작하는 동안 놓친 실행은 작업별 catch_up 정책에 따라 처리됩니다.
+    작업 이름이 저장된 상태를 찾는 키이므로, 같은 콜백을 여러 시각에 등록하면 이름이 규칙별로 달라집니다.
+    """
 
     def __init__(self, bot):
         self.bot = bot
-        self.scheduled_tasks: List[Dict[str, Any]] = []
-        self.scheduler_loop.start()
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._handlers: Dict[str, Callable] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._persisted: Dict[str, Dict] = {}
+        self._running: set = set()
+        self._runner: Optional[asyncio.Task] = None
 
     def cog_unload(self):
-        self.scheduler_loop.cancel()
+        if self._runner:
+            self._runner.cancel()
+        for task in self._running:
+            task.cancel()
 
     async def cog_load(self):
+        await scheduler_db.init_db()
+        self._persisted = await scheduler_db.load_jobs()
+        self._runner = asyncio.create_task(self._run_loop())
         print(f"✅ {self.__class__.__name__} loaded successfully!")
 
     async def log(self, message: str):
@@ -30,80 +177,215 @@ class Scheduler(commands.Cog):
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
 
-    def schedule_daily(self, callback: Callable, hour: int, minute: int):
-        """매일 지정된 시간에 실행될 작업을 등록합니다."""
-        task_info = {
-            "callback": callback,
-            "hour": hour,
-            "minute": minute,
-            "name": callback.__name__,
-            "type": "daily"
-        }
-        self.scheduled_tasks.append(task_info)
-        print(f"📅 작업 등록됨: {callback.__name__} (매일 {hour:02d}:{minute:02d} KST)")
-
-    def schedule_once(self, callback: Callable, run_time: datetime):
-        """지정된 특정 시간에 한 번만 실행될 작업을 등록합니다. run_time은 KST 기준 datetime 객체여야 합니다."""
-        task_info = {
-            "callback": callback,
-            "run_time": run_time,
-            "name": callback.__name__,
-            "type": "once"
+    # ===========================================
+    # 등록
+    # ===========================================
+
+    def schedule_daily(self, callback: Callable, hour: int, minute: int, second: int = 0,
+                       catch_up: str = CATCH_UP_ONCE, name: Optional[str] = None) -> str:
+        """매일 지정된 시간(KST)에 실행될 작업을 등록하고 작업 이름을 반환합니다."""
+        return self._register(callback, DailyRule(hour, minute, second), catch_up, name)
+
+    def schedule_weekly(self, callback: Callable, weekday: int, hour: int, minute: int, second: int = 0,
+                        catch_up: str = CATCH_UP_ONCE, name: Optional[str] = None) -> str:
+        """매주 지정된 요일(월=0)과 시간(KST)에 실행될 작업을 등록합니다."""
+        return self._register(callback, WeeklyRule(weekday, hour, minute, second), catch_up, name)
+
+    def schedule_interval(self, callback: Callable, seconds: float,
+                          catch_up: str = CATCH_UP_SKIP, name: Optional[str] = None) -> str:
+        """지정된 간격(초)마다 실행될 작업을 등록합니다."""
+        return self._register(callback, IntervalRule(seconds), catch_up, name)
+
+    def schedule_once(self, callback: Callable, run_time: datetime,
+                      catch_up: str = CATCH_UP_ONCE, name: Optional[str] = None) -> str:
+        """
+        지정된 특정 시간에 한 번만 실행될 작업을 등록합니다. run_time은 KST 기준 datetime 객체여야 합니다.
+        재시작 후에는 같은 콜백이 다시 등록(register_handler 또는 schedule_*)되는 즉시 이어서 실행됩니다.
+        """
+        if run_time.tzinfo is None:
+            run_time = KST.localize(run_time)
+        return self._register(callback, OnceRule(run_time.timestamp()), catch_up, name)
+
+    def register_handler(self, callback: Callable, name: Optional[str] = None):
+        """
+        콜백만 등록합니다. 재시작 전에 schedule_once로 예약해 둔 작업이 있으면 다시 예약됩니다.
+        (예약한 쪽이 재시작 후 schedule_once를 다시 부르지 않는 경우 cog_load에서 호출)
+        """
+        self._set_handler(name or handler_name(callback), callback)
+
+    def _set_handler(self, handler: str, callback: Callable):
+        self._handlers[handler] = callback
+        for job_name, row in list(self._persisted.items()):
+            if row["handler"] == handler and row["spec"].startswith("once ") and job_name not in self._jobs:
+                self._add_job(ScheduledJob(job_name, handler, OnceRule.from_spec(row["spec"]), row["catch_up"]), row)
+
+    def cancel(self, name: str) -> bool:
+        """작업을 취소합니다. 저장된 상태도 지웁니다."""
+        job = self._jobs.pop(name, None)
+        self._persisted.pop(name, None)
+        asyncio.create_task(self._delete(name))
+        return job is not None
+
+    def _register(self, callback: Callable, rule, catch_up: str, name: Optional[str]) -> str:
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"알 수 없는 catch_up 정책: {catch_up}")
+        handler = handler_name(callback)
+        self._set_handler(handler, callback)
+        name = name or f"{handler}@{rule.spec}"
+        current = self._jobs.get(name)
+        if current is not None and current.rule.spec == rule.spec:
+            # Cog 리로드 등으로 다시 등록: 예약과 통계는 그대로 두고 콜백만 바꿉니다.
+            current.handler, current.catch_up = handler, catch_up
+            return name
+        self._add_job(ScheduledJob(name, handler, rule, catch_up), self._persisted.get(name))
+        print(f"📅 작업 등록됨: {name} ({rule.describe()}, 놓친 실행: {catch_up})")
+        return name
+
+    def _add_job(self, job: ScheduledJob, row: Optional[Dict]):
+        if row is not None and row["spec"] == job.rule.spec:
+            # 같은 규칙으로 저장된 상태가 있으면 그 다음 실행 시각부터 (지났으면 catch_up 정책으로 처리)
+            job.next_run = row["next_run"]
+            job.last_run = row["last_run"]
+        else:
+            job.next_run = job.rule.first_run(time.time())
+        self._jobs[job.name] = job
+        self._persisted[job.name] = self._row(job)
+        if job.next_run is None:
+            self._jobs.pop(job.name)
+            asyncio.create_task(self._delete(job.name))
+            return
+        self._push(job)
+        asyncio.create_task(self._save(job))
+
+    @staticmethod
+    def _row(job: ScheduledJob) -> Dict:
+        return {
+            "handler": job.handler, "spec": job.rule.spec, "catch_up": job.catch_up,
+            "next_run": job.next_run, "last_run": job.last_run,
         }
-        self.scheduled_tasks.append(task_info)
-        print(f"📅 단발성 작업 등록됨: {callback.__name__} ({run_time.strftime('%Y-%m-%d %H:%M:%S')} KST)")
 
-    @tasks.loop(minutes=1)
-    async def scheduler_loop(self):
-        """1분마다 실행되어 예약된 작업을 확인합니다."""
+    def _push(self, job: ScheduledJob):
+        self._seq += 1
+        heapq.heappush(self._heap, (job.next_run, self._seq, job.name))
+        self._wakeup.set()
+
+    # ===========================================
+    # 실행
+    # ===========================================
+
+    async def _run_loop(self):
+        """가장 가까운 예정 시각까지 잠들었다가 때가 된 작업을 실행합니다."""
         await self.bot.wait_until_ready()
-        
-        now = datetime.now(KST)
-        current_hour = now.hour
-        current_minute = now.minute
-
-        tasks_to_remove = []
-
-        for task in self.scheduled_tasks:
-            task_type = task.get("type", "daily") # 기본적으로 daily 처리 (호환성)
-            
-            if task_type == "daily":
-                if task["hour"] == current_hour and task["minute"] == current_minute:
-                    # 비동기 실행을 위해 create_task 사용 (하나가 막혀도 다른 것은 실행되게)
-                    asyncio.create_task(self._run_task(task))
-            elif task_type == "once":
-                # 현재 시간이 run_time을 지났으면 실행
-                if task["run_time"] <= now:
-                    asyncio.create_task(self._run_task(task))
-                    tasks_to_remove.append(task)
-                    
-        for t in tasks_to_remove:
-            if t in self.scheduled_tasks:
-                self.scheduled_tasks.remove(t)
-
-    async def _run_task(self, task):
-        try:
-            func = task["callback"]
-            name = task["name"]
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name = heapq.heappop(self._heap)
+                job = self._jobs.get(name)
+                # 다시 등록되거나 취소되어 바뀐 항목은 버립니다. (힙에서 바로 지우지 않음)
+                if job is None or job.next_run != due:
+                    continue
+                self._dispatch(job, due, now)
+
+            delay = MAX_SLEEP
+            if self._heap:
+                delay = min(MAX_SLEEP, max(0.0, self._heap[0][0] - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, job: ScheduledJob, due: float, now: float):
+        """예정 시각이 된 작업을 catch_up 정책에 따라 실행하거나 건너뛰고, 다음 실행을 예약합니다."""
+        missed = now - due > MISFIRE_GRACE
+        run = not missed or job.catch_up == CATCH_UP_ONCE or (
+            job.catch_up == CATCH_UP_ALL and job.missed_streak < MAX_CATCH_UP_RUNS
+        )
+        job.missed_streak = job.missed_streak + 1 if missed else 0
+
+        # 모두 따라잡을 때는 놓친 예정 시각 바로 다음부터, 아니면 지금 이후부터
+        base = due if run and job.catch_up == CATCH_UP_ALL else now
+        job.next_run = job.rule.next_after(base)
+        if job.next_run is not None:
+            self._push(job)
+
+        if run:
+            task = asyncio.create_task(self._run_job(job, due))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        else:
+            job.skipped += 1
+            print(f"⏭️ 스케줄러: {job.name} 놓친 실행 건너뜀 ({datetime.fromtimestamp(due, KST).strftime('%Y-%m-%d %H:%M:%S')} 예정)")
+            asyncio.create_task(self._save(job))
 
-            if asyncio.iscoroutinefunction(func):
-                await func()
-            else:
-                func()
+    async def _run_job(self, job: ScheduledJob, due: float):
+        # 같은 작업은 겹쳐 실행하지 않습니다. (따라잡기 실행은 차례로)
+        async with job.lock:
+            func = self._handlers.get(job.handler)
+            started = time.time()
+            job.last_lag = started - due
+            job.max_lag = max(job.max_lag, job.last_lag)
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    await func()
+                else:
+                    func()
+                job.runs += 1
+            except Exception as e:
+                job.failures += 1
+                job.last_error = str(e)
+                await self.log(f"❌ 스케줄러: {job.name} 실행 중 오류 발생: {e}")
+                print(f"Scheduler error in {job.name}: {e}")
+            finally:
+                job.last_duration = time.time() - started
+                job.last_run = due
+            # 실행이 끝난 뒤에 저장하므로, 실행 도중 종료되면 재시작 후 다시 실행됩니다.
+            await self._save(job)
 
+    async def _save(self, job: ScheduledJob):
+        try:
+            if job.next_run is None:
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+                self._persisted.pop(job.name, None)
+                await scheduler_db.delete_job(job.name)
+                return
+            self._persisted[job.name] = self._row(job)
+            await scheduler_db.save_job(job.name, job.handler, job.rule.spec, job.catch_up, job.next_run, job.last_run)
         except Exception as e:
-            await self.log(f"❌ 스케줄러: {task.get('name')} 실행 중 오류 발생: {e}")
-            print(f"Scheduler error in {task.get('name')}: {e}")
+            print(f"❌ 스케줄러: {job.name} 상태 저장 실패: {e}")
+
+    async def _delete(self, name: str):
+        try:
+            await scheduler_db.delete_job(name)
+        except Exception as e:
+            print(f"❌ 스케줄러: {name} 상태 삭제 실패: {e}")
+
+    # ===========================================
+    # 통계
+    # ===========================================
+
+    def get_stats(self) -> List[Dict]:
+        """작업별 통계를 다음 실행 시각 순으로 반환합니다."""
+        jobs = sorted(self._jobs.values(), key=lambda j: j.next_run if j.next_run is not None else math.inf)
+        return [
+            {
+                "name": job.name,
+                "rule": job.rule.describe(),
+                "catch_up": job.catch_up,
+                "next_run": job.next_run,
+                "last_run": job.last_run,
+                "runs": job.runs,
+                "failures": job.failures,
+                "skipped": job.skipped,
+                "last_duration_ms": job.last_duration * 1000,
+                "last_lag_ms": job.last_lag * 1000,
+                "max_lag_ms": job.max_lag * 1000,
+                "last_error": job.last_error,
+            }
+            for job in jobs
+        ]
 
-    @scheduler_loop.before_loop
-    async def before_scheduler_loop(self):
-        await self.bot.wait_until_ready()
-        # 정각(00초)에 가깝게 맞추기 위해 초기 딜레이
-        now = datetime.now(KST)
-        # 다음 분의 0초까지 대기
-        next_minute = (now + timedelta(minutes=1)).replace(second=0, microsecond=0)
-        delay = (next_minute - now).total_seconds()
-        await asyncio.sleep(delay)
 
 async def setup(bot):
     await bot.add_cog(Scheduler(bot))
@@ -7,6 +7,7 @@ from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta
 from src.core.DataManager import DataManager
+from src.core.voice_utils import get_tracked_channel_resolver
 import pytz
 import re
 from typing import Callable, List, Optional, Tuple
@@ -311,55 +312,8 @@ class VoiceCommands(commands.GroupCog, group_name="보이스"):
         return f"{days}일 {hours}시간 {minutes}분 {seconds}초 ({self.calculate_points(total_seconds)}점)"
     
     async def get_expanded_tracked_channels(self) -> List[int]:
-        tracked_ids = await self.data_manager.get_tracked_channels("voice")
-        expanded_ids = set()
-
-        # 1. 카테고리ID와 음성채널ID 분리
-        category_ids = set()
-        voice_channel_ids = set()
-        deleted_category_ids = set()  # 삭제된 카테고리 ID 저장
-        
-        for cid in tracked_ids:
-            ch = self.bot.get_channel(cid)
-            if ch is None:
-                try:
-                    ch = await self.bot.fetch_channel(cid)
-                except Exception:
-                    ch = None
-            
-            if isinstance(ch, discord.CategoryChannel):
-                category_ids.add(cid)
-            elif isinstance(ch, (discord.VoiceChannel, discord.StageChannel)):
-                voice_channel_ids.add(cid)
-            else:
-                # 삭제되었거나 접근 불가 → 삭제된 카테고리로 간주
-                deleted_category_ids.add(cid)
-
-        # 2. 카테고리ID로 등록된 경우, 해당 카테고리의 모든 하위 음성채널 포함
-        for cat_id in category_ids:
-            cat = self.bot.get_channel(cat_id)
-            if cat is None:
-                try:
-                    cat = await self.bot.fetch_channel(cat_id)
-                except Exception:
-                    continue
-            if isinstance(cat, discord.CategoryChannel):
-                for vc in cat.voice_channels:
-                    expanded_ids.add(vc.id)
-                # Stage 채널도 포함
-                for sc in getattr(cat, "stage_channels", []):
-                    expanded_ids.add(sc.id)
-
-        # 3. 음성채널ID로 등록된 경우, 해당 음성채널만 포함
-        expanded_ids.update(voice_channel_ids)
-
-        # 4. 삭제된 채널 중, category_id가 등록된 카테고리ID에 포함된 것만 추가 (삭제된 카테고리 포함)
-        all_category_ids = category_ids | deleted_category_ids
-        if all_category_ids:
-            deleted_channel_ids = await self.data_manager.get_deleted_channels_by_categories(list(all_category_ids))
-            expanded_ids.update(deleted_channel_ids)
-
-        return list(expanded_ids)
+        """/순위 집계 채널 (voice 등록 채널을 규칙 없이 확장, voice_utils의 resolver 캐시 사용)"""
+        return list(await get_tracked_channel_resolver(self.bot).get("voice", filtered=False))
 
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """
@@ -432,6 +386,8 @@ class VoiceCommands(commands.GroupCog, group_name="보이스"):
             else:
                 base_datetime = datetime.now(self.tz)
 
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             tracked_channels = await self.get_expanded_tracked_channels()
             times, start_date, end_date = await self.data_manager.get_user_times(user.id, period, base_datetime, tracked_channels)
 
@@ -565,11 +521,12 @@ class VoiceCommands(commands.GroupCog, group_name="보이스"):
             await interaction.response.defer() # 시간이 오래 걸릴 것을 대비해 defer 처리
 
             # 총 시간 데이터 조회
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             tracked_channels = await self.get_expanded_tracked_channels()
-            all_data, start_date, end_date = await self.data_manager.get_all_users_times(period, base_datetime, tracked_channels)
+            totals, start_date, end_date = await self.data_manager.get_all_users_totals(period, base_datetime, tracked_channels)
 
-            user_totals = [(uid, sum(times.values())) for uid, times in all_data.items()]
-            ranked = sorted(user_totals, key=lambda x: x[1], reverse=True)
+            ranked = sorted(totals.items(), key=lambda x: (-x[1], x[0]))
 
             if not ranked:
                 return await interaction.followup.send("해당 기간에 해당하는 기록이 없습니다.", ephemeral=True)
@@ -647,12 +604,14 @@ class VoiceCommands(commands.GroupCog, group_name="보이스"):
             await interaction.response.defer()  # 시간이 오래 걸릴 것을 대비해 defer 처리
 
             # 총 시간 데이터 조회
+            if tracker := self.bot.get_cog("VoiceTracker"):
+                await tracker.flush_before_read()
             tracked_channels = await self.get_expanded_tracked_channels()
-            all_data, start_date, end_date = await self.data_manager.get_all_users_times(period, base_datetime, tracked_channels)
+            totals, start_date, end_date = await self.data_manager.get_all_users_totals(period, base_datetime, tracked_channels)
 
             role_member_ids = {member.id for member in role.members}
-            filtered = [(uid, sum(times.values())) for uid, times in all_data.items() if uid in role_member_ids]
-            ranked = sorted(filtered, key=lambda x: x[1], reverse=True)
+            filtered = [(uid, secs) for uid, secs in totals.items() if uid in role_member_ids]
+            ranked = sorted(filtered, key=lambda x: (-x[1], x[0]))
 
             if not ranked:
                 return await interaction.followup.send(f"{role.name} 역할의 기록이 없습니다.", ephemeral=True)
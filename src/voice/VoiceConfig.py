@@ -1,18 +1,30 @@
+import asyncio
 import discord
+import time
 from discord.ext import commands
 from src.core.DataManager import DataManager
+from src.core.voice_utils import get_tracked_channel_resolver
 
 from src.core.admin_utils import GUILD_IDS, only_in_guild, is_guild_admin
 
+# 채널 생성/삭제/수정 후 롤업을 다시 맞추기까지 기다리는 시간(초). 연속 변경은 한 번으로 묶습니다.
+ROLLUP_RESYNC_DELAY = 30
+
 
 class VoiceConfig(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_manager = DataManager()
+        self._rollup_resync_task = None
+        self._rollups_seeded = False
 
     async def cog_load(self):
         print(f"✅ {self.__class__.__name__} loaded successfully!")
 
+    async def cog_unload(self):
+        if self._rollup_resync_task and not self._rollup_resync_task.done():
+            self._rollup_resync_task.cancel()
+
     async def log(self, message):
         """로그 메시지를 Logger cog를 통해 전송합니다."""
         try:
@@ -22,6 +34,74 @@ class VoiceConfig(commands.Cog):
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
 
+    async def rebuild_rollups(self, force: bool = True) -> dict:
+        """
+        추적 채널 구성에 맞춰 음성 롤업 테이블을 재생성합니다.
+        - voice: 퀘스트/내정보에서 쓰는 필터링된 채널 목록
+        - voice_ranking: /순위, 랭크카드에서 쓰는 확장 채널 목록
+        force=False면 채널 구성이 바뀐 scope만 재생성합니다.
+        반환값: {scope: 롤업 행 수} (재생성한 scope만)
+        """
+        resolver = get_tracked_channel_resolver(self.bot)
+        scopes = {
+            "voice": await resolver.get("voice", filtered=True),
+            "voice_ranking": await resolver.get("voice", filtered=False),
+        }
+
+        result = {}
+        for scope, channel_ids in scopes.items():
+            if not force and self.data_manager.get_rollup_scope_channels(scope) == frozenset(channel_ids):
+                continue
+            result[scope] = await self.data_manager.rebuild_rollups(scope, channel_ids)
+        return result
+
+    async def _rebuild_rollups_quietly(self, force: bool = True):
+        """채널 설정 변경 후 롤업을 갱신합니다. 실패해도 명령어 응답에는 영향을 주지 않습니다."""
+        try:
+            result = await self.rebuild_rollups(force=force)
+            if result:
+                await self.log(f"음성 롤업을 재생성했습니다: {', '.join(f'{k}={v}행' for k, v in result.items())}")
+        except Exception as e:
+            await self.log(f"음성 롤업 재생성 중 오류 발생: {e}")
+
+    def _schedule_rollup_resync(self):
+        """채널 변경이 잠잠해진 뒤 한 번만 롤업 구성을 다시 맞춥니다."""
+        if self._rollup_resync_task and not self._rollup_resync_task.done():
+            self._rollup_resync_task.cancel()
+
+        async def _resync():
+            await asyncio.sleep(ROLLUP_RESYNC_DELAY)
+            await self._rebuild_rollups_quietly(force=False)
+
+        self._rollup_resync_task = asyncio.create_task(_resync())
+
+    @staticmethod
+    def _affects_voice_scope(channel) -> bool:
+        return isinstance(channel, (discord.VoiceChannel, discord.StageChannel, discord.CategoryChannel))
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # 기존 설치본에도 롤업이 채워지도록 첫 연결 시 채널 구성을 확인합니다.
+        if self._rollups_seeded:
+            return
+        self._rollups_seeded = True
+        await self._rebuild_rollups_quietly(force=False)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if self._affects_voice_scope(channel):
+            self._schedule_rollup_resync()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self._affects_voice_scope(channel):
+            self._schedule_rollup_resync()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if self._affects_voice_scope(after) and getattr(before, "category_id", None) != getattr(after, "category_id", None):
+            self._schedule_rollup_resync()
+
     @commands.group(name="보이스", invoke_without_command=True)
     @is_guild_admin()
     async def voice(self, ctx):  
@@ -58,6 +138,21 @@ class VoiceConfig(commands.Cog):
             value="유저 음성 기록을 전부 삭제합니다. **주의! 보이스 기록을 열람하는 다른 명령어가 있는 경우, 그 명령어에서도 모든 기록이 삭제됩니다.**", 
             inline=False
         )
+        embed.add_field(
+            name=f"*{command_name} 기록주기 (초)", 
+            value="누적된 음성 시간을 DB에 반영하는 주기를 변경합니다. (10~600초)", 
+            inline=False
+        )
+        embed.add_field(
+            name=f"*{command_name} 기록상태", 
+            value="음성 기록 플러시 횟수, 행 수, 소요 시간을 확인합니다.", 
+            inline=False
+        )
+        embed.add_field(
+            name=f"*{command_name} 집계재생성", 
+            value="순위/퀘스트 조회에 쓰이는 유저별 일/주/월/누적 집계를 전체 기록에서 다시 계산합니다.", 
+            inline=False
+        )
 
         channel_mentions = []
         
@@ -96,6 +191,7 @@ class VoiceConfig(commands.Cog):
                 await self.log(f"{ctx.author}({ctx.author.id})님에 의해 추적 채널/카테고리에 {ch.mention}({ch.id})를 등록 완료하였습니다. [길드: {ctx.guild.name}({ctx.guild.id}), 채널: {ctx.channel.name}({ctx.channel.id})]")
 
         if added:
+            await self._rebuild_rollups_quietly()
             await ctx.reply(f"다음 채널/카테고리를 보이스 추적에 등록했습니다:\n{', '.join(added)}")
         else:
             await ctx.reply("등록할 유효한 음성 채널이나 카테고리를 찾지 못했습니다.")
@@ -112,6 +208,7 @@ class VoiceConfig(commands.Cog):
                 await self.log(f"{ctx.author}({ctx.author.id})님에 의해 {ch.mention}({ch.id})채널 추적을 중지하였습니다. [길드: {ctx.guild.name}({ctx.guild.id}), 채널: {ctx.channel.name}({ctx.channel.id})]")
 
         if removed:
+            await self._rebuild_rollups_quietly()
             await ctx.send(f"다음 채널/카테고리를 보이스 추적에서 제거했습니다:\n{', '.join(removed)}")
         else:
             await ctx.send("제거할 유효한 채널을 찾지 못했습니다.")
@@ -135,6 +232,7 @@ class VoiceConfig(commands.Cog):
 
         msg_parts = []
         if removed:
+            await self._rebuild_rollups_quietly()
             msg_parts.append(f"다음 ID의 채널/카테고리를 보이스 추적에서 제거했습니다: {', '.join(removed)}")
         if not_found:
             msg_parts.append(f"다음 ID는 등록되어 있지 않습니다: {', '.join(not_found)}")
@@ -157,9 +255,62 @@ class VoiceConfig(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def reset_all_channel(self, ctx):
         await self.data_manager.reset_tracked_channels("voice")
+        await self._rebuild_rollups_quietly()
         await ctx.send("모든 채널 기록이 초기화되었습니다.")
         await self.log(f"{ctx.author}({ctx.author.id})님에 의해 모든 채널 기록이 초기화되었습니다. [길드: {ctx.guild.name}({ctx.guild.id}), 채널: {ctx.channel.name}({ctx.channel.id})]")
 
+    @voice.command(name="기록주기")
+    @only_in_guild()
+    @commands.has_permissions(administrator=True)
+    async def set_flush_interval(self, ctx, seconds: int):
+        tracker = self.bot.get_cog("VoiceTracker")
+        if tracker is None:
+            return await ctx.send("VoiceTracker가 로드되어 있지 않습니다.")
+        if not 10 <= seconds <= 600:
+            return await ctx.send("기록 주기는 10초 이상 600초 이하로 설정해주세요.")
+
+        tracker.set_flush_interval(seconds)
+        await ctx.send(f"음성 기록 반영 주기를 {seconds}초로 변경했습니다.")
+        await self.log(f"{ctx.author}({ctx.author.id})님에 의해 음성 기록 반영 주기가 {seconds}초로 변경되었습니다. [길드: {ctx.guild.name}({ctx.guild.id}), 채널: {ctx.channel.name}({ctx.channel.id})]")
+
+    @voice.command(name="기록상태")
+    @only_in_guild()
+    @commands.has_permissions(administrator=True)
+    async def flush_status(self, ctx):
+        tracker = self.bot.get_cog("VoiceTracker")
+        if tracker is None:
+            return await ctx.send("VoiceTracker가 로드되어 있지 않습니다.")
+
+        stats = tracker.flush_stats
+        flushes = stats["flushes"]
+        avg_rows = stats["rows"] / flushes if flushes else 0
+        embed = discord.Embed(title="음성 기록 플러시 상태", colour=discord.Colour.from_rgb(253, 237, 134))
+        embed.add_field(name="반영 주기", value=f"{int(tracker.flush_voice_times.seconds)}초", inline=True)
+        embed.add_field(name="대기 중인 행", value=str(len(tracker._pending_voice)), inline=True)
+        embed.add_field(name="플러시 횟수", value=f"{flushes}회 (실패 {stats['failures']}회)", inline=True)
+        embed.add_field(name="플러시당 행 수", value=f"평균 {avg_rows:.1f} / 최근 {stats['last_rows']}", inline=True)
+        embed.add_field(name="소요 시간", value=f"최근 {stats['last_ms']:.1f}ms / 최대 {stats['max_ms']:.1f}ms", inline=True)
+        await ctx.send(embed=embed)
+
+    @voice.command(name="집계재생성")
+    @only_in_guild()
+    @commands.has_permissions(administrator=True)
+    async def rebuild_rollup_command(self, ctx):
+        tracker = self.bot.get_cog("VoiceTracker")
+        if tracker is not None:
+            # 아직 반영되지 않은 누적분을 먼저 기록해야 재계산 결과에 포함됩니다.
+            await tracker.flush_pending_voice_times()
+
+        started = time.perf_counter()
+        result = await self.rebuild_rollups()
+        elapsed = time.perf_counter() - started
+
+        lines = [f"`{scope}`: {rows}행" for scope, rows in result.items()]
+        stats = self.data_manager.rollup_stats
+        lines.append(f"집계 사용 {stats['hits']}회 / 스캔 대체 {stats['fallbacks']}회")
+        await ctx.send(f"음성 집계를 재생성했습니다. ({elapsed:.2f}초)\n" + "\n".join(lines))
+        await self.log(f"{ctx.author}({ctx.author.id})님에 의해 음성 집계가 재생성되었습니다. ({elapsed:.2f}초) [길드: {ctx.guild.name}({ctx.guild.id}), 채널: {ctx.channel.name}({ctx.channel.id})]")
+
     @voice.command(name="데이터통합")
     @only_in_guild()
     @commands.has_permissions(administrator=True)
@@ -1,37 +1,94 @@
 """
 사용자의 음성 채널 활동을 추적하고 기록하는 모듈입니다.
 음성 채널 입장/퇴장 시간을 기록하고, DataManager를 통해 DB에 저장합니다.
-또한 음성 퀘스트(30분, 5/10/20시간) 달성 여부를 확인하고 처리합니다.
+또한 음성 퀘스트(30분, 10/20/50시간) 달성 여부를 확인하고 처리합니다.
 """
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.core.DataManager import DataManager
-from src.core.voice_utils import get_filtered_tracked_channels as expand_tracked 
+from src.core.voice_utils import get_tracked_channel_resolver
+from src.level.LevelConstants import VOICE_WEEKLY_QUEST_MAP
+from dataclasses import dataclass
 import asyncio
 import time
 import pytz
 
 KST = pytz.timezone("Asia/Seoul")
 
+# 누적된 음성 시간을 DB에 반영하는 기본 주기 (초)
+VOICE_FLUSH_INTERVAL_SECONDS = 60
+
+# 음성 퀘스트 기준
+VOICE_DAILY_QUEST_SECONDS = 30 * 60
+VOICE_DAILY_1H_SECONDS = 60 * 60
+
+
+def _week_start_str(date_str: str) -> str:
+    """YYYY-MM-DD가 속한 주의 월요일 (YYYY-MM-DD)"""
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    return (date - timedelta(days=date.weekday())).strftime("%Y-%m-%d")
+
+
+@dataclass
+class VoiceQuestCounter:
+    """유저의 오늘/이번 주 추적 채널 음성 시간 (DB 반영분 + 누적기)"""
+    day_key: str
+    week_key: str
+    daily_secs: int = 0
+    weekly_secs: int = 0
+
+    def advance(self, date_str: str, seconds: int):
+        """date_str 날짜의 seconds를 더합니다. 더 뒤 날짜가 오면 일/주 카운터를 넘깁니다."""
+        if date_str > self.day_key:
+            self.day_key, self.daily_secs = date_str, 0
+            week_key = _week_start_str(date_str)
+            if week_key != self.week_key:
+                self.week_key, self.weekly_secs = week_key, 0
+        if date_str == self.day_key:
+            self.daily_secs += seconds
+        if _week_start_str(date_str) == self.week_key:
+            self.weekly_secs += seconds
+
 class VoiceTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_manager = DataManager()
         self.join_times = {}  # {user_id: {channel_id: join_time}}
+        # write-behind 누적기: {(date, user_id, channel_id): seconds}
+        self._pending_voice: dict[tuple[str, int, int], int] = {}
+        # 플러시 중(커밋 전)인 누적분. 조회 시 DB와 중복/누락되지 않도록 따로 보관합니다.
+        self._inflight_voice: dict[tuple[str, int, int], int] = {}
+        self._flush_lock = asyncio.Lock()
+        self.flush_stats = {
+            "flushes": 0,       # 총 플러시 횟수
+            "rows": 0,          # 총 반영 행 수
+            "last_rows": 0,     # 마지막 플러시 행 수
+            "last_ms": 0.0,     # 마지막 플러시 소요 시간
+            "max_ms": 0.0,      # 최대 플러시 소요 시간
+            "failures": 0,      # 실패 횟수
+        }
         bot.loop.create_task(self.data_manager.initialize())
         self.track_voice_time.start()
-        # --- 추가: 음성 퀘스트 지급 여부 메모리 관리 ---
+        self.flush_voice_times.start()
+        # --- 음성 퀘스트: 유저별 일/주 카운터와 이벤트 발생 기록 ---
+        # 카운터는 기간마다 한 번 DB에서 채운 뒤 누적기에 더해지는 시간만큼 증가합니다.
+        self._voice_counters: dict[int, VoiceQuestCounter] = {}
+        self._voice_counter_channels: frozenset[int] = frozenset()
         self.voice_quest_daily_given = set()  # (user_id, date)
-        self.voice_quest_weekly_given = {}    # user_id: set([5, 10, 20])  # 시간 단위
+        self.voice_quest_weekly_given = {}    # (user_id, week_start): set([10, 20, 50])  # 시간 단위
         self.voice_1h_tracker = set() # 오늘 달성한 유저 ID 집합
         self.current_date_str = datetime.now(KST).strftime("%Y-%m-%d")
-        self._tracked_voice_cache = None
-        self._tracked_voice_cache_at = 0  # epoch 초
 
     async def cog_load(self):
         print(f"✅ {self.__class__.__name__} loaded successfully!")
 
+    async def cog_unload(self):
+        self.track_voice_time.cancel()
+        self.flush_voice_times.cancel()
+        # 종료 시 남은 누적분을 반드시 기록
+        await self.flush_pending_voice_times()
+
     async def log(self, message):
         try:
             logger = self.bot.get_cog('Logger')
@@ -40,15 +97,6 @@ class VoiceTracker(commands.Cog):
         except Exception as e:
             print(f"❌ {self.__class__.__name__} 로그 전송 중 오류 발생: {e}")
             
-    async def _get_tracked_voice_ids_cached(self, ttl: int = 600) -> set[int]:
-        now_ts = time.time()
-        if self._tracked_voice_cache and (now_ts - self._tracked_voice_cache_at) < ttl:
-            return self._tracked_voice_cache
-        ids = set(await expand_tracked(self.bot, self.data_manager, "voice"))
-        self._tracked_voice_cache = ids
-        self._tracked_voice_cache_at = now_ts
-        return ids
-
     def get_all_voice_channels(self):
         channels = []
         for guild in self.bot.guilds:
@@ -56,9 +104,86 @@ class VoiceTracker(commands.Cog):
             channels.extend(getattr(guild, "stage_channels", []))  
         return channels
     
-    def invalidate_tracked_voice_cache(self):
-        self._tracked_voice_cache = None
-        self._tracked_voice_cache_at = 0
+    # ===========================================
+    # write-behind 누적기
+    # ===========================================
+
+    def _accumulate(self, user_id: int, channel_id: int, start: datetime, end: datetime):
+        """
+        start~end 구간을 KST 자정 기준으로 나누어 날짜별 누적기에 더합니다.
+        """
+        cursor = start
+        while cursor < end:
+            next_midnight = (cursor + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            segment_end = min(end, next_midnight)
+            seconds = int((segment_end - cursor).total_seconds())
+            if seconds > 0:
+                date_str = cursor.strftime("%Y-%m-%d")
+                key = (date_str, user_id, channel_id)
+                self._pending_voice[key] = self._pending_voice.get(key, 0) + seconds
+                counter = self._voice_counters.get(user_id)
+                if counter is not None and channel_id in self._voice_counter_channels:
+                    counter.advance(date_str, seconds)
+            cursor = segment_end
+
+    async def flush_pending_voice_times(self) -> int:
+        """누적된 음성 시간을 하나의 트랜잭션으로 DB에 반영합니다."""
+        async with self._flush_lock:
+            if not self._pending_voice:
+                return 0
+
+            pending, self._pending_voice = self._pending_voice, {}
+            self._inflight_voice = pending
+            rows = [(date, uid, cid, secs) for (date, uid, cid), secs in pending.items()]
+
+            started = time.perf_counter()
+            try:
+                await self.data_manager.add_voice_times_bulk(rows)
+            except Exception as e:
+                # 실패한 누적분은 다음 플러시에서 재시도
+                for key, secs in pending.items():
+                    self._pending_voice[key] = self._pending_voice.get(key, 0) + secs
+                self.flush_stats["failures"] += 1
+                await self.log(f"음성 기록 플러시 중 오류 ({len(rows)}행): {e}")
+                return 0
+            finally:
+                self._inflight_voice = {}
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats = self.flush_stats
+            stats["flushes"] += 1
+            stats["rows"] += len(rows)
+            stats["last_rows"] = len(rows)
+            stats["last_ms"] = elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            return len(rows)
+
+    def pending_user_seconds(self, user_id: int, start_date: str, end_date: str, channel_ids: set[int]) -> int:
+        """
+        아직 DB에 반영되지 않은 유저의 누적 초를 반환합니다.
+        start_date~end_date(YYYY-MM-DD, 양끝 포함) 범위와 channel_ids에 속한 누적분만 더합니다.
+        """
+        total = 0
+        for source in (self._pending_voice, self._inflight_voice):
+            for (date, uid, cid), secs in source.items():
+                if uid == user_id and cid in channel_ids and start_date <= date <= end_date:
+                    total += secs
+        return total
+
+    async def flush_before_read(self):
+        """조회 명령어 직전에 누적분을 반영합니다. 실패해도 조회는 계속합니다."""
+        try:
+            await self.flush_pending_voice_times()
+        except Exception as e:
+            print(f"❌ {self.__class__.__name__} 조회 전 플러시 중 오류: {e}")
+
+    def set_flush_interval(self, seconds: int):
+        """누적기 플러시 주기를 변경합니다."""
+        self.flush_voice_times.change_interval(seconds=seconds)
+
+    @tasks.loop(seconds=VOICE_FLUSH_INTERVAL_SECONDS)
+    async def flush_voice_times(self):
+        await self.flush_pending_voice_times()
 
     @tasks.loop(minutes=1)
     async def track_voice_time(self):
@@ -81,138 +206,115 @@ class VoiceTracker(commands.Cog):
                     continue
 
                 join_time = self.join_times[user_id][channel_id]
-
-                if join_time.date() != now.date():
-                    midnight = join_time.replace(hour=23, minute=59, second=59, microsecond=999999)
-                    next_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                    duration1 = int((midnight - join_time).total_seconds())
-                    duration2 = int((now - next_day).total_seconds())
-
-                    if duration1 > 0:
-                        await self.data_manager.add_voice_time(user_id, channel_id, duration1)
-                    if duration2 > 0:
-                        await self.data_manager.add_voice_time(user_id, channel_id, duration2)
-
-                    self.join_times[user_id][channel_id] = next_day
-                else:
-                    duration = int((now - join_time).total_seconds())
-                    if duration > 0:
-                        await self.data_manager.add_voice_time(user_id, channel_id, duration)
-                        self.join_times[user_id][channel_id] = now
+                if now > join_time:
+                    self._accumulate(user_id, channel_id, join_time, now)
+                    self.join_times[user_id][channel_id] = now
 
         await self.process_voice_quests()
 
-    async def process_voice_quests(self):
+    async def _get_quest_channel_ids(self) -> frozenset[int]:
+        """음성 퀘스트에 집계하는 추적 채널 목록 (필터링 규칙 적용)"""
+        return await get_tracked_channel_resolver(self.bot).get("voice")
+
+    async def _seed_voice_counters(self, user_ids: set[int], tracked_channel_ids: set[int], now: datetime):
         """
-        음성방 30분(일일), 5/10/20시간(주간) 퀘스트 경험치 지급 이벤트를 발생시킵니다.
+        카운터가 없는 유저의 오늘/이번 주 시간을 DB(롤업)에서 한 번 읽어 카운터를 만듭니다.
+        DB 조회와 누적기 합산 사이에 플러시가 끼어들면 시간이 빠지거나 중복되므로
+        플러시 잠금을 잡은 상태에서 읽고, 잠금을 풀기 전에 카운터를 등록합니다.
         """
+        channels = frozenset(tracked_channel_ids)
+        if channels != self._voice_counter_channels:
+            self._voice_counters.clear()
+            self._voice_counter_channels = channels
 
-        # 추적 채널 목록 확보 (캐시가 있으면 사용, 없으면 유틸 함수로 확장)
-        try:
-            tracked_channel_ids = set(await self._get_tracked_voice_ids_cached())
-        except AttributeError:
-            # 캐시 헬퍼가 없는 경우 폴백
-            from src.core.voice_utils import get_filtered_tracked_channels
-            tracked_channel_ids = set(await get_filtered_tracked_channels(self.bot, self.data_manager, "voice"))
-            
-        if not tracked_channel_ids:
+        missing = {uid for uid in user_ids if uid not in self._voice_counters}
+        if not missing:
             return
 
-        now = datetime.now(KST)
-        user_ids = list(self.join_times.keys())
-        
-        for uid in user_ids:
-            try:
-                # === 일간(오늘) 누적 초 ===
-                day_map, _, _ = await self.data_manager.get_user_times(
-                    user_id=uid,
-                    period="일간",
-                    base_date=now,
-                    channel_filter=list(tracked_channel_ids)
-                )
-                daily_secs = sum(day_map.values()) if day_map else 0
-
-                if daily_secs >= 30 * 60:
-                    # 일일 30분 달성 → 중복 여부는 LevelChecker가 내부적으로 판단하게 이벤트를 발생시킴
-                    self.bot.dispatch("quest_voice_30min", uid)
-
-                # 일일 1시간 달성
-                now_str = now.strftime("%Y-%m-%d")
-                if self.current_date_str != now_str:
-                    self.voice_1h_tracker.clear()
-                    self.current_date_str = now_str
-                    
-                if daily_secs >= 60 * 60 and uid not in self.voice_1h_tracker:
-                    self.voice_1h_tracker.add(uid)
-
-
-                # === 주간 누적 초 ===
-                week_map, _, _ = await self.data_manager.get_user_times(
-                    user_id=uid,
-                    period="주간",
-                    base_date=now,
-                    channel_filter=list(tracked_channel_ids)
+        today_str = now.strftime("%Y-%m-%d")
+        week_start_str = (now - timedelta(days=now.weekday())).strftime("%Y-%m-%d")
+        channel_filter = list(channels)
+        async with self._flush_lock:
+            daily, _, _ = await self.data_manager.get_all_users_totals("일간", now, channel_filter)
+            weekly, _, _ = await self.data_manager.get_all_users_totals("주간", now, channel_filter)
+            for uid in missing:
+                self._voice_counters[uid] = VoiceQuestCounter(
+                    day_key=today_str,
+                    week_key=week_start_str,
+                    daily_secs=daily.get(uid, 0) + self.pending_user_seconds(uid, today_str, today_str, channels),
+                    weekly_secs=weekly.get(uid, 0) + self.pending_user_seconds(uid, week_start_str, today_str, channels),
                 )
-                weekly_secs = sum(week_map.values()) if week_map else 0
 
-                # 주간 5/10/20h 달성도 순차 검사 (중복 방지는 LevelChecker가 이벤트 수신 후 처리)
-                for h in (5, 10, 20):
-                    if weekly_secs >= h * 3600:
-                        self.bot.dispatch("quest_voice_weekly", uid, h)
-            except Exception as e:
-                # 한 유저에서 에러가 나도 다른 유저 진행은 계속
-                try:
-                    await self.log(f"음성방 퀘스트 처리에서 유저 - {uid} 처리 중 오류: {e}")
-                except Exception:
-                    pass
-                        
+    def _emit_voice_quests(self, uid: int, today_str: str):
+        """
+        카운터가 기준을 넘었고 이번 기간에 아직 이벤트를 보내지 않았으면 한 번만 보냅니다.
+        (재시작 등으로 이미 넘은 상태에서 카운터를 채운 경우도 한 번 보내며, 실제 중복 지급은 LevelChecker가 막습니다.)
+        """
+        counter = self._voice_counters.get(uid)
+        if counter is None:
+            return
+        # 오늘 누적이 없어 날짜가 넘어가지 않은 카운터를 오늘로 맞춥니다.
+        counter.advance(today_str, 0)
+
+        if counter.daily_secs >= VOICE_DAILY_QUEST_SECONDS and (uid, counter.day_key) not in self.voice_quest_daily_given:
+            self.voice_quest_daily_given.add((uid, counter.day_key))
+            self.bot.dispatch("quest_voice_30min", uid)
+
+        if counter.daily_secs >= VOICE_DAILY_1H_SECONDS:
+            self.voice_1h_tracker.add(uid)
+
+        given = self.voice_quest_weekly_given.setdefault((uid, counter.week_key), set())
+        for h in sorted(VOICE_WEEKLY_QUEST_MAP):
+            if counter.weekly_secs >= h * 3600 and h not in given:
+                given.add(h)
+                self.bot.dispatch("quest_voice_weekly", uid, h)
+
+    def _rollover_quest_state(self, now: datetime):
+        """날짜가 바뀌면 지난 기간의 이벤트 발생 기록을 정리합니다."""
+        today_str = now.strftime("%Y-%m-%d")
+        if self.current_date_str == today_str:
+            return
+        self.current_date_str = today_str
+        self.voice_1h_tracker.clear()
+        week_start_str = (now - timedelta(days=now.weekday())).strftime("%Y-%m-%d")
+        self.voice_quest_daily_given = {k for k in self.voice_quest_daily_given if k[1] == today_str}
+        self.voice_quest_weekly_given = {
+            k: v for k, v in self.voice_quest_weekly_given.items() if k[1] == week_start_str
+        }
+        # 음성 채널에 없는 유저의 카운터는 다음에 들어올 때 다시 채웁니다.
+        self._voice_counters = {uid: c for uid, c in self._voice_counters.items() if uid in self.join_times}
+
+    async def process_voice_quests(self):
+        """
+        음성방 30분(일일), 10/20/50시간(주간) 퀘스트 경험치 지급 이벤트를 발생시킵니다.
+        음성 채널에 있는 유저의 메모리 카운터만 확인하며, 기준을 넘는 순간 한 번만 이벤트를 보냅니다.
+        """
+        await self.process_voice_quests_for_users(set(self.join_times.keys()))
+
     async def process_voice_quests_for_users(self, user_ids: set[int]):
         """
-        음성방 30분(일일), 5/10/20시간(주간) 퀘스트 경험치 지급 이벤트를 발생시킵니다.
+        지정한 유저들의 음성 퀘스트 달성을 확인합니다.
+        카운터가 없는 유저(처음 보거나 채널 구성이 바뀐 경우)만 DB에서 한 번 채웁니다.
         """
         if not user_ids:
             return
 
-        # 추적 채널 목록 확보 (캐시가 있으면 사용, 없으면 유틸 함수로 확장)
-        try:
-            tracked_channel_ids = set(await self._get_tracked_voice_ids_cached())
-        except AttributeError:
-            # 캐시 헬퍼가 없는 경우 폴백
-            from src.core.voice_utils import get_filtered_tracked_channels
-            tracked_channel_ids = set(await get_filtered_tracked_channels(self.bot, self.data_manager, "voice"))
-            
+        tracked_channel_ids = await self._get_quest_channel_ids()
         if not tracked_channel_ids:
             return
 
         now = datetime.now(KST)
+        self._rollover_quest_state(now)
+        try:
+            await self._seed_voice_counters(user_ids, tracked_channel_ids, now)
+        except Exception as e:
+            await self.log(f"음성방 퀘스트 카운터 초기화 중 오류: {e}")
+            return
+
+        today_str = now.strftime("%Y-%m-%d")
         for uid in user_ids:
             try:
-                # === 일간(오늘) 누적 초 ===
-                day_map, _, _ = await self.data_manager.get_user_times(
-                    user_id=uid,
-                    period="일간",
-                    base_date=now,
-                    channel_filter=list(tracked_channel_ids)
-                )
-                daily_secs = sum(day_map.values()) if day_map else 0
-
-                if daily_secs >= 30 * 60:
-                    # 일일 30분 달성 → 중복 여부는 LevelChecker가 처리
-                    self.bot.dispatch("quest_voice_30min", uid)
-
-                # === 주간 누적 초 ===
-                week_map, _, _ = await self.data_manager.get_user_times(
-                    user_id=uid,
-                    period="주간",
-                    base_date=now,
-                    channel_filter=list(tracked_channel_ids)
-                )
-                weekly_secs = sum(week_map.values()) if week_map else 0
-
-                # 주간 5/10/20h 달성도 순차 검사 (중복 방지는 LevelChecker가 처리)
-                for h in (5, 10, 20):
-                    if weekly_secs >= h * 3600:
-                        self.bot.dispatch("quest_voice_weekly", uid, h)
+                self._emit_voice_quests(uid, today_str)
             except Exception as e:
                 # 한 유저에서 에러가 나도 다른 유저 진행은 계속
                 try:
@@ -230,8 +332,6 @@ class VoiceTracker(commands.Cog):
             await self.log(
                 f"추적된 카테고리 {category_name}의 음성/스테이지 채널 {channel.name}({channel.id})이 삭제되었습니다. [길드: {channel.guild.name}({channel.guild.id})] [시스템]"
             )
-            # 추적 채널 캐시 무효화
-            self.invalidate_tracked_voice_cache()
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
@@ -245,21 +345,8 @@ class VoiceTracker(commands.Cog):
             if before.channel:
                 if member.id in self.join_times and before.channel.id in self.join_times[member.id]:
                     join_time = self.join_times[member.id][before.channel.id]
-
-                    if join_time.date() != now.date():
-                        midnight = join_time.replace(hour=23, minute=59, second=59, microsecond=999999)
-                        next_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                        duration1 = int((midnight - join_time).total_seconds())
-                        duration2 = int((now - next_day).total_seconds())
-
-                        if duration1 > 0:
-                            await self.data_manager.add_voice_time(member.id, before.channel.id, duration1)
-                        if duration2 > 0:
-                            await self.data_manager.add_voice_time(member.id, before.channel.id, duration2)
-                    else:
-                        duration = int((now - join_time).total_seconds())
-                        if duration > 0:
-                            await self.data_manager.add_voice_time(member.id, before.channel.id, duration)
+                    if now > join_time:
+                        self._accumulate(member.id, before.channel.id, join_time, now)
 
                     del self.join_times[member.id][before.channel.id]
 
@@ -269,12 +356,14 @@ class VoiceTracker(commands.Cog):
                     self.join_times[member.id] = {}
                 self.join_times[member.id][after.channel.id] = now
             else:
-                await self.process_voice_quests_for_users({member.id}) # 나간 유저에 대해 음성 퀘스트 처리
+                # 나간 유저의 음성 퀘스트 처리 (DB 미반영 누적분은 메모리에서 합산)
+                await self.process_voice_quests_for_users({member.id})
         except Exception as e:
             print(e)
     @commands.command()
     async def check_all_time(self, ctx, user: discord.Member = None):
         user = user or ctx.author
+        await self.flush_pending_voice_times()
         data = await self.data_manager.get_user_times(user.id, "누적")
         times, start, end = data
         if not times: